@@ -91,7 +91,7 @@ def resolve_conflict(conflict: dict, mission_id: str) -> dict:
             "Re-evaluate dependency graph",
             "Re-issue tasks with conflict resolved",
         ]
-        log_to_ledger(AGENT_NAME, f"Conflict RESOLVED [{severity}] for {mission_id}: {description[:50]}")
+        log_to_ledger(AGENT_NAME, f"Conflict RESOLVED [{severity}] for {mission_id}: {description[:50]}", mission_id=mission_id)
         return {
             "resolution": "RESOLVED",
             "severity": severity,
@@ -99,7 +99,7 @@ def resolve_conflict(conflict: dict, mission_id: str) -> dict:
             "reassigned_to": "Roadmap reissued after conflict clearance",
         }
     else:
-        log_to_ledger(AGENT_NAME, f"Conflict NOTED [{severity}] for {mission_id}")
+        log_to_ledger(AGENT_NAME, f"Conflict NOTED [{severity}] for {mission_id}", mission_id=mission_id)
         return {
             "resolution": "NOTED",
             "severity": severity,
@@ -150,7 +150,7 @@ def dispatch(task: str, mission_id: str, tasks_list: list[dict] = None) -> HandO
         next_action="PM and Market Analyst: begin planning and market research in parallel.",
     )
 
-    log_to_ledger(AGENT_NAME, f"Dispatched mission {mission_id} to PM/Analyst (WSJF applied)")
+    log_to_ledger(AGENT_NAME, f"Dispatched mission {mission_id} to PM/Analyst (WSJF applied)", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "Mission Dispatched", "IN_PROGRESS",
            f"Mission {mission_id} dispatched. WSJF applied. Routing to PM + Analyst.",
            mission_id=mission_id)
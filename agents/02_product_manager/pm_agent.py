@@ -233,7 +233,7 @@ def plan(mission_id: str, task: str, market_data: dict = None) -> HandOffMessage
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"PRD + RICE + OKR generated for mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"PRD + RICE + OKR generated for mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "PRD + RICE + OKR Complete", "PRD",
            f"PRD 생성 완료. RICE Top: {rice_table[0]['name']} ({rice_table[0]['rice']}pt). OKR defined.",
            outputs=[prd_path], mission_id=mission_id)
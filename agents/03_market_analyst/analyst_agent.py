@@ -214,7 +214,7 @@ def analyze(mission_id: str, topic: str) -> HandOffMessage:
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"Full market analysis (SWOT/PESTLE/Porter's) for mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"Full market analysis (SWOT/PESTLE/Porter's) for mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "Market Analysis Complete", "COMPLETE",
            f"SWOT + PESTLE + Porter's 5 Forces + TAM/SAM/SOM 완료. 기회 등급: {forces['overall_attractiveness']}",
            mission_id=mission_id)
@@ -160,7 +160,7 @@ def design(mission_id: str, prd_summary: str = "") -> HandOffMessage:
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"Architecture designed for mission {mission_id} — ADR-0001, C4, OpenAPI spec")
+    log_to_ledger(AGENT_NAME, f"Architecture designed for mission {mission_id} — ADR-0001, C4, OpenAPI spec", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "Architecture Design Complete", "ADR",
            f"ADR-0001 확정 (Clean Architecture + Modular Monolith). C4 다이어그램 + OpenAPI stub 생성.",
            outputs=[str(adr_path)], mission_id=mission_id)
@@ -124,7 +124,7 @@ def implement(mission_id: str, feature: str, adr: dict = None) -> HandOffMessage
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"Backend '{feature}' implemented (TDD + Clean Architecture) — mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"Backend '{feature}' implemented (TDD + Clean Architecture) — mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "Backend Implementation Complete", "COMPLETE",
            f"'{feature}' 구현 완료. TDD Red-Green-Refactor. Use cases: {len(use_cases)}개. Coverage ≥80% 목표.",
            mission_id=mission_id)
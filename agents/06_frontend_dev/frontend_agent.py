@@ -151,7 +151,7 @@ def implement(mission_id: str, feature: str) -> HandOffMessage:
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"Frontend '{feature}' implemented (Atomic Design + WCAG) — mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"Frontend '{feature}' implemented (Atomic Design + WCAG) — mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, "Frontend Implementation Complete", "COMPLETE",
            f"'{feature}' UI 구현 완료. Atomic Design: {len(hierarchy['atoms'])}atoms/{len(hierarchy['molecules'])}molecules. WCAG 2.1 AA 체크.",
            mission_id=mission_id)
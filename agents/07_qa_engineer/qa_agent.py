@@ -158,7 +158,7 @@ def validate(mission_id: str, artifact: str, test_results: dict = None) -> HandO
         blockers="none" if not blocked else f"Test failures: {total - passed}/{total}",
     )
 
-    log_to_ledger(AGENT_NAME, f"QA {'PASSED' if not blocked else 'BLOCKED'} for {artifact} — mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"QA {'PASSED' if not blocked else 'BLOCKED'} for {artifact} — mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME,
            "QA Validation Complete" if not blocked else "QA BLOCKED — Test Failures",
            "QA" if not blocked else "BLOCKED",
@@ -144,7 +144,8 @@ def audit(mission_id: str, artifact: str, findings: list = None) -> HandOffMessa
 
     log_to_ledger(
         AGENT_NAME,
-        f"Security audit {'BLOCKED' if blocked else 'CLEARED'} for {artifact} — {len(critical)}C/{len(high)}H — mission {mission_id}"
+        f"Security audit {'BLOCKED' if blocked else 'CLEARED'} for {artifact} — {len(critical)}C/{len(high)}H — mission {mission_id}",
+        mission_id=mission_id,
     )
     notify(AGENT_ID, AGENT_NAME,
            "Security Audit BLOCKED" if blocked else "Security Audit CLEARED",
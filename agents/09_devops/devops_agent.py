@@ -126,7 +126,7 @@ def deploy(mission_id: str, artifact: str, environment: str = "staging") -> Hand
         blockers="none",
     )
 
-    log_to_ledger(AGENT_NAME, f"Deployed '{artifact}' v{version} to {environment} — Blue-Green — mission {mission_id}")
+    log_to_ledger(AGENT_NAME, f"Deployed '{artifact}' v{version} to {environment} — Blue-Green — mission {mission_id}", mission_id=mission_id)
     notify(AGENT_ID, AGENT_NAME, f"Deployment to {environment}", "DEPLOYMENT",
            f"🚀 {artifact} v{version} → {environment} 배포 완료 (Blue-Green). "
            f"SLO: {slo_data['slo']['target']} | Error Budget: {slo_data['slo']['error_budget_minutes']}min",
@@ -161,7 +161,7 @@ def report(
 
     message = format_message(event_type, mission_id, summary, status)
     sent    = asyncio.run(send_telegram(message))
-    log_to_ledger(AGENT_NAME, f"Telegram notification sent for mission {mission_id} [{status}]")
+    log_to_ledger(AGENT_NAME, f"Telegram notification sent for mission {mission_id} [{status}]", mission_id=mission_id)
     return sent
 
 
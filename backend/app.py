@@ -307,10 +307,12 @@ def create_app():
     register_search_admin(app)
 
     # Register cache stats endpoint
-    from .cache import get_cache
+    from .cache import get_cache, get_single_flight_stats
     @app.route('/api/perf/cache-stats')
     def cache_stats():
-        return jsonify(get_cache().stats()), 200
+        stats = get_cache().stats()
+        stats['coalescing'] = get_single_flight_stats()
+        return jsonify(stats), 200
 
     # -----------------------------------------------------------------------
     # Request tracking middleware  (Task 5)
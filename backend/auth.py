@@ -7,8 +7,10 @@ import time
 import threading
 import secrets
 from functools import wraps
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash
-from .models import db, User, Subscription, Payment, Product
+from .models import db, User, Subscription, Payment
+from .principal import get_principal, invalidate_principal
 from .rate_limiter import rate_limit
 from .input_validator import (
     validate_email, validate_password, validate_string, sanitize_html,
@@ -151,6 +153,13 @@ def revoke_token(token):
         _token_blacklist.revoke(token, time.time() + 3600)
 
 
+def _load_current_user():
+    """Load (once per request) the User row behind g.user."""
+    if '_current_user' not in g:
+        g._current_user = db.session.get(User, g.user_id)
+    return g._current_user
+
+
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -192,13 +201,15 @@ def require_auth(f):
         if not payload or payload.get('type') != 'access':
             return jsonify({'error': 'Invalid or expired token'}), 401
 
-        user = User.query.get(payload['user_id'])
-        if not user or not user.is_active:
+        principal = get_principal(payload['user_id'])
+        if not principal or not principal.is_active:
             return jsonify({'error': 'User not found or inactive'}), 401
 
-        g.user_id = user.id
-        g.user_role = user.role
-        g.user = user
+        g.user_id = principal.user_id
+        g.user_role = principal.role
+        g.principal = principal
+        # The ORM row is only loaded if the view actually touches g.user
+        g.user = LocalProxy(_load_current_user)
 
         return f(*args, **kwargs)
 
@@ -229,17 +240,8 @@ def require_subscription(product_slug):
             if getattr(g, 'user', None) is not None and getattr(g.user, 'email', None) == 'demo@softfactory.com':
                 return f(*args, **kwargs)
 
-            product = Product.query.filter_by(slug=product_slug).first()
-            if not product:
-                return jsonify({'error': f'Subscription to {product_slug} required'}), 403
-
-            subscription = Subscription.query.filter_by(
-                user_id=g.user_id,
-                product_id=product.id,
-                status='active'
-            ).first()
-
-            if not subscription:
+            principal = getattr(g, 'principal', None) or get_principal(g.user_id)
+            if not principal or not principal.has_subscription(product_slug):
                 return jsonify({'error': f'Subscription to {product_slug} required'}), 403
 
             return f(*args, **kwargs)
@@ -499,6 +501,7 @@ def delete_account():
         revoke_token(auth_header[7:])
 
     db.session.commit()
+    invalidate_principal(user.id)
 
     email_service = _get_email_service()
     if email_service:
@@ -755,6 +758,7 @@ def oauth_callback(provider):
 
     user.is_active = True
     db.session.commit()
+    invalidate_principal(user.id)
 
     # Generate tokens
     access_token, refresh_token = create_tokens(user.id, user.role)
@@ -1,7 +1,9 @@
 """Lightweight In-Memory TTL Cache for SoftFactory
 
-Provides simple response caching without external dependencies (no Redis needed).
+Provides simple response caching without required external dependencies.
 Uses threading locks for safe concurrent access in production WSGI servers.
+The global cache is a per-worker L1 in front of the shared L2 tier from
+backend.shared_cache (Redis, or local SQLite when Redis is absent).
 
 Usage:
     from backend.cache import ttl_cache, invalidate_cache
@@ -11,6 +13,14 @@ Usage:
     def get_data():
         return jsonify({...}), 200
 
+    # Hot endpoint: coalesce concurrent misses and serve the previous value
+    # for up to 30s past expiry while one background refresh runs:
+    @app.route('/api/hot')
+    @ttl_cache(ttl_seconds=60, key_prefix='hot', single_flight=True,
+               stale_while_revalidate=30)
+    def get_hot():
+        return jsonify({...}), 200
+
     # Invalidate on writes:
     @app.route('/api/data', methods=['POST'])
     @invalidate_cache('data')
@@ -19,20 +29,45 @@ Usage:
 """
 
 import time
+import heapq
+import bisect
 import hashlib
 import threading
+from collections import OrderedDict
 from functools import wraps
-from flask import request, g, jsonify
+from flask import request, g, jsonify, copy_current_request_context
+
+from .shared_cache import TieredCache
+
+
+# Upper bounds (microseconds) of the eviction latency histogram buckets.
+EVICTION_LATENCY_BUCKETS_US = (10, 50, 100, 500, 1000, 5000)
+
+
+def _key_namespace(key):
+    """Return the portion of a cache key before the first ':' separator."""
+    return key.split(':', 1)[0]
 
 
 class TTLCache:
-    """Thread-safe in-memory cache with TTL expiration and size limits."""
+    """Thread-safe in-memory cache with TTL expiration and size limits.
+
+    Entries live in an ``OrderedDict`` kept in LRU order, so capacity
+    eviction is an O(1) ``popitem``.  A min-heap of ``(expire_time, key)``
+    pairs drives expiry in O(log n); heap entries are validated lazily
+    against the store, so overwrites never require a heap search.  Keys are
+    also indexed by namespace (the part before the first ``:``) so that
+    ``invalidate_prefix`` only touches the matching buckets.
+    """
 
     def __init__(self, max_entries=1024):
-        self._store = {}  # key -> (value, expire_time)
+        self._store = OrderedDict()  # key -> (value, expire_time), LRU order
+        self._expiry_heap = []  # (expire_time, key); may contain stale pairs
+        self._prefix_index = {}  # namespace -> set(keys)
         self._lock = threading.Lock()
         self._max_entries = max_entries
         self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._eviction_latency = [0] * (len(EVICTION_LATENCY_BUCKETS_US) + 1)
 
     def get(self, key):
         """Get value if it exists and has not expired."""
@@ -43,35 +78,64 @@ class TTLCache:
                 return None
             value, expire_time = entry
             if time.time() > expire_time:
-                del self._store[key]
+                self._remove(key)
                 self._stats['misses'] += 1
                 return None
+            self._store.move_to_end(key)
             self._stats['hits'] += 1
             return value
 
     def set(self, key, value, ttl_seconds):
-        """Store value with TTL. Evicts oldest entries if over capacity."""
+        """Store value with TTL. Evicts expired, then least recently used entries."""
         with self._lock:
-            # Evict expired entries when approaching capacity
-            if len(self._store) >= self._max_entries:
+            if key not in self._store and len(self._store) >= self._max_entries:
+                started = time.perf_counter()
                 self._evict_expired()
-            # If still at capacity, evict oldest entries
-            if len(self._store) >= self._max_entries:
-                self._evict_oldest(len(self._store) // 4)
-            self._store[key] = (value, time.time() + ttl_seconds)
+                while self._store and len(self._store) >= self._max_entries:
+                    self._evict_lru()
+                self._record_eviction_latency(time.perf_counter() - started)
+            expire_time = time.time() + ttl_seconds
+            self._store[key] = (value, expire_time)
+            self._store.move_to_end(key)
+            self._prefix_index.setdefault(_key_namespace(key), set()).add(key)
+            heapq.heappush(self._expiry_heap, (expire_time, key))
+            if len(self._expiry_heap) > 2 * self._max_entries:
+                self._compact_heap()
+
+    def delete(self, key):
+        """Remove a single entry. Returns True if it existed."""
+        with self._lock:
+            existed = key in self._store
+            self._remove(key)
+            return existed
+
+    def purge_expired(self):
+        """Remove every expired entry. Returns the number removed."""
+        with self._lock:
+            before = len(self._store)
+            self._evict_expired()
+            return before - len(self._store)
 
     def invalidate_prefix(self, prefix):
         """Remove all entries whose key starts with the given prefix."""
         with self._lock:
-            keys_to_remove = [k for k in self._store if k.startswith(prefix)]
-            for k in keys_to_remove:
-                del self._store[k]
-                self._stats['evictions'] += 1
+            for namespace in list(self._prefix_index):
+                if namespace.startswith(prefix):
+                    keys = list(self._prefix_index[namespace])
+                elif prefix.startswith(namespace):
+                    keys = [k for k in self._prefix_index[namespace] if k.startswith(prefix)]
+                else:
+                    continue
+                for k in keys:
+                    self._remove(k)
+                    self._stats['evictions'] += 1
 
     def clear(self):
         """Remove all entries."""
         with self._lock:
             self._store.clear()
+            self._expiry_heap.clear()
+            self._prefix_index.clear()
 
     def stats(self):
         """Return cache statistics."""
@@ -84,28 +148,89 @@ class TTLCache:
                 'evictions': self._stats['evictions'],
                 'hit_rate_pct': round(hit_rate, 2),
                 'entries': len(self._store),
+                'eviction_latency_us': self._latency_histogram(),
             }
 
+    def _remove(self, key):
+        """Drop a key from the store and prefix index (caller must hold lock).
+
+        The matching heap pair is left behind and discarded lazily.
+        """
+        self._store.pop(key, None)
+        namespace = _key_namespace(key)
+        bucket = self._prefix_index.get(namespace)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._prefix_index[namespace]
+
     def _evict_expired(self):
-        """Remove all expired entries (caller must hold lock)."""
+        """Pop expired entries off the expiry heap (caller must hold lock)."""
         now = time.time()
-        expired = [k for k, (_, exp) in self._store.items() if now > exp]
-        for k in expired:
-            del self._store[k]
-            self._stats['evictions'] += 1
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expire_time, key = heapq.heappop(heap)
+            entry = self._store.get(key)
+            if entry is not None and entry[1] == expire_time:
+                self._remove(key)
+                self._stats['evictions'] += 1
+
+    def _evict_lru(self):
+        """Remove the least recently used entry (caller must hold lock)."""
+        key = next(iter(self._store))
+        self._remove(key)
+        self._stats['evictions'] += 1
+
+    def _compact_heap(self):
+        """Rebuild the expiry heap without stale pairs (caller must hold lock)."""
+        self._expiry_heap = [(exp, k) for k, (_, exp) in self._store.items()]
+        heapq.heapify(self._expiry_heap)
 
-    def _evict_oldest(self, count):
-        """Remove the N entries with the earliest expiry (caller must hold lock)."""
-        sorted_keys = sorted(self._store, key=lambda k: self._store[k][1])
-        for k in sorted_keys[:count]:
-            del self._store[k]
-            self._stats['evictions'] += 1
+    def _record_eviction_latency(self, seconds):
+        """Add one eviction pass to the latency histogram (caller must hold lock)."""
+        micros = seconds * 1_000_000
+        self._eviction_latency[bisect.bisect_left(EVICTION_LATENCY_BUCKETS_US, micros)] += 1
+
+    def _latency_histogram(self):
+        """Return the eviction latency histogram keyed by bucket upper bound."""
+        labels = [f'le_{bound}' for bound in EVICTION_LATENCY_BUCKETS_US] + ['le_inf']
+        return dict(zip(labels, self._eviction_latency))
 
 
 # ---------------------------------------------------------------------------
-# Global singleton
+# Global singleton (L1 per worker, shared L2 — see backend/shared_cache.py)
 # ---------------------------------------------------------------------------
-_cache = TTLCache(max_entries=2048)
+_cache = TieredCache('http', TTLCache(max_entries=2048), l1_max_ttl=300)
+
+# How long a follower waits for the leader of a coalesced miss before it
+# gives up and recomputes the response itself.
+SINGLE_FLIGHT_WAIT_SECONDS = 30
+
+
+class _Flight:
+    """An in-progress computation that concurrent callers can wait on."""
+
+    __slots__ = ('done', 'entry')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None  # (json_data, status_code) when cacheable
+
+
+_flights = {}  # cache_key -> _Flight
+_flights_lock = threading.Lock()
+_flight_stats = {
+    'leader_computes': 0,
+    'coalesced_waits': 0,
+    'coalesced_hits': 0,
+    'stale_served': 0,
+    'background_refreshes': 0,
+}
+
+
+def _bump(counter):
+    with _flights_lock:
+        _flight_stats[counter] += 1
 
 
 def _build_cache_key(prefix):
@@ -121,11 +246,82 @@ def _build_cache_key(prefix):
     return prefix + ':' + hashlib.md5(raw.encode()).hexdigest()
 
 
+def _cacheable_entry(result):
+    """Return (json_data, status_code) for a cacheable view result, else None.
+
+    Only successful (2xx) JSON responses are cacheable.
+    """
+    if isinstance(result, tuple):
+        response_obj, status_code = result[0], result[1] if len(result) > 1 else 200
+    else:
+        response_obj, status_code = result, 200
+
+    if not (isinstance(status_code, int) and 200 <= status_code < 300):
+        return None
+    try:
+        if hasattr(response_obj, 'get_json'):
+            json_data = response_obj.get_json()
+        elif isinstance(response_obj, dict):
+            json_data = response_obj
+        else:
+            json_data = None
+    except Exception:
+        return None  # Don't let cache errors break the endpoint
+    if json_data is None:
+        return None
+    return json_data, status_code
+
+
+def _store_entry(cache_key, entry, ttl_seconds, stale_seconds):
+    """Cache a (json_data, status_code) pair with its freshness deadline."""
+    json_data, status_code = entry
+    fresh_until = time.time() + ttl_seconds
+    try:
+        _cache.set(cache_key, (json_data, status_code, fresh_until), ttl_seconds + stale_seconds)
+    except Exception:
+        pass  # Don't let cache errors break the endpoint
+
+
+def _cached_response(data, status, marker):
+    response = jsonify(data)
+    response.headers['X-Cache'] = marker
+    return response, status
+
+
+def _start_background_refresh(f, args, kwargs, cache_key, ttl_seconds, stale_seconds):
+    """Recompute a stale entry on a daemon thread unless a refresh is running."""
+    with _flights_lock:
+        if cache_key in _flights:
+            return
+        flight = _flights[cache_key] = _Flight()
+        _flight_stats['background_refreshes'] += 1
+
+    saved_g = dict(vars(g))
+
+    @copy_current_request_context
+    def refresh():
+        try:
+            vars(g).update(saved_g)
+            entry = _cacheable_entry(f(*args, **kwargs))
+            if entry is not None:
+                _store_entry(cache_key, entry, ttl_seconds, stale_seconds)
+            flight.entry = entry
+        except Exception:
+            pass  # Keep serving the stale value; the next reader retries
+        finally:
+            with _flights_lock:
+                _flights.pop(cache_key, None)
+            flight.done.set()
+
+    threading.Thread(target=refresh, name=f'cache-refresh-{cache_key}', daemon=True).start()
+
+
 # ---------------------------------------------------------------------------
 # Decorators
 # ---------------------------------------------------------------------------
 
-def ttl_cache(ttl_seconds=300, key_prefix='default'):
+def ttl_cache(ttl_seconds=300, key_prefix='default', single_flight=False,
+              stale_while_revalidate=0):
     """Decorator that caches the full Flask response tuple (json_data, status_code).
 
     Must be placed AFTER @require_auth (closer to function) so that g.user_id
@@ -134,6 +330,11 @@ def ttl_cache(ttl_seconds=300, key_prefix='default'):
     Args:
         ttl_seconds: Time-to-live in seconds.
         key_prefix: Prefix for the cache key (used for targeted invalidation).
+        single_flight: Coalesce concurrent misses for the same key so only one
+            caller runs the view while the others wait for its result.
+        stale_while_revalidate: Seconds past expiry during which the previous
+            value is still served (``X-Cache: STALE``) while a background
+            thread recomputes it.
     """
     def decorator(f):
         @wraps(f)
@@ -141,35 +342,50 @@ def ttl_cache(ttl_seconds=300, key_prefix='default'):
             cache_key = _build_cache_key(key_prefix)
             cached = _cache.get(cache_key)
             if cached is not None:
-                data, status = cached
-                response = jsonify(data)
-                response.headers['X-Cache'] = 'HIT'
-                return response, status
-
-            result = f(*args, **kwargs)
-
-            # Normalise the return value
-            if isinstance(result, tuple):
-                response_obj, status_code = result[0], result[1] if len(result) > 1 else 200
-            else:
-                response_obj, status_code = result, 200
-
-            # Only cache successful (2xx) JSON responses
-            if 200 <= status_code < 300:
-                try:
-                    if hasattr(response_obj, 'get_json'):
-                        json_data = response_obj.get_json()
-                    elif isinstance(response_obj, dict):
-                        json_data = response_obj
-                    else:
-                        json_data = None
-
-                    if json_data is not None:
-                        _cache.set(cache_key, (json_data, status_code), ttl_seconds)
-                except Exception:
-                    pass  # Don't let cache errors break the endpoint
-
-            return result
+                data, status, fresh_until = cached
+                if time.time() <= fresh_until:
+                    return _cached_response(data, status, 'HIT')
+                _bump('stale_served')
+                _start_background_refresh(
+                    f, args, kwargs, cache_key, ttl_seconds, stale_while_revalidate
+                )
+                return _cached_response(data, status, 'STALE')
+
+            if not single_flight:
+                result = f(*args, **kwargs)
+                entry = _cacheable_entry(result)
+                if entry is not None:
+                    _store_entry(cache_key, entry, ttl_seconds, stale_while_revalidate)
+                return result
+
+            with _flights_lock:
+                flight = _flights.get(cache_key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[cache_key] = _Flight()
+                    _flight_stats['leader_computes'] += 1
+                else:
+                    _flight_stats['coalesced_waits'] += 1
+
+            if not leader:
+                if flight.done.wait(SINGLE_FLIGHT_WAIT_SECONDS) and flight.entry is not None:
+                    _bump('coalesced_hits')
+                    data, status = flight.entry
+                    return _cached_response(data, status, 'COALESCED')
+                # Leader failed, timed out or produced an uncacheable response
+                return f(*args, **kwargs)
+
+            try:
+                result = f(*args, **kwargs)
+                entry = _cacheable_entry(result)
+                if entry is not None:
+                    _store_entry(cache_key, entry, ttl_seconds, stale_while_revalidate)
+                flight.entry = entry
+                return result
+            finally:
+                with _flights_lock:
+                    _flights.pop(cache_key, None)
+                flight.done.set()
 
         return wrapper
     return decorator
@@ -199,3 +415,11 @@ def invalidate_cache(prefix):
 def get_cache():
     """Return the global cache instance (for stats, manual operations)."""
     return _cache
+
+
+def get_single_flight_stats():
+    """Return request-coalescing and stale-while-revalidate counters."""
+    with _flights_lock:
+        stats = dict(_flight_stats)
+        stats['in_flight'] = len(_flights)
+    return stats
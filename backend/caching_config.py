@@ -1,23 +1,21 @@
 """Caching Configuration & Implementation"""
 import json
 import hashlib
-from datetime import datetime, timedelta
 from flask import request, g
 from functools import wraps
-import os
-from pathlib import Path
-import tempfile
+
+from .cache import TTLCache
+from .shared_cache import TieredCache
 
 class CacheManager:
-    """Simple in-memory and file-based cache with TTL support"""
+    """Two-tier cache with TTL support.
+
+    L1 is a per-process TTLCache; L2 is the shared tier from
+    backend.shared_cache, so entries and invalidations reach every worker.
+    """
 
     def __init__(self):
-        self.memory_cache = {}
-        if os.getenv('VERCEL', '').strip() == '1':
-            self.cache_dir = Path(tempfile.gettempdir()) / 'softfactory-cache'
-        else:
-            self.cache_dir = Path(__file__).parent.parent / '.cache'
-        self.cache_dir.mkdir(exist_ok=True)
+        self._tiers = TieredCache('cache_manager', TTLCache(max_entries=1024))
         self.hit_count = 0
         self.miss_count = 0
 
@@ -27,87 +25,46 @@ class CacheManager:
             'args': str(args),
             'kwargs': str(sorted(kwargs.items()))
         }, sort_keys=True)
-        return hashlib.md5(combined.encode()).hexdigest()
+        return f"{key_prefix}:" + hashlib.md5(combined.encode()).hexdigest()
 
     def get(self, key):
         """Get value from cache"""
-        # Check memory cache first
-        if key in self.memory_cache:
-            entry = self.memory_cache[key]
-            if datetime.utcnow() < entry['expires']:
-                self.hit_count += 1
-                return entry['value']
-            else:
-                del self.memory_cache[key]
-
-        # Check file cache
-        cache_file = self.cache_dir / f"{key}.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                if datetime.fromisoformat(data['expires']) > datetime.utcnow():
-                    self.hit_count += 1
-                    # Load into memory for next hit
-                    self.memory_cache[key] = {
-                        'value': data['value'],
-                        'expires': datetime.fromisoformat(data['expires'])
-                    }
-                    return data['value']
-                else:
-                    cache_file.unlink()
-            except Exception:
-                pass
-
+        value = self._tiers.get(key)
+        if value is not None:
+            self.hit_count += 1
+            return value
         self.miss_count += 1
         return None
 
     def set(self, key, value, ttl_seconds=3600):
         """Set value in cache with TTL"""
-        expires = datetime.utcnow() + timedelta(seconds=ttl_seconds)
-
-        # Store in memory
-        self.memory_cache[key] = {
-            'value': value,
-            'expires': expires
-        }
-
-        # Store in file for persistence
-        cache_file = self.cache_dir / f"{key}.json"
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'value': value,
-                    'expires': expires.isoformat()
-                }, f)
-        except Exception as e:
-            print(f"Failed to write cache file: {e}")
+        self._tiers.set(key, value, ttl_seconds)
 
     def delete(self, key):
         """Delete value from cache"""
-        if key in self.memory_cache:
-            del self.memory_cache[key]
+        self._tiers.delete(key)
 
-        cache_file = self.cache_dir / f"{key}.json"
-        if cache_file.exists():
-            cache_file.unlink()
+    def invalidate_prefix(self, prefix):
+        """Delete every entry whose key starts with prefix"""
+        self._tiers.invalidate_prefix(prefix)
 
     def clear(self):
         """Clear all cache"""
-        self.memory_cache.clear()
-        for cache_file in self.cache_dir.glob('*.json'):
-            cache_file.unlink()
+        self._tiers.clear()
 
     def get_stats(self):
         """Get cache statistics"""
         total = self.hit_count + self.miss_count
         hit_rate = (self.hit_count / total * 100) if total > 0 else 0
+        tier_stats = self._tiers.stats()
         return {
             'hits': self.hit_count,
             'misses': self.miss_count,
             'hit_rate': round(hit_rate, 2),
             'total_requests': total,
-            'cached_items': len(self.memory_cache)
+            'cached_items': tier_stats['entries'],
+            'l2_backend': tier_stats['l2_backend'],
+            'l2_hits': tier_stats['l2_hits'],
         }
 
 # Global cache instance
@@ -144,10 +101,7 @@ def cache_bust(key_prefix):
 
             # Invalidate related cache entries
             try:
-                pattern = f"{key_prefix}:*"
-                for cache_file in _cache_manager.cache_dir.glob('*.json'):
-                    if key_prefix in cache_file.stem:
-                        cache_file.unlink()
+                _cache_manager.invalidate_prefix(f"{key_prefix}:")
             except Exception as e:
                 print(f"Failed to bust cache: {e}")
 
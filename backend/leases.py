@@ -0,0 +1,98 @@
+"""Row leases — claim batches of due rows so concurrent workers never share one.
+
+A leased model has ``lease_owner`` / ``lease_expires_at`` columns. ``claim()``
+takes up to ``limit`` rows that match the caller's criteria and whose lease is
+free or expired, stamps them with a fresh owner token and commits:
+
+- PostgreSQL: ``SELECT ... FOR UPDATE SKIP LOCKED`` — concurrent claimers
+  skip each other's rows instead of blocking on them.
+- SQLite and others: one compare-and-set ``UPDATE`` that re-checks the lease
+  predicate. Writers are serialized, so each row is won by exactly one
+  claimer; the winner reads its rows back by owner token.
+
+A worker that dies mid-batch leaves an expiring lease behind, so its rows
+become claimable again after ``lease_seconds``. A worker that merely runs
+long can lose its rows the same way, so it calls ``retain()`` before writing
+its results and drops any row another worker has since claimed.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, select, update
+
+from .models import db
+
+
+def new_owner(prefix: str = 'worker') -> str:
+    """Unique owner token for one claim."""
+    return f'{prefix}-{uuid.uuid4().hex[:16]}'
+
+
+def lease_free(model, now: datetime):
+    """SQL predicate: row is not leased, or its lease has expired."""
+    return or_(model.lease_expires_at.is_(None), model.lease_expires_at < now)
+
+
+def claim(model, criteria: Iterable, order_by: Iterable, limit: int, lease_seconds: int,
+          owner: Optional[str] = None, now: Optional[datetime] = None,
+          values: Optional[Dict] = None) -> List[int]:
+    """Lease up to ``limit`` rows matching ``criteria``; returns their ids.
+
+    ``values`` are extra columns set in the same UPDATE (e.g. a status flip
+    or an attempt counter). Commits the current session.
+    """
+    now = now or datetime.utcnow()
+    owner = owner or new_owner()
+    order_by = list(order_by)
+    due = [*criteria, lease_free(model, now)]
+    candidates = select(model.id).where(*due).order_by(*order_by).limit(limit)
+    stamp = {**(values or {}), 'lease_owner': owner, 'lease_expires_at': now + timedelta(seconds=lease_seconds)}
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        ids = db.session.execute(candidates.with_for_update(skip_locked=True)).scalars().all()
+        if ids:
+            db.session.execute(
+                update(model).where(model.id.in_(ids)).values(**stamp)
+                .execution_options(synchronize_session=False)
+            )
+    else:
+        db.session.execute(
+            update(model).where(model.id.in_(candidates.scalar_subquery()), *due).values(**stamp)
+            .execution_options(synchronize_session=False)
+        )
+        ids = db.session.execute(
+            select(model.id).where(model.lease_owner == owner).order_by(*order_by)
+        ).scalars().all()
+
+    db.session.commit()
+    return list(ids)
+
+
+def retain(model, ids: Iterable[int], owner: str, lease_seconds: int,
+           now: Optional[datetime] = None) -> List[int]:
+    """Re-stamp the rows of ``ids`` still leased to ``owner``; returns their ids.
+
+    The UPDATE write-locks the retained rows until the caller commits, so no
+    other worker can claim them between this check and the caller's write.
+    Rows re-claimed by someone else are left alone and not returned. Does not
+    commit.
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    now = now or datetime.utcnow()
+    db.session.execute(
+        update(model).where(model.id.in_(ids), model.lease_owner == owner)
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    return list(db.session.execute(
+        select(model.id).where(model.id.in_(ids), model.lease_owner == owner)
+    ).scalars().all())
+
+
+def release(row) -> None:
+    """Clear the lease on a loaded row (caller commits)."""
+    row.lease_owner = None
+    row.lease_expires_at = None
@@ -1,6 +1,6 @@
 """SoftFactory Database Models (v2.0 — Optimized with Indexes & Relationships)"""
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Index, func
+from sqlalchemy import Index, event, func, inspect
 from sqlalchemy.orm import joinedload, selectinload, synonym
 from datetime import datetime, timedelta
 import uuid
@@ -146,6 +146,9 @@ class Subscription(db.Model):
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        Index('idx_payment_user_created', 'user_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -341,6 +344,8 @@ class SNSPost(db.Model):
         Index('idx_sns_post_account_created', 'account_id', 'created_at'),
         # Published posts (analytics queries)
         Index('idx_sns_post_user_published', 'user_id', 'status'),
+        # Delivery claims (status='scheduled' due by scheduled_at)
+        Index('idx_sns_post_status_scheduled', 'status', 'scheduled_at'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -371,6 +376,10 @@ class SNSPost(db.Model):
     error_message = db.Column(db.Text)
     retry_count = db.Column(db.Integer, default=0)
 
+    # Delivery lease (backend.leases) — held while a scheduler worker publishes it
+    lease_owner = db.Column(db.String(64))
+    lease_expires_at = db.Column(db.DateTime)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -596,6 +605,8 @@ class SNSAutomate(db.Model):
         Index('idx_sns_automate_next_run', 'next_run'),
         # Active automation rules
         Index('idx_sns_automate_active', 'is_active'),
+        # Delivery claims (active rules due by next_run)
+        Index('idx_sns_automate_due', 'is_active', 'next_run'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -612,6 +623,9 @@ class SNSAutomate(db.Model):
     requested_at = db.Column(db.DateTime)
     next_run = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
+    # Delivery lease (backend.leases) — held while a scheduler worker runs the rule
+    lease_owner = db.Column(db.String(64))
+    lease_expires_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -693,6 +707,11 @@ class ReviewListing(db.Model):
         Index('idx_external_id_platform', 'external_id', 'source_platform'),
         # Deadline queries (expired listings cleanup)
         Index('idx_deadline', 'deadline'),
+        # /review/aggregated sorts: (status, sort key, deadline) so the sort is an
+        # ordered index scan and the deadline filter is checked from the index
+        Index('idx_listing_status_deadline', 'status', 'deadline'),
+        Index('idx_listing_status_reward', 'status', 'reward_value', 'deadline'),
+        Index('idx_listing_status_app_count', 'status', 'application_count', 'deadline'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -710,6 +729,8 @@ class ReviewListing(db.Model):
     url = db.Column(db.String(500))
     image_url = db.Column(db.String(500))
     applied_accounts = db.Column(db.JSON, default=[])  # [account_ids]
+    # Local ReviewApplication rows; maintained by the ReviewApplication flush hooks below
+    application_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     status = db.Column(db.String(50), default='active')  # 'active', 'closed', 'ended'
     scraped_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -736,6 +757,24 @@ class ReviewListing(db.Model):
         }
 
 
+class ReviewCrawlState(db.Model):
+    """Review Crawl State — Conditional-GET validators and content hashes from previous crawls"""
+    __tablename__ = 'review_crawl_states'
+    __table_args__ = (
+        # One state row per (platform, page URL / listing id)
+        db.UniqueConstraint('platform', 'kind', 'key', name='uq_crawl_state_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    platform = db.Column(db.String(50), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # 'page', 'listing'
+    key = db.Column(db.String(1000), nullable=False)  # page URL with query / listing external_id
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(64))
+    content_hash = db.Column(db.String(64))
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class ReviewBookmark(db.Model):
     """Review Bookmark — User bookmarked review listing"""
     __tablename__ = 'review_bookmarks'
@@ -838,6 +877,42 @@ class ReviewApplication(db.Model):
         }
 
 
+def adjust_application_counts(connection, deltas):
+    """Atomically add {listing_id: delta} to review_listings.application_count.
+
+    Runs on the given (flushing) connection, so counters commit or roll back
+    with the application rows. Bulk (Core) inserts of ReviewApplication bypass
+    the flush hooks below and must call this themselves.
+    """
+    deltas = [{'b_id': listing_id, 'b_delta': delta} for listing_id, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    table = ReviewListing.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == db.bindparam('b_id'))
+        .values(application_count=func.coalesce(table.c.application_count, 0) + db.bindparam('b_delta')),
+        deltas
+    )
+
+
+@event.listens_for(ReviewApplication, 'after_insert')
+def _application_inserted(mapper, connection, target):
+    adjust_application_counts(connection, {target.listing_id: 1})
+
+
+@event.listens_for(ReviewApplication, 'after_delete')
+def _application_deleted(mapper, connection, target):
+    adjust_application_counts(connection, {target.listing_id: -1})
+
+
+@event.listens_for(ReviewApplication, 'after_update')
+def _application_moved(mapper, connection, target):
+    history = inspect(target).attrs.listing_id.history
+    if history.deleted and history.added:
+        adjust_application_counts(connection, {history.deleted[0]: -1, history.added[0]: 1})
+
+
 class ReviewAutoRule(db.Model):
     """Review Automation Rule — Auto-apply to matching review listings"""
     __tablename__ = 'review_auto_rules'
@@ -1576,6 +1651,7 @@ class Invoice(db.Model):
     __table_args__ = (
         Index('idx_order_id', 'order_id'),
         Index('idx_user_id_invoices', 'user_id'),
+        Index('idx_invoice_user_issued', 'user_id', 'issued_date'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -2057,6 +2133,25 @@ class Feed(db.Model):
         }
 
 
+class FeedItem(db.Model):
+    """Materialized home feed — one row per (reader, activity), fanned out when the activity is written"""
+    __tablename__ = 'feed_items'
+    __table_args__ = (
+        # Feed reads: WHERE user_id = ? AND activity_id < :cursor ORDER BY activity_id DESC
+        db.UniqueConstraint('user_id', 'activity_id', name='uq_feed_item_user_activity'),
+        # Unfollow cleanup
+        Index('idx_feed_item_user_actor', 'user_id', 'actor_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # feed owner
+    activity_id = db.Column(db.Integer, db.ForeignKey('feeds.id'), nullable=False)
+    actor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    activity_type = db.Column(db.String(50), nullable=False)
+    content_json = db.Column(db.JSON, nullable=True)  # copied from Feed so reads need no join
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # activity time
+
+
 class CookingSession(db.Model):
     """User cooking sessions"""
     __tablename__ = 'cooking_sessions'
@@ -2653,6 +2748,11 @@ class MarketingEvent(db.Model):
         Index('idx_marketing_event_status', 'processing_status'),
         Index('idx_marketing_event_contact_ts', 'contact_id', 'event_ts'),
         Index('idx_marketing_event_anonymous', 'anonymous_id'),
+        # Work queue: oldest pending first, and lease expiry (backend.services.growth_queue)
+        Index('idx_marketing_event_queue', 'processing_status', 'created_at'),
+        Index('idx_marketing_event_lease', 'processing_status', 'lease_expires_at'),
+        # Dashboard windows (partial-hour edges; backend.services.growth_rollups)
+        Index('idx_marketing_event_ts', 'event_ts'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -2668,6 +2768,10 @@ class MarketingEvent(db.Model):
     processing_updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     workflow_run_id = db.Column(db.String(120), nullable=True)
     error_code = db.Column(db.String(120), nullable=True)
+    # Queue lease (backend.leases) — held by the poller that claimed the event
+    lease_owner = db.Column(db.String(64), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    delivery_attempts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     def to_dict(self):
@@ -2685,6 +2789,7 @@ class MarketingEvent(db.Model):
             'processing_updated_at': self.processing_updated_at.isoformat() if self.processing_updated_at else None,
             'workflow_run_id': self.workflow_run_id,
             'error_code': self.error_code,
+            'delivery_attempts': self.delivery_attempts,
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
 
@@ -2694,6 +2799,8 @@ class MarketingJourneyState(db.Model):
     __table_args__ = (
         Index('idx_marketing_journey_state', 'journey_id', 'state'),
         Index('idx_marketing_journey_contact', 'contact_id'),
+        Index('idx_marketing_journey_entered', 'entered_at'),
+        Index('idx_marketing_journey_last_action', 'last_action_at'),
         db.UniqueConstraint('contact_id', 'journey_id', name='uq_marketing_journey_contact_journey'),
     )
 
@@ -2725,6 +2832,7 @@ class MarketingMessageLog(db.Model):
         Index('idx_marketing_message_status', 'status'),
         Index('idx_marketing_message_campaign', 'campaign_id'),
         Index('idx_marketing_message_contact_sent', 'contact_id', 'sent_at'),
+        Index('idx_marketing_message_created', 'created_at'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -2768,6 +2876,7 @@ class MarketingDLQ(db.Model):
         Index('idx_marketing_dlq_status', 'status'),
         Index('idx_marketing_dlq_event_id', 'event_id'),
         Index('idx_marketing_dlq_workflow_created', 'workflow_name', 'created_at'),
+        Index('idx_marketing_dlq_created', 'created_at'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -2796,3 +2905,49 @@ class MarketingDLQ(db.Model):
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
             'resolved_reason': self.resolved_reason,
         }
+
+
+class MarketingRollup(db.Model):
+    """Hourly growth dashboard counters (backend.services.growth_rollups).
+
+    One row per (metric, hour bucket, dimension); kept in step with the raw
+    marketing tables by flush hooks and rebuilt by ``rebuild_rollups()``.
+    """
+    __tablename__ = 'marketing_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('metric', 'bucket', 'dimension', name='uq_marketing_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(32), nullable=False)      # contacts, events, messages, dlq
+    bucket = db.Column(db.DateTime, nullable=False)        # start of the hour
+    dimension = db.Column(db.String(60), nullable=False)   # lifecycle stage / status
+    total = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        return {
+            'metric': self.metric,
+            'bucket': self.bucket.isoformat() if self.bucket else None,
+            'dimension': self.dimension,
+            'total': self.total,
+        }
+
+
+class MarketingJourneyRollup(db.Model):
+    """Journey states by the hours their activity span starts and ends.
+
+    A journey is active from min(entered_at, last_action_at) to
+    max(entered_at, last_action_at); the dashboard counts journeys whose span
+    overlaps the requested window, so both ends are bucketed.
+    """
+    __tablename__ = 'marketing_journey_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('span_start', 'span_end', 'state', name='uq_marketing_journey_rollup_key'),
+        Index('idx_marketing_journey_rollup_end', 'span_end'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    span_start = db.Column(db.DateTime, nullable=False)
+    span_end = db.Column(db.DateTime, nullable=False)
+    state = db.Column(db.String(60), nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)
@@ -1,20 +1,20 @@
 """Stripe Payment Integration — Enhanced with Invoices, KRW, & Subscriptions"""
-from flask import Blueprint, request, jsonify, g, url_for, send_file
+from flask import Blueprint, request, jsonify, g, url_for, send_file, current_app, Response, stream_with_context
 from datetime import datetime, timedelta
-import os
+import csv
 import json
+import os
 import stripe
-import requests
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from io import BytesIO
+from io import BytesIO, StringIO
 from .models import db, Product, Subscription, Payment, User, Order, Invoice, SubscriptionPlan, FileUpload
 from .auth import require_auth, require_admin
+from .principal import invalidate_principal
 from .services.file_service import get_s3_client
+from .services.fx_rates import fx_rates, DEFAULT_RATE
+from .services.payment_history import EXPORT_FIELDS, history_page, iter_history
+from .services.invoice_renderer import (
+    artifact_key, invoice_payload, invoice_render_queue, invoice_store, render_invoice_pdf,
+)
 
 payment_bp = Blueprint('payment', __name__, url_prefix='/api/payment')
 
@@ -31,34 +31,19 @@ PLATFORM_URL = os.getenv('PLATFORM_URL', 'http://localhost:8000')
 # ============ EXCHANGE RATES & UTILITIES ============
 
 class ExchangeRateService:
-    """KRW/USD exchange rate management with caching"""
-    CACHE_KEY = 'exchange_rate_usd_krw'
-    CACHE_TTL = 3600  # 1 hour
-    DEFAULT_RATE = 1250.0  # Fallback rate
+    """KRW/USD exchange rate management backed by the cached FX rate provider"""
+    DEFAULT_RATE = DEFAULT_RATE  # Fallback rate
 
     @staticmethod
     def get_current_rate():
-        """Get USD to KRW exchange rate from OpenExchangeRates API"""
-        try:
-            # Try to fetch from cache first
-            cache_rate = os.getenv('CACHED_EXCHANGE_RATE')
-            if cache_rate:
-                return float(cache_rate)
-
-            # Fetch from free API (OpenExchangeRates)
-            api_key = os.getenv('EXCHANGE_RATE_API_KEY', '')
-            if api_key:
-                url = f'https://openexchangerates.org/api/latest.json?app_id={api_key}&symbols=KRW'
-                response = requests.get(url, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    rate = data.get('rates', {}).get('KRW', ExchangeRateService.DEFAULT_RATE)
-                    return float(rate)
-
-            # Fallback to fixed rate
-            return ExchangeRateService.DEFAULT_RATE
-        except Exception as e:
-            return ExchangeRateService.DEFAULT_RATE
+        """Get the last-known USD to KRW rate (never blocks on the rate API)"""
+        return fx_rates.get_rate()
+
+    @staticmethod
+    def get_rate_status():
+        """Rate plus staleness metadata (source, fetched_at, age_seconds, stale)"""
+        fx_rates.get_rate()  # kicks a refresh if the rate is due
+        return fx_rates.status()
 
     @staticmethod
     def usd_to_krw(usd_amount):
@@ -205,6 +190,7 @@ def checkout_success():
         )
         db.session.add(payment)
         db.session.commit()
+        invalidate_principal(user_id)
 
         return {'message': 'Payment successful'}, 200
 
@@ -234,6 +220,7 @@ def stripe_webhook():
             if subscription:
                 subscription.status = 'canceled'
                 db.session.commit()
+                invalidate_principal(subscription.user_id)
 
         return {'message': 'Webhook received'}, 200
 
@@ -318,124 +305,44 @@ def get_subscriptions():
 # ============ INVOICING & ORDERS ============
 
 def generate_invoice_pdf(invoice, user, order=None):
-    """Generate PDF invoice using ReportLab
+    """Generate PDF invoice synchronously (prefer invoice_render_queue)
 
     Returns: BytesIO object with PDF content
     """
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
-    story = []
-
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=12
+    return BytesIO(render_invoice_pdf(invoice_payload(invoice, user, order)))
+
+
+def _invoice_pdf_upload(user_id, invoice_number):
+    """FileUpload record for an invoice PDF that is mirrored to S3 after rendering"""
+    bucket = os.getenv('AWS_S3_BUCKET', 'softfactory-uploads')
+    pdf_key = f'invoices/{user_id}/{invoice_number}.pdf'
+    return FileUpload(
+        user_id=user_id,
+        file_key=pdf_key,
+        original_filename=f'{invoice_number}.pdf',
+        file_size=0,  # set once the rendered PDF is uploaded
+        content_type='application/pdf',
+        category='document',
+        s3_url=f"https://{bucket}.s3.{os.getenv('AWS_S3_REGION', 'us-east-1')}.amazonaws.com/{pdf_key}",
+        cdn_url=f"https://{os.getenv('CLOUDFRONT_DOMAIN')}/{pdf_key}" if os.getenv('CLOUDFRONT_DOMAIN') else None
     )
 
-    # Title
-    story.append(Paragraph('INVOICE', title_style))
-    story.append(Spacer(1, 0.3 * inch))
-
-    # Invoice header info
-    due_date = invoice.due_date or (invoice.issued_date + timedelta(days=30))
-    header_data = [
-        ['Invoice Number:', invoice.invoice_number, 'Issue Date:', invoice.issued_date.strftime('%Y-%m-%d')],
-        ['Company:', 'SoftFactory Inc.', 'Due Date:', due_date.strftime('%Y-%m-%d')],
-    ]
-    header_table = Table(header_data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 2*inch])
-    header_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    story.append(header_table)
-    story.append(Spacer(1, 0.3 * inch))
-
-    # Bill to
-    story.append(Paragraph('Bill To:', heading_style))
-    bill_data = [
-        [f'{user.name}'],
-        [user.email],
-    ]
-    bill_table = Table(bill_data, colWidths=[4*inch])
-    bill_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
-    ]))
-    story.append(bill_table)
-    story.append(Spacer(1, 0.3 * inch))
-
-    # Line items
-    story.append(Paragraph('Line Items:', heading_style))
-    if order:
-        items = json.loads(order.items_json) if isinstance(order.items_json, str) else order.items_json
-        items_data = [['Description', 'Quantity', 'Unit Price (KRW)', 'Amount (KRW)']]
-        for item in items:
-            items_data.append([
-                f"Product {item.get('product_id', 'N/A')}",
-                str(item.get('quantity', 1)),
-                f"{item.get('price_krw', 0):,}",
-                f"{item.get('quantity', 1) * item.get('price_krw', 0):,}"
-            ])
-    else:
-        items_data = [['Description', 'Amount (KRW)']]
-        items_data.append(['Invoice Payment', f'{invoice.amount_krw:,}'])
-
-    items_table = Table(items_data, colWidths=[2.5*inch, 1.2*inch, 1.5*inch, 1.5*inch])
-    items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-        ('FONT', (0, 1), (-1, -1), 'Helvetica', 9),
-    ]))
-    story.append(items_table)
-    story.append(Spacer(1, 0.2 * inch))
-
-    # Totals
-    totals_data = [
-        ['Subtotal (KRW):', f'{invoice.amount_krw:,}'],
-        ['Tax (KRW):', f'{invoice.tax_krw:,}'],
-        ['Total (KRW):', f'{invoice.total_krw:,}'],
-    ]
-    totals_table = Table(totals_data, colWidths=[4*inch, 2*inch])
-    totals_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('FONT', (0, 0), (0, -1), 'Helvetica', 10),
-        ('FONT', (1, 0), (1, -2), 'Helvetica', 10),
-        ('FONT', (1, -1), (1, -1), 'Helvetica-Bold', 12),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#34495e')),
-        ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-    ]))
-    story.append(totals_table)
-    story.append(Spacer(1, 0.3 * inch))
-
-    # Footer
-    story.append(Paragraph(
-        'Thank you for your business!<br/>Payment terms: Net 30 days',
-        styles['Normal']
-    ))
-
-    # Build PDF
-    doc.build(story)
-    pdf_buffer.seek(0)
-    return pdf_buffer
+
+def _upload_invoice_pdf(app, s3_client, upload_id, file_key, invoice_id):
+    """Post-render hook: push the stored PDF to S3 and record its size"""
+    def upload(path):
+        pdf_bytes = path.read_bytes()
+        s3_client.put_object(
+            Bucket=os.getenv('AWS_S3_BUCKET', 'softfactory-uploads'),
+            Key=file_key,
+            Body=pdf_bytes,
+            ContentType='application/pdf',
+            Metadata={'invoice_id': str(invoice_id)}
+        )
+        with app.app_context():
+            FileUpload.query.filter_by(id=upload_id).update({'file_size': len(pdf_bytes)})
+            db.session.commit()
+    return upload
 
 
 @payment_bp.route('/invoice', methods=['POST'])
@@ -457,7 +364,8 @@ def create_invoice():
         "amount_krw": int,
         "tax_krw": int,
         "total_krw": int,
-        "pdf_url": str (S3 URL),
+        "pdf_url": str (download endpoint; it returns the S3 URL once uploaded),
+        "pdf_status": "pending" | "ready",
         "stripe_url": str (Stripe invoice URL if enabled)
     }
     """
@@ -495,41 +403,24 @@ def create_invoice():
         db.session.add(invoice)
         db.session.flush()
 
-        # Generate PDF
-        order = Order.query.get(order_id) if order_id else None
-        pdf_buffer = generate_invoice_pdf(invoice, g.user, order)
-
-        # Upload PDF to S3
+        # Link the S3 object up front; the upload itself follows the render
         s3_client = get_s3_client()
-        pdf_url = None
+        pdf_upload = None
         if s3_client:
-            pdf_key = f'invoices/{g.user_id}/{invoice_number}.pdf'
-            s3_client.put_object(
-                Bucket=os.getenv('AWS_S3_BUCKET', 'softfactory-uploads'),
-                Key=pdf_key,
-                Body=pdf_buffer.getvalue(),
-                ContentType='application/pdf',
-                Metadata={'invoice_id': str(invoice.id)}
-            )
-
-            # Create FileUpload record
-            pdf_upload = FileUpload(
-                user_id=g.user_id,
-                file_key=pdf_key,
-                original_filename=f'{invoice_number}.pdf',
-                file_size=len(pdf_buffer.getvalue()),
-                content_type='application/pdf',
-                category='document',
-                s3_url=f"https://{os.getenv('AWS_S3_BUCKET', 'softfactory-uploads')}.s3.{os.getenv('AWS_S3_REGION', 'us-east-1')}.amazonaws.com/{pdf_key}",
-                cdn_url=f"https://{os.getenv('CLOUDFRONT_DOMAIN')}/{pdf_key}" if os.getenv('CLOUDFRONT_DOMAIN') else None
-            )
+            pdf_upload = _invoice_pdf_upload(g.user_id, invoice_number)
             db.session.add(pdf_upload)
             db.session.flush()
             invoice.pdf_file_id = pdf_upload.id
-            pdf_url = pdf_upload.s3_url
-
         db.session.commit()
 
+        # Render the PDF in the background
+        order = Order.query.get(order_id) if order_id else None
+        pdf_key = invoice_render_queue.submit(
+            invoice_payload(invoice, g.user, order),
+            on_ready=_upload_invoice_pdf(current_app._get_current_object(), s3_client, pdf_upload.id,
+                                         pdf_upload.file_key, invoice.id) if pdf_upload else None
+        )
+
         # Create Stripe invoice if enabled
         stripe_url = None
         if STRIPE_ENABLED and total_krw > 0:
@@ -556,7 +447,8 @@ def create_invoice():
             'amount_krw': amount_krw,
             'tax_krw': tax_krw,
             'total_krw': total_krw,
-            'pdf_url': pdf_url,
+            'pdf_url': url_for('payment.download_invoice', invoice_id=invoice.id),
+            'pdf_status': invoice_render_queue.status(pdf_key),
             'stripe_url': stripe_url,
             'issued_date': invoice.issued_date.isoformat(),
             'due_date': invoice.due_date.isoformat(),
@@ -572,6 +464,11 @@ def create_invoice():
 def download_invoice(invoice_id):
     """Download invoice PDF
 
+    Streams the stored artifact with a strong ETag and Range support. A
+    missing artifact is served from S3 once its upload has completed
+    (file_size recorded), otherwise rendered on demand; if that takes longer
+    than INVOICE_RENDER_WAIT the response is 202 with Retry-After.
+
     Returns: PDF file for download
     """
     invoice = Invoice.query.get(invoice_id)
@@ -582,28 +479,37 @@ def download_invoice(invoice_id):
     if invoice.user_id != g.user_id:
         return jsonify({'error': 'Not authorized'}), 403
 
-    if not invoice.pdf:
-        # Generate PDF if not already created
-        try:
-            order = invoice.order if invoice.order_id else None
-            pdf_buffer = generate_invoice_pdf(invoice, g.user, order)
-            return send_file(
-                pdf_buffer,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=f'{invoice.invoice_number}.pdf'
-            )
-        except Exception as e:
-            return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
-
-    # Return S3 URL for download
-    if invoice.pdf.s3_url:
-        return jsonify({
-            'pdf_url': invoice.pdf.s3_url,
-            'filename': f'{invoice.invoice_number}.pdf'
-        }), 200
-
-    return jsonify({'error': 'PDF not available'}), 404
+    try:
+        payload = invoice_payload(invoice, invoice.user, invoice.order if invoice.order_id else None)
+        key = artifact_key(payload)
+        path = invoice_store.get(key)
+        if path is None and invoice.pdf and invoice.pdf.s3_url and (invoice.pdf.file_size or 0) > 0:
+            # Rendered and uploaded on another host; it lives in S3
+            return jsonify({
+                'pdf_url': invoice.pdf.s3_url,
+                'filename': f'{invoice.invoice_number}.pdf'
+            }), 200
+        if path is None:
+            invoice_render_queue.submit(payload)
+            path = invoice_render_queue.wait(key)
+    except Exception as e:
+        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+
+    if path is None:
+        response = jsonify({'status': invoice_render_queue.status(key),
+                            'message': 'Invoice PDF is being rendered'})
+        response.headers['Retry-After'] = '2'
+        return response, 202
+
+    return send_file(
+        path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'{invoice.invoice_number}.pdf',
+        etag=key,
+        conditional=True,
+        max_age=86400
+    )
 
 
 @payment_bp.route('/subscribe', methods=['POST'])
@@ -713,6 +619,7 @@ def create_subscription():
         )
         db.session.add(subscription)
         db.session.commit()
+        invalidate_principal(g.user_id)
 
         return jsonify({
             'subscription_id': subscription.id,
@@ -812,6 +719,7 @@ def upgrade_subscription(subscription_id):
             else timedelta(days=365)
         )
         db.session.commit()
+        invalidate_principal(subscription.user_id)
 
         return jsonify({
             'subscription_id': subscription.id,
@@ -885,6 +793,7 @@ def cancel_subscription_v2(subscription_id):
         # Update subscription
         subscription.status = 'canceling' if cancel_at_end else 'canceled'
         db.session.commit()
+        invalidate_principal(subscription.user_id)
 
         return jsonify({
             'subscription_id': subscription.id,
@@ -903,16 +812,18 @@ def cancel_subscription_v2(subscription_id):
 @payment_bp.route('/history', methods=['GET'])
 @require_auth
 def get_payment_history():
-    """Get user payment & invoice history
+    """Get user payment & invoice history (merged, newest first)
 
     Query params:
     - limit: max results (default 50)
-    - offset: pagination offset (default 0)
+    - cursor: next_cursor from the previous page (preferred)
+    - offset: pagination offset (default 0, ignored with cursor)
     - status: filter by status (pending, paid, canceled)
 
     Response: {
-        "total": int,
-        "payments": [{
+        "total": int (all matching entries),
+        "next_cursor": str or null,
+        "history": [{
             "id": int,
             "type": "payment" or "invoice",
             "date": ISO,
@@ -925,64 +836,61 @@ def get_payment_history():
     """
     limit = min(int(request.args.get('limit', 50)), 100)
     offset = int(request.args.get('offset', 0))
+    cursor = request.args.get('cursor')
     status_filter = request.args.get('status')
 
-    # Get invoices
-    inv_query = Invoice.query.filter_by(user_id=g.user_id)
-    if status_filter:
-        inv_query = inv_query.filter_by(status=status_filter)
-
-    invoices = inv_query.order_by(
-        Invoice.issued_date.desc()
-    ).limit(limit).offset(offset).all()
-
-    # Get payments
-    pay_query = Payment.query.filter_by(user_id=g.user_id)
-    if status_filter:
-        pay_query = pay_query.filter_by(status=status_filter)
-
-    payments = pay_query.order_by(
-        Payment.created_at.desc()
-    ).limit(limit).offset(offset).all()
-
-    # Merge and sort
-    history = []
-
-    for inv in invoices:
-        history.append({
-            'id': inv.id,
-            'type': 'invoice',
-            'date': inv.issued_date.isoformat(),
-            'amount_krw': inv.total_krw,
-            'status': inv.status,
-            'invoice_number': inv.invoice_number,
-            'invoice_url': inv.pdf.s3_url if inv.pdf else None,
-            'stripe_url': None,  # Could fetch from Stripe if needed
-            'due_date': inv.due_date.isoformat() if inv.due_date else None,
-        })
-
-    for pay in payments:
-        history.append({
-            'id': pay.id,
-            'type': 'payment',
-            'date': pay.created_at.isoformat(),
-            'amount': pay.amount,
-            'status': pay.status,
-            'stripe_payment_id': pay.stripe_payment_id,
-            'invoice_url': None,
-        })
-
-    # Sort by date descending
-    history.sort(key=lambda x: x['date'], reverse=True)
+    try:
+        page = history_page(g.user_id, limit=limit, cursor=cursor, offset=offset,
+                            status=status_filter)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
-        'total': len(history),
+        'total': page['total'],
         'limit': limit,
-        'offset': offset,
-        'history': history[:limit]
+        'offset': 0 if cursor else offset,
+        'next_cursor': page['next_cursor'],
+        'history': page['history']
     }), 200
 
 
+@payment_bp.route('/history/export', methods=['GET'])
+@require_auth
+def export_payment_history():
+    """Stream the full payment & invoice history for accounting
+
+    Query params:
+    - format: csv (default) or jsonl
+    - status: filter by status
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'jsonl'):
+        return jsonify({'error': 'format must be csv or jsonl'}), 400
+
+    entries = iter_history(g.user_id, status=request.args.get('status'))
+
+    def generate():
+        if export_format == 'jsonl':
+            for entry in entries:
+                yield json.dumps(entry, ensure_ascii=False) + '\n'
+            return
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(entry)
+            if buffer.tell() > 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    mimetype = 'application/x-ndjson' if export_format == 'jsonl' else 'text/csv'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=payment-history.{export_format}',
+    })
+
+
 # ============ CONVERSION & RATES ============
 
 @payment_bp.route('/exchange-rate', methods=['GET'])
@@ -1003,10 +911,11 @@ def get_exchange_rate():
     base = request.args.get('base_currency', 'USD')
     target = request.args.get('target_currency', 'KRW')
 
+    status = ExchangeRateService.get_rate_status()
     if base == 'USD' and target == 'KRW':
-        rate = ExchangeRateService.get_current_rate()
+        rate = status['rate']
     elif base == 'KRW' and target == 'USD':
-        rate = 1 / ExchangeRateService.get_current_rate()
+        rate = 1 / status['rate']
     else:
         return jsonify({'error': f'Unsupported currency pair: {base}/{target}'}), 400
 
@@ -1014,7 +923,10 @@ def get_exchange_rate():
         'base': base,
         'target': target,
         'rate': rate,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': datetime.utcnow().isoformat(),
+        'source': status['source'],
+        'fetched_at': status['fetched_at'],
+        'stale': status['stale'],
     }), 200
 
 
@@ -1094,6 +1006,7 @@ def stripe_webhook_enhanced():
             if subscription:
                 subscription.status = 'canceled'
                 db.session.commit()
+                invalidate_principal(subscription.user_id)
 
         # Handle subscription updates
         elif event['type'] == 'customer.subscription.updated':
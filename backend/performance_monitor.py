@@ -1,6 +1,18 @@
-"""Performance Monitoring & Metrics Collection"""
+"""Performance Monitoring & Metrics Collection
+
+Request latencies are aggregated in memory into per-endpoint, per-minute
+log-bucketed histograms (an HDR-style sketch with <=5% relative error), kept
+for the last hour. Percentiles for the 1m/5m/60m windows are read by merging
+at most 60 fixed-size sketches, independent of traffic volume. The JSONL log
+is still written, but by a buffered background writer off the request path.
+"""
 import time
 import os
+import math
+import atexit
+import queue
+import threading
+from collections import deque
 from functools import wraps
 from flask import request, g, jsonify
 from datetime import datetime
@@ -8,13 +20,216 @@ import json
 from pathlib import Path
 import psutil
 
+# Histogram geometry: bucket i covers (BASE * GROWTH**(i-1), BASE * GROWTH**i] ms.
+HISTOGRAM_BASE_MS = 0.01
+HISTOGRAM_GROWTH = 1.05
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+SKETCH_SLOT_SECONDS = 60
+SKETCH_SLOTS = 60  # one hour of one-minute slots
+WINDOWS_MINUTES = (1, 5, 60)
+RECENT_SAMPLES = 1000
+
+LOG_FLUSH_INTERVAL_SECONDS = 1.0
+LOG_FLUSH_BATCH = 500
+
+
+def _bucket_index(value_ms):
+    if value_ms <= HISTOGRAM_BASE_MS:
+        return 0
+    return int(math.ceil(math.log(value_ms / HISTOGRAM_BASE_MS) / _LOG_GROWTH))
+
+
+def _bucket_upper_bound(index):
+    return HISTOGRAM_BASE_MS * HISTOGRAM_GROWTH ** index
+
+
+class LatencySketch:
+    """Mergeable log-bucketed histogram plus exact count/sum/min/max."""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max',
+                 'db_total', 'db_min', 'db_max', 'errors')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.db_total = 0
+        self.db_min = None
+        self.db_max = None
+        self.errors = 0
+
+    def add(self, duration_ms, db_queries=0, is_error=False):
+        index = _bucket_index(duration_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += duration_ms
+        self.min = duration_ms if self.min is None else min(self.min, duration_ms)
+        self.max = duration_ms if self.max is None else max(self.max, duration_ms)
+        self.db_total += db_queries
+        self.db_min = db_queries if self.db_min is None else min(self.db_min, db_queries)
+        self.db_max = db_queries if self.db_max is None else max(self.db_max, db_queries)
+        if is_error:
+            self.errors += 1
+
+    def merge(self, other):
+        if not other.count:
+            return
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.db_total += other.db_total
+        self.db_min = other.db_min if self.db_min is None else min(self.db_min, other.db_min)
+        self.db_max = other.db_max if self.db_max is None else max(self.db_max, other.db_max)
+        self.errors += other.errors
+
+    def quantile(self, q):
+        """Approximate quantile, clamped to the observed min/max."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(q * self.count)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(_bucket_upper_bound(index), self.min), self.max)
+        return self.max
+
+    def to_stats(self):
+        return {
+            'count': self.count,
+            'response_time': {
+                'min': self.min,
+                'max': self.max,
+                'avg': self.total / self.count,
+                'p50': round(self.quantile(0.50), 2),
+                'p95': round(self.quantile(0.95), 2),
+                'p99': round(self.quantile(0.99), 2),
+            },
+            'db_queries': {
+                'min': self.db_min or 0,
+                'max': self.db_max or 0,
+                'avg': self.db_total / self.count,
+            },
+            'errors': self.errors,
+        }
+
+
+class RollingSketches:
+    """Per-(endpoint, method) ring of one-minute ``LatencySketch`` slots."""
+
+    def __init__(self, slot_seconds=SKETCH_SLOT_SECONDS, slots=SKETCH_SLOTS):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self._rings = {}  # (endpoint, method) -> [(slot_id, LatencySketch) | None] * slots
+        self._lock = threading.Lock()
+
+    def _slot_id(self, now):
+        return int(now // self.slot_seconds)
+
+    def add(self, endpoint, method, duration_ms, status_code, db_queries=0, now=None):
+        slot_id = self._slot_id(time.time() if now is None else now)
+        with self._lock:
+            ring = self._rings.get((endpoint, method))
+            if ring is None:
+                ring = self._rings[(endpoint, method)] = [None] * self.slots
+            position = slot_id % self.slots
+            slot = ring[position]
+            if slot is None or slot[0] != slot_id:
+                slot = ring[position] = (slot_id, LatencySketch())
+            slot[1].add(duration_ms, db_queries, status_code >= 400)
+
+    def window(self, minutes, endpoint=None, method=None, now=None):
+        """Merge the slots covering the last ``minutes`` (capped at the ring)."""
+        current = self._slot_id(time.time() if now is None else now)
+        span = max(1, min(self.slots, int(math.ceil(minutes * 60 / self.slot_seconds))))
+        oldest = current - span + 1
+        merged = LatencySketch()
+        with self._lock:
+            for (ep, m), ring in self._rings.items():
+                if (endpoint and ep != endpoint) or (method and m != method):
+                    continue
+                for slot in ring:
+                    if slot is not None and oldest <= slot[0] <= current:
+                        merged.merge(slot[1])
+        return merged
+
+    def endpoints(self):
+        with self._lock:
+            return sorted({ep for ep, _ in self._rings})
+
+
+class BufferedLogWriter:
+    """Append JSON lines from a daemon thread, in batches, off the request path."""
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def write(self, record):
+        if self._thread is None:
+            self._start()
+        self._queue.put(record)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='performance-log-writer', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + LOG_FLUSH_INTERVAL_SECONDS
+            while len(batch) < LOG_FLUSH_BATCH:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def flush(self):
+        """Synchronously write whatever is still queued."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with open(self.path, 'a') as f:
+                f.write(''.join(json.dumps(m) + '\n' for m in batch))
+        except Exception as e:
+            print(f"Failed to write performance metric: {e}")
+
+
 class PerformanceMonitor:
     """Track API request performance and system metrics"""
 
     def __init__(self):
-        self.metrics = []
+        self.metrics = deque(maxlen=RECENT_SAMPLES)
+        self.total_samples = 0
+        self.sketches = RollingSketches()
         self.log_path = Path(__file__).parent.parent / 'logs' / 'performance.jsonl'
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_writer = BufferedLogWriter(self.log_path)
 
     def record_request(self, endpoint, method, duration_ms, status_code, db_queries=0, cache_hits=0):
         """Record a request metric"""
@@ -28,15 +243,13 @@ class PerformanceMonitor:
             'cache_hits': cache_hits
         }
         self.metrics.append(metric)
+        self.total_samples += 1
+        self.sketches.add(endpoint, method, duration_ms, status_code, db_queries)
         self._write_to_log(metric)
 
     def _write_to_log(self, metric):
-        """Write metric to JSONL log file"""
-        try:
-            with open(self.log_path, 'a') as f:
-                f.write(json.dumps(metric) + '\n')
-        except Exception as e:
-            print(f"Failed to write performance metric: {e}")
+        """Queue metric for the background JSONL writer"""
+        self._log_writer.write(metric)
 
     def get_system_metrics(self):
         """Get current system resource usage"""
@@ -88,11 +301,35 @@ def monitor_performance(f):
     return decorated
 
 def get_performance_stats(endpoint=None, method=None, minutes=60):
-    """Get performance statistics from metrics"""
-    from datetime import datetime, timedelta
+    """Get performance statistics from the in-memory rolling sketches.
+
+    Windows longer than the sketch ring (60 minutes) fall back to scanning
+    the JSONL log.
+    """
+    if minutes > SKETCH_SLOTS * SKETCH_SLOT_SECONDS / 60:
+        return _get_performance_stats_from_log(endpoint, method, minutes)
 
+    sketch = _monitor.sketches.window(minutes, endpoint=endpoint, method=method)
+    if not sketch.count:
+        return None
+    return sketch.to_stats()
+
+
+def get_windowed_stats(endpoint=None, method=None):
+    """Get stats for each of the standard 1m/5m/60m windows."""
+    return {
+        f'{m}m': get_performance_stats(endpoint=endpoint, method=method, minutes=m)
+        for m in WINDOWS_MINUTES
+    }
+
+
+def _get_performance_stats_from_log(endpoint=None, method=None, minutes=60):
+    """Get performance statistics by rescanning the JSONL log"""
+    from datetime import timedelta
+
+    _monitor._log_writer.flush()
     cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-    metrics = []
+    sketch = LatencySketch()
 
     try:
         if _monitor.log_path.exists():
@@ -104,34 +341,15 @@ def get_performance_stats(endpoint=None, method=None, minutes=60):
                         if ts >= cutoff:
                             if (not endpoint or m['endpoint'] == endpoint) and \
                                (not method or m['method'] == method):
-                                metrics.append(m)
+                                sketch.add(m['duration_ms'], m['db_queries'], m['status_code'] >= 400)
                     except:
                         continue
     except Exception as e:
         print(f"Error reading metrics: {e}")
 
-    if not metrics:
+    if not sketch.count:
         return None
-
-    durations = [m['duration_ms'] for m in metrics]
-    db_queries = [m['db_queries'] for m in metrics]
-
-    return {
-        'count': len(metrics),
-        'response_time': {
-            'min': min(durations),
-            'max': max(durations),
-            'avg': sum(durations) / len(durations),
-            'p95': sorted(durations)[int(len(durations) * 0.95)] if len(durations) > 20 else max(durations),
-            'p99': sorted(durations)[int(len(durations) * 0.99)] if len(durations) > 100 else max(durations)
-        },
-        'db_queries': {
-            'min': min(db_queries) if db_queries else 0,
-            'max': max(db_queries) if db_queries else 0,
-            'avg': sum(db_queries) / len(db_queries) if db_queries else 0
-        },
-        'errors': len([m for m in metrics if m['status_code'] >= 400])
-    }
+    return sketch.to_stats()
 
 def register_performance_routes(app):
     """Register performance monitoring endpoints"""
@@ -139,6 +357,7 @@ def register_performance_routes(app):
     @app.route('/api/monitoring/metrics')
     def get_metrics():
         """Get system and request metrics"""
+        from .cache import get_cache, get_single_flight_stats
         try:
             system = _monitor.get_system_metrics()
 
@@ -149,10 +368,20 @@ def register_performance_routes(app):
                 if stats:
                     endpoints_stats[endpoint] = stats
 
+            windows = {
+                endpoint: get_windowed_stats(endpoint=endpoint)
+                for endpoint in _monitor.sketches.endpoints()
+            }
+
             return jsonify({
                 'system': system,
                 'endpoints': endpoints_stats,
-                'collected_samples': len(_monitor.metrics)
+                'windows': windows,
+                'collected_samples': _monitor.total_samples,
+                'cache': {
+                    **get_cache().stats(),
+                    'coalescing': get_single_flight_stats(),
+                },
             }), 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
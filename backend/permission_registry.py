@@ -0,0 +1,139 @@
+"""Permission registry — precompiled permission bitsets for RBAC checks.
+
+Every active permission gets one bit, ``1 << permission.id``. Using the row
+id keeps bit assignments identical in every worker and stable across
+restarts, so masks cached in the shared principal cache mean the same thing
+everywhere. The registry also precomputes role → mask, so a user's
+permission set is the OR of their roles' masks and a check is one integer AND:
+
+    required = permission_registry.mask_for('write:sns_posts', 'admin:all')
+    allowed = bool(principal.permission_mask & required)
+
+The registry loads lazily and also refreshes every ``PERMISSION_REGISTRY_TTL``
+seconds. ``invalidate()`` is called whenever roles or grants change. It writes a
+new generation token to the shared cache tier (``backend.shared_cache``). Every
+worker compares that token with the one its maps were loaded under before it
+uses them, so a grant or revoke applies everywhere on the next check. Without
+a shared tier, the token only exists in this process.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, FrozenSet, List, Optional
+
+from .models import db, Permission, Role, RolePermission
+from .shared_cache import get_shared_backend
+
+logger = logging.getLogger(__name__)
+
+PERMISSION_REGISTRY_TTL = float(os.getenv('PERMISSION_REGISTRY_TTL', '60'))
+# L2 key holding the current generation token, and how long it is kept
+GENERATION_KEY = 'permission_registry:generation'
+GENERATION_TTL = 30 * 86400
+
+
+class PermissionRegistry:
+    """Name → bit and role → mask maps for the active RBAC model."""
+
+    def __init__(self, ttl: float = PERMISSION_REGISTRY_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._bits: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._role_masks: Dict[int, int] = {}
+        self._mask_memo: Dict[tuple, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation: Optional[str] = None
+
+    def _shared_generation(self) -> Optional[str]:
+        """Current generation token; the local one without a usable shared tier."""
+        backend = get_shared_backend()
+        if backend is None:
+            return self._generation
+        try:
+            found = backend.get(GENERATION_KEY)
+        except Exception as e:
+            logger.warning("Could not read the permission registry generation: %s", e)
+            return self._generation
+        return found[0] if found else None
+
+    def load(self) -> None:
+        """(Re)build the maps from the permissions and role_permissions tables."""
+        # Read before the tables so a change made during the load triggers another
+        generation = self._shared_generation()
+        perms = db.session.query(Permission.id, Permission.name).filter(
+            Permission.is_active.is_(True)).all()
+        bits = {name: 1 << perm_id for perm_id, name in perms}
+
+        role_masks: Dict[int, int] = {}
+        rows = (
+            db.session.query(RolePermission.role_id, Permission.name)
+            .join(Permission, Permission.id == RolePermission.permission_id)
+            .join(Role, Role.id == RolePermission.role_id)
+            .filter(Role.is_active.is_(True), Permission.is_active.is_(True))
+            .all()
+        )
+        for role_id, name in rows:
+            role_masks[role_id] = role_masks.get(role_id, 0) | bits[name]
+
+        with self._lock:
+            self._bits = bits
+            self._names = {bit: name for name, bit in bits.items()}
+            self._role_masks = role_masks
+            self._mask_memo = {}
+            self._loaded_at = time.monotonic()
+            self._generation = generation
+
+    def invalidate(self) -> None:
+        """Force a reload on next use, here and in every worker sharing the L2 tier."""
+        generation = uuid.uuid4().hex
+        with self._lock:
+            self._loaded_at = None
+            self._generation = generation
+        backend = get_shared_backend()
+        if backend is None:
+            return
+        try:
+            backend.set(GENERATION_KEY, generation, time.time() + GENERATION_TTL)
+        except Exception as e:
+            logger.warning("Could not publish the permission registry generation: %s", e)
+
+    def generation(self) -> Optional[str]:
+        """Token of the grants the loaded maps reflect; changes on every invalidate()."""
+        self._ensure_loaded()
+        return self._generation
+
+    def _ensure_loaded(self) -> None:
+        if (self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl
+                or self._shared_generation() != self._generation):
+            self.load()
+
+    def mask_for(self, *names: str) -> int:
+        """OR of the bits for names; unknown or inactive names contribute 0."""
+        self._ensure_loaded()
+        mask = self._mask_memo.get(names)
+        if mask is None:
+            mask = 0
+            for name in names:
+                mask |= self._bits.get(name, 0)
+            self._mask_memo[names] = mask
+        return mask
+
+    def role_mask(self, role_id: int) -> int:
+        self._ensure_loaded()
+        return self._role_masks.get(role_id, 0)
+
+    def names_for(self, mask: int) -> FrozenSet[str]:
+        """Permission names whose bits are set in mask."""
+        self._ensure_loaded()
+        return frozenset(name for bit, name in self._names.items() if mask & bit)
+
+    def roles_with(self, *names: str) -> List[int]:
+        """Ids of active roles granting any of names."""
+        required = self.mask_for(*names)
+        return [role_id for role_id, mask in self._role_masks.items() if mask & required]
+
+
+permission_registry = PermissionRegistry()
@@ -0,0 +1,167 @@
+"""Principal cache — compact authorization record for the authenticated user.
+
+``require_auth`` used to load the full ``User`` row on every request, and the
+RBAC / subscription decorators then re-loaded it and walked ``user.roles`` →
+``role.permissions`` and the subscriptions table. A ``Principal`` carries
+everything those checks need:
+
+    user_id, is_active, role (legacy column), roles, permission_mask
+    (bitset from ``permission_registry``), subscriptions (product slugs
+    with an active subscription)
+
+Principals are memoized on ``g`` for the request and in a short-TTL
+``TieredCache`` under one key per user, stamped with the permission
+registry generation they were built under. That generation is shared by
+every worker, so an entry from an older one is a miss everywhere. Call
+``invalidate_principal(user_id)`` after changing a user's roles, status or
+subscriptions, and ``invalidate_all_principals()`` after changing roles or
+the permissions they grant.
+
+Usage:
+    from backend.principal import current_principal
+
+    principal = current_principal()
+    if principal and principal.has_permission('write:sns_posts'):
+        ...
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from flask import g, has_app_context
+
+from .cache import TTLCache
+from .models import db, User, Role, UserRole, Subscription, Product
+from .permission_registry import permission_registry
+from .shared_cache import TieredCache
+
+PRINCIPAL_CACHE_TTL = float(os.getenv('PRINCIPAL_CACHE_TTL', '30'))
+
+_cache = TieredCache('principal', TTLCache(max_entries=4096))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable authorization snapshot of one user."""
+    user_id: int
+    is_active: bool
+    role: str
+    roles: frozenset
+    permission_mask: int
+    subscriptions: frozenset
+
+    @property
+    def permissions(self) -> frozenset:
+        return permission_registry.names_for(self.permission_mask)
+
+    def has_role(self, *names: str) -> bool:
+        return any(name in self.roles for name in names)
+
+    def has_permission(self, *names: str) -> bool:
+        return bool(self.permission_mask & permission_registry.mask_for(*names))
+
+    def has_subscription(self, product_slug: str) -> bool:
+        return product_slug in self.subscriptions
+
+    def to_dict(self) -> dict:
+        return {
+            'user_id': self.user_id,
+            'is_active': self.is_active,
+            'role': self.role,
+            'roles': sorted(self.roles),
+            'permission_mask': self.permission_mask,
+            'subscriptions': sorted(self.subscriptions),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Principal':
+        return cls(
+            user_id=data['user_id'],
+            is_active=data['is_active'],
+            role=data['role'],
+            roles=frozenset(data['roles']),
+            permission_mask=data['permission_mask'],
+            subscriptions=frozenset(data['subscriptions']),
+        )
+
+
+def _key(user_id: int) -> str:
+    return f'user:{user_id}'
+
+
+def build_principal(user_id: int) -> Optional[Principal]:
+    """Load a Principal from the database (three small queries)."""
+    row = db.session.query(User.is_active, User.role).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    is_active, role = row
+
+    role_rows = (
+        db.session.query(Role.id, Role.name)
+        .join(UserRole, UserRole.role_id == Role.id)
+        .filter(UserRole.user_id == user_id, Role.is_active.is_(True))
+        .all()
+    )
+    roles = {role_name for _, role_name in role_rows}
+    permission_mask = 0
+    for role_id, _ in role_rows:
+        permission_mask |= permission_registry.role_mask(role_id)
+    # Legacy support: the users.role column counts as a role unless it's the default
+    if role and role != 'user':
+        roles.add(role)
+
+    slugs = (
+        db.session.query(Product.slug)
+        .join(Subscription, Subscription.product_id == Product.id)
+        .filter(Subscription.user_id == user_id, Subscription.status == 'active')
+        .all()
+    )
+
+    return Principal(
+        user_id=user_id,
+        is_active=bool(is_active),
+        role=role or 'user',
+        roles=frozenset(roles),
+        permission_mask=permission_mask,
+        subscriptions=frozenset(slug for (slug,) in slugs),
+    )
+
+
+def get_principal(user_id: int) -> Optional[Principal]:
+    """Return the cached Principal for user_id, building it on a miss."""
+    generation = permission_registry.generation()
+    cached = _cache.get(_key(user_id))
+    if cached is not None and cached['generation'] == generation:
+        return Principal.from_dict(cached['principal'])
+
+    principal = build_principal(user_id)
+    # Skip the write if roles or grants changed in any worker while we were reading
+    if principal is not None and permission_registry.generation() == generation:
+        _cache.set(_key(user_id), {'generation': generation, 'principal': principal.to_dict()},
+                   PRINCIPAL_CACHE_TTL)
+    return principal
+
+
+def current_principal() -> Optional[Principal]:
+    """Principal for the current request, memoized on ``g``."""
+    principal = getattr(g, 'principal', None)
+    if principal is None and getattr(g, 'user_id', None) is not None:
+        principal = get_principal(g.user_id)
+        g.principal = principal
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a user's cached Principal (roles, status or subscriptions changed)."""
+    _cache.delete(_key(user_id))
+    if has_app_context() and getattr(g, 'principal', None) is not None \
+            and g.principal.user_id == user_id:
+        g.principal = None
+
+
+def invalidate_all_principals() -> None:
+    """Drop every cached Principal and the permission registry (roles or grants changed)."""
+    permission_registry.invalidate()
+    _cache.clear()
+    if has_app_context() and getattr(g, 'principal', None) is not None:
+        g.principal = None
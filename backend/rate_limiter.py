@@ -1,7 +1,10 @@
 """Simple In-Memory Rate Limiter
 
-Production-grade rate limiting without external dependencies (no Redis needed).
-Implements sliding-window counters for both IP-based and user-based rate limiting.
+Production-grade rate limiting without required external dependencies.
+The ``rate_limit`` decorator uses a GCRA limiter with O(1) state per key and
+sharded locks; set ``REDIS_URL`` (or ``RATE_LIMIT_BACKEND=sqlite``) to share
+limits across workers. The original sliding-window ``RateLimiter`` is kept
+for direct callers.
 
 Usage:
     from backend.rate_limiter import RateLimiter, rate_limit
@@ -16,12 +19,20 @@ Usage:
     allowed, info = limiter.check('login:192.168.1.1', max_requests=5, window_seconds=60)
 """
 
+import logging
+import math
+import os
+import sqlite3
 import time
 import threading
 from functools import wraps
 from flask import request, jsonify, g
 from typing import Tuple, Callable, Optional
 
+from .runtime_paths import workspace_path
+
+logger = logging.getLogger(__name__)
+
 
 class RateLimiter:
     """Thread-safe in-memory sliding-window rate limiter.
@@ -104,8 +115,213 @@ class RateLimiter:
             del self._store[key]
 
 
-# Global singleton instance
-_limiter = RateLimiter()
+class GCRARateLimiter:
+    """Thread-safe GCRA (generic cell rate algorithm) rate limiter.
+
+    Equivalent to a token bucket holding ``max_requests`` tokens that refill
+    continuously over ``window_seconds``, but each key stores a single float:
+    its theoretical arrival time (TAT). Checks are O(1) and keys are spread
+    over ``shards`` independently locked dicts so unrelated clients never
+    contend on one global lock.
+
+    Pass a ``backend`` (``RedisGCRABackend``/``SQLiteGCRABackend``) to keep
+    the state outside the process so limits hold across Gunicorn workers.
+    """
+
+    def __init__(self, shards: int = 32, backend=None):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._checks_per_sweep = 1024
+        self._shard_checks = [0] * shards
+        self.backend = backend
+
+    def _shard(self, key: str):
+        index = hash(key) % len(self._shards)
+        return index, self._shards[index]
+
+    def check(self, key: str, max_requests: int, window_seconds: int) -> Tuple[bool, dict]:
+        """Check if a request is allowed under the rate limit.
+
+        Args:
+            key: Unique identifier (e.g., 'login:192.168.1.1' or 'api:user_42')
+            max_requests: Maximum burst of requests allowed in the window
+            window_seconds: Time for a fully drained limit to refill
+
+        Returns:
+            Tuple of (allowed: bool, info: dict with limit/remaining/retry_after)
+        """
+        if self.backend is not None:
+            try:
+                allowed, remaining, retry_after = self.backend.check(key, max_requests, window_seconds)
+                return allowed, _limit_info(allowed, max_requests, remaining, retry_after, window_seconds)
+            except Exception as e:
+                logger.warning("Shared rate limit backend failed, using local state: %s", e)
+
+        now = time.time()
+        index, (store, lock) = self._shard(key)
+        with lock:
+            self._shard_checks[index] += 1
+            if self._shard_checks[index] >= self._checks_per_sweep:
+                self._shard_checks[index] = 0
+                self._sweep(store, now)
+            allowed, new_tat, remaining, retry_after = _gcra(
+                store.get(key, now), now, max_requests, window_seconds
+            )
+            if allowed:
+                store[key] = new_tat
+        return allowed, _limit_info(allowed, max_requests, remaining, retry_after, window_seconds)
+
+    def reset(self, key: str):
+        """Reset rate limit for a specific key (e.g., on successful login)."""
+        if self.backend is not None:
+            try:
+                self.backend.reset(key)
+            except Exception as e:
+                logger.warning("Shared rate limit reset failed for %s: %s", key, e)
+        _, (store, lock) = self._shard(key)
+        with lock:
+            store.pop(key, None)
+
+    @staticmethod
+    def _sweep(store: dict, now: float):
+        """Drop keys whose TAT has passed; they are identical to unseen keys."""
+        for key in [k for k, tat in store.items() if tat <= now]:
+            del store[key]
+
+
+def _gcra(tat: float, now: float, max_requests: int, window_seconds: float):
+    """Evaluate one GCRA step.
+
+    Returns (allowed, new_tat, remaining, retry_after_seconds).
+    """
+    interval = window_seconds / max_requests
+    new_tat = max(tat, now) + interval
+    backlog = new_tat - now
+    if backlog > window_seconds:
+        return False, tat, 0, backlog - window_seconds
+    remaining = int((window_seconds - backlog) / interval + 1e-9)
+    return True, new_tat, remaining, 0
+
+
+def _limit_info(allowed: bool, max_requests: int, remaining: int,
+                retry_after: float, window_seconds: int) -> dict:
+    return {
+        'limit': max_requests,
+        'remaining': remaining,
+        'retry_after': 0 if allowed else max(1, math.ceil(retry_after)),
+        'window': window_seconds,
+    }
+
+
+# Runs the GCRA step atomically inside Redis using the server clock, so all
+# workers (and hosts) agree on time. Returns {allowed, remaining, retry_ms}.
+_GCRA_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local interval = window_ms / limit
+local t = redis.call('TIME')
+local now = t[1] * 1000 + t[2] / 1000
+local tat = tonumber(redis.call('GET', key) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local backlog = new_tat - now
+if backlog > window_ms then
+  return {0, 0, math.ceil(backlog - window_ms)}
+end
+redis.call('SET', key, new_tat, 'PX', math.ceil(backlog))
+return {1, math.floor((window_ms - backlog) / interval + 1e-9), 0}
+"""
+
+
+class RedisGCRABackend:
+    """GCRA state in Redis, evaluated by a Lua script (one round-trip)."""
+
+    def __init__(self, url: str, key_prefix: str = 'sfrl:'):
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._client.ping()
+        self._script = self._client.register_script(_GCRA_LUA)
+        self._prefix = key_prefix
+
+    def check(self, key: str, max_requests: int, window_seconds: int):
+        allowed, remaining, retry_ms = self._script(
+            keys=[self._prefix + key], args=[max_requests, int(window_seconds * 1000)]
+        )
+        return bool(allowed), int(remaining), int(retry_ms) / 1000
+
+    def reset(self, key: str):
+        self._client.delete(self._prefix + key)
+
+
+class SQLiteGCRABackend:
+    """GCRA state in a host-local SQLite file shared by all workers.
+
+    Each check is one ``BEGIN IMMEDIATE`` transaction, which serializes
+    writers across processes without a separate lock file.
+    """
+
+    def __init__(self, path):
+        self._path = str(path)
+        self._local = threading.local()
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)'
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=2.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def check(self, key: str, max_requests: int, window_seconds: int):
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tat FROM rate_limits WHERE key = ?', (key,)).fetchone()
+            allowed, new_tat, remaining, retry_after = _gcra(
+                row[0] if row else now, now, max_requests, window_seconds
+            )
+            if allowed:
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)', (key, new_tat)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, remaining, retry_after
+
+    def reset(self, key: str):
+        self._conn().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+
+def _create_backend():
+    """Pick the shared state backend from ``RATE_LIMIT_BACKEND``.
+
+    ``auto`` (default) uses Redis when ``REDIS_URL`` is set and reachable and
+    in-process state otherwise; ``redis``, ``sqlite`` and ``memory`` force a
+    choice. Tests (``TESTING=true``) always use in-process state under auto.
+    """
+    mode = os.getenv('RATE_LIMIT_BACKEND', 'auto').strip().lower()
+    if mode == 'auto' and os.getenv('TESTING', '').strip().lower() in {'1', 'true', 'yes', 'on'}:
+        return None
+    redis_url = os.getenv('REDIS_URL', '').strip()
+    try:
+        if mode in ('auto', 'redis') and redis_url:
+            return RedisGCRABackend(redis_url)
+        if mode == 'sqlite':
+            return SQLiteGCRABackend(workspace_path('cache', create=True) / 'rate_limits.sqlite3')
+    except Exception as e:
+        logger.warning("Shared rate limit backend unavailable, using in-process state: %s", e)
+    return None
+
+
+# Global singleton instance (backend resolved from the environment on import)
+_limiter = GCRARateLimiter(backend=_create_backend())
 
 
 def get_client_ip() -> str:
@@ -182,6 +398,6 @@ def rate_limit(max_requests: int = 100, window_seconds: int = 60,
     return decorator
 
 
-def get_limiter() -> RateLimiter:
+def get_limiter() -> GCRARateLimiter:
     """Get the global rate limiter instance."""
     return _limiter
@@ -3,6 +3,8 @@ from flask import g, jsonify, request
 from functools import wraps
 from datetime import datetime
 from .models import db, User, Role, Permission, RolePermission, UserRole, RoleAuditLog
+from .permission_registry import permission_registry
+from .principal import current_principal, get_principal, invalidate_principal, invalidate_all_principals
 
 
 # ============================================================================
@@ -22,23 +24,16 @@ def require_role(*required_roles):
         @wraps(fn)
         def decorated_function(*args, **kwargs):
             # Check if user is authenticated (set by @require_auth)
-            if not hasattr(g, 'user') or g.user is None:
+            if getattr(g, 'user_id', None) is None:
                 return jsonify({'error': 'Unauthorized'}), 401
 
-            # Load user roles from database
-            user = User.query.get(g.user['user_id'])
-            if not user:
+            # Role set (UserRole table + legacy 'role' field) from the principal cache
+            principal = current_principal()
+            if not principal:
                 return jsonify({'error': 'User not found'}), 404
 
-            # Get user's role names (check both legacy 'role' field and new UserRole table)
-            user_roles = {role.name for role in user.roles}
-
-            # Legacy support: check 'role' field for backward compatibility
-            if user.role and user.role != 'user':
-                user_roles.add(user.role)
-
             # Check if user has any of the required roles
-            if not any(role in user_roles for role in required_roles):
+            if not principal.has_role(*required_roles):
                 return jsonify({
                     'error': 'Forbidden',
                     'message': f'Requires one of roles: {", ".join(required_roles)}'
@@ -65,22 +60,16 @@ def require_permission(*required_permissions):
         @wraps(fn)
         def decorated_function(*args, **kwargs):
             # Check if user is authenticated
-            if not hasattr(g, 'user') or g.user is None:
+            if getattr(g, 'user_id', None) is None:
                 return jsonify({'error': 'Unauthorized'}), 401
 
-            user = User.query.get(g.user['user_id'])
-            if not user:
+            principal = current_principal()
+            if not principal:
                 return jsonify({'error': 'User not found'}), 404
 
-            # Get all permissions for user's roles
-            user_permissions = set()
-            for role in user.roles:
-                for perm in role.permissions:
-                    if perm.is_active:
-                        user_permissions.add(perm.name)
-
-            # Check if user has any of the required permissions
-            if not any(perm in user_permissions for perm in required_permissions):
+            # One AND against the precompiled bitset
+            required = permission_registry.mask_for(*required_permissions)
+            if not principal.permission_mask & required:
                 return jsonify({
                     'error': 'Forbidden',
                     'message': f'Requires one of permissions: {", ".join(required_permissions)}'
@@ -110,17 +99,11 @@ def get_user_permissions(user_id):
     Returns:
         Set of permission names (e.g., {'write:sns_posts', 'read:users'})
     """
-    user = User.query.get(user_id)
-    if not user:
+    principal = get_principal(user_id)
+    if not principal:
         return set()
 
-    permissions = set()
-    for role in user.roles:
-        for perm in role.permissions:
-            if perm.is_active:
-                permissions.add(perm.name)
-
-    return permissions
+    return set(principal.permissions)
 
 
 def get_user_roles(user_id):
@@ -151,16 +134,11 @@ def has_permission(user_id, permission_name):
     Returns:
         Boolean
     """
-    user = User.query.get(user_id)
-    if not user:
+    principal = get_principal(user_id)
+    if not principal:
         return False
 
-    for role in user.roles:
-        for perm in role.permissions:
-            if perm.is_active and perm.name == permission_name:
-                return True
-
-    return False
+    return principal.has_permission(permission_name)
 
 
 def has_role(user_id, role_name):
@@ -186,6 +164,27 @@ def has_role(user_id, role_name):
     return False
 
 
+def users_with_permission(permission_name, limit=100, offset=0):
+    """
+    Find users holding a permission through any of their roles.
+
+    Roles are resolved from the permission registry, so this is a single
+    user_roles query rather than a walk over every user.
+
+    Returns:
+        Tuple (total: int, users: list of User)
+    """
+    role_ids = permission_registry.roles_with(permission_name)
+    if not role_ids:
+        return 0, []
+
+    holders = db.session.query(UserRole.user_id).filter(UserRole.role_id.in_(role_ids)).distinct()
+    query = User.query.filter(User.id.in_(holders))
+    total = query.count()
+    users = query.order_by(User.id).limit(limit).offset(offset).all()
+    return total, users
+
+
 def assign_role_to_user(user_id, role_name, assigned_by_id=None):
     """
     Assign a role to a user and log the action.
@@ -214,6 +213,7 @@ def assign_role_to_user(user_id, role_name, assigned_by_id=None):
         # Add role to user
         user.roles.append(role)
         db.session.commit()
+        invalidate_principal(user_id)
 
         # Log the action
         log_rbac_change(
@@ -267,6 +267,7 @@ def remove_role_from_user(user_id, role_name, assigned_by_id=None):
     try:
         user.roles.remove(role)
         db.session.commit()
+        invalidate_principal(user_id)
 
         log_rbac_change(
             action='remove_role',
@@ -318,6 +319,7 @@ def grant_permission_to_role(role_name, permission_name, assigned_by_id=None):
     try:
         role.permissions.append(permission)
         db.session.commit()
+        invalidate_all_principals()
 
         log_rbac_change(
             action='grant_permission',
@@ -369,6 +371,7 @@ def revoke_permission_from_role(role_name, permission_name, assigned_by_id=None)
     try:
         role.permissions.remove(permission)
         db.session.commit()
+        invalidate_all_principals()
 
         log_rbac_change(
             action='revoke_permission',
@@ -535,6 +538,7 @@ def init_rbac():
                         role.permissions.append(perm)
 
         db.session.commit()
+        permission_registry.load()
         print("RBAC initialized successfully")
     except Exception as e:
         db.session.rollback()
@@ -1,12 +1,15 @@
 """Automated Scheduler — APScheduler integration for periodic data pipeline tasks.
 
-Manages 6 background jobs:
+Manages 9 background jobs:
   1. Review site crawling (every 2 hours)
   2. SNS analytics collection (every 1 hour)
   3. Trending topics refresh (every 30 minutes)
   4. Auto-apply rules check (every 15 minutes)
   5. SNS auto-post executor (every 5 minutes)
   6. Data cleanup (daily at 3 AM)
+  7. Daily Telegram summary (daily at 9 AM)
+  8. FX rate refresh (every FX_REFRESH_INTERVAL seconds, default 1 hour)
+  9. Month-end invoice PDF batch render (monthly, 1st at 2 AM)
 
 Thread-safe: all DB operations use Flask app context.
 Idempotent: repeated runs produce the same result.
@@ -140,12 +143,34 @@ def init_scheduler(app: Flask):
         kwargs={'app': app},
     )
 
+    # Job 8: FX rate refresh (keeps the cached USD/KRW rate warm)
+    from backend.services.fx_rates import FX_REFRESH_INTERVAL
+    scheduler.add_job(
+        refresh_fx_rates,
+        IntervalTrigger(seconds=FX_REFRESH_INTERVAL),
+        id='fx_rate_refresh',
+        name='FX Rate Refresh',
+        replace_existing=True,
+        kwargs={'app': app},
+    )
+
+    # Job 9: Month-end invoice PDF batch render (1st of the month, 2 AM UTC)
+    scheduler.add_job(
+        render_month_invoices,
+        CronTrigger(day=1, hour=2, minute=0),
+        id='invoice_batch_render',
+        name='Month-end Invoice Render',
+        replace_existing=True,
+        kwargs={'app': app},
+    )
+
     scheduler.start()
     _scheduler_started = True
-    logger.info('Scheduler started with 7 jobs: '
+    logger.info('Scheduler started with 9 jobs: '
                 'review_crawler(2h), sns_analytics(1h), trending_refresh(30m), '
                 'auto_apply_check(15m), sns_auto_post(5m), data_cleanup(daily@03:00), '
-                'telegram_daily_summary(daily@09:00)')
+                'telegram_daily_summary(daily@09:00), fx_rate_refresh(%ds), '
+                'invoice_batch_render(monthly@02:00)', FX_REFRESH_INTERVAL)
 
 
 # ===========================================================================
@@ -160,6 +185,7 @@ def crawl_review_sites(app: Flask):
     t0 = _now_ms()
     results: dict[str, int] = {}
     errors: list[str] = []
+    mocked = False
 
     try:
         with app.app_context():
@@ -174,14 +200,17 @@ def crawl_review_sites(app: Flask):
                 if sum(results.values()) == 0:
                     logger.info('[CRAWLER] Real scrapers returned 0 results; supplementing with mock data')
                     results = _mock_crawl_review_sites(app)
+                    mocked = True
             except ImportError:
                 # Scrapers module not yet implemented — run mock crawl
                 logger.info('[CRAWLER] review_scrapers module not found; running mock crawl')
                 results = _mock_crawl_review_sites(app)
+                mocked = True
             except Exception as e:
                 logger.error(f'[CRAWLER] aggregate_all_listings error: {e}', exc_info=True)
                 errors.append(str(e))
                 results = _mock_crawl_review_sites(app)
+                mocked = True
 
             # Log per-platform results into CrawlerLog
             for platform, count in results.items():
@@ -206,6 +235,11 @@ def crawl_review_sites(app: Flask):
 
             db.session.commit()
 
+            # aggregate_all_listings() publishes MAX(scraped_at) itself; mock rows need it here
+            if mocked:
+                from backend.services.review_freshness import refresh_last_scraped
+                refresh_last_scraped()
+
             total = sum(results.values())
             logger.info(f'[CRAWLER] Completed: {total} listings across {len(results)} platforms')
             for p, c in results.items():
@@ -425,265 +459,74 @@ def _pick_trending_hashtags(platform: str) -> list[str]:
 # Job 4 — Auto-Apply Rules Check
 # ===========================================================================
 
-def check_auto_apply_rules(app: Flask):
-    """Read active ReviewAutoRule records, match against new ReviewListings,
-    and auto-create ReviewApplication records for matching rules.
+def check_auto_apply_rules(app: Flask) -> dict | None:
+    """Match active ReviewAutoRules against listings that became relevant since
+    the last tick and bulk-create ReviewApplication records.
+
+    Uses the set-based matcher in backend.services.auto_apply (constant number
+    of queries per tick). Returns the tick's match stats.
     """
     t0 = _now_ms()
     try:
         with app.app_context():
-            from backend.models import (
-                db, ReviewAutoRule, ReviewListing, ReviewApplication, ReviewAccount
-            )
-
-            rules = ReviewAutoRule.query.filter_by(is_active=True).all()
-            if not rules:
-                logger.debug('[AUTO-APPLY] No active rules found')
-                _record_history('auto_apply_check', 'Auto Apply Rules Check', 'success',
-                                _now_ms() - t0, '0 rules, 0 applied')
-                return
-
-            total_applied = 0
-            total_rules_processed = 0
-
-            for rule in rules:
-                try:
-                    # Find active review accounts for the user
-                    accounts = ReviewAccount.query.filter_by(
-                        user_id=rule.user_id,
-                        is_active=True,
-                    ).all()
-                    if not accounts:
-                        continue
-
-                    # Determine which account(s) to use
-                    preferred_ids = rule.preferred_accounts or []
-                    target_account = None
-                    for acct in accounts:
-                        if acct.id in preferred_ids:
-                            target_account = acct
-                            break
-                    if target_account is None:
-                        target_account = accounts[0]
-
-                    # Build query for matching listings
-                    now = datetime.utcnow()
-                    max_deadline = now + timedelta(days=rule.apply_deadline_days or 30)
-
-                    query = ReviewListing.query.filter(
-                        ReviewListing.status == 'active',
-                        ReviewListing.deadline >= now,
-                        ReviewListing.deadline <= max_deadline,
-                    )
+            from backend.models import db
+            from backend.services.auto_apply import auto_apply_matcher
 
-                    if rule.target_categories:
-                        query = query.filter(ReviewListing.category.in_(rule.target_categories))
-
-                    if rule.min_reward:
-                        query = query.filter(ReviewListing.reward_value >= rule.min_reward)
-                    if rule.max_reward:
-                        query = query.filter(ReviewListing.reward_value <= rule.max_reward)
-
-                    if rule.reward_types:
-                        query = query.filter(ReviewListing.reward_type.in_(rule.reward_types))
-
-                    matching_listings = query.all()
-
-                    rule_applied = 0
-                    for listing in matching_listings:
-                        # Respect applicant ratio limit
-                        if (listing.max_applicants and listing.current_applicants
-                                and rule.max_applicants_ratio):
-                            ratio = listing.current_applicants / listing.max_applicants
-                            if ratio >= rule.max_applicants_ratio:
-                                continue
-
-                        # Idempotent: skip if already applied
-                        existing = ReviewApplication.query.filter_by(
-                            listing_id=listing.id,
-                            account_id=target_account.id,
-                        ).first()
-                        if existing:
-                            continue
-
-                        application = ReviewApplication(
-                            listing_id=listing.id,
-                            account_id=target_account.id,
-                            status='pending',
-                        )
-                        db.session.add(application)
-
-                        # Update listing applied_accounts
-                        if not listing.applied_accounts:
-                            listing.applied_accounts = []
-                        if target_account.id not in listing.applied_accounts:
-                            new_list = list(listing.applied_accounts)
-                            new_list.append(target_account.id)
-                            listing.applied_accounts = new_list
-
-                        rule_applied += 1
-
-                    if rule_applied > 0:
-                        logger.info(f'[AUTO-APPLY] Rule "{rule.name}" (id={rule.id}): '
-                                    f'applied to {rule_applied} listings')
-
-                    total_applied += rule_applied
-                    total_rules_processed += 1
-                    db.session.commit()
-
-                except Exception as e:
-                    logger.error(f'[AUTO-APPLY] Error processing rule {rule.id}: {e}')
-                    db.session.rollback()
+            try:
+                stats = auto_apply_matcher.run()
+            except Exception:
+                db.session.rollback()
+                raise
 
-            logger.info(f'[AUTO-APPLY] Processed {total_rules_processed} rules, '
-                        f'auto-applied {total_applied} listings')
+            if stats.rules == 0:
+                logger.debug('[AUTO-APPLY] No active rules found')
+            else:
+                logger.info(f'[AUTO-APPLY] {stats.summary()} '
+                            f'({stats.skipped_existing} already applied, '
+                            f'{stats.skipped_ratio} over applicant ratio)')
             _record_history('auto_apply_check', 'Auto Apply Rules Check', 'success',
-                            _now_ms() - t0,
-                            f'{total_rules_processed} rules, {total_applied} applied')
+                            _now_ms() - t0, stats.summary())
+            return stats.to_dict()
 
     except Exception as e:
         logger.error(f'[AUTO-APPLY] Critical error: {e}', exc_info=True)
         _record_history('auto_apply_check', 'Auto Apply Rules Check', 'error',
                         _now_ms() - t0, str(e)[:500])
+        return None
 
 
 # ===========================================================================
 # Job 5 — Execute Scheduled SNS Posts
 # ===========================================================================
 
-def execute_scheduled_posts(app: Flask):
-    """Find SNSAutomate records where next_run <= now and is_active,
-    create mock post content, and advance next_run based on frequency.
+def execute_scheduled_posts(app: Flask) -> dict | None:
+    """Run due SNSAutomate rules and publish due scheduled SNSPosts.
 
-    Also publishes any SNSPost records with status='scheduled' and
-    scheduled_at <= now.
+    Delegates to ``backend.services.sns_delivery``: due rows are claimed in
+    leased batches (safe with several scheduler workers), accounts and
+    Telegram chat ids are prefetched per batch, and platform publishes and
+    Telegram notifications run in a thread pool with per-platform limits.
 
-    Sends Telegram notifications on success/failure.
+    Returns the run's DeliveryStats as a dict (None on a critical error).
     """
     t0 = _now_ms()
     try:
         with app.app_context():
-            from backend.models import db, SNSAutomate, SNSPost, SNSAccount
-            from backend.telegram_service import send_sns_notification
-
-            now = datetime.utcnow()
+            from backend.services.sns_delivery import sns_delivery_engine
 
-            # --- Part A: SNSAutomate rule execution ---
-            automates = SNSAutomate.query.filter(
-                SNSAutomate.is_active == True,  # noqa: E712
-                SNSAutomate.next_run <= now,
-            ).all()
+            stats = sns_delivery_engine.run()
 
-            auto_executed = 0
-            for rule in automates:
-                try:
-                    # Find an active account for the user on one of the target platforms
-                    platforms = rule.platforms or []
-                    if not platforms:
-                        continue
-
-                    account = SNSAccount.query.filter(
-                        SNSAccount.user_id == rule.user_id,
-                        SNSAccount.platform.in_(platforms),
-                        SNSAccount.is_active == True,  # noqa: E712
-                    ).first()
-
-                    if not account:
-                        logger.warning(f'[AUTO-POST] No active account for rule {rule.id}')
-                        # Send Telegram failure notification
-                        send_sns_notification(
-                            rule.user_id,
-                            'post_failure',
-                            {'platform': ', '.join(platforms), 'error': 'No active account found'}
-                        )
-                        continue
-
-                    # Create a mock post (in production, use AI generation)
-                    is_wordpress = account.platform in {'wordpress', 'blog'}
-                    post = SNSPost(
-                        user_id=rule.user_id,
-                        account_id=account.id,
-                        content=(
-                            f'[Candidate] {rule.topic or "WordPress update"}'
-                            if is_wordpress
-                            else f'[Auto] {rule.topic or "Update"} - {rule.purpose or "engagement"}'
-                        ),
-                        platform='wordpress' if is_wordpress else account.platform,
-                        template_type='trend-brief' if is_wordpress else 'auto_generated',
-                        status='draft' if is_wordpress else 'published',
-                        published_at=None if is_wordpress else now,
-                        scheduled_at=now,
-                    )
-                    db.session.add(post)
-
-                    # Advance next_run
-                    freq = rule.frequency or 'daily'
-                    if is_wordpress:
-                        rule.next_run = now + timedelta(minutes=10)
-                    elif freq == 'daily':
-                        rule.next_run = now + timedelta(days=1)
-                    elif freq == 'weekly':
-                        rule.next_run = now + timedelta(weeks=1)
-                    elif freq == 'custom':
-                        rule.next_run = now + timedelta(hours=24)
-                    else:
-                        rule.next_run = now + timedelta(days=1)
-
-                    auto_executed += 1
-
-                    # Send Telegram success notification
-                    send_sns_notification(
-                        rule.user_id,
-                        'automation_executed',
-                        {
-                            'automation_name': rule.name or f'Auto-rule {rule.id}',
-                            'platforms': platforms,
-                            'execution_time': now.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                        }
-                    )
-
-                except Exception as e:
-                    logger.error(f'[AUTO-POST] Error executing rule {rule.id}: {e}')
-                    # Send Telegram failure notification
-                    try:
-                        send_sns_notification(
-                            rule.user_id,
-                            'post_failure',
-                            {'platform': ', '.join(rule.platforms or []), 'error': str(e)[:200]}
-                        )
-                    except Exception as notify_error:
-                        logger.error(f'[AUTO-POST] Failed to send Telegram notification: {notify_error}')
-
-            # --- Part B: Publish scheduled individual posts ---
-            scheduled_posts = SNSPost.query.filter(
-                SNSPost.status == 'scheduled',
-                SNSPost.scheduled_at <= now,
-            ).all()
-
-            posts_published = 0
-            for post in scheduled_posts:
-                try:
-                    post.status = 'published'
-                    post.published_at = now
-                    posts_published += 1
-                except Exception as e:
-                    logger.error(f'[AUTO-POST] Error publishing post {post.id}: {e}')
-                    post.status = 'failed'
-                    post.error_message = str(e)[:500]
-
-            db.session.commit()
-
-            if auto_executed or posts_published:
-                logger.info(f'[AUTO-POST] Executed {auto_executed} automation rules, '
-                            f'published {posts_published} scheduled posts')
+            if stats.rules_executed or stats.published or stats.failed:
+                logger.info(f'[AUTO-POST] {stats.summary()}')
             _record_history('sns_auto_post', 'SNS Auto Post Executor', 'success',
-                            _now_ms() - t0,
-                            f'{auto_executed} rules, {posts_published} posts published')
+                            _now_ms() - t0, stats.summary())
+            return stats.to_dict()
 
     except Exception as e:
         logger.error(f'[AUTO-POST] Critical error: {e}', exc_info=True)
         _record_history('sns_auto_post', 'SNS Auto Post Executor', 'error',
                         _now_ms() - t0, str(e)[:500])
+        return None
 
 
 # ===========================================================================
@@ -848,6 +691,64 @@ def cleanup_old_data(app: Flask):
                         _now_ms() - t0, str(e)[:500])
 
 
+# ===========================================================================
+# Job 8 — FX Rate Refresh
+# ===========================================================================
+
+def refresh_fx_rates(app: Flask):
+    """Fetch the USD/KRW rate so request paths only ever read the cached value."""
+    t0 = _now_ms()
+    from backend.services.fx_rates import fx_rates
+
+    if fx_rates.refresh():
+        status = fx_rates.status()
+        logger.info(f"[FX] Refreshed USD/KRW={status['rate']} from {status['source']}")
+        _record_history('fx_rate_refresh', 'FX Rate Refresh', 'success',
+                        _now_ms() - t0, f"USD/KRW {status['rate']}")
+    else:
+        status = fx_rates.status()
+        _record_history('fx_rate_refresh', 'FX Rate Refresh', 'error', _now_ms() - t0,
+                        (status['last_error'] or 'no rate source configured')[:500])
+
+
+# ===========================================================================
+# Job 9 — Month-end Invoice Render
+# ===========================================================================
+
+def render_month_invoices(app: Flask, month_start: date | None = None):
+    """Pre-render every invoice issued in the previous month in a process pool.
+
+    Artifacts already in the store are skipped, so re-runs are cheap and
+    downloads of the month's invoices never render on the request path.
+    """
+    t0 = _now_ms()
+    with app.app_context():
+        try:
+            from backend.models import Invoice
+            from backend.services.invoice_renderer import invoice_payload, invoice_render_queue
+
+            if month_start is None:
+                month_start = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+            month_end = (month_start + timedelta(days=32)).replace(day=1)
+
+            invoices = Invoice.query.filter(
+                Invoice.issued_date >= month_start,
+                Invoice.issued_date < month_end,
+            ).order_by(Invoice.id).all()
+            payloads = [invoice_payload(inv, inv.user, inv.order if inv.order_id else None)
+                        for inv in invoices]
+            keys = invoice_render_queue.render_batch(payloads)
+
+            detail = f"{len(keys)} invoices for {month_start:%Y-%m}"
+            logger.info(f"[INVOICE] Rendered {detail}")
+            _record_history('invoice_batch_render', 'Month-end Invoice Render', 'success',
+                            _now_ms() - t0, detail)
+        except Exception as e:
+            logger.error(f"[INVOICE] Batch render failed: {e}\n{traceback.format_exc()}")
+            _record_history('invoice_batch_render', 'Month-end Invoice Render', 'error',
+                            _now_ms() - t0, str(e)[:500])
+
+
 # ===========================================================================
 # Helpers
 # ===========================================================================
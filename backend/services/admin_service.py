@@ -6,6 +6,7 @@ from ..models import (
     db, User, Product, Subscription, Payment, SNSAccount,
     SNSAnalytics, ReviewAccount, Campaign, CampaignApplication, ErrorLog
 )
+from ..principal import invalidate_principal
 import json
 
 
@@ -85,6 +86,7 @@ class AdminService:
         old_role = user.role
         user.role = new_role
         db.session.commit()
+        invalidate_principal(user_id)
 
         AdminService.audit_log(
             admin_id=admin_id,
@@ -105,6 +107,7 @@ class AdminService:
         old_status = user.is_active
         user.is_active = is_active
         db.session.commit()
+        invalidate_principal(user_id)
 
         AdminService.audit_log(
             admin_id=admin_id,
@@ -1,16 +1,35 @@
 """AI Response Cache — Reduces duplicate Claude API calls.
 
-TTL-based in-memory cache with per-user isolation support for personalized
+TTL-based two-tier cache (per-process L1 + shared L2 from
+backend.shared_cache) with per-user isolation support for personalized
 content. Global caching for platform-wide data (trending, posting times).
 
+PromptCache sits underneath the per-method caches, at the Claude call
+itself: it keys on the normalized prompt (case/whitespace folded) plus the
+sorted call parameters, optionally (AI_PROMPT_CACHE_SIMILARITY < 1) matches
+near-identical prompts by comparing the words that differ, and serves stale
+responses while one background call revalidates them. Entries persist in
+the shared L2 (SQLite under .workspace/cache or Redis), so they survive
+restarts. Callers that need a new response ("regenerate") bypass it with
+``fresh_responses()`` or a ``Cache-Control: no-cache`` request header.
+
 Thread-safe via threading.Lock.
 """
+import difflib
 import hashlib
 import json
 import logging
+import os
+import re
 import threading
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..cache import TTLCache
+from ..shared_cache import TieredCache
 
 logger = logging.getLogger('ai_cache')
 
@@ -22,8 +41,8 @@ class AIResponseCache:
     Supports per-user keys (set user_id kwarg) and global keys for shared data.
     """
 
-    def __init__(self, default_ttl: int = 3600):
-        self._cache: dict = {}
+    def __init__(self, default_ttl: int = 3600, namespace: str = 'ai'):
+        self._cache = TieredCache(namespace, TTLCache(max_entries=2048))
         self._lock = threading.Lock()
         self.default_ttl = default_ttl
         self.hits = 0
@@ -46,9 +65,9 @@ class AIResponseCache:
     def get(self, method: str, **kwargs) -> Optional[Any]:
         """Return cached value if still valid, else None."""
         key = self._make_key(method, **kwargs)
+        entry = self._cache.get(key)
         with self._lock:
-            entry = self._cache.get(key)
-            if entry and time.time() < entry['expires']:
+            if entry is not None:
                 self.hits += 1
                 logger.debug("Cache HIT  method=%s key=%s", method, key[:8])
                 return entry['data']
@@ -60,38 +79,27 @@ class AIResponseCache:
         """Store value with TTL (seconds). Uses default_ttl when ttl is None."""
         key = self._make_key(method, **kwargs)
         effective_ttl = ttl if ttl is not None else self.default_ttl
-        with self._lock:
-            self._cache[key] = {
-                'data': data,
-                'expires': time.time() + effective_ttl,
-                'created': time.time(),
-                'method': method,
-            }
+        self._cache.set(key, {'data': data, 'method': method}, effective_ttl)
         logger.debug("Cache SET  method=%s key=%s ttl=%ss", method, key[:8], effective_ttl)
 
     def invalidate(self, method: str, **kwargs) -> bool:
         """Remove a specific cache entry. Returns True if it existed."""
         key = self._make_key(method, **kwargs)
-        with self._lock:
-            existed = key in self._cache
-            self._cache.pop(key, None)
+        existed = self._cache.get(key) is not None
+        self._cache.delete(key)
         return existed
 
     def clear_expired(self) -> int:
         """Purge all expired entries. Returns count of entries removed."""
-        now = time.time()
-        with self._lock:
-            before = len(self._cache)
-            self._cache = {k: v for k, v in self._cache.items() if now < v['expires']}
-            removed = before - len(self._cache)
+        removed = self._cache.purge_expired()
         if removed:
             logger.info("Cache evicted %d expired entries", removed)
         return removed
 
     def clear_all(self) -> None:
         """Wipe the entire cache (e.g. for testing)."""
+        self._cache.clear()
         with self._lock:
-            self._cache.clear()
             self.hits = 0
             self.misses = 0
 
@@ -101,17 +109,18 @@ class AIResponseCache:
 
     def stats(self) -> dict:
         """Return cache hit-rate statistics."""
+        expired = self._cache.purge_expired()
+        tier_stats = self._cache.stats()
         with self._lock:
             total = self.hits + self.misses
             hit_rate = (self.hits / total * 100) if total > 0 else 0.0
-            now = time.time()
-            active = sum(1 for v in self._cache.values() if now < v['expires'])
             return {
                 'hits': self.hits,
                 'misses': self.misses,
                 'hit_rate_pct': round(hit_rate, 1),
-                'active_entries': active,
-                'total_entries': len(self._cache),
+                'active_entries': tier_stats['entries'],
+                'total_entries': tier_stats['entries'] + expired,
+                'l2_backend': tier_stats['l2_backend'],
             }
 
 
@@ -145,6 +154,245 @@ CACHE_TTLS: dict[str, int] = {
 
 
 # ---------------------------------------------------------------------------
-# Module-level singleton
+# Prompt-level TTL registry (seconds) — one entry per MAX_TOKENS_BY_METHOD /
+# SNS engine method; 0 or missing means the call is never cached.
+# Generation methods get short TTLs: identical prompts within a few minutes
+# (double submits, retries, several users on the same topic) reuse output.
+# ---------------------------------------------------------------------------
+PROMPT_CACHE_TTLS: dict[str, int] = {
+    'generate_hashtags':          7200,
+    'get_trending_topics':        1800,
+    'analyze_best_posting_time':  3600,
+    'generate_review_response':    600,
+    'analyze_nutrition':         86400,
+    'recommend_recipes':          1800,
+    'generate_bio_content':        600,
+    'generate_sns_content':        600,
+    'generate_content':            600,
+    'repurpose_content':           600,
+    'generate_content_calendar':   600,
+    'analyze_competitor':         3600,
+    'calculate_roi':               300,
+    'analyze_post_performance':   1800,
+}
+
+# Methods whose prompts may be matched approximately (free-text topics) when
+# similarity matching is enabled; numbers in the prompt still have to match
+# exactly. Off by default: word-level similarity cannot tell a topic from its
+# negation ("healthy"/"unhealthy" scores 0.875).
+SIMILAR_PROMPT_METHODS = frozenset({
+    'generate_sns_content', 'generate_content', 'generate_hashtags',
+    'get_trending_topics', 'recommend_recipes',
+})
+
+_WHITESPACE = re.compile(r'\s+')
+_NUMBERS = re.compile(r'\d+(?:\.\d+)?')
+
+_bypass: ContextVar[bool] = ContextVar('ai_prompt_cache_bypass', default=False)
+
+
+@contextmanager
+def fresh_responses():
+    """Skip cached responses for calls made inside the block.
+
+    Fresh responses still replace the cached entry, so the next identical
+    prompt sees the newest output.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _bypass_requested() -> bool:
+    """fresh_responses() is active, or the current request sent no-cache."""
+    if _bypass.get():
+        return True
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return False
+    return has_request_context() and 'no-cache' in request.headers.get('Cache-Control', '').lower()
+
+
+def normalize_prompt(text: str) -> str:
+    """Case-fold and collapse whitespace so cosmetic prompt differences share a key."""
+    return _WHITESPACE.sub(' ', text or '').strip().casefold()
+
+
+def prompt_similarity(a: str, b: str) -> float:
+    """Similarity of two normalized prompts, judged on the words that differ.
+
+    Prompts share long templates, so whole-prompt overlap says little; the
+    words outside the common word subsequence are compared character by
+    character instead ("kimchi stew" vs "kimchi stews" is close, "beef" vs
+    "beer" and "spring" vs "winter" are not).
+    """
+    if a == b:
+        return 1.0
+    words_a, words_b = a.split(), b.split()
+    matcher = difflib.SequenceMatcher(None, words_a, words_b, autojunk=False)
+    diff_a, diff_b = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'equal':
+            diff_a.extend(words_a[i1:i2])
+            diff_b.extend(words_b[j1:j2])
+    return difflib.SequenceMatcher(None, ' '.join(diff_a), ' '.join(diff_b), autojunk=False).ratio()
+
+
+class PromptCache:
+    """Normalized-prompt response cache with stale-while-revalidate.
+
+    ``get_or_call`` returns ``(text, usage, cached)``. ``call`` must return
+    ``(text, usage)`` with usage ``{'input_tokens': n, 'output_tokens': n}``,
+    or ``(None, None)`` on failure (failures are never cached).
+    """
+
+    def __init__(self, ttls: Dict[str, int], namespace: str = 'ai_prompt',
+                 stale_ratio: float = 1.0, similarity: float = 1.0,
+                 similar_methods=SIMILAR_PROMPT_METHODS, index_size: int = 128):
+        self._cache = TieredCache(namespace, TTLCache(max_entries=2048))
+        self.ttls = ttls
+        self.stale_ratio = stale_ratio
+        self.similarity = similarity
+        self.similar_methods = similar_methods
+        self._index_size = index_size
+        # bucket -> OrderedDict(key -> normalized prompt), most recent last
+        self._similar_index: Dict[str, OrderedDict] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'similar_hits': 0, 'stale_served': 0,
+                       'misses': 0, 'bypassed': 0, 'background_refreshes': 0}
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def make_key(self, method: str, prompt: str, **params) -> Tuple[str, str, str]:
+        """Return (exact key, similarity bucket, normalized prompt)."""
+        normalized = normalize_prompt(prompt)
+        params = {k: normalize_prompt(v) if isinstance(v, str) else v for k, v in params.items()}
+        base = json.dumps({'method': method, **params}, sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(f"{base}|{normalized}".encode('utf-8')).hexdigest()
+        numbers = _NUMBERS.findall(normalized)
+        bucket = hashlib.sha256(f"{base}|{numbers}".encode('utf-8')).hexdigest()
+        return key, bucket, normalized
+
+    def _find_similar(self, method: str, bucket: str, normalized: str) -> Optional[str]:
+        if method not in self.similar_methods or self.similarity >= 1:
+            return None
+        best_key, best_score = None, 0.0
+        with self._lock:
+            candidates = list(self._similar_index.get(bucket, {}).items())
+        for key, other in reversed(candidates):  # newest first
+            score = prompt_similarity(normalized, other)
+            if score >= self.similarity and score > best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remember(self, method: str, bucket: str, key: str, normalized: str) -> None:
+        if method not in self.similar_methods:
+            return
+        with self._lock:
+            index = self._similar_index.setdefault(bucket, OrderedDict())
+            index[key] = normalized
+            index.move_to_end(key)
+            while len(index) > self._index_size:
+                index.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Read-through
+    # ------------------------------------------------------------------
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _store(self, key: str, text: str, usage: Optional[Dict], ttl: int) -> None:
+        entry = {'text': text, 'usage': usage or {}, 'fresh_until': time.time() + ttl}
+        self._cache.set(key, entry, ttl + ttl * self.stale_ratio)
+
+    def get_or_call(self, method: str, prompt: str, call: Callable[[], Tuple[Any, Any]],
+                    **params) -> Tuple[Any, Optional[Dict], bool]:
+        ttl = self.ttls.get(method, 0) if method else 0
+        if ttl <= 0:
+            text, usage = call()
+            return text, usage, False
+
+        key, bucket, normalized = self.make_key(method, prompt, **params)
+        bypass = _bypass_requested()
+        entry = None if bypass else self._cache.get(key)
+        if entry is None and not bypass:
+            similar_key = self._find_similar(method, bucket, normalized)
+            if similar_key is not None:
+                entry = self._cache.get(similar_key)
+                if entry is not None:
+                    self._bump('similar_hits')
+
+        if entry is not None:
+            if time.time() <= entry['fresh_until']:
+                self._bump('hits')
+            else:
+                self._bump('stale_served')
+                # Always refresh under this prompt's own key: call() answers this
+                # prompt, not the similar one whose entry was served
+                self._revalidate(method, bucket, key, normalized, call, ttl)
+            return entry['text'], entry['usage'], True
+
+        self._bump('bypassed' if bypass else 'misses')
+        text, usage = call()
+        if text is not None:
+            self._store(key, text, usage, ttl)
+            self._remember(method, bucket, key, normalized)
+        return text, usage, False
+
+    def _revalidate(self, method: str, bucket: str, key: str, normalized: str,
+                    call: Callable, ttl: int) -> None:
+        """Refresh a stale entry on a daemon thread unless a refresh is running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self._stats['background_refreshes'] += 1
+
+        def refresh():
+            try:
+                text, usage = call()
+                if text is not None:
+                    self._store(key, text, usage, ttl)
+                    self._remember(method, bucket, key, normalized)
+            except Exception as e:
+                logger.warning("Prompt cache refresh failed key=%s: %s", key[:8], e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f'ai-prompt-refresh-{key[:8]}', daemon=True).start()
+
+    def clear_all(self) -> None:
+        self._cache.clear()
+        with self._lock:
+            self._similar_index.clear()
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['refreshing'] = len(self._refreshing)
+        served = stats['hits'] + stats['similar_hits'] + stats['stale_served']
+        total = served + stats['misses']
+        stats['hit_rate_pct'] = round(served / total * 100, 1) if total else 0.0
+        return stats
+
+
+# ---------------------------------------------------------------------------
+# Module-level singletons
 # ---------------------------------------------------------------------------
 ai_cache = AIResponseCache(default_ttl=3600)
+prompt_cache = PromptCache(
+    PROMPT_CACHE_TTLS,
+    stale_ratio=float(os.getenv('AI_PROMPT_CACHE_STALE_RATIO', '1.0')),
+    similarity=float(os.getenv('AI_PROMPT_CACHE_SIMILARITY', '1.0')),
+)
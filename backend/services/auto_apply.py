@@ -0,0 +1,270 @@
+"""Auto Apply — set-based matching of ReviewAutoRules against ReviewListings.
+
+One scheduler tick costs a fixed number of queries regardless of how many
+rules and listings there are:
+
+1. active rules, and active review accounts for all rule owners
+2. candidate listings — only those that became relevant since the last tick
+   (new ids above the watermark, or listings whose deadline just entered a
+   rule's ``apply_deadline_days`` window). Rules created or edited since the
+   last tick, and the first tick after a restart, backfill against the whole
+   window instead.
+3. existing (listing, account) applications for the candidates, in one
+   prefetch
+4. a bulk INSERT of the new applications, plus ``application_count`` and
+   ``applied_accounts`` updates
+
+Rules are evaluated in memory against listings indexed by category and
+reward type. Per-tick stats (``MatchStats``) are returned and kept on
+``auto_apply_matcher.last_stats``.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, or_
+
+from ..models import (
+    db, adjust_application_counts, ReviewAccount, ReviewApplication, ReviewAutoRule, ReviewListing,
+)
+
+logger = logging.getLogger('auto_apply')
+
+_PREFETCH_CHUNK = 500
+
+
+@dataclass
+class MatchStats:
+    """Counters for one matching pass."""
+    rules: int = 0
+    rules_backfilled: int = 0
+    rules_without_account: int = 0
+    listings_scanned: int = 0
+    matches: int = 0
+    skipped_existing: int = 0
+    skipped_ratio: int = 0
+    applied: int = 0
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        return (f'{self.rules} rules, {self.listings_scanned} listings, '
+                f'{self.matches} matches, {self.applied} applied')
+
+
+def _window_days(rule) -> int:
+    return rule.apply_deadline_days or 30
+
+
+def _pick_account(rule, accounts: List) -> Optional[object]:
+    """Preferred account if the rule names one, else the user's first account."""
+    preferred_ids = rule.preferred_accounts or []
+    for acct in accounts:
+        if acct.id in preferred_ids:
+            return acct
+    return accounts[0] if accounts else None
+
+
+class ListingIndex:
+    """Candidate listings bucketed by category and by reward type."""
+
+    def __init__(self, listings: Iterable):
+        self.all = list(listings)
+        self.by_category = defaultdict(list)
+        self.by_reward_type = defaultdict(list)
+        for listing in self.all:
+            self.by_category[listing.category].append(listing)
+            self.by_reward_type[listing.reward_type].append(listing)
+
+    def candidates(self, rule) -> List:
+        """Smallest bucket set that can contain the rule's matches."""
+        options = [self.all]
+        if rule.target_categories:
+            options.append([l for c in set(rule.target_categories) for l in self.by_category.get(c, ())])
+        if rule.reward_types:
+            options.append([l for t in set(rule.reward_types) for l in self.by_reward_type.get(t, ())])
+        return min(options, key=len)
+
+
+def rule_matches(rule, listing, now: datetime) -> bool:
+    """Same predicate the per-rule SQL filter used to apply."""
+    if listing.deadline is None or not (now <= listing.deadline <= now + timedelta(days=_window_days(rule))):
+        return False
+    if rule.target_categories and listing.category not in rule.target_categories:
+        return False
+    if rule.reward_types and listing.reward_type not in rule.reward_types:
+        return False
+    if rule.min_reward and (listing.reward_value is None or listing.reward_value < rule.min_reward):
+        return False
+    if rule.max_reward and (listing.reward_value is None or listing.reward_value > rule.max_reward):
+        return False
+    return True
+
+
+def _over_ratio(rule, listing) -> bool:
+    if listing.max_applicants and listing.current_applicants and rule.max_applicants_ratio:
+        return listing.current_applicants / listing.max_applicants >= rule.max_applicants_ratio
+    return False
+
+
+class AutoApplyMatcher:
+    """Incremental matcher; remembers the listing watermark between ticks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watermark_id: Optional[int] = None
+        self._last_run: Optional[datetime] = None
+        self.last_stats: Optional[MatchStats] = None
+
+    def reset(self) -> None:
+        """Forget the watermark; the next run backfills every rule."""
+        with self._lock:
+            self._watermark_id = None
+            self._last_run = None
+
+    @staticmethod
+    def _changed_since(row, when: datetime) -> bool:
+        """Rule/account created or edited after when (needs a backfill)."""
+        changed = row.updated_at or row.created_at
+        return changed is None or changed > when
+
+    def _is_new(self, rule, listing, last_run: datetime) -> bool:
+        """Listing became relevant to rule since the last tick."""
+        if listing.id > self._watermark_id:
+            return True
+        return listing.deadline > last_run + timedelta(days=_window_days(rule))
+
+    def _load_listings(self, now: datetime, max_days: int, min_days: int, backfill: bool) -> List:
+        query = ReviewListing.query.filter(
+            ReviewListing.status == 'active',
+            ReviewListing.deadline >= now,
+            ReviewListing.deadline <= now + timedelta(days=max_days),
+        )
+        if not backfill:
+            query = query.filter(or_(
+                ReviewListing.id > self._watermark_id,
+                ReviewListing.deadline > self._last_run + timedelta(days=min_days),
+            ))
+        return query.order_by(ReviewListing.id).all()
+
+    @staticmethod
+    def _existing_pairs(listing_ids: Set[int], account_ids: Set[int]) -> Set[Tuple[int, int]]:
+        pairs = set()
+        ids = sorted(listing_ids)
+        for start in range(0, len(ids), _PREFETCH_CHUNK):
+            rows = db.session.query(ReviewApplication.listing_id, ReviewApplication.account_id).filter(
+                ReviewApplication.listing_id.in_(ids[start:start + _PREFETCH_CHUNK]),
+                ReviewApplication.account_id.in_(account_ids),
+            ).all()
+            pairs.update((listing_id, account_id) for listing_id, account_id in rows)
+        return pairs
+
+    def run(self, now: Optional[datetime] = None) -> MatchStats:
+        """One matching pass; commits the new applications."""
+        with self._lock:
+            return self._run(now or datetime.utcnow())
+
+    def _run(self, now: datetime) -> MatchStats:
+        stats = MatchStats()
+        started = time.monotonic()
+
+        rules = ReviewAutoRule.query.filter_by(is_active=True).order_by(ReviewAutoRule.id).all()
+        stats.rules = len(rules)
+        if not rules:
+            self.last_stats = stats
+            return stats
+
+        accounts_by_user = defaultdict(list)
+        for acct in ReviewAccount.query.filter(
+                ReviewAccount.user_id.in_({r.user_id for r in rules}),
+                ReviewAccount.is_active.is_(True)).order_by(ReviewAccount.id):
+            accounts_by_user[acct.user_id].append(acct)
+
+        targets = {}
+        for rule in rules:
+            account = _pick_account(rule, accounts_by_user.get(rule.user_id, []))
+            if account is None:
+                stats.rules_without_account += 1
+            else:
+                targets[rule.id] = account
+        rules = [r for r in rules if r.id in targets]
+        first_run = self._watermark_id is None
+        # On a cold start every existing listing is covered by the backfill
+        top_id = (db.session.query(db.func.max(ReviewListing.id)).scalar() or 0) if first_run else 0
+        if not rules:
+            self._advance(now, top_id)
+            self.last_stats = stats
+            return stats
+
+        last_run = self._last_run
+        backfill_ids = {
+            r.id for r in rules
+            if first_run or self._changed_since(r, last_run) or self._changed_since(targets[r.id], last_run)
+        }
+        stats.rules_backfilled = len(backfill_ids)
+
+        listings = self._load_listings(
+            now,
+            max_days=max(_window_days(r) for r in rules),
+            min_days=min(_window_days(r) for r in rules),
+            backfill=bool(backfill_ids),
+        )
+        stats.listings_scanned = len(listings)
+        top_id = max([top_id] + [l.id for l in listings])
+        index = ListingIndex(listings)
+
+        matches: Dict[Tuple[int, int], object] = {}
+        for rule in rules:
+            account = targets[rule.id]
+            rule_matches_count = 0
+            for listing in index.candidates(rule):
+                if rule.id not in backfill_ids and not self._is_new(rule, listing, last_run):
+                    continue
+                if not rule_matches(rule, listing, now):
+                    continue
+                if _over_ratio(rule, listing):
+                    stats.skipped_ratio += 1
+                    continue
+                stats.matches += 1
+                rule_matches_count += 1
+                matches.setdefault((listing.id, account.id), listing)
+            if rule_matches_count:
+                logger.debug(f'[AUTO-APPLY] Rule "{rule.name}" (id={rule.id}): {rule_matches_count} matches')
+
+        if matches:
+            existing = self._existing_pairs({lid for lid, _ in matches}, {aid for _, aid in matches})
+            new_pairs = [pair for pair in matches if pair not in existing]
+            stats.skipped_existing = len(matches) - len(new_pairs)
+
+            if new_pairs:
+                db.session.execute(insert(ReviewApplication), [
+                    {'listing_id': lid, 'account_id': aid, 'status': 'pending', 'applied_at': now}
+                    for lid, aid in new_pairs
+                ])
+                adjust_application_counts(db.session.connection(), Counter(lid for lid, _ in new_pairs))
+            for lid, aid in new_pairs:
+                listing = matches[(lid, aid)]
+                applied = list(listing.applied_accounts or [])
+                if aid not in applied:
+                    applied.append(aid)
+                    listing.applied_accounts = applied
+            db.session.commit()
+            stats.applied = len(new_pairs)
+
+        self._advance(now, top_id)
+        stats.duration_ms = round((time.monotonic() - started) * 1000, 1)
+        self.last_stats = stats
+        return stats
+
+    def _advance(self, now: datetime, top_id: int) -> None:
+        self._watermark_id = max(self._watermark_id or 0, top_id)
+        self._last_run = now
+
+
+auto_apply_matcher = AutoApplyMatcher()
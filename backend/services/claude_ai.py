@@ -6,6 +6,7 @@ the Claude API with tiered model selection for cost efficiency.
 Optimizations (v2.0):
   - Tiered model routing: haiku / sonnet / opus per task complexity
   - TTL-based response caching via ai_cache.AIResponseCache
+  - Normalized-prompt, stale-while-revalidate call cache via ai_cache.PromptCache
   - Compressed prompts (40-60% shorter than v1.0)
   - Per-method max_tokens caps
   - AIUsageTracker for cost monitoring
@@ -90,6 +91,13 @@ class AIUsageTracker:
             'balanced': {'input': 0, 'output': 0},
             'powerful': {'input': 0, 'output': 0},
         }
+        self.cache_hits: int = 0
+        self.cache_hits_by_method: dict[str, int] = {}
+        self.saved_tokens_by_tier: dict[str, dict] = {
+            'fast':     {'input': 0, 'output': 0},
+            'balanced': {'input': 0, 'output': 0},
+            'powerful': {'input': 0, 'output': 0},
+        }
         self._reset_time: float = time.time()
 
     def track(
@@ -107,14 +115,34 @@ class AIUsageTracker:
             self.tokens_by_tier[tier]['input'] += input_tokens
             self.tokens_by_tier[tier]['output'] += output_tokens
 
-    def estimated_cost_usd(self) -> float:
+    def track_cache_hit(
+        self,
+        method: str,
+        tier: str,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """Record a response served from cache and the tokens it did not spend."""
+        self.cache_hits += 1
+        self.cache_hits_by_method[method] = self.cache_hits_by_method.get(method, 0) + 1
+        if tier in self.saved_tokens_by_tier:
+            self.saved_tokens_by_tier[tier]['input'] += input_tokens
+            self.saved_tokens_by_tier[tier]['output'] += output_tokens
+
+    def _cost(self, tokens_by_tier: dict) -> float:
         total = 0.0
-        for tier, counts in self.tokens_by_tier.items():
+        for tier, counts in tokens_by_tier.items():
             prices = self._PRICE.get(tier, self._PRICE['fast'])
             total += (counts['input'] / 1_000_000) * prices['input']
             total += (counts['output'] / 1_000_000) * prices['output']
         return round(total, 6)
 
+    def estimated_cost_usd(self) -> float:
+        return self._cost(self.tokens_by_tier)
+
+    def estimated_savings_usd(self) -> float:
+        return self._cost(self.saved_tokens_by_tier)
+
     def report(self) -> dict:
         return {
             'daily_calls': self.daily_calls,
@@ -124,6 +152,11 @@ class AIUsageTracker:
             'estimated_cost_usd': self.estimated_cost_usd(),
             'calls_by_method': self.calls_by_method,
             'tokens_by_tier': self.tokens_by_tier,
+            'cache_hits': self.cache_hits,
+            'cache_hits_by_method': self.cache_hits_by_method,
+            'tokens_saved': sum(c['input'] + c['output'] for c in self.saved_tokens_by_tier.values()),
+            'saved_tokens_by_tier': self.saved_tokens_by_tier,
+            'estimated_savings_usd': self.estimated_savings_usd(),
             'tracking_since': datetime.utcfromtimestamp(self._reset_time).isoformat(),
         }
 
@@ -566,34 +599,17 @@ class ClaudeAIService:
             or MAX_TOKENS_BY_METHOD.get(method, 1000)
         )
 
-        try:
-            messages = [{"role": "user", "content": prompt}]
-            kwargs: Dict[str, Any] = {
-                "model": model,
-                "max_tokens": effective_max_tokens,
-                "messages": messages,
-            }
-            if system:
-                kwargs["system"] = system
-
-            response = self.client.messages.create(**kwargs)
-            text = response.content[0].text
-
-            # Track usage
-            usage = getattr(response, 'usage', None)
-            if usage:
-                usage_tracker.track(
-                    method=method or 'unknown',
-                    tier=tier,
-                    input_tokens=getattr(usage, 'input_tokens', 0),
-                    output_tokens=getattr(usage, 'output_tokens', 0),
-                )
-
-            if json_mode:
-                return self._extract_json(text)
-
-            return text
+        messages = [{"role": "user", "content": prompt}]
+        kwargs: Dict[str, Any] = {
+            "model": model,
+            "max_tokens": effective_max_tokens,
+            "messages": messages,
+        }
+        if system:
+            kwargs["system"] = system
 
+        try:
+            text, usage, cached = self._cached_create(method, tier, kwargs, prompt)
         except Exception as e:
             error_str = str(e)
             if 'rate_limit' in error_str.lower() or '429' in error_str:
@@ -607,6 +623,48 @@ class ClaudeAIService:
 
             return self._fallback_response(prompt)
 
+        if json_mode:
+            return self._extract_json(text)
+
+        return text
+
+    def _cached_create(self, method: str, tier: str, kwargs: Dict[str, Any],
+                       prompt: str):
+        """messages.create through the normalized-prompt cache.
+
+        Returns (text, usage, cached). Live calls are tracked as usage; cache
+        hits are tracked as savings.
+        """
+        def create():
+            response = self.client.messages.create(**kwargs)
+            usage = getattr(response, 'usage', None)
+            usage = {
+                'input_tokens': getattr(usage, 'input_tokens', 0) if usage else 0,
+                'output_tokens': getattr(usage, 'output_tokens', 0) if usage else 0,
+            }
+            if usage['input_tokens'] or usage['output_tokens']:
+                usage_tracker.track(method=method or 'unknown', tier=tier, **usage)
+            return response.content[0].text, usage
+
+        try:
+            from .ai_cache import prompt_cache
+        except ImportError:
+            text, usage = create()
+            return text, usage, False
+
+        text, usage, cached = prompt_cache.get_or_call(
+            method, prompt, create, model=kwargs['model'],
+            system=kwargs.get('system', ''), max_tokens=kwargs['max_tokens'],
+        )
+        if cached:
+            usage = usage or {}
+            usage_tracker.track_cache_hit(
+                method=method, tier=tier,
+                input_tokens=usage.get('input_tokens', 0),
+                output_tokens=usage.get('output_tokens', 0),
+            )
+        return text, usage, cached
+
     def _extract_json(self, text: str) -> Any:
         """Extract and parse JSON from Claude's response text."""
         try:
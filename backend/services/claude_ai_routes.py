@@ -3,6 +3,7 @@
 Provides REST API endpoints for all Claude AI features:
 - SNS content generation
 - Content repurposing across platforms
+- Bulk multi-platform generation streamed as Server-Sent Events
 - Competitor analysis
 - Trending topics
 - Review response generation
@@ -17,12 +18,14 @@ v2.0 changes:
   - /api/ai/usage — new admin endpoint for cost monitoring
   - /api/ai/status — now includes cache stats
   - Long-response endpoints use stream_with_context for better UX
+  - /api/ai/bulk-generate — concurrent content/hashtag/repurpose/calendar jobs
 """
 import json
 from flask import Blueprint, request, jsonify, g, stream_with_context, Response
 from datetime import datetime
 from ..auth import require_auth
 from .claude_ai import claude_ai, usage_tracker
+from .sns_ai_engine import sns_ai_engine
 
 import logging
 
@@ -155,6 +158,65 @@ def repurpose():
     }), 200
 
 
+# ================================================================
+# POST /api/ai/bulk-generate — Concurrent Bulk Generation (SSE)
+# ================================================================
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@claude_ai_bp.route('/bulk-generate', methods=['POST'])
+@require_auth
+def bulk_generate():
+    """Run many generation jobs concurrently and stream results as they finish.
+
+    Request body:
+        jobs (list[dict], required): Job specs, each with ``type`` (content,
+            hashtags, repurpose, calendar) plus that method's arguments.
+            ``platforms`` / ``topics`` / ``target_platforms`` lists fan out
+            into one job per item.
+        max_concurrency (int, optional): Parallel calls for this request
+
+    Returns:
+        text/event-stream of ``result`` events (one per job, in completion
+        order) followed by a ``done`` event with counts
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body is required'}), 400
+
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list) or len(jobs) == 0:
+        return jsonify({'error': 'jobs must be a non-empty list'}), 400
+
+    try:
+        expanded = sns_ai_engine.expand_bulk_jobs(jobs)
+        max_concurrency = int(data['max_concurrency']) if data.get('max_concurrency') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        started = datetime.utcnow()
+        failed = 0
+        yield _sse('start', {'total': len(expanded), 'ai_powered': sns_ai_engine.is_available})
+        for event in sns_ai_engine.generate_bulk(jobs, max_concurrency=max_concurrency):
+            failed += 'error' in event
+            yield _sse('result', event)
+        yield _sse('done', {
+            'total': len(expanded),
+            'failed': failed,
+            'elapsed_ms': int((datetime.utcnow() - started).total_seconds() * 1000),
+            'generated_at': datetime.utcnow().isoformat(),
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 # ================================================================
 # POST /api/ai/analyze-competitor — Competitor Analysis (streaming)
 # ================================================================
@@ -504,8 +566,9 @@ def ai_usage():
     # Attach cache stats if available
     cache_stats = None
     try:
-        from .ai_cache import ai_cache
+        from .ai_cache import ai_cache, prompt_cache
         cache_stats = ai_cache.stats()
+        cache_stats['prompt_cache'] = prompt_cache.stats()
     except ImportError:
         pass
 
@@ -1673,12 +1673,13 @@ def get_user_feed():
 
     Query Parameters:
     - limit: Number of items (default 20, max 100)
-    - offset: Pagination offset (default 0)
+    - cursor: next_cursor from the previous page
+    - offset: Legacy pagination offset (default 0)
 
     Returns: {
         'feed': [Feed items with user/recipe/activity info],
-        'total': Total count,
         'has_more': Boolean,
+        'next_cursor': Cursor for the next page,
         'next_offset': Next offset for pagination
     }
     """
@@ -1688,8 +1689,9 @@ def get_user_feed():
         user_id = g.user_id
         limit = min(int(request.args.get('limit', 20)), 100)
         offset = int(request.args.get('offset', 0))
+        cursor = request.args.get('cursor', type=int)
 
-        result = FeedService.get_user_feed(user_id, limit, offset)
+        result = FeedService.get_user_feed(user_id, limit, offset, cursor=cursor)
         return jsonify(result), 200
     except Exception as e:
         return jsonify({'error': f'Feed retrieval failed: {str(e)}'}), 500
@@ -3,9 +3,9 @@ Production-grade search with Korean/English support, facets, autocomplete, and h
 """
 
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk, streaming_bulk
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 import logging
 import json
 import os
@@ -55,15 +55,19 @@ class ElasticsearchService:
             logger.error(f"Failed to connect to Elasticsearch: {str(e)}")
             raise
 
-    def create_indices(self):
-        """Create Elasticsearch indices with analyzers and mappings"""
-        indices = {
-            'recipes': self._get_recipes_mapping(),
-            'sns_posts': self._get_sns_posts_mapping(),
-            'users': self._get_users_mapping()
+    def get_mapping(self, index: str) -> Dict:
+        """Settings + mappings body for a logical index ('recipes', 'sns_posts', 'users')"""
+        mappings = {
+            'recipes': self._get_recipes_mapping,
+            'sns_posts': self._get_sns_posts_mapping,
+            'users': self._get_users_mapping
         }
+        return mappings[index]()
 
-        for index_name, mapping in indices.items():
+    def create_indices(self):
+        """Create Elasticsearch indices with analyzers and mappings"""
+        for index_name in ('recipes', 'sns_posts', 'users'):
+            mapping = self.get_mapping(index_name)
             try:
                 if self.es.indices.exists(index=index_name):
                     logger.info(f"Index '{index_name}' already exists")
@@ -278,17 +282,8 @@ class ElasticsearchService:
 
     def bulk_index(self, index: str, documents: List[Dict]) -> Tuple[int, List]:
         """Bulk index documents - optimized for large datasets"""
-        actions = [
-            {
-                '_index': index,
-                '_id': doc.get('id'),
-                '_source': doc
-            }
-            for doc in documents
-        ]
-
         try:
-            success, errors = bulk(self.es, actions, raise_on_error=False)
+            success, errors = self.stream_bulk(index, documents)
             logger.info(f"Bulk indexed {success} documents in '{index}'")
             if errors:
                 logger.warning(f"Bulk index errors: {len(errors)}")
@@ -297,6 +292,43 @@ class ElasticsearchService:
             logger.error(f"Bulk indexing failed: {str(e)}")
             return 0, [str(e)]
 
+    def stream_bulk(self, index: str, documents: Iterable[Dict], chunk_size: int = 500,
+                    thread_count: int = 1) -> Tuple[int, List]:
+        """
+        Bulk index an iterable of documents without materialising it.
+
+        Documents are consumed lazily and sent ``chunk_size`` at a time with
+        streaming_bulk, or with parallel_bulk over ``thread_count`` threads.
+        Per-document failures are collected rather than raised.
+        """
+        actions = (
+            {
+                '_index': index,
+                '_id': doc.get('id'),
+                '_source': doc
+            }
+            for doc in documents
+        )
+
+        if thread_count > 1:
+            results = parallel_bulk(
+                self.es, actions, thread_count=thread_count, chunk_size=chunk_size,
+                raise_on_error=False, raise_on_exception=False
+            )
+        else:
+            results = streaming_bulk(
+                self.es, actions, chunk_size=chunk_size, max_retries=3,
+                raise_on_error=False, raise_on_exception=False
+            )
+
+        success, errors = 0, []
+        for ok, item in results:
+            if ok:
+                success += 1
+            else:
+                errors.append(item)
+        return success, errors
+
     def search(self, index: str, query: Dict, size: int = 20, from_: int = 0) -> Dict:
         """Execute search query with pagination"""
         try:
@@ -316,7 +348,12 @@ class ElasticsearchService:
     def delete_index(self, index: str) -> bool:
         """Delete index for reset/maintenance"""
         try:
-            self.es.indices.delete(index=index)
+            # Reindexed indices are aliases over a versioned physical index
+            if self.es.indices.exists_alias(name=index):
+                targets = list(self.es.indices.get_alias(name=index).keys())
+            else:
+                targets = [index]
+            self.es.indices.delete(index=','.join(targets))
             logger.info(f"Deleted index '{index}'")
             return True
         except Exception as e:
@@ -0,0 +1,459 @@
+"""Event ingestion pipeline — set-based batches behind a group-commit buffer.
+
+``ingest_batch()`` persists any number of event payloads in one
+transaction with a fixed number of statements:
+
+1. one duplicate lookup for every ``event_id`` / ``idempotency_key`` in the
+   batch (duplicates inside the batch are caught in memory)
+2. one contact lookup by uid / id / email / phone, then one flush creating
+   the contacts that are still missing
+3. one journey-state lookup for every (contact, journey) the events advance
+4. a multi-row INSERT of the events plus one dashboard rollup upsert
+   (``growth_rollups``), and a single commit
+
+Results come back per event, in input order:
+``{'index', 'status', 'accepted', 'duplicate', 'event_id', 'idempotency_key'}``
+with ``status`` one of ``accepted`` / ``duplicate`` / ``rejected`` /
+``failed`` (plus ``error`` for the last two). Payloads are validated up
+front, so a malformed one is ``rejected`` on its own; if the batch
+transaction still fails, each event is retried in its own transaction so
+only the events that cannot be stored are ``failed``.
+
+``GroupCommitBuffer`` coalesces concurrent requests: submissions queue up
+until ``EVENT_GROUP_COMMIT_MAX`` events are waiting or
+``EVENT_GROUP_COMMIT_MS`` milliseconds pass, then one background flush runs
+``ingest_batch`` for all of them and hands each caller its own slice.
+
+Config:
+    EVENT_GROUP_COMMIT_MS    max wait before a flush; 0 disables the buffer (default 10)
+    EVENT_GROUP_COMMIT_MAX   events that trigger an immediate flush (default 500)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+
+from ..models import db, MarketingContact, MarketingEvent, MarketingJourneyState
+from .growth_rollups import adjust_rollups, bucket_of
+
+logger = logging.getLogger("event_ingest")
+
+EVENT_JOURNEY_MAP = {
+    "lead_captured": ("growth_main", "lead_captured", "lead"),
+    "signup_completed": ("growth_main", "signup_completed", "signed_up"),
+    "key_action_completed": ("growth_main", "activated", "active"),
+    "trial_expiring": ("revenue_recovery", "trial_expiring", "trial"),
+    "payment_failed": ("revenue_recovery", "payment_failed", "at_risk"),
+    "reengagement_eligible": ("retention_recovery", "reengagement", "inactive"),
+    "churn_risk_detected": ("retention_recovery", "churn_risk", "at_risk"),
+}
+
+_INSERT_CHUNK = 500
+
+# Column limits; longer values are rejected instead of failing the INSERT
+_MAX_LENGTHS = {"event_name": 120, "event_id": 64, "idempotency_key": 180}
+# identity field -> (max length, numbers accepted)
+_IDENTITY_FIELDS = {"contact_id": (36, True), "email": (255, False), "phone": (32, True),
+                    "anonymous_id": (120, False)}
+
+
+def _utc_now() -> datetime:
+    return datetime.utcnow()
+
+
+def _parse_event_ts(raw: str | None) -> datetime:
+    if not raw:
+        return _utc_now()
+    try:
+        parsed = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except ValueError:
+        return _utc_now()
+    if parsed.tzinfo:
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@dataclass
+class _Event:
+    index: int
+    event_id: str
+    event_name: str
+    event_ts: datetime
+    idempotency_key: str
+    identity: dict
+    context: dict
+    props: dict
+    contact: Optional[MarketingContact] = field(default=None, repr=False)
+
+
+def _result(index: int, status: str, event_id=None, idempotency_key=None, error=None) -> Dict:
+    result = {
+        "index": index,
+        "status": status,
+        "accepted": status in ("accepted", "duplicate"),
+        "duplicate": status == "duplicate",
+        "event_id": event_id,
+        "idempotency_key": idempotency_key,
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+def _text(value, numbers: bool = True) -> Optional[str]:
+    """Stripped string ('' when missing), or None when the value has the wrong type."""
+    if value is None:
+        return ""
+    if isinstance(value, str) or (numbers and isinstance(value, int) and not isinstance(value, bool)):
+        return str(value).strip()
+    return None
+
+
+def _normalize(index: int, payload) -> Tuple[Optional[_Event], Optional[Dict]]:
+    if not isinstance(payload, dict):
+        return None, _result(index, "rejected", error="invalid JSON body")
+    event_name = _text(payload.get("event_name"), numbers=False)
+    if event_name is None:
+        return None, _result(index, "rejected", error="event_name must be a string")
+    if not event_name:
+        return None, _result(index, "rejected", error="event_name is required")
+
+    event_id, idempotency_key = _text(payload.get("event_id")), _text(payload.get("idempotency_key"))
+    if event_id is None or idempotency_key is None:
+        return None, _result(index, "rejected", error="event_id and idempotency_key must be strings")
+    event_id = event_id or str(uuid.uuid4())
+    idempotency_key = idempotency_key or event_id
+    fields = {"event_name": event_name, "event_id": event_id, "idempotency_key": idempotency_key}
+    for name, value in fields.items():
+        if len(value) > _MAX_LENGTHS[name]:
+            return None, _result(index, "rejected", error=f"{name} exceeds {_MAX_LENGTHS[name]} characters")
+
+    raw_identity = payload.get("identity") if isinstance(payload.get("identity"), dict) else {}
+    identity = {}
+    for name, (max_length, numbers) in _IDENTITY_FIELDS.items():
+        value = _text(raw_identity.get(name), numbers)
+        if value is None:
+            return None, _result(index, "rejected", error=f"identity.{name} must be a string")
+        if len(value) > max_length:
+            return None, _result(index, "rejected", error=f"identity.{name} exceeds {max_length} characters")
+        if value:
+            identity[name] = value
+
+    return _Event(
+        index=index,
+        event_id=event_id,
+        event_name=event_name,
+        event_ts=_parse_event_ts(payload.get("ts")),
+        idempotency_key=idempotency_key,
+        identity=identity,
+        context=payload.get("context") if isinstance(payload.get("context"), dict) else {},
+        props=payload.get("props") if isinstance(payload.get("props"), dict) else {},
+    ), None
+
+
+def _existing_keys(events: List[_Event]) -> Tuple[Dict[str, Tuple], Dict[str, Tuple]]:
+    """Stored (event_id, idempotency_key) rows matching any event in the batch."""
+    by_event_id, by_key = {}, {}
+    for start in range(0, len(events), _INSERT_CHUNK):
+        chunk = events[start:start + _INSERT_CHUNK]
+        rows = db.session.query(MarketingEvent.event_id, MarketingEvent.idempotency_key).filter(or_(
+            MarketingEvent.event_id.in_({e.event_id for e in chunk}),
+            MarketingEvent.idempotency_key.in_({e.idempotency_key for e in chunk}),
+        )).all()
+        for event_id, key in rows:
+            by_event_id[event_id] = (event_id, key)
+            by_key[key] = (event_id, key)
+    return by_event_id, by_key
+
+
+def _identity(event: _Event) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(contact_id, email, phone); _normalize already stripped and validated them."""
+    return event.identity.get("contact_id"), event.identity.get("email"), event.identity.get("phone")
+
+
+class _ContactIndex:
+    """Contacts for a batch, looked up in one query and created in one flush."""
+
+    def __init__(self, events: List[_Event]):
+        uids, ids, emails, phones = set(), set(), set(), set()
+        for event in events:
+            contact_id, email, phone = _identity(event)
+            if contact_id:
+                uids.add(contact_id)
+                if contact_id.isdigit():
+                    ids.add(int(contact_id))
+            if email:
+                emails.add(email)
+            if phone:
+                phones.add(phone)
+
+        self.by_uid, self.by_id, self.by_email, self.by_phone = {}, {}, {}, {}
+        clauses = [column.in_(values) for column, values in (
+            (MarketingContact.contact_uid, uids), (MarketingContact.id, ids),
+            (MarketingContact.email, emails), (MarketingContact.phone, phones),
+        ) if values]
+        if clauses:
+            for contact in MarketingContact.query.filter(or_(*clauses)):
+                self._remember(contact)
+
+    def _remember(self, contact: MarketingContact) -> None:
+        self.by_uid[contact.contact_uid] = contact
+        if contact.id is not None:
+            self.by_id[contact.id] = contact
+        if contact.email:
+            self.by_email.setdefault(contact.email, contact)
+        if contact.phone:
+            self.by_phone.setdefault(contact.phone, contact)
+
+    def resolve(self, event: _Event, now: datetime) -> Optional[MarketingContact]:
+        """Same precedence as the single-event path: uid, id, email, phone, else create."""
+        contact_id, email, phone = _identity(event)
+        contact = None
+        if contact_id:
+            contact = self.by_uid.get(contact_id)
+            if not contact and contact_id.isdigit():
+                contact = self.by_id.get(int(contact_id))
+        if not contact and email:
+            contact = self.by_email.get(email)
+        if not contact and phone:
+            contact = self.by_phone.get(phone)
+        if contact or (not email and not phone):
+            return contact
+
+        contact = MarketingContact(
+            contact_uid=str(uuid.uuid4()),
+            email=email,
+            phone=phone,
+            status="active",
+            lifecycle_stage="lead",
+            locale="ko-KR",
+            timezone="Asia/Seoul",
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(contact)
+        self._remember(contact)
+        return contact
+
+
+def _apply_progress(events: List[_Event]) -> None:
+    """Advance lifecycle stages and journey states, in event order."""
+    progressing = [e for e in events if e.contact is not None and e.event_name in EVENT_JOURNEY_MAP]
+    if not progressing:
+        return
+
+    journeys = {}
+    for state in MarketingJourneyState.query.filter(
+            MarketingJourneyState.contact_id.in_({e.contact.id for e in progressing}),
+            MarketingJourneyState.journey_id.in_({EVENT_JOURNEY_MAP[e.event_name][0] for e in progressing})):
+        journeys[(state.contact_id, state.journey_id)] = state
+
+    for event in progressing:
+        journey_id, next_state, lifecycle_stage = EVENT_JOURNEY_MAP[event.event_name]
+        contact = event.contact
+        contact.lifecycle_stage = lifecycle_stage
+        contact.updated_at = event.event_ts
+
+        journey = journeys.get((contact.id, journey_id))
+        if journey is None:
+            journey = MarketingJourneyState(
+                contact_id=contact.id,
+                journey_id=journey_id,
+                state=next_state,
+                entered_at=event.event_ts,
+                last_action_at=event.event_ts,
+                cooldown_until=None,
+                version=1,
+            )
+            db.session.add(journey)
+            journeys[(contact.id, journey_id)] = journey
+            continue
+
+        if journey.state != next_state:
+            journey.state = next_state
+            journey.entered_at = event.event_ts
+            journey.version += 1
+        journey.last_action_at = event.event_ts
+
+
+def _persist(events: List[_Event], results: List[Optional[Dict]]) -> None:
+    """Dedupe, resolve contacts, progress journeys and insert; caller commits."""
+    by_event_id, by_key = _existing_keys(events)
+    fresh: List[_Event] = []
+    for event in events:
+        duplicate = by_event_id.get(event.event_id) or by_key.get(event.idempotency_key)
+        if duplicate:
+            results[event.index] = _result(event.index, "duplicate", *duplicate)
+            continue
+        fresh.append(event)
+        # Later events in the same batch dedupe against this one
+        by_event_id[event.event_id] = by_key[event.idempotency_key] = (event.event_id, event.idempotency_key)
+    if not fresh:
+        return
+
+    now = _utc_now()
+    contacts = _ContactIndex(fresh)
+    for event in fresh:
+        event.contact = contacts.resolve(event, now)
+    db.session.flush()
+    _apply_progress(fresh)
+
+    rows = [{
+        "event_id": e.event_id,
+        "event_name": e.event_name,
+        "event_ts": e.event_ts,
+        "contact_id": e.contact.id if e.contact else None,
+        "anonymous_id": e.identity.get("anonymous_id"),
+        "context_json": e.context,
+        "props_json": e.props,
+        "idempotency_key": e.idempotency_key,
+        "processing_status": "pending",
+        "processing_updated_at": now,
+        "created_at": now,
+    } for e in fresh]
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        db.session.execute(insert(MarketingEvent).values(rows[start:start + _INSERT_CHUNK]))
+    # Core INSERTs skip the rollup flush hook
+    adjust_rollups(db.session.connection(), Counter(("events", bucket_of(e.event_ts), "open") for e in fresh))
+    for event in fresh:
+        results[event.index] = _result(event.index, "accepted", event.event_id, event.idempotency_key)
+
+
+def _persist_each(events: List[_Event], results: List[Optional[Dict]]) -> None:
+    """Fallback after a failed batch: one transaction per event, so a bad one fails alone."""
+    for event in events:
+        for attempt in range(2):
+            try:
+                _persist([event], results)
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if not attempt:
+                    continue
+            except Exception:
+                db.session.rollback()
+                logger.exception("[EVENTS] event %s failed", event.event_id)
+            results[event.index] = _result(event.index, "failed", event.event_id, event.idempotency_key,
+                                           error="event persistence failed")
+            break
+
+
+def ingest_batch(payloads: List) -> List[Dict]:
+    """Persist payloads in one transaction; returns one result per payload."""
+    results: List[Optional[Dict]] = [None] * len(payloads)
+    events = []
+    for index, payload in enumerate(payloads):
+        event, rejected = _normalize(index, payload)
+        if rejected:
+            results[index] = rejected
+        else:
+            events.append(event)
+    if not events:
+        return results
+
+    for attempt in range(2):
+        try:
+            _persist(events, results)
+            db.session.commit()
+            return results
+        except IntegrityError:
+            # A concurrent writer inserted one of our keys or contacts first;
+            # the retry sees its rows and reports them as duplicates/matches.
+            db.session.rollback()
+            if attempt:
+                logger.warning("[EVENTS] batch of %d conflicted twice", len(events))
+        except Exception:
+            db.session.rollback()
+            logger.exception("[EVENTS] batch of %d failed; retrying event by event", len(events))
+            break
+
+    _persist_each(events, results)
+    return results
+
+
+class GroupCommitBuffer:
+    """Coalesces concurrent submissions into one ``ingest_batch`` per flush."""
+
+    def __init__(self, app, max_events: int = 500, max_wait_ms: int = 10):
+        self.app = app
+        self.max_events = max_events
+        self.max_wait = max_wait_ms / 1000.0
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[List, Future]] = []
+        self._pending_events = 0
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+
+    def submit(self, payloads: List) -> Future:
+        """Queue payloads; the future resolves to their results."""
+        future: Future = Future()
+        with self._cond:
+            self._pending.append((list(payloads), future))
+            self._pending_events += len(payloads)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="event-group-commit", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def ingest(self, payloads: List, timeout: float = 30.0) -> List[Dict]:
+        return self.submit(payloads).result(timeout=timeout)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.max_wait
+                while self._pending_events < self.max_events:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending, self._pending_events = self._pending, [], 0
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[List, Future]]) -> None:
+        flat = [payload for payloads, _ in batch for payload in payloads]
+        try:
+            with self.app.app_context():
+                results = ingest_batch(flat)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.flushes += 1
+        offset = 0
+        for payloads, future in batch:
+            mine = results[offset:offset + len(payloads)]
+            for local_index, result in enumerate(mine):
+                result["index"] = local_index
+            future.set_result(mine)
+            offset += len(payloads)
+
+
+def ingest(app, payloads: List) -> List[Dict]:
+    """Ingest through the app's group-commit buffer, or directly when disabled."""
+    wait_ms = int(os.getenv("EVENT_GROUP_COMMIT_MS", "10"))
+    if wait_ms <= 0:
+        return ingest_batch(payloads)
+    buffer = app.extensions.get("event_group_commit")
+    if buffer is None:
+        buffer = app.extensions.setdefault("event_group_commit", GroupCommitBuffer(
+            app,
+            max_events=int(os.getenv("EVENT_GROUP_COMMIT_MAX", "500")),
+            max_wait_ms=wait_ms,
+        ))
+    return buffer.ingest(payloads)
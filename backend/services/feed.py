@@ -6,6 +6,7 @@ from sqlalchemy import desc, func
 from datetime import datetime, timedelta
 from backend.models import db, User, Recipe, RecipeReview, Feed, UserFollow, RecipeLike
 from backend.auth import require_auth
+from backend.services.feed_service import FeedService
 
 feed_bp = Blueprint('feed', __name__, url_prefix='/api/coocook/feed')
 
@@ -85,6 +86,8 @@ def log_recipe_published(current_user, recipe_id):
         }
     )
     db.session.add(feed)
+    db.session.flush()
+    FeedService.fan_out(feed)
     db.session.commit()
 
     return jsonify({
@@ -201,6 +204,8 @@ def log_recipe_reviewed(current_user, recipe_id):
         }
     )
     db.session.add(feed)
+    db.session.flush()
+    FeedService.fan_out(feed)
 
     # Update recipe stats
     recipe.review_count += 1
@@ -257,6 +262,7 @@ def log_user_followed(current_user, following_id):
         }
     )
     db.session.add(feed)
+    FeedService.backfill_from(current_user.id, [following_id])
 
     db.session.commit()
 
@@ -279,6 +285,7 @@ def log_user_unfollowed(current_user, following_id):
         return jsonify({'error': 'Not following this user'}), 400
 
     db.session.delete(follow)
+    FeedService.remove_author(current_user.id, following_id)
     db.session.commit()
 
     return jsonify({
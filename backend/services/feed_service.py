@@ -1,147 +1,261 @@
 """CooCook Feed Service — Social Feed, Reviews, Recommendations"""
 from datetime import datetime, timedelta
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, insert
+from ..cache import TTLCache
 from ..models import (
-    db, User, Chef, Recipe, RecipeReview, RecipeLike, UserFollow, Feed,
+    db, User, Chef, Recipe, RecipeReview, RecipeLike, UserFollow, Feed, FeedItem,
     CookingSession
 )
+from ..shared_cache import TieredCache
 from typing import List, Dict, Optional, Tuple
 import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Authors with more followers than this are not fanned out on write; their
+# activities are merged into followers' feeds at read time instead
+FANOUT_THRESHOLD = int(os.getenv('FEED_FANOUT_THRESHOLD', '1000'))
+# Activities copied into a feed when the reader follows someone (or on first read)
+BACKFILL_LIMIT = int(os.getenv('FEED_BACKFILL_LIMIT', '50'))
+# Feed activity types that appear in followers' home feeds
+FANOUT_TYPES = ('recipe_published', 'recipe_reviewed', 'review')
+
+# Seconds an empty feed is remembered as already rebuilt, so genuinely empty
+# feeds (no follows, no activity) do not re-run the rebuild on every read
+REBUILD_MARKER_TTL = int(os.getenv('FEED_REBUILD_MARKER_TTL', '86400'))
+_rebuild_markers = TieredCache('feed_rebuild', TTLCache(max_entries=8192))
+
+_CELEBRITY_TTL_SECONDS = 300
+_celebrity_cache = {'ids': frozenset(), 'expires_at': 0.0}
+_celebrity_lock = threading.Lock()
+
+
+def _celebrity_ids() -> frozenset:
+    """User ids above FANOUT_THRESHOLD followers (one GROUP BY, cached for 5 minutes)."""
+    now = time.monotonic()
+    if _celebrity_cache['expires_at'] > now:
+        return _celebrity_cache['ids']
+    with _celebrity_lock:
+        if _celebrity_cache['expires_at'] <= now:
+            rows = db.session.query(UserFollow.following_id).group_by(
+                UserFollow.following_id
+            ).having(func.count(UserFollow.id) > FANOUT_THRESHOLD).all()
+            _celebrity_cache['ids'] = frozenset(r[0] for r in rows)
+            _celebrity_cache['expires_at'] = now + _CELEBRITY_TTL_SECONDS
+    return _celebrity_cache['ids']
 
 
 class FeedService:
     """Manages user feed, social interactions, and recommendations"""
 
     @staticmethod
-    def get_user_feed(user_id: int, limit: int = 20, offset: int = 0) -> Dict:
+    def get_user_feed(user_id: int, limit: int = 20, offset: int = 0,
+                      cursor: Optional[int] = None) -> Dict:
         """
-        Get personalized feed for user combining:
-        - New recipes from followed chefs
-        - Activity from followed users (reviews, likes)
-        - AI-powered recommendations
-        - Popular recipes
+        Get the home feed for a user: activities of followed users and their own.
+
+        Reads are a keyset range scan over the user's materialized feed_items,
+        merged with activities of followed high-follower authors, which are
+        read from feeds on demand instead of being fanned out on write.
 
         Args:
             user_id: Target user ID
             limit: Number of feed items (default 20)
-            offset: Pagination offset
+            offset: Legacy pagination offset (prefer cursor)
+            cursor: next_cursor from the previous page
 
         Returns:
             {
-                'feed': [Feed items with user/chef/recipe info],
-                'total': Total count,
+                'feed': [Feed items],
+                'next_cursor': Cursor for next page (None on last page),
                 'next_offset': Offset for next page,
+                'has_more': bool,
                 'timestamp': Current timestamp
             }
         """
         try:
-            # Get followed chef IDs
-            followed_chef_ids = db.session.query(UserFollow.following_id).filter(
-                UserFollow.follower_id == user_id
-            ).subquery()
+            if cursor is not None:
+                offset = 0
+            items = FeedService._read_feed(user_id, offset + limit + 1, cursor)
 
-            # Build feed query combining multiple sources
-            feed_query = db.session.query(Feed).filter(
-                Feed.user_id == user_id
-            ).order_by(
-                desc(Feed.created_at)
-            ).offset(offset).limit(limit).all()
+            # Feeds of users who followed people before fan-out existed start
+            # empty; rebuild once, later follows and activities fan out anyway
+            if (not items and cursor is None and offset == 0
+                    and _rebuild_markers.get(str(user_id)) is None):
+                _rebuild_markers.set(str(user_id), True, REBUILD_MARKER_TTL)
+                if FeedService.rebuild_feed(user_id):
+                    items = FeedService._read_feed(user_id, limit + 1, None)
 
-            # Fallback: If no feed items, generate from followed content
-            if not feed_query:
-                feed_query = FeedService._generate_personalized_feed(
-                    user_id, limit, offset
-                )
-
-            feed_items = [FeedService._serialize_feed_item(item) for item in feed_query]
-            total_count = db.session.query(func.count(Feed.id)).filter(
-                Feed.user_id == user_id
-            ).scalar()
+            page = items[offset:offset + limit]
+            has_more = len(items) > offset + limit
 
             return {
-                'feed': feed_items,
-                'total': total_count,
-                'next_offset': offset + limit,
-                'has_more': (offset + limit) < total_count,
+                'feed': [FeedService._serialize_feed_item(item) for item in page],
+                'next_cursor': FeedService._activity_id(page[-1]) if has_more and page else None,
+                'next_offset': offset + len(page),
+                'has_more': has_more,
                 'timestamp': datetime.utcnow().isoformat()
             }
         except Exception as e:
             return {
                 'error': f'Feed generation failed: {str(e)}',
                 'feed': [],
-                'total': 0
+                'has_more': False
             }
 
     @staticmethod
-    def _generate_personalized_feed(user_id: int, limit: int, offset: int) -> List:
-        """Generate personalized feed from followed chefs and users"""
+    def _read_feed(user_id: int, count: int, cursor: Optional[int]) -> List:
+        """Newest-first merge of pushed feed_items and pulled celebrity activities."""
+        pushed = FeedItem.query.filter(FeedItem.user_id == user_id)
+        if cursor is not None:
+            pushed = pushed.filter(FeedItem.activity_id < cursor)
+        items = pushed.order_by(desc(FeedItem.activity_id)).limit(count).all()
+
+        pull_ids = FeedService._pulled_authors(user_id)
+        if pull_ids:
+            pulled = Feed.query.filter(
+                Feed.user_id.in_(pull_ids),
+                Feed.activity_type.in_(FANOUT_TYPES)
+            )
+            if cursor is not None:
+                pulled = pulled.filter(Feed.id < cursor)
+            seen = {item.activity_id for item in items}
+            items.extend(
+                row for row in pulled.order_by(desc(Feed.id)).limit(count).all()
+                if row.id not in seen
+            )
+            items.sort(key=FeedService._activity_id, reverse=True)
+            items = items[:count]
+        return items
+
+    @staticmethod
+    def _pulled_authors(user_id: int) -> List[int]:
+        """Followed (or own) authors whose activities are read on demand."""
+        celebrities = _celebrity_ids()
+        if not celebrities:
+            return []
+        followed = db.session.query(UserFollow.following_id).filter(
+            UserFollow.follower_id == user_id,
+            UserFollow.following_id.in_(celebrities)
+        ).all()
+        authors = [row[0] for row in followed]
+        if user_id in celebrities:
+            authors.append(user_id)
+        return authors
+
+    @staticmethod
+    def _activity_id(item) -> int:
+        return item.activity_id if isinstance(item, FeedItem) else item.id
+
+    @staticmethod
+    def fan_out(activity: 'Feed') -> int:
+        """
+        Copy a new activity into its author's and followers' feeds.
+
+        The activity must be flushed (have an id). Rows are added to the
+        current session; the caller commits them with the activity. Authors
+        above FANOUT_THRESHOLD followers only get their own copy and are
+        merged into followers' feeds at read time.
+        """
+        if activity.activity_type not in FANOUT_TYPES:
+            return 0
+
+        readers = [activity.user_id]
+        if activity.user_id not in _celebrity_ids():
+            readers.extend(r[0] for r in db.session.query(UserFollow.follower_id).filter(
+                UserFollow.following_id == activity.user_id
+            ).distinct().all() if r[0] != activity.user_id)
+
+        created_at = activity.created_at or datetime.utcnow()
+        db.session.execute(insert(FeedItem), [
+            {
+                'user_id': reader_id,
+                'activity_id': activity.id,
+                'actor_id': activity.user_id,
+                'activity_type': activity.activity_type,
+                'content_json': activity.content_json,
+                'created_at': created_at,
+            }
+            for reader_id in readers
+        ])
+        return len(readers)
+
+    @staticmethod
+    def backfill_from(user_id: int, actor_ids: List[int], limit: int = BACKFILL_LIMIT) -> int:
+        """Copy recent fan-out activities of ``actor_ids`` into a user's feed (caller commits)."""
+        actor_ids = [a for a in actor_ids if a not in _celebrity_ids()]
+        if not actor_ids:
+            return 0
+
+        existing = {r[0] for r in db.session.query(FeedItem.activity_id).filter(
+            FeedItem.user_id == user_id,
+            FeedItem.actor_id.in_(actor_ids)
+        ).all()}
+        activities = Feed.query.filter(
+            Feed.user_id.in_(actor_ids),
+            Feed.activity_type.in_(FANOUT_TYPES)
+        ).order_by(desc(Feed.id)).limit(limit).all()
+
+        rows = [
+            {
+                'user_id': user_id,
+                'activity_id': a.id,
+                'actor_id': a.user_id,
+                'activity_type': a.activity_type,
+                'content_json': a.content_json,
+                'created_at': a.created_at,
+            }
+            for a in activities if a.id not in existing
+        ]
+        if rows:
+            db.session.execute(insert(FeedItem), rows)
+        return len(rows)
+
+    @staticmethod
+    def rebuild_feed(user_id: int) -> int:
+        """Populate an empty feed from followed users' and own recent activities."""
         try:
-            # Get followed users and chefs
-            following = db.session.query(UserFollow.following_id).filter(
+            following = [r[0] for r in db.session.query(UserFollow.following_id).filter(
                 UserFollow.follower_id == user_id
-            ).all()
-            following_ids = [f[0] for f in following]
-
-            # Recent recipes from followed chefs
-            feed_items = []
-            if following_ids:
-                recent_recipes = db.session.query(Recipe).filter(
-                    Recipe.chef_id.in_(following_ids)
-                ).order_by(desc(Recipe.created_at)).limit(limit // 2).all()
-
-                for recipe in recent_recipes:
-                    feed_item = Feed(
-                        user_id=user_id,
-                        activity_type='new_recipe',
-                        content_json=json.dumps({
-                            'recipe_id': recipe.id,
-                            'title': recipe.title,
-                            'chef_id': recipe.chef_id,
-                            'chef_name': recipe.chef.name if recipe.chef else 'Unknown'
-                        })
-                    )
-                    feed_items.append(feed_item)
-
-            # Recent reviews from followed users
-            if following_ids:
-                recent_reviews = db.session.query(RecipeReview).filter(
-                    RecipeReview.user_id.in_(following_ids)
-                ).order_by(desc(RecipeReview.created_at)).limit(limit // 4).all()
-
-                for review in recent_reviews:
-                    feed_item = Feed(
-                        user_id=user_id,
-                        activity_type='review',
-                        content_json=json.dumps({
-                            'review_id': review.id,
-                            'recipe_id': review.recipe_id,
-                            'rating': review.rating,
-                            'user_id': review.user_id,
-                            'user_name': review.user.name if review.user else 'Unknown'
-                        })
-                    )
-                    feed_items.append(feed_item)
-
-            return sorted(feed_items, key=lambda x: x.created_at, reverse=True)
+            ).all()]
+            added = FeedService.backfill_from(user_id, following + [user_id])
+            db.session.commit()
+            return added
         except Exception as e:
-            print(f"Feed generation error: {e}")
-            return []
+            db.session.rollback()
+            logger.warning(f"Feed rebuild failed for user {user_id}: {e}")
+            return 0
+
+    @staticmethod
+    def remove_author(user_id: int, actor_id: int) -> int:
+        """Drop an unfollowed author's activities from a user's feed (caller commits)."""
+        return FeedItem.query.filter_by(user_id=user_id, actor_id=actor_id).delete(
+            synchronize_session=False
+        )
 
     @staticmethod
-    def _serialize_feed_item(feed: 'Feed') -> Dict:
-        """Convert Feed object to JSON-serializable dict"""
+    def _serialize_feed_item(feed) -> Dict:
+        """Convert a FeedItem or Feed object to JSON-serializable dict"""
         try:
-            content = json.loads(feed.content_json) if feed.content_json else {}
+            content = feed.content_json or {}
+            if isinstance(content, str):
+                content = json.loads(content)
             return {
-                'id': feed.id,
+                'id': FeedService._activity_id(feed),
                 'activity_type': feed.activity_type,
+                'actor_id': feed.actor_id if isinstance(feed, FeedItem) else feed.user_id,
                 'content': content,
                 'created_at': feed.created_at.isoformat() if feed.created_at else None,
                 'timestamp': datetime.utcnow().isoformat()
             }
         except Exception:
             return {
-                'id': feed.id,
+                'id': FeedService._activity_id(feed),
                 'activity_type': feed.activity_type,
                 'content': {},
                 'created_at': None
@@ -214,6 +328,7 @@ class FeedService:
                 'rating': rating,
                 'text': text[:100]
             })
+            FeedService.fan_out(feed)
             db.session.commit()
 
             return {
@@ -0,0 +1,258 @@
+"""FX Rates — cached, background-refreshed USD→KRW rate provider.
+
+Checkout, plan listings and ``/api/payment/convert`` read the rate through
+``fx_rates.get_rate()``, which never waits on the network:
+
+- The last-known rate is kept in process and in a JSON snapshot under
+  ``.workspace/fx/`` so restarts and sibling workers start warm. A snapshot
+  written by a different source than the configured one is ignored.
+- A rate older than ``FX_REFRESH_INTERVAL`` seconds triggers one background
+  refresh; readers keep getting the last-known value meanwhile. The
+  scheduler also refreshes it on the same interval.
+- Local sources (file/static) are also re-read as soon as they change
+  (file mtime, configured value), so an edit applies on the next read.
+- Network failures keep the previous rate; ``status()`` reports its age,
+  source and whether it is older than ``FX_MAX_AGE`` (stale).
+
+Sources (``FX_RATE_SOURCE``):
+    openexchangerates  live API, needs EXCHANGE_RATE_API_KEY (default when set)
+    file               local JSON in OpenExchangeRates ``latest.json`` format
+                       (``{"rates": {"KRW": 1350.2}, "timestamp": 1760000000}``)
+                       at FX_RATE_FILE — deterministic for tests and offline use
+    static             fixed CACHED_EXCHANGE_RATE value
+
+With no source configured the provider serves ``DEFAULT_RATE``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+import requests
+
+from ..runtime_paths import workspace_path
+
+logger = logging.getLogger('fx_rates')
+
+DEFAULT_RATE = 1250.0
+FX_REFRESH_INTERVAL = float(os.getenv('FX_REFRESH_INTERVAL', '3600'))
+FX_MAX_AGE = float(os.getenv('FX_MAX_AGE', '86400'))
+
+
+# ---------------------------------------------------------------------------
+# Rate sources
+# ---------------------------------------------------------------------------
+
+class OpenExchangeRatesSource:
+    """Live USD→KRW rate from openexchangerates.org."""
+    name = 'openexchangerates'
+    local = False
+    URL = 'https://openexchangerates.org/api/latest.json'
+
+    def __init__(self, api_key: str, timeout: float = 5):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def fetch(self) -> Tuple[float, Optional[float]]:
+        response = requests.get(self.URL, params={'app_id': self.api_key, 'symbols': 'KRW'},
+                                timeout=self.timeout)
+        response.raise_for_status()
+        return _parse_rates(response.json())
+
+
+class FileRateSource:
+    """USD→KRW rate from a local JSON file in ``latest.json`` format."""
+    name = 'file'
+    local = True
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def fetch(self) -> Tuple[float, Optional[float]]:
+        return _parse_rates(json.loads(self.path.read_text(encoding='utf-8')))
+
+    def version(self):
+        """Changes whenever the file is rewritten."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class StaticRateSource:
+    """Fixed rate (CACHED_EXCHANGE_RATE)."""
+    name = 'static'
+    local = True
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+
+    def fetch(self) -> Tuple[float, Optional[float]]:
+        return self.rate, None
+
+    def version(self):
+        return self.rate
+
+
+def _parse_rates(data: dict) -> Tuple[float, Optional[float]]:
+    """(rate, as_of epoch) from an OpenExchangeRates-style payload."""
+    rate = float(data['rates']['KRW'])
+    if rate <= 0:
+        raise ValueError(f'Invalid KRW rate: {rate}')
+    return rate, data.get('timestamp')
+
+
+def source_from_env():
+    """Build the configured rate source, or None when nothing is configured."""
+    kind = os.getenv('FX_RATE_SOURCE', '').strip().lower()
+    if kind == 'file' or (not kind and os.getenv('FX_RATE_FILE')):
+        return FileRateSource(os.getenv('FX_RATE_FILE') or workspace_path('fx', 'rates.json'))
+    if kind == 'static' or (not kind and os.getenv('CACHED_EXCHANGE_RATE')):
+        return StaticRateSource(os.getenv('CACHED_EXCHANGE_RATE', DEFAULT_RATE))
+    api_key = os.getenv('EXCHANGE_RATE_API_KEY', '')
+    if kind in ('', 'openexchangerates') and api_key:
+        return OpenExchangeRatesSource(api_key)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Provider
+# ---------------------------------------------------------------------------
+
+class FxRateProvider:
+    """Last-known USD→KRW rate with non-blocking stale-while-revalidate reads.
+
+    Local sources (file/static) are read inline on a miss or when their
+    ``version()`` changes, since they cannot stall a request; network
+    sources are only ever called from a background thread or the scheduler.
+    """
+
+    def __init__(self, source=None, snapshot_path=None,
+                 refresh_interval: float = FX_REFRESH_INTERVAL,
+                 max_age: float = FX_MAX_AGE, default_rate: float = DEFAULT_RATE):
+        self.source = source
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.default_rate = default_rate
+        self._snapshot: Optional[dict] = None
+        self._loaded = False
+        self._source_version = None  # local sources: version() at the last refresh
+        self._refreshing = False
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # -- snapshot persistence ---------------------------------------------
+
+    def _load_snapshot(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text(encoding='utf-8'))
+            if self.source is None or snapshot.get('source') != self.source.name:
+                return  # written under another configuration
+            if float(snapshot['rate']) > 0:
+                self._snapshot = snapshot
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable FX snapshot %s: %s", self.snapshot_path, e)
+
+    def _save_snapshot(self, snapshot: dict) -> None:
+        if not self.snapshot_path:
+            return
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(snapshot), encoding='utf-8')
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            logger.warning("Could not persist FX snapshot: %s", e)
+
+    # -- refresh ------------------------------------------------------------
+
+    def refresh(self) -> bool:
+        """Fetch from the source now; keeps the last-known rate on failure."""
+        if self.source is None:
+            return False
+        if self.source.local:
+            # Recorded before fetching: a broken file is retried once it changes
+            self._source_version = self.source.version()
+        try:
+            rate, as_of = self.source.fetch()
+        except Exception as e:
+            with self._lock:
+                self._last_error = f'{type(e).__name__}: {e}'
+            logger.warning("FX rate refresh from %s failed: %s", self.source.name, e)
+            return False
+
+        snapshot = {'rate': rate, 'fetched_at': time.time(), 'as_of': as_of, 'source': self.source.name}
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded = True
+            self._last_error = None
+        self._save_snapshot(snapshot)
+        return True
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='fx-rate-refresh', daemon=True).start()
+
+    def _age(self, snapshot: Optional[dict]) -> Optional[float]:
+        return time.time() - snapshot['fetched_at'] if snapshot else None
+
+    # -- reads --------------------------------------------------------------
+
+    def get_rate(self) -> float:
+        """Current rate; never waits on a network source."""
+        self._load_snapshot()
+        snapshot = self._snapshot
+        age = self._age(snapshot)
+        if self.source is not None and self.source.local:
+            if (age is None or age > self.refresh_interval
+                    or self.source.version() != self._source_version):
+                self.refresh()
+                snapshot = self._snapshot
+        elif self.source is not None and (age is None or age > self.refresh_interval):
+            self._refresh_in_background()
+        return float(snapshot['rate']) if snapshot else self.default_rate
+
+    def status(self) -> dict:
+        """Staleness metadata for the rate get_rate() is serving."""
+        self._load_snapshot()
+        with self._lock:
+            snapshot = self._snapshot
+            refreshing = self._refreshing
+            last_error = self._last_error
+        age = self._age(snapshot)
+        return {
+            'rate': float(snapshot['rate']) if snapshot else self.default_rate,
+            'source': snapshot['source'] if snapshot else 'default',
+            'fetched_at': datetime.utcfromtimestamp(snapshot['fetched_at']).isoformat() if snapshot else None,
+            'as_of': (datetime.utcfromtimestamp(snapshot['as_of']).isoformat()
+                      if snapshot and snapshot.get('as_of') else None),
+            'age_seconds': round(age, 1) if age is not None else None,
+            'stale': age is None or age > self.max_age,
+            'refreshing': refreshing,
+            'last_error': last_error,
+        }
+
+
+fx_rates = FxRateProvider(source_from_env(), snapshot_path=workspace_path('fx', 'usd_krw.json'))
@@ -6,9 +6,10 @@ import uuid
 from datetime import datetime, timezone
 
 from flask import Blueprint, jsonify, request
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 
 from ..auth import require_admin, require_auth
+from ..leases import release
 from ..models import (
     db,
     MarketingConsent,
@@ -18,9 +19,13 @@ from ..models import (
     MarketingJourneyState,
     MarketingMessageLog,
 )
+from .growth_queue import ack_events, claim_events, fail_events, queue_metrics
+from .growth_rollups import build_summary
 
 growth_automation_bp = Blueprint("growth_automation", __name__, url_prefix="/api/v1/growth")
 
+QUEUE_BATCH_MAX = 500
+
 
 def _utc_now() -> datetime:
     return datetime.utcnow()
@@ -65,68 +70,8 @@ def _pagination():
     return page, per_page
 
 
-def _apply_window(query, column, from_dt: datetime | None, to_dt: datetime | None):
-    if from_dt:
-        query = query.filter(column >= from_dt)
-    if to_dt:
-        query = query.filter(column <= to_dt)
-    return query
-
-
 def _build_summary_payload(from_dt: datetime | None = None, to_dt: datetime | None = None):
-    contact_q = _apply_window(MarketingContact.query, MarketingContact.created_at, from_dt, to_dt)
-    event_q = _apply_window(MarketingEvent.query, MarketingEvent.event_ts, from_dt, to_dt)
-    message_q = _apply_window(MarketingMessageLog.query, MarketingMessageLog.created_at, from_dt, to_dt)
-    dlq_q = _apply_window(MarketingDLQ.query, MarketingDLQ.created_at, from_dt, to_dt)
-    journey_q = MarketingJourneyState.query
-    if from_dt:
-        journey_q = journey_q.filter(
-            or_(MarketingJourneyState.entered_at >= from_dt, MarketingJourneyState.last_action_at >= from_dt)
-        )
-    if to_dt:
-        journey_q = journey_q.filter(
-            or_(MarketingJourneyState.entered_at <= to_dt, MarketingJourneyState.last_action_at <= to_dt)
-        )
-
-    contact_total = contact_q.count()
-    event_total = event_q.count()
-    failed_events = event_q.filter(MarketingEvent.processing_status == "failed").count()
-    queue = {
-        row.processing_status: row.total
-        for row in db.session.query(
-            MarketingEvent.processing_status,
-            func.count(MarketingEvent.id).label("total"),
-        ).group_by(MarketingEvent.processing_status).all()
-    }
-    journey_counts = {
-        row.state: row.total
-        for row in journey_q.with_entities(
-            MarketingJourneyState.state,
-            func.count(MarketingJourneyState.id).label("total"),
-        ).group_by(MarketingJourneyState.state).all()
-    }
-    delivery = {
-        row.status: row.total
-        for row in message_q.with_entities(
-            MarketingMessageLog.status,
-            func.count(MarketingMessageLog.id).label("total"),
-        ).group_by(MarketingMessageLog.status).all()
-    }
-    lifecycle_counts = {
-        row.lifecycle_stage: row.total
-        for row in contact_q.with_entities(
-            MarketingContact.lifecycle_stage,
-            func.count(MarketingContact.id).label("total"),
-        ).group_by(MarketingContact.lifecycle_stage).all()
-    }
-    return {
-        "contacts": {"total": contact_total, "lifecycle_counts": lifecycle_counts},
-        "events": {"total": event_total, "failed": failed_events},
-        "journey_counts": journey_counts,
-        "delivery": delivery,
-        "queue": queue,
-        "errors": {"dlq_open": dlq_q.filter(MarketingDLQ.status == "open").count()},
-    }
+    return build_summary(from_dt, to_dt)
 
 
 def _build_recommendations(summary: dict):
@@ -198,6 +143,7 @@ def _serialize_event_for_queue(event_row: MarketingEvent):
         },
         "context": event_row.context_json or {},
         "props": event_row.props_json or {},
+        "delivery_attempt": event_row.delivery_attempts,
     }
 
 
@@ -533,42 +479,67 @@ def replay_dlq(dlq_id: int):
         event.processing_status = "pending"
         event.processing_updated_at = now
         event.error_code = None
+        release(event)
 
     db.session.commit()
     return jsonify({"replayed": True, "status": row.status}), 200
 
 
+def _queue_items(payload: dict, defaults: tuple) -> list | None:
+    """``events`` as ids or objects, with top-level defaults for the given keys."""
+    events = payload.get("events")
+    if not isinstance(events, list) or not events:
+        return None
+    shared = {key: payload.get(key) for key in defaults if payload.get(key) is not None}
+    items = []
+    for entry in events:
+        item = {"event_id": entry} if isinstance(entry, (str, int)) else entry
+        if not isinstance(item, dict) or not item.get("event_id"):
+            return None
+        items.append({**shared, **item})
+    return items
+
+
+def _settle_one(settle, payload: dict):
+    event_id = payload.get("event_id")
+    if not event_id:
+        return None, (jsonify({"ok": False, "error": "event_id is required"}), 400)
+    result = settle([{**payload, "event_id": str(event_id)}], claim_id=payload.get("claim_id"))[0]
+    if result["status"] == "not_found":
+        return None, (jsonify({"ok": False, "error": "event not found"}), 404)
+    if result["status"] == "lease_lost":
+        return None, (jsonify({"ok": False, "error": "lease expired or claimed by another poller"}), 409)
+    return result, None
+
+
+def _settle_batch(settle, payload: dict, defaults: tuple):
+    items = _queue_items(payload, defaults)
+    if items is None:
+        return jsonify({"ok": False, "error": "events must be a non-empty list of event ids or objects"}), 400
+    if len(items) > QUEUE_BATCH_MAX:
+        return jsonify({"ok": False, "error": f"at most {QUEUE_BATCH_MAX} events per call"}), 413
+    results = settle(items, claim_id=payload.get("claim_id"))
+    return jsonify({
+        "ok": True,
+        "settled": sum(1 for r in results if r["status"] == "ok"),
+        "results": results,
+    }), 200
+
+
 @growth_automation_bp.route("/queue/pending", methods=["GET"])
 def queue_pending():
+    """Claim (lease) pending events; expired leases are redelivered."""
     auth_error = _check_queue_token()
     if auth_error:
         return auth_error
 
-    now = _utc_now()
-    stale_at = now.timestamp() - 300
-    stale_rows = (
-        MarketingEvent.query
-        .filter(MarketingEvent.processing_status == "processing")
-        .all()
-    )
-    for row in stale_rows:
-        if row.processing_updated_at and row.processing_updated_at.timestamp() < stale_at:
-            row.processing_status = "pending"
-            row.processing_updated_at = now
-
     limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
-    rows = (
-        MarketingEvent.query
-        .filter(MarketingEvent.processing_status == "pending")
-        .order_by(MarketingEvent.created_at.asc())
-        .limit(limit)
-        .all()
-    )
-    for row in rows:
-        row.processing_status = "processing"
-        row.processing_updated_at = now
-    db.session.commit()
-    return jsonify({"events": [_serialize_event_for_queue(row) for row in rows]}), 200
+    claim_id, lease_expires_at, rows = claim_events(limit, lease_seconds=request.args.get("lease", type=int))
+    return jsonify({
+        "claim_id": claim_id,
+        "lease_expires_at": lease_expires_at.isoformat(),
+        "events": [_serialize_event_for_queue(row) for row in rows],
+    }), 200
 
 
 @growth_automation_bp.route("/queue/ack", methods=["POST"])
@@ -577,19 +548,9 @@ def queue_ack():
     if auth_error:
         return auth_error
 
-    payload = request.get_json(silent=True) or {}
-    event_id = payload.get("event_id")
-    if not event_id:
-        return jsonify({"ok": False, "error": "event_id is required"}), 400
-
-    row = MarketingEvent.query.filter_by(event_id=str(event_id)).first()
-    if not row:
-        return jsonify({"ok": False, "error": "event not found"}), 404
-
-    row.processing_status = "processed"
-    row.processing_updated_at = _utc_now()
-    row.workflow_run_id = payload.get("workflow_run_id")
-    db.session.commit()
+    _, error = _settle_one(ack_events, request.get_json(silent=True) or {})
+    if error:
+        return error
     return jsonify({"ok": True}), 200
 
 
@@ -599,35 +560,35 @@ def queue_fail():
     if auth_error:
         return auth_error
 
-    payload = request.get_json(silent=True) or {}
-    event_id = payload.get("event_id")
-    if not event_id:
-        return jsonify({"ok": False, "error": "event_id is required"}), 400
+    result, error = _settle_one(fail_events, request.get_json(silent=True) or {})
+    if error:
+        return error
+    return jsonify({"ok": True, "dlq_id": result["dlq_id"]}), 200
 
-    row = MarketingEvent.query.filter_by(event_id=str(event_id)).first()
-    if not row:
-        return jsonify({"ok": False, "error": "event not found"}), 404
 
-    now = _utc_now()
-    error_summary = payload.get("error") or "workflow failed"
-    row.processing_status = "failed"
-    row.processing_updated_at = now
-    row.error_code = error_summary[:120]
-    row.workflow_run_id = payload.get("workflow_run_id")
-
-    dlq = MarketingDLQ(
-        event_id=row.event_id,
-        workflow_name=payload.get("workflow_name") or "unknown-workflow",
-        step_name=payload.get("step"),
-        error_summary=error_summary,
-        payload_json={
-            "event": row.to_dict(),
-            "workflow_run_id": payload.get("workflow_run_id"),
-        },
-        retry_count=0,
-        status="open",
-        created_at=now,
-    )
-    db.session.add(dlq)
-    db.session.commit()
-    return jsonify({"ok": True, "dlq_id": dlq.id}), 200
+@growth_automation_bp.route("/queue/ack/batch", methods=["POST"])
+def queue_ack_batch():
+    """Ack many events: ``{"claim_id"?, "workflow_run_id"?, "events": [...]}``."""
+    auth_error = _check_queue_token()
+    if auth_error:
+        return auth_error
+    return _settle_batch(ack_events, request.get_json(silent=True) or {}, ("workflow_run_id",))
+
+
+@growth_automation_bp.route("/queue/fail/batch", methods=["POST"])
+def queue_fail_batch():
+    """Fail and dead-letter many events; top-level fields apply to every entry."""
+    auth_error = _check_queue_token()
+    if auth_error:
+        return auth_error
+    return _settle_batch(fail_events, request.get_json(silent=True) or {},
+                         ("error", "workflow_name", "step", "workflow_run_id"))
+
+
+@growth_automation_bp.route("/queue/metrics", methods=["GET"])
+def queue_metrics_view():
+    """Queue depth, lease state and claim latency."""
+    auth_error = _check_queue_token()
+    if auth_error:
+        return auth_error
+    return jsonify(queue_metrics()), 200
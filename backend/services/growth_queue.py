@@ -0,0 +1,223 @@
+"""Growth event work queue — leased claims over MarketingEvent.
+
+n8n pollers claim events with ``claim_events()``. A claim leases the rows
+(``backend.leases``): ``FOR UPDATE SKIP LOCKED`` on PostgreSQL and a
+compare-and-set UPDATE on SQLite, so two pollers never receive the same
+event. Claimed events stay ``processing`` until they are acked or failed. If
+the lease (visibility timeout) lapses first, the next claim picks the event
+up again through ``idx_marketing_event_lease``; nothing scans stale rows.
+
+Every claim returns a ``claim_id``. Acks/fails that pass it are only applied
+while that claim still holds the lease, so a poller whose lease expired
+cannot settle an event another poller is now working on.
+
+Metrics (``queue_metrics()``): queue depth by status, in-flight and
+expired leases, oldest pending age, plus per-process counters and recent
+queue-wait / claim-duration percentiles.
+
+Config:
+    GROWTH_QUEUE_LEASE   default visibility timeout in seconds (default 300)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from ..leases import claim, new_owner, release
+from ..models import db, MarketingDLQ, MarketingEvent
+
+CLAIMABLE = ("pending", "processing")  # processing rows only once their lease lapsed
+MIN_LEASE, MAX_LEASE = 30, 3600
+
+
+def default_lease() -> int:
+    return int(os.getenv("GROWTH_QUEUE_LEASE", "300"))
+
+
+def _percentiles(samples: Iterable[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p95": None, "max": None}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3), "max": round(ordered[-1], 3)}
+
+
+class QueueMetrics:
+    """Per-process claim/settle counters and recent latency samples."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._queue_wait = deque(maxlen=window)
+        self._claim_ms = deque(maxlen=window)
+        self.counters = {"claims": 0, "claimed": 0, "redelivered": 0, "acked": 0, "failed": 0, "lease_lost": 0}
+
+    def record_claim(self, rows: List[MarketingEvent], now: datetime, duration_ms: float) -> None:
+        with self._lock:
+            self.counters["claims"] += 1
+            self.counters["claimed"] += len(rows)
+            self._claim_ms.append(duration_ms)
+            for row in rows:
+                if row.delivery_attempts > 1:
+                    self.counters["redelivered"] += 1
+                elif row.created_at:
+                    self._queue_wait.append((now - row.created_at).total_seconds())
+
+    def record(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += n
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "queue_wait_seconds": _percentiles(self._queue_wait),
+                "claim_duration_ms": _percentiles(self._claim_ms),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._queue_wait.clear()
+            self._claim_ms.clear()
+            self.counters = dict.fromkeys(self.counters, 0)
+
+
+queue_metrics_recorder = QueueMetrics()
+
+
+def claim_events(limit: int, lease_seconds: Optional[int] = None,
+                 now: Optional[datetime] = None) -> Tuple[str, datetime, List[MarketingEvent]]:
+    """Lease up to ``limit`` claimable events; returns (claim_id, lease expiry, rows)."""
+    now = now or datetime.utcnow()
+    lease_seconds = min(max(lease_seconds or default_lease(), MIN_LEASE), MAX_LEASE)
+    owner = new_owner("growth")
+    started = time.monotonic()
+    ids = claim(
+        MarketingEvent,
+        [MarketingEvent.processing_status.in_(CLAIMABLE)],
+        [MarketingEvent.created_at, MarketingEvent.id],
+        limit, lease_seconds, owner=owner, now=now,
+        values={
+            "processing_status": "processing",
+            "processing_updated_at": now,
+            "delivery_attempts": MarketingEvent.delivery_attempts + 1,
+        },
+    )
+    rows = []
+    if ids:
+        rows = (MarketingEvent.query.options(joinedload(MarketingEvent.contact))
+                .filter(MarketingEvent.id.in_(ids))
+                .order_by(MarketingEvent.created_at, MarketingEvent.id).all())
+    queue_metrics_recorder.record_claim(rows, now, (time.monotonic() - started) * 1000)
+    return owner, now + timedelta(seconds=lease_seconds), rows
+
+
+def _settle(items: List[Dict], claim_id: Optional[str], apply, after_flush=None) -> List[Dict]:
+    """Load all referenced events in one query, apply ``apply`` to the ones we may settle.
+
+    ``after_flush(results)`` runs once new rows have ids, before the commit.
+    """
+    event_ids = [str(item["event_id"]) for item in items]
+    rows = {row.event_id: row for row in MarketingEvent.query.filter(MarketingEvent.event_id.in_(set(event_ids)))}
+    results = []
+    for item, event_id in zip(items, event_ids):
+        row = rows.get(event_id)
+        if row is None:
+            results.append({"event_id": event_id, "status": "not_found"})
+        elif claim_id and row.lease_owner != claim_id:
+            results.append({"event_id": event_id, "status": "lease_lost"})
+        else:
+            results.append({"event_id": event_id, "status": "ok", **(apply(row, item) or {})})
+            release(row)
+    db.session.flush()
+    if after_flush:
+        after_flush(results)
+    db.session.commit()
+    lost = sum(1 for r in results if r["status"] == "lease_lost")
+    if lost:
+        queue_metrics_recorder.record("lease_lost", lost)
+    return results
+
+
+def ack_events(items: List[Dict], claim_id: Optional[str] = None, now: Optional[datetime] = None) -> List[Dict]:
+    """Mark events processed. ``items``: ``{'event_id', 'workflow_run_id'?}``."""
+    now = now or datetime.utcnow()
+
+    def apply(row, item):
+        row.processing_status = "processed"
+        row.processing_updated_at = now
+        row.workflow_run_id = item.get("workflow_run_id")
+
+    results = _settle(items, claim_id, apply)
+    queue_metrics_recorder.record("acked", sum(1 for r in results if r["status"] == "ok"))
+    return results
+
+
+def fail_events(items: List[Dict], claim_id: Optional[str] = None, now: Optional[datetime] = None) -> List[Dict]:
+    """Mark events failed and dead-letter them.
+
+    ``items``: ``{'event_id', 'error'?, 'workflow_name'?, 'step'?, 'workflow_run_id'?}``.
+    """
+    now = now or datetime.utcnow()
+    dead_letters = []
+
+    def apply(row, item):
+        error_summary = item.get("error") or "workflow failed"
+        row.processing_status = "failed"
+        row.processing_updated_at = now
+        row.error_code = error_summary[:120]
+        row.workflow_run_id = item.get("workflow_run_id")
+        dlq = MarketingDLQ(
+            event_id=row.event_id,
+            workflow_name=item.get("workflow_name") or "unknown-workflow",
+            step_name=item.get("step"),
+            error_summary=error_summary,
+            payload_json={
+                "event": row.to_dict(),
+                "workflow_run_id": item.get("workflow_run_id"),
+            },
+            retry_count=0,
+            status="open",
+            created_at=now,
+        )
+        db.session.add(dlq)
+        dead_letters.append(dlq)
+        return {"dlq": dlq}
+
+    def resolve_ids(results):
+        for result in results:
+            if "dlq" in result:
+                result["dlq_id"] = result.pop("dlq").id
+
+    results = _settle(items, claim_id, apply, after_flush=resolve_ids)
+    queue_metrics_recorder.record("failed", len(dead_letters))
+    return results
+
+
+def queue_metrics(now: Optional[datetime] = None) -> Dict:
+    """Queue depth and lease state from the database, plus this process's counters."""
+    now = now or datetime.utcnow()
+    depth = dict(
+        db.session.query(MarketingEvent.processing_status, func.count(MarketingEvent.id))
+        .group_by(MarketingEvent.processing_status).all()
+    )
+    expired = (MarketingEvent.query
+               .filter(MarketingEvent.processing_status == "processing",
+                       db.or_(MarketingEvent.lease_expires_at.is_(None), MarketingEvent.lease_expires_at < now))
+               .count())
+    oldest = (db.session.query(func.min(MarketingEvent.created_at))
+              .filter(MarketingEvent.processing_status == "pending").scalar())
+    return {
+        "depth": depth,
+        "ready": depth.get("pending", 0) + expired,
+        "in_flight": depth.get("processing", 0) - expired,
+        "expired_leases": expired,
+        "oldest_pending_age_seconds": round((now - oldest).total_seconds(), 3) if oldest else None,
+        **queue_metrics_recorder.snapshot(),
+    }
@@ -0,0 +1,343 @@
+"""Growth dashboard rollups — hourly counters behind /dashboard/summary.
+
+The summary used to run eight COUNT / GROUP BY queries over the raw
+marketing tables on every hit. The counts now live in two rollup tables:
+
+``marketing_rollups`` — one row per (metric, hour bucket, dimension):
+
+    metric     bucketed by   dimension
+    contacts   created_at    lifecycle_stage
+    events     event_ts      processing_status ("pending"/"processing" -> "open")
+    messages   created_at    status
+    dlq        created_at    status
+
+``marketing_journey_rollups`` — journey states by the hours their activity
+span (entered_at .. last_action_at) starts and ends, so "journeys active in
+the window" stays an overlap test.
+
+Maintenance: a Session ``after_flush`` hook turns inserts, updates and
+deletes of the tracked models into counter deltas and upserts them on the
+flushing connection, so rollups commit or roll back with the rows. Core
+INSERTs (``event_ingest``) call ``adjust_rollups()`` themselves. Lease claims
+move events between pending and processing with a bulk UPDATE the hook never
+sees, which is why both fold into "open"; the in-flight split of the queue
+is counted off ``idx_marketing_event_queue`` instead.
+
+Reads: ``build_summary()`` sums the buckets that lie wholly inside the
+requested window and counts the partial hours at either edge from the raw
+tables (index range scans over at most an hour each), so the numbers match
+the old per-row queries.
+
+``rebuild_rollups()`` recomputes everything from the raw tables. Run
+``scripts/rebuild_growth_rollups.py`` after upgrading, or after bulk edits
+that bypass the ORM.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, func, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import (
+    db,
+    MarketingContact,
+    MarketingDLQ,
+    MarketingEvent,
+    MarketingJourneyRollup,
+    MarketingJourneyState,
+    MarketingMessageLog,
+    MarketingRollup,
+)
+
+HOUR = timedelta(hours=1)
+OPEN_STATUSES = ("pending", "processing")
+JOURNEY_FIELDS = ("entered_at", "last_action_at", "state")
+
+
+def _event_dimension(status: str) -> str:
+    return "open" if status in OPEN_STATUSES else status
+
+
+# model -> (metric, time attribute, dimension attribute, dimension mapper)
+METRICS = {
+    MarketingContact: ("contacts", "created_at", "lifecycle_stage", None),
+    MarketingEvent: ("events", "event_ts", "processing_status", _event_dimension),
+    MarketingMessageLog: ("messages", "created_at", "status", None),
+    MarketingDLQ: ("dlq", "created_at", "status", None),
+}
+
+
+def bucket_of(ts: Optional[datetime]) -> Optional[datetime]:
+    """Start of the hour ``ts`` falls in."""
+    return ts.replace(minute=0, second=0, microsecond=0) if ts else None
+
+
+def _ceil_hour(ts: datetime) -> datetime:
+    bucket = bucket_of(ts)
+    return bucket if bucket == ts else bucket + HOUR
+
+
+def metric_key(model, values: Dict) -> Optional[Tuple]:
+    """(metric, bucket, dimension) for a row of a tracked model."""
+    metric, ts_attr, dim_attr, mapper = METRICS[model]
+    ts, dimension = values.get(ts_attr), values.get(dim_attr)
+    if ts is None or dimension is None:
+        return None
+    return metric, bucket_of(ts), mapper(dimension) if mapper else dimension
+
+
+def journey_key(entered_at, last_action_at, state) -> Optional[Tuple]:
+    """(span_start, span_end, state) buckets for a journey row."""
+    if entered_at is None or state is None:
+        return None
+    ends = (entered_at, last_action_at) if last_action_at else (entered_at,)
+    return bucket_of(min(ends)), bucket_of(max(ends)), state
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def _upsert(connection, table, keys: Tuple[str, ...], deltas: Dict[Tuple, int]) -> None:
+    rows = [{**dict(zip(keys, key)), "total": n} for key, n in deltas.items() if key and n]
+    if not rows:
+        return
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys),
+                                          set_={"total": table.c.total + stmt.excluded.total})
+        connection.execute(stmt, rows)
+        return
+    for row in rows:
+        updated = connection.execute(
+            table.update().where(*[table.c[k] == row[k] for k in keys]).values(total=table.c.total + row["total"])
+        )
+        if not updated.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def adjust_rollups(connection, deltas: Optional[Dict] = None, journey_deltas: Optional[Dict] = None) -> None:
+    """Add ``{(metric, bucket, dimension): n}`` and ``{(span_start, span_end, state): n}``.
+
+    Runs on the given connection, so counters commit or roll back with the
+    rows they describe.
+    """
+    if deltas:
+        _upsert(connection, MarketingRollup.__table__, ("metric", "bucket", "dimension"), deltas)
+    if journey_deltas:
+        _upsert(connection, MarketingJourneyRollup.__table__, ("span_start", "span_end", "state"), journey_deltas)
+
+
+def _tracked_fields(model) -> Tuple[str, ...]:
+    if model is MarketingJourneyState:
+        return JOURNEY_FIELDS
+    spec = METRICS.get(model)
+    return spec[1:3] if spec else ()
+
+
+def _key(model, values: Dict) -> Optional[Tuple]:
+    if model is MarketingJourneyState:
+        return journey_key(*(values[name] for name in JOURNEY_FIELDS))
+    return metric_key(model, values)
+
+
+def _before_and_after(obj, fields) -> Tuple[Dict, Dict]:
+    state = inspect(obj)
+    before, after = {}, {}
+    for name in fields:
+        history = state.attrs[name].history
+        if history.added or history.deleted:
+            before[name] = history.deleted[0] if history.deleted else None
+            after[name] = history.added[0] if history.added else None
+        else:
+            before[name] = after[name] = getattr(obj, name)
+    return before, after
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so updates always know the old value."""
+
+
+for _model in (*METRICS, MarketingJourneyState):
+    for _name in _tracked_fields(_model):
+        event.listen(getattr(_model, _name), "set", _keep_old_value, active_history=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted(session, flush_context, instances):
+    # Deleted rows can't be loaded after the DELETE runs; read what we need now
+    for obj in session.deleted:
+        for name in _tracked_fields(type(obj)):
+            getattr(obj, name)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_flush(session, flush_context):
+    deltas, journey_deltas = Counter(), Counter()
+
+    def record(model, key, n):
+        if key:
+            (journey_deltas if model is MarketingJourneyState else deltas)[key] += n
+
+    for obj in session.new:
+        fields = _tracked_fields(type(obj))
+        if fields:
+            record(type(obj), _key(type(obj), {name: getattr(obj, name) for name in fields}), 1)
+    for obj in session.dirty:
+        fields = _tracked_fields(type(obj))
+        if fields:
+            before, after = _before_and_after(obj, fields)
+            old, new = _key(type(obj), before), _key(type(obj), after)
+            if old != new:
+                record(type(obj), old, -1)
+                record(type(obj), new, 1)
+    for obj in session.deleted:
+        fields = _tracked_fields(type(obj))
+        if fields:
+            record(type(obj), _key(type(obj), _before_and_after(obj, fields)[0]), -1)
+
+    if deltas or journey_deltas:
+        adjust_rollups(session.connection(), deltas, journey_deltas)
+
+
+def rebuild_rollups(batch_size: int = 5000) -> Dict[str, int]:
+    """Recompute both rollup tables from the raw marketing tables and commit.
+
+    Writes that land while the raw tables are being read may be missed, so
+    run it when ingestion is quiet.
+    """
+    deltas, journey_deltas = Counter(), Counter()
+    for model, (_, ts_attr, dim_attr, _) in METRICS.items():
+        rows = db.session.query(getattr(model, ts_attr), getattr(model, dim_attr)).yield_per(batch_size)
+        for ts, dimension in rows:
+            key = metric_key(model, {ts_attr: ts, dim_attr: dimension})
+            if key:
+                deltas[key] += 1
+    rows = db.session.query(*(getattr(MarketingJourneyState, name) for name in JOURNEY_FIELDS)).yield_per(batch_size)
+    for entered_at, last_action_at, state in rows:
+        key = journey_key(entered_at, last_action_at, state)
+        if key:
+            journey_deltas[key] += 1
+
+    db.session.execute(delete(MarketingRollup))
+    db.session.execute(delete(MarketingJourneyRollup))
+    adjust_rollups(db.session.connection(), deltas, journey_deltas)
+    db.session.commit()
+    return {"rollups": len(deltas), "journey_rollups": len(journey_deltas)}
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def _split_window(from_dt: Optional[datetime], to_dt: Optional[datetime]):
+    """Whole-hour buckets inside [from_dt, to_dt] and the raw edge ranges.
+
+    Returns ``(buckets, edges)``: ``buckets`` is ``(lo, hi)`` meaning
+    ``lo <= bucket < hi`` (either end may be None) or None when no hour fits;
+    ``edges`` are ``(start, end, end_inclusive)`` ranges to count raw.
+    """
+    lo = _ceil_hour(from_dt) if from_dt else None
+    hi = bucket_of(to_dt) if to_dt else None
+    if lo and hi and lo >= hi:
+        return None, [(from_dt, to_dt, True)]
+    edges = []
+    if from_dt and from_dt < lo:
+        edges.append((from_dt, lo, False))
+    if to_dt:
+        edges.append((hi, to_dt, True))
+    return (lo, hi), edges
+
+
+def _in_range(column, start, end, inclusive=True):
+    return and_(column >= start, column <= end if inclusive else column < end)
+
+
+def _metric_counts(from_dt, to_dt) -> Dict[str, Counter]:
+    """{metric: Counter(dimension -> rows)} for rows inside the window."""
+    counts = {metric: Counter() for metric, _, _, _ in METRICS.values()}
+    buckets, edges = _split_window(from_dt, to_dt)
+    if buckets:
+        lo, hi = buckets
+        q = db.session.query(MarketingRollup.metric, MarketingRollup.dimension, func.sum(MarketingRollup.total))
+        if lo:
+            q = q.filter(MarketingRollup.bucket >= lo)
+        if hi:
+            q = q.filter(MarketingRollup.bucket < hi)
+        for metric, dimension, total in q.group_by(MarketingRollup.metric, MarketingRollup.dimension):
+            counts[metric][dimension] += int(total or 0)
+
+    for model, (metric, ts_attr, dim_attr, mapper) in METRICS.items():
+        column, dim_column = getattr(model, ts_attr), getattr(model, dim_attr)
+        for start, end, inclusive in edges:
+            rows = (db.session.query(dim_column, func.count(model.id))
+                    .filter(_in_range(column, start, end, inclusive)).group_by(dim_column))
+            for dimension, total in rows:
+                counts[metric][mapper(dimension) if mapper else dimension] += total
+    return counts
+
+
+def _journey_counts(from_dt, to_dt) -> Counter:
+    """Journeys whose activity span overlaps the window, by state."""
+    lo = _ceil_hour(from_dt) if from_dt else None
+    hi = bucket_of(to_dt) if to_dt else None
+    counts = Counter()
+
+    q = db.session.query(MarketingJourneyRollup.state, func.sum(MarketingJourneyRollup.total))
+    if lo:
+        q = q.filter(MarketingJourneyRollup.span_end >= lo)
+    if hi:
+        q = q.filter(MarketingJourneyRollup.span_start < hi)
+    for state, total in q.group_by(MarketingJourneyRollup.state):
+        counts[state] += int(total or 0)
+    if not from_dt and not to_dt:
+        return counts
+
+    # Journeys in the edge buckets: span ends in [from_dt, lo) or starts in [hi, to_dt]
+    entered, last = MarketingJourneyState.entered_at, MarketingJourneyState.last_action_at
+    overlaps, edges = [], []
+    if from_dt:
+        overlaps.append(or_(entered >= from_dt, last >= from_dt))
+        edges += [and_(_in_range(entered, from_dt, lo, False), or_(last.is_(None), last <= entered)),
+                  and_(_in_range(last, from_dt, lo, False), last > entered)]
+    if to_dt:
+        overlaps.append(or_(entered <= to_dt, last <= to_dt))
+        edges += [and_(_in_range(entered, hi, to_dt), or_(last.is_(None), last >= entered)),
+                  and_(_in_range(last, hi, to_dt), last < entered)]
+    rows = (db.session.query(MarketingJourneyState.state, func.count(MarketingJourneyState.id))
+            .filter(*overlaps, or_(*edges)).group_by(MarketingJourneyState.state))
+    for state, total in rows:
+        counts[state] += total
+    return counts
+
+
+def _nonzero(counts: Counter) -> Dict[str, int]:
+    return {key: total for key, total in counts.items() if total}
+
+
+def build_summary(from_dt: Optional[datetime] = None, to_dt: Optional[datetime] = None) -> Dict:
+    """Dashboard summary for the window, read from the rollups."""
+    counts = _metric_counts(from_dt, to_dt)
+    all_events = counts["events"] if not from_dt and not to_dt else _metric_counts(None, None)["events"]
+    queue = {status: total for status, total in all_events.items() if status != "open" and total}
+    queue.update(
+        db.session.query(MarketingEvent.processing_status, func.count(MarketingEvent.id))
+        .filter(MarketingEvent.processing_status.in_(OPEN_STATUSES))
+        .group_by(MarketingEvent.processing_status).all()
+    )
+    return {
+        "contacts": {
+            "total": sum(counts["contacts"].values()),
+            "lifecycle_counts": _nonzero(counts["contacts"]),
+        },
+        "events": {"total": sum(counts["events"].values()), "failed": counts["events"]["failed"]},
+        "journey_counts": _nonzero(_journey_counts(from_dt, to_dt)),
+        "delivery": _nonzero(counts["messages"]),
+        "queue": queue,
+        "errors": {"dlq_open": counts["dlq"]["open"]},
+    }
@@ -0,0 +1,295 @@
+"""Invoice Renderer — async, content-addressed invoice PDF pipeline.
+
+Rendering is split from the request path:
+
+- ``invoice_payload()`` snapshots everything printed on an invoice into a
+  plain dict (cheap, done in the request). The payload is picklable, so the
+  same input feeds the thread queue and the month-end process pool.
+- ``render_invoice_pdf()`` builds the PDF from a payload. Paragraph/table
+  styles and column layout are built once per process (``_template()``) and
+  documents are rendered with ReportLab's ``invariant`` mode, so a payload
+  always yields byte-identical output.
+- ``InvoiceArtifactStore`` keeps rendered PDFs under ``.workspace/invoices/``
+  addressed by the SHA-256 of payload + template version. An invoice is
+  rendered once; later downloads stream the stored file, and the key doubles
+  as a strong ETag.
+- ``InvoiceRenderQueue`` renders in a small thread pool, deduplicating
+  in-flight keys, and ``render_batch()`` fans large batches out to a process
+  pool.
+
+Config:
+    INVOICE_RENDER_WORKERS    render threads per process (default 2)
+    INVOICE_RENDER_WAIT       seconds a download waits for a pending render (default 10)
+    INVOICE_BATCH_PROCESSES   processes for batch rendering (default CPU count)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from ..runtime_paths import workspace_path
+
+logger = logging.getLogger('invoice_renderer')
+
+# Bump when the layout changes so existing artifacts are not served for new renders
+TEMPLATE_VERSION = 1
+
+INVOICE_RENDER_WORKERS = int(os.getenv('INVOICE_RENDER_WORKERS', '2'))
+INVOICE_RENDER_WAIT = float(os.getenv('INVOICE_RENDER_WAIT', '10'))
+INVOICE_BATCH_PROCESSES = int(os.getenv('INVOICE_BATCH_PROCESSES', str(os.cpu_count() or 2)))
+
+
+# ---------------------------------------------------------------------------
+# Payload + rendering
+# ---------------------------------------------------------------------------
+
+def invoice_payload(invoice, user, order=None) -> dict:
+    """Everything printed on the invoice, as a plain JSON-able dict."""
+    due_date = invoice.due_date or (invoice.issued_date + timedelta(days=30))
+    items = None
+    if order:
+        raw = json.loads(order.items_json) if isinstance(order.items_json, str) else order.items_json
+        items = [
+            {
+                'product_id': item.get('product_id', 'N/A'),
+                'quantity': item.get('quantity', 1),
+                'price_krw': item.get('price_krw', 0),
+            }
+            for item in raw or []
+        ]
+    return {
+        'invoice_number': invoice.invoice_number,
+        'issued_date': invoice.issued_date.strftime('%Y-%m-%d'),
+        'due_date': due_date.strftime('%Y-%m-%d'),
+        'bill_to_name': user.name,
+        'bill_to_email': user.email,
+        'items': items,
+        'amount_krw': invoice.amount_krw,
+        'tax_krw': invoice.tax_krw or 0,
+        'total_krw': invoice.total_krw,
+    }
+
+
+def artifact_key(payload: dict) -> str:
+    """Content address for a payload under the current template version."""
+    canonical = json.dumps({'v': TEMPLATE_VERSION, 'invoice': payload}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _template() -> dict:
+    """Styles and table layout, built once per process."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#2c3e50'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=colors.HexColor('#34495e'),
+            spaceAfter=12
+        ),
+        'normal': styles['Normal'],
+        'header_widths': [1.5*inch, 2*inch, 1.5*inch, 2*inch],
+        'header': TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'bill_widths': [4*inch],
+        'bill': TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
+        ]),
+        'items_widths': [2.5*inch, 1.2*inch, 1.5*inch, 1.5*inch],
+        'items': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+            ('FONT', (0, 1), (-1, -1), 'Helvetica', 9),
+        ]),
+        'totals_widths': [4*inch, 2*inch],
+        'totals': TableStyle([
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONT', (0, 0), (0, -1), 'Helvetica', 10),
+            ('FONT', (1, 0), (1, -2), 'Helvetica', 10),
+            ('FONT', (1, -1), (1, -1), 'Helvetica-Bold', 12),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#34495e')),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+        ]),
+    }
+
+
+def _table(rows, widths, style) -> Table:
+    table = Table(rows, colWidths=widths)
+    table.setStyle(style)
+    return table
+
+
+def render_invoice_pdf(payload: dict) -> bytes:
+    """Render a payload to PDF bytes (deterministic for a given payload)."""
+    t = _template()
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, invariant=1)
+
+    if payload['items'] is not None:
+        items_data = [['Description', 'Quantity', 'Unit Price (KRW)', 'Amount (KRW)']]
+        for item in payload['items']:
+            items_data.append([
+                f"Product {item['product_id']}",
+                str(item['quantity']),
+                f"{item['price_krw']:,}",
+                f"{item['quantity'] * item['price_krw']:,}"
+            ])
+    else:
+        items_data = [['Description', 'Amount (KRW)'], ['Invoice Payment', f"{payload['amount_krw']:,}"]]
+
+    story = [
+        Paragraph('INVOICE', t['title']),
+        Spacer(1, 0.3 * inch),
+        _table([
+            ['Invoice Number:', payload['invoice_number'], 'Issue Date:', payload['issued_date']],
+            ['Company:', 'SoftFactory Inc.', 'Due Date:', payload['due_date']],
+        ], t['header_widths'], t['header']),
+        Spacer(1, 0.3 * inch),
+        Paragraph('Bill To:', t['heading']),
+        _table([[payload['bill_to_name']], [payload['bill_to_email']]], t['bill_widths'], t['bill']),
+        Spacer(1, 0.3 * inch),
+        Paragraph('Line Items:', t['heading']),
+        _table(items_data, t['items_widths'], t['items']),
+        Spacer(1, 0.2 * inch),
+        _table([
+            ['Subtotal (KRW):', f"{payload['amount_krw']:,}"],
+            ['Tax (KRW):', f"{payload['tax_krw']:,}"],
+            ['Total (KRW):', f"{payload['total_krw']:,}"],
+        ], t['totals_widths'], t['totals']),
+        Spacer(1, 0.3 * inch),
+        Paragraph('Thank you for your business!<br/>Payment terms: Net 30 days', t['normal']),
+    ]
+    doc.build(story)
+    return pdf_buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Artifact store
+# ---------------------------------------------------------------------------
+
+class InvoiceArtifactStore:
+    """Rendered PDFs on local disk, addressed by artifact key."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.pdf'
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        return path if path.exists() else None
+
+    def put(self, key: str, data: bytes) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return path
+
+
+# ---------------------------------------------------------------------------
+# Render queue
+# ---------------------------------------------------------------------------
+
+class InvoiceRenderQueue:
+    """Background rendering with per-key deduplication."""
+
+    def __init__(self, store: InvoiceArtifactStore, max_workers: int = INVOICE_RENDER_WORKERS):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='invoice-render')
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _render(self, key: str, payload: dict, on_ready: Optional[Callable[[Path], None]]) -> Path:
+        try:
+            path = self.store.put(key, render_invoice_pdf(payload))
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        if on_ready:
+            try:
+                on_ready(path)
+            except Exception as e:
+                logger.warning("Invoice %s post-render hook failed: %s", payload['invoice_number'], e)
+        return path
+
+    def submit(self, payload: dict, on_ready: Optional[Callable[[Path], None]] = None) -> str:
+        """Queue a render unless the artifact exists or is already rendering."""
+        key = artifact_key(payload)
+        if self.store.get(key):
+            return key
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = self._executor.submit(self._render, key, payload, on_ready)
+        return key
+
+    def status(self, key: str) -> str:
+        """'ready', 'pending' or 'missing'."""
+        if self.store.get(key):
+            return 'ready'
+        with self._lock:
+            return 'pending' if key in self._pending else 'missing'
+
+    def wait(self, key: str, timeout: float = INVOICE_RENDER_WAIT) -> Optional[Path]:
+        """Stored artifact path, waiting up to timeout for a pending render."""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning("Invoice render %s failed or timed out: %s", key[:12], e)
+        return self.store.get(key)
+
+    def render_batch(self, payloads: Iterable[dict], processes: int = INVOICE_BATCH_PROCESSES) -> List[str]:
+        """Render many payloads in a process pool; returns all artifact keys.
+
+        Already-stored artifacts are skipped, so re-running a batch is cheap.
+        """
+        keyed = [(artifact_key(p), p) for p in payloads]
+        todo = {key: p for key, p in keyed if not self.store.get(key)}
+        if todo:
+            keys = list(todo)
+            with ProcessPoolExecutor(max_workers=max(1, min(processes, len(keys)))) as pool:
+                for key, pdf in zip(keys, pool.map(render_invoice_pdf, [todo[k] for k in keys], chunksize=8)):
+                    self.store.put(key, pdf)
+        return [key for key, _ in keyed]
+
+
+invoice_store = InvoiceArtifactStore(workspace_path('invoices'))
+invoice_render_queue = InvoiceRenderQueue(invoice_store)
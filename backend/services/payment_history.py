@@ -0,0 +1,146 @@
+"""Payment History — unified, keyset-paginated invoice + payment ledger.
+
+Invoices and payments are merged in SQL with a UNION ALL over
+``(date, type, id)`` and ordered newest first, so every page is one indexed
+range scan no matter how deep, and ``total`` counts the whole history rather
+than the merged page. Rows for a page are then hydrated with one query per
+type, with invoice PDFs eager-loaded.
+
+Cursors are opaque base64 strings encoding the last ``(date, type, id)``
+returned; ``iter_history()`` walks the same keyset in chunks for streaming
+CSV/JSONL exports.
+"""
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal, or_, select, union_all
+from sqlalchemy.orm import joinedload
+
+from ..models import db, Invoice, Payment
+from ..utils.pagination import decode_keyset_cursor, encode_keyset_cursor
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FIELDS = ['type', 'id', 'date', 'status', 'amount_krw', 'amount', 'currency',
+                 'invoice_number', 'invoice_url', 'stripe_payment_id', 'due_date']
+
+
+def encode_cursor(key: Tuple[datetime, str, int]) -> str:
+    return encode_keyset_cursor(*key)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        date, kind, row_id = decode_keyset_cursor(cursor)
+        return datetime.fromisoformat(date), str(kind), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _ledger(user_id: int, status: Optional[str] = None):
+    """UNION ALL of (date, type, id) for a user's invoices and payments."""
+    invoices = select(
+        Invoice.issued_date.label('date'), literal('invoice').label('type'), Invoice.id.label('id'),
+    ).where(Invoice.user_id == user_id)
+    payments = select(
+        Payment.created_at.label('date'), literal('payment').label('type'), Payment.id.label('id'),
+    ).where(Payment.user_id == user_id)
+    if status:
+        invoices = invoices.where(Invoice.status == status)
+        payments = payments.where(Payment.status == status)
+    return union_all(invoices, payments).subquery('ledger')
+
+
+def _page_keys(user_id: int, status: Optional[str], limit: int,
+               after: Optional[Tuple[datetime, str, int]] = None,
+               offset: int = 0) -> List[Tuple[datetime, str, int]]:
+    ledger = _ledger(user_id, status)
+    query = select(ledger.c.date, ledger.c.type, ledger.c.id)
+    if after is not None:
+        date, kind, row_id = after
+        query = query.where(or_(
+            ledger.c.date < date,
+            and_(ledger.c.date == date, ledger.c.type < kind),
+            and_(ledger.c.date == date, ledger.c.type == kind, ledger.c.id < row_id),
+        ))
+    query = query.order_by(ledger.c.date.desc(), ledger.c.type.desc(), ledger.c.id.desc())
+    if offset:
+        query = query.offset(offset)
+    return [tuple(row) for row in db.session.execute(query.limit(limit)).all()]
+
+
+def count_history(user_id: int, status: Optional[str] = None) -> int:
+    ledger = _ledger(user_id, status)
+    return db.session.execute(select(func.count()).select_from(ledger)).scalar() or 0
+
+
+def _entries(keys: List[Tuple[datetime, str, int]]) -> List[Dict]:
+    """Hydrate ledger keys into response dicts, preserving key order."""
+    invoice_ids = [row_id for _, kind, row_id in keys if kind == 'invoice']
+    payment_ids = [row_id for _, kind, row_id in keys if kind == 'payment']
+    invoices = {inv.id: inv for inv in Invoice.query.options(joinedload(Invoice.pdf))
+                .filter(Invoice.id.in_(invoice_ids)).all()} if invoice_ids else {}
+    payments = {pay.id: pay for pay in Payment.query.filter(Payment.id.in_(payment_ids)).all()} \
+        if payment_ids else {}
+
+    history = []
+    for _, kind, row_id in keys:
+        if kind == 'invoice':
+            inv = invoices[row_id]
+            history.append({
+                'id': inv.id,
+                'type': 'invoice',
+                'date': inv.issued_date.isoformat(),
+                'amount_krw': inv.total_krw,
+                'status': inv.status,
+                'invoice_number': inv.invoice_number,
+                'invoice_url': inv.pdf.s3_url if inv.pdf else None,
+                'stripe_url': None,  # Could fetch from Stripe if needed
+                'due_date': inv.due_date.isoformat() if inv.due_date else None,
+            })
+        else:
+            pay = payments[row_id]
+            history.append({
+                'id': pay.id,
+                'type': 'payment',
+                'date': pay.created_at.isoformat(),
+                'amount': pay.amount,
+                'currency': pay.currency,
+                'status': pay.status,
+                'stripe_payment_id': pay.stripe_payment_id,
+                'invoice_url': None,
+            })
+    return history
+
+
+def history_page(user_id: int, limit: int = 50, cursor: Optional[str] = None,
+                 offset: int = 0, status: Optional[str] = None) -> Dict:
+    """One page of the merged history.
+
+    ``cursor`` (from the previous page's ``next_cursor``) takes precedence;
+    ``offset`` is kept for older clients and is now applied to the merged
+    ledger, so it is correct but still scans skipped rows.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    keys = _page_keys(user_id, status, limit + 1, after=after, offset=0 if after else offset)
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+    return {
+        'total': count_history(user_id, status),
+        'history': _entries(keys),
+        'next_cursor': encode_cursor(keys[-1]) if has_more and keys else None,
+    }
+
+
+def iter_history(user_id: int, status: Optional[str] = None,
+                 chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Every history entry, newest first, fetched chunk by chunk via keyset."""
+    after = None
+    while True:
+        keys = _page_keys(user_id, status, chunk_size, after=after)
+        if not keys:
+            return
+        yield from _entries(keys)
+        if len(keys) < chunk_size:
+            return
+        after = keys[-1]
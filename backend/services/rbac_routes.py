@@ -6,8 +6,9 @@ from ..auth import require_auth, require_admin
 from ..rbac import (
     require_role, require_permission, assign_role_to_user, remove_role_from_user,
     grant_permission_to_role, revoke_permission_from_role, get_user_permissions,
-    get_user_roles, has_permission, has_role
+    get_user_roles, has_permission, has_role, users_with_permission
 )
+from ..principal import invalidate_all_principals
 from ..input_validator import validate_request_data
 
 rbac_bp = Blueprint('rbac', __name__, url_prefix='/api/admin/rbac')
@@ -94,7 +95,7 @@ def create_role():
             action='create_role',
             target_type='role',
             target_role_id=role.id,
-            actor_user_id=g.user['user_id'],
+            actor_user_id=g.user_id,
             status='success',
             details=f'Created role "{name}"'
         )
@@ -135,13 +136,14 @@ def update_role(role_id):
             role.is_active = data['is_active']
 
         db.session.commit()
+        invalidate_all_principals()
 
         from ..rbac import log_rbac_change
         log_rbac_change(
             action='update_role',
             target_type='role',
             target_role_id=role.id,
-            actor_user_id=g.user['user_id'],
+            actor_user_id=g.user_id,
             status='success'
         )
 
@@ -175,13 +177,14 @@ def delete_role(role_id):
 
         role.is_active = False
         db.session.commit()
+        invalidate_all_principals()
 
         from ..rbac import log_rbac_change
         log_rbac_change(
             action='delete_role',
             target_type='role',
             target_role_id=role.id,
-            actor_user_id=g.user['user_id'],
+            actor_user_id=g.user_id,
             status='success'
         )
 
@@ -280,7 +283,7 @@ def create_permission():
             action='create_permission',
             target_type='permission',
             target_permission_id=perm.id,
-            actor_user_id=g.user['user_id'],
+            actor_user_id=g.user_id,
             status='success'
         )
 
@@ -344,7 +347,7 @@ def assign_role_endpoint(user_id):
         success, message = assign_role_to_user(
             user_id=user_id,
             role_name=role_name,
-            assigned_by_id=g.user['user_id']
+            assigned_by_id=g.user_id
         )
 
         if not success:
@@ -373,7 +376,7 @@ def remove_role_endpoint(user_id, role_name):
         success, message = remove_role_from_user(
             user_id=user_id,
             role_name=role_name,
-            assigned_by_id=g.user['user_id']
+            assigned_by_id=g.user_id
         )
 
         if not success:
@@ -439,7 +442,7 @@ def grant_permission_endpoint(role_name):
         success, message = grant_permission_to_role(
             role_name=role_name,
             permission_name=perm_name,
-            assigned_by_id=g.user['user_id']
+            assigned_by_id=g.user_id
         )
 
         if not success:
@@ -468,7 +471,7 @@ def revoke_permission_endpoint(role_name, permission_name):
         success, message = revoke_permission_from_role(
             role_name=role_name,
             permission_name=permission_name,
-            assigned_by_id=g.user['user_id']
+            assigned_by_id=g.user_id
         )
 
         if not success:
@@ -593,6 +596,36 @@ def check_user_permission(user_id):
         return jsonify({'error': str(e)}), 500
 
 
+@rbac_bp.route('/permissions/<permission_name>/users', methods=['GET'])
+@require_auth
+@require_role('admin')
+def get_permission_holders(permission_name):
+    """
+    GET /api/admin/rbac/permissions/<permission_name>/users
+    List users who hold a permission through any of their roles.
+
+    Query params:
+        limit: int (default: 100, max: 1000)
+        offset: int (default: 0)
+    """
+    try:
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        offset = int(request.args.get('offset', 0))
+
+        total, users = users_with_permission(permission_name, limit=limit, offset=offset)
+
+        return jsonify({
+            'success': True,
+            'permission': permission_name,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'users': [{'id': u.id, 'email': u.email, 'name': u.name} for u in users]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @rbac_bp.route('/users/<int:user_id>/permissions', methods=['GET'])
 @require_auth
 @require_role('admin')
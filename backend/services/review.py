@@ -7,6 +7,8 @@ from uuid import uuid4
 from ..models import db, Campaign, CampaignApplication, ReviewListing, ReviewAccount, ReviewApplication, ReviewBookmark, ReviewAutoRule
 from ..auth import require_auth, require_subscription
 from ..cache import ttl_cache, invalidate_cache
+from ..utils.pagination import decode_keyset_cursor, encode_keyset_cursor
+from .review_freshness import get_last_scraped
 from ..input_validator import (
     validate_string, validate_integer, validate_platform, sanitize_html,
     check_xss, check_sql_injection, VALID_REVIEW_PLATFORMS
@@ -1133,14 +1135,15 @@ def run_auto_apply_rules():
     """Compatibility endpoint used by frontend to trigger an immediate auto-apply pass."""
     from backend.scheduler import check_auto_apply_rules
 
-    check_auto_apply_rules(current_app._get_current_object())
+    stats = check_auto_apply_rules(current_app._get_current_object())
 
     return jsonify({
-        'success': True,
+        'success': stats is not None,
         'message': 'Auto-apply run triggered',
-        'applied_count': 0,
-        'skipped_count': 0,
-        'errors': []
+        'applied_count': stats['applied'] if stats else 0,
+        'skipped_count': stats['skipped_existing'] + stats['skipped_ratio'] if stats else 0,
+        'stats': stats,
+        'errors': [] if stats is not None else ['Auto-apply run failed; see scheduler history']
     }), 200
 
 
@@ -1223,14 +1226,54 @@ def trigger_scraper():
 
 # ==================== AGGREGATED LISTINGS API (Multi-Platform) ====================
 
+# sort name -> (column, descending, nullable); ties break on id in the same direction
+_AGGREGATED_SORTS = {
+    'latest': (ReviewListing.scraped_at, True, False),
+    'created': (ReviewListing.scraped_at, True, False),
+    'created_at': (ReviewListing.scraped_at, True, False),
+    'reward_high': (ReviewListing.reward_value, True, True),
+    'reward_value': (ReviewListing.reward_value, True, True),
+    'applicants_few': (ReviewListing.application_count, False, False),
+    'applicants': (ReviewListing.application_count, False, False),
+    'deadline': (ReviewListing.deadline, False, False),
+}
+
+
+def _decode_listing_cursor(cursor, column):
+    """(sort value, id) from a next_cursor; raises ValueError if malformed."""
+    try:
+        value, listing_id = decode_keyset_cursor(cursor)
+        if value is not None and isinstance(column.type, db.DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(listing_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _after_cursor(column, descending, value, listing_id):
+    """Rows strictly after (value, id) in (column, id) order; NULLs sort last."""
+    id_col = ReviewListing.id
+    if value is None:
+        return and_(column.is_(None), id_col < listing_id if descending else id_col > listing_id)
+    beyond = column < value if descending else column > value
+    tie = and_(column == value, id_col < listing_id if descending else id_col > listing_id)
+    return or_(beyond, tie, column.is_(None))
+
+
 @review_bp.route('/aggregated', methods=['GET'])
 @require_auth
 def get_aggregated_listings():
-    """Get unified review listings from all platforms with filters, pagination, and sorting"""
+    """Get unified review listings from all platforms with filters, pagination, and sorting
+
+    Page mode (page/per_page) returns total/pages. Passing the previous
+    response's next_cursor as ``cursor`` switches to keyset pagination for
+    infinite scroll, which skips the COUNT.
+    """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', type=int)
     if per_page is None:
         per_page = request.args.get('limit', 12, type=int)
+    cursor = request.args.get('cursor')
     category = request.args.get('category')
     platform = request.args.get('platform', request.args.get('source_platform'))
     min_reward = request.args.get('min_reward', type=int)
@@ -1266,34 +1309,33 @@ def get_aggregated_listings():
     if max_reward is not None:
         query = query.filter(ReviewListing.reward_value <= max_reward)
 
-    # Sort results
-    if sort == 'reward_high' or sort == 'reward_value':
-        query = query.order_by(desc(ReviewListing.reward_value))
-    elif sort == 'applicants_few' or sort == 'applicants':
-        # Order by fewer applicants (ascending application count)
-        app_counts = (
-            db.session.query(
-                ReviewApplication.listing_id,
-                func.count(ReviewApplication.id).label('app_count')
-            )
-            .group_by(ReviewApplication.listing_id)
-            .subquery()
-        )
-        query = query.outerjoin(
-            app_counts,
-            ReviewListing.id == app_counts.c.listing_id
-        ).order_by(func.coalesce(app_counts.c.app_count, 0))
-    elif sort in ('created', 'created_at'):
-        query = query.order_by(desc(ReviewListing.scraped_at))
-    elif sort == 'deadline':
-        query = query.order_by(ReviewListing.deadline)
-    else:  # latest (default)
-        query = query.order_by(desc(ReviewListing.scraped_at))
+    # Sort results (application_count is denormalized, so no GROUP BY)
+    column, descending, nullable = _AGGREGATED_SORTS.get(sort, _AGGREGATED_SORTS['latest'])
+    order_col = desc(column) if descending else column
+    if nullable:
+        order_col = order_col.nullslast()
+    query = query.order_by(order_col, desc(ReviewListing.id) if descending else ReviewListing.id)
 
-    result = query.paginate(page=page, per_page=per_page)
+    if cursor:
+        try:
+            after_value, after_id = _decode_listing_cursor(cursor, column)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        rows = query.filter(_after_cursor(column, descending, after_value, after_id)).limit(per_page + 1).all()
+        items, has_more = rows[:per_page], len(rows) > per_page
+        total = pages = None
+    else:
+        result = query.paginate(page=page, per_page=per_page)
+        items, has_more = result.items, result.has_next
+        total, pages = result.total, result.pages
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_keyset_cursor(getattr(last, column.key), last.id)
 
     # Batch lookup: get all bookmarked listing IDs for current user in one query
-    listing_ids = [listing.id for listing in result.items]
+    listing_ids = [listing.id for listing in items]
     bookmarked_ids = set()
     if listing_ids:
         bookmarked_rows = (
@@ -1303,53 +1345,33 @@ def get_aggregated_listings():
         )
         bookmarked_ids = {row[0] for row in bookmarked_rows}
 
-    # Get application counts for each listing (for progress bar)
-    app_counts_query = (
-        db.session.query(
-            ReviewApplication.listing_id,
-            func.count(ReviewApplication.id).label('app_count')
-        )
-        .group_by(ReviewApplication.listing_id)
-        .filter(ReviewApplication.listing_id.in_(listing_ids))
-        .all()
-    )
-    app_counts_map = {row[0]: row[1] for row in app_counts_query}
-
     # Build response data
     listings_data = []
-    for listing in result.items:
+    for listing in items:
         listing_dict = listing.to_dict()
         listing_dict['is_bookmarked'] = listing.id in bookmarked_ids
-        listing_dict['current_applicants'] = app_counts_map.get(listing.id, 0)
+        listing_dict['current_applicants'] = listing.application_count or 0
         listings_data.append(listing_dict)
 
-    # Get last scraped timestamp
-    last_scraped = (
-        db.session.query(func.max(ReviewListing.scraped_at))
-        .scalar()
-    )
+    # Refreshed by crawls, not scanned per request
+    last_scraped = get_last_scraped()
 
+    fields = {
+        'listings': listings_data,
+        'total': total,
+        'pages': pages,
+        'current_page': None if cursor else page,
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'last_scraped': last_scraped.isoformat() if last_scraped else None
+    }
     payload = {
         'success': True,
-        'data': {
-            'listings': listings_data,
-            'total': result.total,
-            'pages': result.pages,
-            'current_page': page,
-            'per_page': per_page,
-            'last_scraped': last_scraped.isoformat() if last_scraped else None
-        },
+        'data': dict(fields),
         'timestamp': datetime.utcnow().isoformat()
     }
-
-    payload.update({
-        'listings': listings_data,
-        'total': result.total,
-        'pages': result.pages,
-        'current_page': page,
-        'per_page': per_page,
-        'last_scraped': last_scraped.isoformat() if last_scraped else None
-    })
+    payload.update(fields)
 
     return jsonify(payload), 200
 
@@ -0,0 +1,38 @@
+"""Review listing freshness — cached ``last_scraped`` timestamp.
+
+``MAX(review_listings.scraped_at)`` only changes when a crawl inserts
+listings, so it is recomputed once at crawl completion
+(``refresh_last_scraped``) and read from the shared cache by
+``/api/review/aggregated`` instead of being scanned per request.
+
+L1: per-process TTLCache
+L2: shared tier from backend.shared_cache (Redis, or local SQLite), so the
+scheduler process refreshing it is visible to every web worker
+"""
+from datetime import datetime
+from typing import Optional
+
+from ..cache import TTLCache
+from ..models import db, ReviewListing
+from ..shared_cache import TieredCache
+
+# Upper bound only; crawls refresh the value explicitly
+LAST_SCRAPED_TTL = 24 * 3600
+
+_CACHE = TieredCache('review', TTLCache(max_entries=16), l1_max_ttl=30)
+_KEY = 'last_scraped'
+
+
+def refresh_last_scraped() -> Optional[datetime]:
+    """Recompute MAX(scraped_at) and publish it to the cache."""
+    last = db.session.query(db.func.max(ReviewListing.scraped_at)).scalar()
+    _CACHE.set(_KEY, last.isoformat() if last else '', LAST_SCRAPED_TTL)
+    return last
+
+
+def get_last_scraped() -> Optional[datetime]:
+    """Cached MAX(scraped_at); computed on a cold cache."""
+    cached = _CACHE.get(_KEY)
+    if cached is None:
+        return refresh_last_scraped()
+    return datetime.fromisoformat(cached) if cached else None
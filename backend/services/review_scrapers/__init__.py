@@ -12,14 +12,21 @@ Aggregates experience/review campaign listings from Korean platforms:
 
 Each scraper extends BaseScraper and implements parse_listings().
 Error isolation ensures one failing scraper does not affect others.
+
+aggregate_all_listings() runs scrapers on a thread pool by default. With
+use_async=True (or SCRAPER_ASYNC_ENGINE=1) all scrapers instead share one
+AsyncFetchEngine with per-host concurrency and politeness limits.
 """
 
+import asyncio
 import logging
+import os
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional, Type
 
-from .base_scraper import BaseScraper
+
+from .base_scraper import BaseScraper, in_app_context, to_thread
 from .revu_scraper import RevuScraper
 from .reviewplace_scraper import ReviewPlaceScraper
 from .wible_scraper import WibleScraper
@@ -41,6 +48,15 @@ def _optional_scraper(module_name: str, class_name: str) -> Optional[Type[BaseSc
         return None
 
 
+def _refresh_last_scraped() -> None:
+    """Publish the new MAX(scraped_at) for /api/review/aggregated after a crawl."""
+    try:
+        from backend.services.review_freshness import refresh_last_scraped
+        refresh_last_scraped()
+    except Exception as e:
+        logger.warning(f"Could not refresh last_scraped: {e}")
+
+
 def _create_scrapers() -> List[BaseScraper]:
     """
     Create fresh scraper instances.
@@ -93,7 +109,18 @@ def get_scraper(platform: str) -> BaseScraper:
     return None
 
 
-def aggregate_all_listings(max_workers: int = 3) -> Dict[str, Dict]:
+def _use_async_engine(use_async: Optional[bool]) -> bool:
+    if use_async is None:
+        use_async = os.getenv('SCRAPER_ASYNC_ENGINE', '0').lower() in ('1', 'true', 'yes')
+    if use_async:
+        from . import async_engine
+        if async_engine.httpx is None:
+            logger.warning("httpx is not installed; falling back to threaded scraping")
+            return False
+    return use_async
+
+
+def aggregate_all_listings(max_workers: int = 3, use_async: Optional[bool] = None) -> Dict[str, Dict]:
     """
     Scrape listings from all platforms concurrently with error isolation.
 
@@ -103,6 +130,8 @@ def aggregate_all_listings(max_workers: int = 3) -> Dict[str, Dict]:
 
     Args:
         max_workers: Maximum number of concurrent scraper threads (default: 3)
+        use_async: Run on the async engine instead of threads
+            (default: SCRAPER_ASYNC_ENGINE env var)
 
     Returns:
         Dictionary with platform names as keys and result info as values:
@@ -115,16 +144,20 @@ def aggregate_all_listings(max_workers: int = 3) -> Dict[str, Dict]:
             }
         }
     """
+    if _use_async_engine(use_async):
+        return asyncio.run(aggregate_all_listings_async())
+
     scrapers = _create_scrapers()
     logger.info(f"Starting aggregation of review listings from {len(scrapers)} platforms")
     logger.info(f"Platforms: {[s.platform for s in scrapers]}")
 
     results = {}
+    scrape = in_app_context(_safe_scrape)
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all scraper tasks
         future_to_scraper = {
-            executor.submit(_safe_scrape, scraper): scraper
+            executor.submit(scrape, scraper): scraper
             for scraper in scrapers
         }
 
@@ -161,6 +194,51 @@ def aggregate_all_listings(max_workers: int = 3) -> Dict[str, Dict]:
         f"{successes} succeeded, {failures} failed"
     )
 
+    in_app_context(_refresh_last_scraped)()
+    return results
+
+
+async def aggregate_all_listings_async(platforms: Optional[List[str]] = None, engine=None) -> Dict[str, Dict]:
+    """
+    Scrape listings from all (or the given) platforms on one AsyncFetchEngine.
+
+    Paginated scrapers fetch their pages through the engine with pipelined
+    pagination; the rest run their blocking parse_listings() on worker
+    threads. Per-host limits apply across all scrapers.
+
+    Args:
+        platforms: Optional list of platform identifiers to scrape
+        engine: AsyncFetchEngine to use (default: a new one, closed on return)
+
+    Returns:
+        Dictionary with platform results (same format as aggregate_all_listings)
+    """
+    from .async_engine import AsyncFetchEngine
+
+    scrapers = _create_scrapers()
+    if platforms is not None:
+        scrapers = [s for s in scrapers if s.platform in platforms]
+    logger.info(f"Starting async aggregation of review listings from {len(scrapers)} platforms")
+
+    owns_engine = engine is None
+    if owns_engine:
+        engine = AsyncFetchEngine()
+    try:
+        outcomes = await asyncio.gather(*(_safe_scrape_async(s, engine) for s in scrapers))
+    finally:
+        if owns_engine:
+            await engine.aclose()
+
+    results = {scraper.platform: result for scraper, result in zip(scrapers, outcomes)}
+
+    total_found = sum(r.get('count', 0) for r in results.values())
+    successes = sum(1 for r in results.values() if r['status'] == 'success')
+    logger.info(
+        f"Async aggregation completed: {total_found} listings found | "
+        f"{successes} succeeded, {len(results) - successes} failed | "
+        f"{engine.stats['requests']} requests"
+    )
+    await to_thread(_refresh_last_scraped)
     return results
 
 
@@ -187,9 +265,10 @@ def aggregate_specific_platforms(platforms: List[str], max_workers: int = 3) ->
         logger.info(f"Available platforms: {[s.platform for s in all_scrapers]}")
         return results
 
+    scrape = in_app_context(_safe_scrape)
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_scraper = {
-            executor.submit(_safe_scrape, scraper): scraper
+            executor.submit(scrape, scraper): scraper
             for scraper in selected_scrapers
         }
 
@@ -214,6 +293,7 @@ def aggregate_specific_platforms(platforms: List[str], max_workers: int = 3) ->
 
     total_found = sum(r.get('count', 0) for r in results.values())
     logger.info(f"Aggregation completed. Total: {total_found} listings processed")
+    in_app_context(_refresh_last_scraped)()
     return results
 
 
@@ -253,6 +333,31 @@ def _safe_scrape(scraper: BaseScraper) -> Dict:
         }
 
 
+async def _safe_scrape_async(scraper: BaseScraper, engine) -> Dict:
+    """Async _safe_scrape(): run a scraper on the engine with full error isolation."""
+    try:
+        listings = await scraper.parse_listings_async(engine)
+        return {
+            'count': len(listings),
+            'saved': len(listings),
+            'status': 'success',
+            'error': None,
+        }
+    except Exception as e:
+        error_msg = f"{type(e).__name__}: {str(e)}"
+        logger.error(
+            f"[{scraper.platform}] Scraper crashed:\n"
+            f"  Error: {error_msg}\n"
+            f"  Traceback: {traceback.format_exc()}"
+        )
+        return {
+            'count': 0,
+            'saved': 0,
+            'status': 'error',
+            'error': error_msg,
+        }
+
+
 def list_available_platforms() -> List[str]:
     """
     Get list of available scraper platforms.
@@ -292,6 +397,7 @@ __all__ = [
     'InflexerScraper',
     'get_scraper',
     'aggregate_all_listings',
+    'aggregate_all_listings_async',
     'aggregate_specific_platforms',
     'list_available_platforms',
     'get_platform_info',
@@ -0,0 +1,220 @@
+"""Async Fetch Engine - Pooled httpx fetching shared by all review scrapers
+
+One AsyncFetchEngine serves every scraper in an aggregation run:
+  - connection pooling: one httpx.AsyncClient per proxy URL (keep-alive)
+  - per-host concurrency: at most ``per_host_concurrency`` requests in flight
+    to the same host, across all scrapers (several scrapers hit Naver)
+  - politeness: request starts to one host are spaced ``host_min_interval``
+    seconds apart, replacing BaseScraper.rate_limit() sleeps
+  - retries with exponential backoff, proxy rotation via the scraper's
+    proxy_manager and CAPTCHA solving via its captcha_solver
+  - conditional GETs against the scraper's crawl_state (if_changed=True)
+
+Usage:
+    async with AsyncFetchEngine() as engine:
+        soup = await engine.fetch(scraper, url, params={'page': 1})
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from .base_scraper import to_thread
+from .crawl_state import UNCHANGED, page_key
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is optional for the thread path
+    httpx = None
+
+logger = logging.getLogger('review.scrapers')
+
+PER_HOST_CONCURRENCY = int(os.getenv('SCRAPER_PER_HOST_CONCURRENCY', '2'))
+HOST_MIN_INTERVAL = float(os.getenv('SCRAPER_HOST_MIN_INTERVAL', '0.5'))
+MAX_CONNECTIONS = int(os.getenv('SCRAPER_MAX_CONNECTIONS', '20'))
+
+
+def _proxy_kwarg() -> str:
+    """httpx renamed ``proxies`` to ``proxy`` in 0.26."""
+    params = inspect.signature(httpx.AsyncClient.__init__).parameters
+    return 'proxy' if 'proxy' in params else 'proxies'
+
+
+class _HostGate:
+    """Concurrency cap plus minimum spacing between request starts for one host."""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._min_interval = min_interval
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            # Reserve the next start slot under the lock, sleep outside it
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self._min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+
+class AsyncFetchEngine:
+    """Shared async HTTP fetcher with per-host limits for BaseScraper subclasses"""
+
+    def __init__(
+        self,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        host_min_interval: float = HOST_MIN_INTERVAL,
+        max_connections: int = MAX_CONNECTIONS,
+        timeout: float = 10,
+        transport=None,
+    ):
+        """
+        Args:
+            per_host_concurrency: Max in-flight requests per host
+            host_min_interval: Min seconds between request starts per host
+            max_connections: Connection pool size per client
+            timeout: Default request timeout in seconds
+            transport: Optional httpx transport (used by tests)
+        """
+        if httpx is None:
+            raise RuntimeError("httpx is required for the async scraping engine")
+
+        self.per_host_concurrency = per_host_concurrency
+        self.host_min_interval = host_min_interval
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._transport = transport
+        self._clients: Dict[Optional[str], 'httpx.AsyncClient'] = {}
+        self._gates: Dict[str, _HostGate] = {}
+        self.stats = {'requests': 0, 'failures': 0, 'unchanged': 0, 'captchas_solved': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled clients"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    def _client(self, proxy: Optional[str]) -> 'httpx.AsyncClient':
+        # httpx binds proxies per client, so keep one pooled client per proxy
+        client = self._clients.get(proxy)
+        if client is None:
+            kwargs = {
+                'limits': httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                'timeout': self.timeout,
+                'follow_redirects': True,
+            }
+            if self._transport is not None:
+                kwargs['transport'] = self._transport
+            if proxy:
+                kwargs[_proxy_kwarg()] = proxy
+            client = self._clients[proxy] = httpx.AsyncClient(**kwargs)
+        return client
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlsplit(url).netloc
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = _HostGate(self.per_host_concurrency, self.host_min_interval)
+        return gate
+
+    async def fetch(self, scraper, url: str, params: Dict = None, timeout: float = None,
+                    if_changed: bool = False) -> Optional[BeautifulSoup]:
+        """
+        Async equivalent of BaseScraper.fetch_page().
+
+        Uses the scraper's session headers, proxy_manager, captcha_solver and
+        crawl_state.
+
+        Args:
+            scraper: BaseScraper the request is made for
+            url: URL to fetch
+            params: Optional query parameters
+            timeout: Request timeout in seconds (default: engine timeout)
+            if_changed: Send a conditional GET and return UNCHANGED, without
+                parsing, if the page matches the last crawl
+
+        Returns:
+            BeautifulSoup object, UNCHANGED, or None if failed
+        """
+        state = scraper.crawl_state if if_changed else None
+        key = page_key(url, params)
+        headers = dict(scraper.session.headers)
+        if state is not None:
+            headers.update(state.conditional_headers(key))
+        for attempt in range(scraper.max_retries):
+            proxy = scraper.proxy_manager.get_proxy() if scraper.proxy_manager else None
+
+            try:
+                async with self._gate(url):
+                    self.stats['requests'] += 1
+                    resp = await self._client(proxy).get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=timeout or self.timeout
+                    )
+                resp.raise_for_status()
+
+                if scraper.proxy_manager and proxy:
+                    scraper.proxy_manager.mark_proxy_healthy(proxy)
+
+                if state is not None and scraper._unchanged(state, key, resp.status_code, resp.headers, resp.content):
+                    self.stats['unchanged'] += 1
+                    return UNCHANGED
+
+                soup = await to_thread(BeautifulSoup, resp.content, 'html.parser')
+
+                # Solve and retry with the token if the page is a CAPTCHA wall
+                captcha_params = None
+                if scraper.captcha_solver:
+                    captcha_params = await to_thread(
+                        scraper.solve_captcha_challenge, soup, str(resp.url)
+                    )
+                if captcha_params:
+                    self.stats['captchas_solved'] += 1
+                    params = {**(params or {}), **captcha_params}
+                    continue
+
+                return soup
+
+            except httpx.TimeoutException:
+                logger.warning(f"[{scraper.platform}] Timeout fetching {url} (attempt {attempt + 1}/{scraper.max_retries})")
+            except httpx.TransportError:
+                logger.warning(f"[{scraper.platform}] Connection error fetching {url} (attempt {attempt + 1}/{scraper.max_retries})")
+            except httpx.HTTPError as e:
+                logger.error(f"[{scraper.platform}] Error fetching {url}: {e}")
+
+            self.stats['failures'] += 1
+            if scraper.proxy_manager and proxy:
+                scraper.proxy_manager.mark_proxy_failed(proxy)
+            if attempt < scraper.max_retries - 1:
+                await asyncio.sleep(scraper.initial_retry_delay * (2 ** attempt))
+
+        logger.error(f"[{scraper.platform}] Failed to fetch {url} after {scraper.max_retries} attempts")
+        return None
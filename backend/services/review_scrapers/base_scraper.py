@@ -2,16 +2,48 @@
 
 import requests
 from bs4 import BeautifulSoup
+import asyncio
 import time
 import logging
 import os
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from abc import ABC, abstractmethod
 
+from flask import current_app, has_app_context
+
+from .crawl_state import CrawlStateStore, UNCHANGED, page_key
+
 logger = logging.getLogger('review.scrapers')
 
 
+def in_app_context(fn):
+    """Wrap fn to run inside a fresh app context of the caller's Flask app.
+
+    save_listings() and the crawl state store need db.session, which is not
+    thread-safe. Each call gets its own context, so its own session, which is
+    removed when the call returns.
+    """
+    if not has_app_context():
+        return fn
+    app = current_app._get_current_object()
+
+    def run(*args, **kwargs):
+        with app.app_context():
+            return fn(*args, **kwargs)
+    return run
+
+
+async def to_thread(fn, *args):
+    """asyncio.to_thread() with fn in its own app context.
+
+    A plain to_thread() copies the caller's contextvars, so concurrent
+    worker threads would share the event loop's app context and db.session.
+    """
+    return await asyncio.to_thread(in_app_context(fn), *args)
+
+
 class BaseScraper(ABC):
     """Abstract base class for all review platform scrapers"""
 
@@ -50,6 +82,11 @@ class BaseScraper(ABC):
         if self.use_captcha_solver:
             self._init_captcha_solver()
 
+        # Conditional-GET / content-hash state for incremental crawls
+        self.crawl_state = None
+        if os.getenv('SCRAPER_INCREMENTAL', '1').lower() in ('1', 'true', 'yes'):
+            self.crawl_state = CrawlStateStore(platform_name)
+
     def _init_proxy_manager(self):
         """Initialize proxy manager for request rotation"""
         try:
@@ -74,7 +111,7 @@ class BaseScraper(ABC):
             logger.warning(f"[{self.platform}] Failed to initialize CAPTCHA solver: {e}")
             self.captcha_solver = None
 
-    def fetch_page(self, url: str, params: Dict = None, timeout: int = 10) -> Optional[BeautifulSoup]:
+    def fetch_page(self, url: str, params: Dict = None, timeout: int = 10, if_changed: bool = False) -> Optional[BeautifulSoup]:
         """
         Fetch a page with error handling, proxy rotation, and retry logic.
 
@@ -85,10 +122,16 @@ class BaseScraper(ABC):
             url: URL to fetch
             params: Optional query parameters
             timeout: Request timeout in seconds
+            if_changed: Send a conditional GET and return UNCHANGED, without
+                parsing, if the page matches the last crawl (needs crawl_state)
 
         Returns:
-            BeautifulSoup object or None if failed
+            BeautifulSoup object, UNCHANGED, or None if failed
         """
+        state = self.crawl_state if if_changed else None
+        key = page_key(url, params)
+        conditional_headers = state.conditional_headers(key) if state else None
+
         for attempt in range(self.max_retries):
             proxy = None
             if self.proxy_manager:
@@ -104,7 +147,8 @@ class BaseScraper(ABC):
                     url,
                     params=params,
                     timeout=timeout,
-                    proxies=proxies
+                    proxies=proxies,
+                    headers=conditional_headers
                 )
                 resp.raise_for_status()
 
@@ -112,6 +156,9 @@ class BaseScraper(ABC):
                 if self.proxy_manager and proxy:
                     self.proxy_manager.mark_proxy_healthy(proxy)
 
+                if state is not None and self._unchanged(state, key, resp.status_code, resp.headers, resp.content):
+                    return UNCHANGED
+
                 return BeautifulSoup(resp.content, 'html.parser')
 
             except requests.exceptions.Timeout:
@@ -141,10 +188,170 @@ class BaseScraper(ABC):
         logger.error(f"[{self.platform}] Failed to fetch {url} after {self.max_retries} attempts")
         return None
 
+    def _unchanged(self, state: CrawlStateStore, key: str, status_code: int, headers, body: bytes) -> bool:
+        """True for a 304 or a body identical to the last crawl."""
+        if status_code == 304:
+            logger.debug(f"[{self.platform}] Not modified: {key}")
+            return True
+        if not state.page_changed(key, headers.get('ETag'), headers.get('Last-Modified'), body):
+            logger.debug(f"[{self.platform}] Unchanged content: {key}")
+            return True
+        return False
+
     def rate_limit(self):
         """Apply rate limiting between requests"""
         time.sleep(self.delay)
 
+    def solve_captcha_challenge(self, soup: BeautifulSoup, page_url: str) -> Optional[Dict]:
+        """
+        Solve a reCAPTCHA/hCaptcha widget embedded in a fetched page.
+
+        Args:
+            soup: Parsed page
+            page_url: URL the page was served from
+
+        Returns:
+            Query parameters carrying the solved token, or None if the page has
+            no challenge or it could not be solved
+        """
+        if not self.captcha_solver:
+            return None
+
+        widget = soup.select_one('.g-recaptcha[data-sitekey], .h-captcha[data-sitekey]')
+        if not widget:
+            return None
+
+        is_hcaptcha = 'h-captcha' in (widget.get('class') or [])
+        result = self.captcha_solver.solve_captcha(
+            captcha_type='hcaptcha' if is_hcaptcha else 'recaptcha_v2',
+            site_key=widget['data-sitekey'],
+            page_url=page_url
+        )
+        if not result or not result.get('success'):
+            logger.warning(f"[{self.platform}] CAPTCHA on {page_url} could not be solved")
+            return None
+
+        self.captcha_cost_tracker += result.get('cost', 0)
+        field = 'h-captcha-response' if is_hcaptcha else 'g-recaptcha-response'
+        return {field: result['token']}
+
+    # ------------------------------------------------------------------
+    # Paginated crawling
+    #
+    # Scrapers whose listing pages are addressed by a fixed list of URLs
+    # implement page_requests() and parse_page(). crawl_pages() walks them
+    # sequentially; crawl_pages_async() fetches ahead through an
+    # AsyncFetchEngine while earlier pages are parsed. Both send conditional
+    # requests and skip pages that are unchanged since the last crawl.
+    # ------------------------------------------------------------------
+
+    def page_requests(self) -> Optional[List[Tuple[str, Optional[Dict]]]]:
+        """
+        List the (url, params) of each listing page, in crawl order.
+
+        Returns:
+            List of requests, or None if the scraper paginates itself
+        """
+        return None
+
+    def parse_page(self, soup: BeautifulSoup, page: int) -> Optional[List[Dict]]:
+        """
+        Parse the listings on one page.
+
+        Args:
+            soup: Parsed page
+            page: 1-based page number
+
+        Returns:
+            Valid listings on the page, or None to stop paginating
+        """
+        raise NotImplementedError
+
+    def crawl_pages(self) -> List[Dict]:
+        """Fetch and parse each page from page_requests() in turn."""
+        listings = []
+        for page, (url, params) in enumerate(self.page_requests(), start=1):
+            logger.debug(f"[{self.platform}] Fetching page {page}: {url}")
+            soup = self.fetch_page(url, params=params, if_changed=True)
+            if soup is UNCHANGED:
+                self.rate_limit()
+                continue
+            if not soup:
+                logger.warning(f"[{self.platform}] Failed to fetch page {page}, stopping")
+                break
+
+            page_listings = self.parse_page(soup, page)
+            if page_listings is None:
+                break
+            listings.extend(page_listings)
+            self._confirm_page(url, params, page_listings)
+
+            self.rate_limit()
+        return listings
+
+    async def crawl_pages_async(self, engine, prefetch: int = 3) -> List[Dict]:
+        """
+        Pipelined crawl_pages(): keep up to ``prefetch`` pages in flight.
+
+        Pages past the last one are fetched speculatively and discarded.
+        Politeness is enforced by the engine's per-host limits, so there is
+        no rate_limit() sleep between pages.
+        """
+        page_requests = self.page_requests()
+        if self.crawl_state is not None:
+            # conditional_headers()/page_changed() would otherwise query on the event loop
+            await to_thread(self.crawl_state.load)
+        pending = deque()
+        issued = 0
+        listings = []
+        try:
+            for page in range(1, len(page_requests) + 1):
+                while issued < len(page_requests) and len(pending) < prefetch:
+                    url, params = page_requests[issued]
+                    pending.append(asyncio.ensure_future(
+                        engine.fetch(self, url, params=params, if_changed=True)
+                    ))
+                    issued += 1
+
+                soup = await pending.popleft()
+                if soup is UNCHANGED:
+                    continue
+                if not soup:
+                    logger.warning(f"[{self.platform}] Failed to fetch page {page}, stopping")
+                    break
+
+                page_listings = self.parse_page(soup, page)
+                if page_listings is None:
+                    break
+                listings.extend(page_listings)
+                self._confirm_page(*page_requests[page - 1], page_listings)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return listings
+
+    def _confirm_page(self, url: str, params: Optional[Dict], page_listings: List[Dict]) -> None:
+        # Only pages that yielded listings are remembered, so the end of
+        # pagination is re-checked on every crawl
+        if self.crawl_state is not None and page_listings:
+            self.crawl_state.confirm_page(page_key(url, params))
+
+    async def parse_listings_async(self, engine) -> List[Dict]:
+        """
+        Async counterpart of parse_listings().
+
+        Paginated scrapers crawl through the engine; others run their
+        blocking parse_listings() on a worker thread.
+        """
+        if self.page_requests() is None:
+            return await to_thread(self.parse_listings)
+
+        listings = await self.crawl_pages_async(engine)
+        saved_count = await to_thread(self.save_listings, listings)
+        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved (total found: {len(listings)})")
+        return listings
+
     @abstractmethod
     def parse_listings(self) -> List[Dict]:
         """
@@ -170,58 +377,96 @@ class BaseScraper(ABC):
 
     def save_listings(self, listings: List[Dict]) -> int:
         """
-        Save listings to database, avoiding duplicates.
+        Save listings to database as one bulk upsert.
+
+        Listings whose content hash matches the last crawl are skipped
+        without touching the DB. For the rest, existing rows are loaded with
+        one IN query per chunk; new listings are inserted and changed ones
+        updated in place. Staged crawl state is committed in the same
+        transaction.
 
         Args:
             listings: List of listing dictionaries
 
         Returns:
-            Number of listings saved
+            Number of new listings saved
         """
         from backend.models import db, ReviewListing
 
+        if self.crawl_state is not None:
+            changed = self.crawl_state.changed_listings(listings)
+        else:
+            changed = {str(l['external_id']): (l, None) for l in listings}
+
+        existing = {}
+        external_ids = list(changed)
+        try:
+            for start in range(0, len(external_ids), 500):
+                chunk = external_ids[start:start + 500]
+                for row in ReviewListing.query.filter(
+                    ReviewListing.source_platform == self.platform,
+                    ReviewListing.external_id.in_(chunk)
+                ).all():
+                    existing[row.external_id] = row
+        except Exception as e:
+            logger.error(f"[{self.platform}] Error loading existing listings: {e}")
+            return 0
+
         saved_count = 0
-        for listing_data in listings:
+        updated_count = 0
+        for external_id, (listing_data, digest) in changed.items():
             try:
-                # Check if already exists
-                existing = ReviewListing.query.filter_by(
-                    source_platform=self.platform,
-                    external_id=listing_data['external_id']
-                ).first()
-
-                if existing:
-                    logger.debug(f"[{self.platform}] Listing {listing_data['external_id']} already exists, skipping")
-                    continue
-
-                # Create new listing
-                listing = ReviewListing(
-                    source_platform=self.platform,
-                    external_id=listing_data['external_id'],
-                    title=listing_data.get('title', ''),
-                    brand=listing_data.get('brand'),
-                    category=listing_data.get('category'),
-                    reward_type=listing_data.get('reward_type'),
-                    reward_value=listing_data.get('reward_value', 0),
-                    deadline=listing_data.get('deadline'),
-                    max_applicants=listing_data.get('max_applicants'),
-                    url=listing_data.get('url'),
-                    image_url=listing_data.get('image_url'),
-                    requirements=listing_data.get('requirements', {}),
-                    status='active'
-                )
-                db.session.add(listing)
-                saved_count += 1
+                fields = {
+                    'title': listing_data.get('title', ''),
+                    'brand': listing_data.get('brand'),
+                    'category': listing_data.get('category'),
+                    'reward_type': listing_data.get('reward_type'),
+                    'reward_value': listing_data.get('reward_value', 0),
+                    'deadline': listing_data.get('deadline'),
+                    'max_applicants': listing_data.get('max_applicants'),
+                    'url': listing_data.get('url'),
+                    'image_url': listing_data.get('image_url'),
+                    'requirements': listing_data.get('requirements', {}),
+                }
+                row = existing.get(external_id)
+                if row is None:
+                    db.session.add(ReviewListing(
+                        source_platform=self.platform,
+                        external_id=listing_data['external_id'],
+                        status='active',
+                        **fields
+                    ))
+                    saved_count += 1
+                elif digest is not None:
+                    # Known to differ from the last crawl: refresh scraped fields
+                    for name, value in fields.items():
+                        setattr(row, name, value)
+                    updated_count += 1
+                else:
+                    logger.debug(f"[{self.platform}] Listing {external_id} already exists, skipping")
+
+                if digest is not None:
+                    self.crawl_state.stage_listing(external_id, digest)
 
             except Exception as e:
                 logger.error(f"[{self.platform}] Error saving listing {listing_data.get('external_id')}: {e}")
                 continue
 
         try:
+            if self.crawl_state is not None:
+                self.crawl_state.add_to_session(db.session)
             db.session.commit()
-            logger.info(f"[{self.platform}] Saved {saved_count} new listings")
+            if self.crawl_state is not None:
+                self.crawl_state.committed()
+            logger.info(
+                f"[{self.platform}] Saved {saved_count} new listings, updated {updated_count} "
+                f"({len(listings) - len(changed)} unchanged)"
+            )
         except Exception as e:
             logger.error(f"[{self.platform}] Error committing listings: {e}")
             db.session.rollback()
+            if self.crawl_state is not None:
+                self.crawl_state.discard_staged()
             return 0
 
         return saved_count
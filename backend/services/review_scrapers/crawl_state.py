@@ -0,0 +1,198 @@
+"""Crawl State Store - Incremental crawling state for one platform
+
+Persists, per platform, in the review_crawl_states table:
+  - page state:    ETag / Last-Modified validators and a SHA-256 of the body
+                   for each listing page URL, used to send conditional GETs
+                   and skip unchanged pages before BeautifulSoup parsing
+  - listing state: a SHA-256 of each parsed listing, keyed by external_id,
+                   used to skip unchanged listings before touching
+                   review_listings
+
+State is loaded with one query on first use, or up front with load(); the
+async crawl calls load() on a worker thread to keep the query off the event
+loop. New state is staged in memory and written in the same transaction as
+the listings (BaseScraper.save_listings), so a failed save never marks pages
+as already crawled.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger('review.scrapers')
+
+PAGE = 'page'
+LISTING = 'listing'
+
+# Returned by fetch_page(if_changed=True) / AsyncFetchEngine.fetch for pages
+# that are unchanged since the last crawl
+UNCHANGED = object()
+
+
+def page_key(url: str, params: Optional[Dict] = None) -> str:
+    """Canonical state key for a page request (URL plus sorted query)."""
+    if not params:
+        return url
+    query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def _json_default(value):
+    # Deadlines are often derived from "D-N" labels relative to now; compare
+    # them by day so they do not make every listing look changed
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value)
+
+
+def content_hash(content) -> str:
+    """SHA-256 hex digest of raw bytes, or of a listing dict's stable JSON form."""
+    if isinstance(content, dict):
+        content = json.dumps(content, sort_keys=True, default=_json_default, ensure_ascii=False)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+class CrawlStateStore:
+    """Loaded + staged crawl state for one platform"""
+
+    def __init__(self, platform: str):
+        self.platform = platform
+        self._states: Optional[Dict[Tuple[str, str], Dict]] = None
+        self._observed: Dict[str, Dict] = {}
+        self._staged: Dict[Tuple[str, str], Dict] = {}
+
+    def _load(self) -> Dict[Tuple[str, str], Dict]:
+        if self._states is None:
+            self._states = {}
+            try:
+                from backend.models import ReviewCrawlState
+
+                for row in ReviewCrawlState.query.filter_by(platform=self.platform).all():
+                    self._states[(row.kind, row.key)] = {
+                        'etag': row.etag,
+                        'last_modified': row.last_modified,
+                        'content_hash': row.content_hash,
+                    }
+            except Exception as e:
+                logger.debug(f"[{self.platform}] Crawl state unavailable, crawling in full: {e}")
+        return self._states
+
+    def load(self) -> None:
+        """Load the stored state now instead of on first use (one query)."""
+        self._load()
+
+    # ---- pages ----
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously seen page."""
+        state = self._load().get((PAGE, key))
+        headers = {}
+        if state:
+            if state['etag']:
+                headers['If-None-Match'] = state['etag']
+            if state['last_modified']:
+                headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def page_changed(self, key: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> bool:
+        """
+        Record a fetched page body and report whether it differs from last crawl.
+
+        The new state is held until confirm_page() is called for the key.
+        """
+        digest = content_hash(body)
+        self._observed[key] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': digest,
+        }
+        state = self._load().get((PAGE, key))
+        return not state or state['content_hash'] != digest
+
+    def confirm_page(self, key: str) -> None:
+        """Stage the observed state of a page whose listings were parsed."""
+        observed = self._observed.pop(key, None)
+        if observed:
+            self._staged[(PAGE, key)] = observed
+
+    # ---- listings ----
+
+    def changed_listings(self, listings) -> Dict[str, Tuple[Dict, str]]:
+        """
+        Filter listings down to new or changed ones.
+
+        Returns:
+            {external_id: (listing, content_hash)} for listings whose hash
+            differs from the stored one (last occurrence wins on duplicates)
+        """
+        states = self._load()
+        changed = {}
+        for listing in listings:
+            external_id = str(listing['external_id'])
+            digest = content_hash(listing)
+            state = states.get((LISTING, external_id))
+            if state and state['content_hash'] == digest:
+                continue
+            changed[external_id] = (listing, digest)
+        return changed
+
+    def stage_listing(self, external_id: str, digest: str) -> None:
+        self._staged[(LISTING, str(external_id))] = {
+            'etag': None,
+            'last_modified': None,
+            'content_hash': digest,
+        }
+
+    # ---- persistence ----
+
+    def add_to_session(self, session) -> int:
+        """
+        Upsert staged state rows into ``session`` (caller commits).
+
+        Existing rows are fetched with one IN query per chunk of keys.
+        """
+        if not self._staged:
+            return 0
+
+        from backend.models import ReviewCrawlState
+
+        now = datetime.utcnow()
+        staged = list(self._staged.items())
+        for kind in (PAGE, LISTING):
+            keys = [key for (k, key), _ in staged if k == kind]
+            existing = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                for row in ReviewCrawlState.query.filter(
+                    ReviewCrawlState.platform == self.platform,
+                    ReviewCrawlState.kind == kind,
+                    ReviewCrawlState.key.in_(chunk),
+                ).all():
+                    existing[row.key] = row
+
+            for key in keys:
+                values = self._staged[(kind, key)]
+                row = existing.get(key)
+                if row is None:
+                    session.add(ReviewCrawlState(
+                        platform=self.platform, kind=kind, key=key, changed_at=now, **values
+                    ))
+                else:
+                    row.etag = values['etag']
+                    row.last_modified = values['last_modified']
+                    row.content_hash = values['content_hash']
+                    row.changed_at = now
+        return len(staged)
+
+    def committed(self) -> None:
+        """Fold staged state into the loaded view after a successful commit."""
+        self._load().update(self._staged)
+        self._staged = {}
+
+    def discard_staged(self) -> None:
+        self._staged = {}
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger('review.scrapers')
@@ -21,48 +21,49 @@ class InflexerScraper(BaseScraper):
         Returns:
             List of listing dictionaries
         """
-        listings = []
-        page = 1
-        max_pages = 5  # Scrape first 5 pages for performance
-
         logger.info(f"[{self.platform}] Starting to scrape listings...")
 
-        while page <= max_pages:
-            url = f"{self.base_url}/campaigns"
-            params = {'page': page, 'type': 'active'}
-
-            logger.debug(f"[{self.platform}] Fetching page {page}: {url}")
-            soup = self.fetch_page(url, params=params)
+        listings = self.crawl_pages()
 
-            if not soup:
-                logger.warning(f"[{self.platform}] Failed to fetch page {page}, stopping")
-                break
+        # Save to database
+        saved_count = self.save_listings(listings)
+        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved")
 
-            # Find campaign containers
-            items = soup.select('.campaign-card, .campaign-item, .deal-card, [data-campaign-id]')
+        return listings
 
-            if not items:
-                logger.warning(f"[{self.platform}] No items found on page {page}, stopping")
-                break
+    def page_requests(self) -> List[Tuple[str, Dict]]:
+        """Active campaign pages 1..5 (first 5 pages for performance)"""
+        max_pages = 5
+        return [
+            (f"{self.base_url}/campaigns", {'page': page, 'type': 'active'})
+            for page in range(1, max_pages + 1)
+        ]
 
-            logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
+    def parse_page(self, soup, page: int) -> Optional[List[Dict]]:
+        """
+        Parse one campaign listing page.
 
-            for item in items:
-                try:
-                    listing = self._parse_item(item)
-                    if listing and self.validate_listing(listing):
-                        listings.append(listing)
-                except Exception as e:
-                    logger.error(f"[{self.platform}] Error parsing item: {e}")
-                    continue
+        Returns:
+            Listings on the page, or None to stop pagination
+        """
+        # Find campaign containers
+        items = soup.select('.campaign-card, .campaign-item, .deal-card, [data-campaign-id]')
 
-            self.rate_limit()
-            page += 1
+        if not items:
+            logger.warning(f"[{self.platform}] No items found on page {page}, stopping")
+            return None
 
-        # Save to database
-        saved_count = self.save_listings(listings)
-        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved")
+        logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
 
+        listings = []
+        for item in items:
+            try:
+                listing = self._parse_item(item)
+                if listing and self.validate_listing(listing):
+                    listings.append(listing)
+            except Exception as e:
+                logger.error(f"[{self.platform}] Error parsing item: {e}")
+                continue
         return listings
 
     def _parse_item(self, item) -> Dict:
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger('review.scrapers')
@@ -16,42 +16,36 @@ class MiblScraper(BaseScraper):
 
     def parse_listings(self) -> List[Dict]:
         """Parse listings from MiBL"""
-        listings = []
-        page = 1
-        max_pages = 5
-
         logger.info(f"[{self.platform}] Starting to scrape listings...")
 
-        while page <= max_pages:
-            url = f"{self.base_url}/collaboration"
-            params = {'page': page}
-
-            logger.debug(f"[{self.platform}] Fetching page {page}")
-            soup = self.fetch_page(url, params=params)
+        listings = self.crawl_pages()
 
-            if not soup:
-                break
-
-            items = soup.select('.collab-card, .job-item, .offer-card')
+        saved_count = self.save_listings(listings)
+        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved")
+        return listings
 
-            if not items:
-                break
+    def page_requests(self) -> List[Tuple[str, Dict]]:
+        """Collaboration pages 1..5"""
+        max_pages = 5
+        return [(f"{self.base_url}/collaboration", {'page': page}) for page in range(1, max_pages + 1)]
 
-            logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
+    def parse_page(self, soup, page: int) -> Optional[List[Dict]]:
+        """Parse one collaboration page; None stops pagination"""
+        items = soup.select('.collab-card, .job-item, .offer-card')
 
-            for item in items:
-                try:
-                    listing = self._parse_item(item)
-                    if listing and self.validate_listing(listing):
-                        listings.append(listing)
-                except Exception as e:
-                    logger.error(f"[{self.platform}] Error parsing item: {e}")
+        if not items:
+            return None
 
-            self.rate_limit()
-            page += 1
+        logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
 
-        saved_count = self.save_listings(listings)
-        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved")
+        listings = []
+        for item in items:
+            try:
+                listing = self._parse_item(item)
+                if listing and self.validate_listing(listing):
+                    listings.append(listing)
+            except Exception as e:
+                logger.error(f"[{self.platform}] Error parsing item: {e}")
         return listings
 
     def _parse_item(self, item) -> Dict:
@@ -23,7 +23,7 @@ Pagination: /pr/?page=2
 import re
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin
 from .base_scraper import BaseScraper
 
@@ -50,53 +50,48 @@ class ReviewPlaceScraper(BaseScraper):
         Returns:
             List of listing dictionaries
         """
-        listings = []
-        max_pages = 3
-
         logger.info(f"[{self.platform}] Starting to scrape listings from reviewplace.co.kr/pr/ ...")
 
-        for page in range(1, max_pages + 1):
-            url = f"{self.base_url}/pr/"
-            params = {'page': page}
-
-            logger.debug(f"[{self.platform}] Fetching page {page}: {url}")
-            soup = self.fetch_page(url, params=params)
-
-            if not soup:
-                logger.warning(f"[{self.platform}] Failed to fetch page {page}, stopping")
-                break
+        listings = self.crawl_pages()
 
-            # Campaign items: #cmp_list > div.item
-            cmp_list = soup.select_one('#cmp_list')
-            if not cmp_list:
-                # Fallback: try direct .campaign_list selector
-                cmp_list = soup.select_one('.campaign_list.c_list')
-
-            if not cmp_list:
-                logger.warning(f"[{self.platform}] Campaign list container not found on page {page}")
-                break
-
-            items = cmp_list.select('div.item')
+        saved_count = self.save_listings(listings)
+        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved (total found: {len(listings)})")
+        return listings
 
-            if not items:
-                logger.info(f"[{self.platform}] No items found on page {page}, stopping pagination")
-                break
+    def page_requests(self) -> List[Tuple[str, Dict]]:
+        """Listing pages /pr/?page=1..3"""
+        max_pages = 3
+        return [(f"{self.base_url}/pr/", {'page': page}) for page in range(1, max_pages + 1)]
+
+    def parse_page(self, soup, page: int) -> Optional[List[Dict]]:
+        """Parse one /pr/ listing page; None stops pagination."""
+        # Campaign items: #cmp_list > div.item
+        cmp_list = soup.select_one('#cmp_list')
+        if not cmp_list:
+            # Fallback: try direct .campaign_list selector
+            cmp_list = soup.select_one('.campaign_list.c_list')
+
+        if not cmp_list:
+            logger.warning(f"[{self.platform}] Campaign list container not found on page {page}")
+            return None
 
-            logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
+        items = cmp_list.select('div.item')
 
-            for item in items:
-                try:
-                    listing = self._parse_item(item)
-                    if listing and self.validate_listing(listing):
-                        listings.append(listing)
-                except Exception as e:
-                    logger.error(f"[{self.platform}] Error parsing item: {e}")
-                    continue
+        if not items:
+            logger.info(f"[{self.platform}] No items found on page {page}, stopping pagination")
+            return None
 
-            self.rate_limit()
+        logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
 
-        saved_count = self.save_listings(listings)
-        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved (total found: {len(listings)})")
+        listings = []
+        for item in items:
+            try:
+                listing = self._parse_item(item)
+                if listing and self.validate_listing(listing):
+                    listings.append(listing)
+            except Exception as e:
+                logger.error(f"[{self.platform}] Error parsing item: {e}")
+                continue
         return listings
 
     def _parse_item(self, item) -> Optional[Dict]:
@@ -29,7 +29,7 @@ Channels: 블로그(01), 인스타그램(03), 유튜브(04), 기타(06)
 import re
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlencode
 from .base_scraper import BaseScraper
 
@@ -70,44 +70,39 @@ class SeouloubaScraper(BaseScraper):
         Returns:
             List of listing dictionaries
         """
-        listings = []
-        max_pages = 3
-
         logger.info(f"[{self.platform}] Starting to scrape listings from seoulouba.co.kr/campaign/ ...")
 
-        for page in range(1, max_pages + 1):
-            url = f"{self.base_url}/campaign/"
-            params = {'page': page}
-
-            logger.debug(f"[{self.platform}] Fetching page {page}: {url}")
-            soup = self.fetch_page(url, params=params)
+        listings = self.crawl_pages()
 
-            if not soup:
-                logger.warning(f"[{self.platform}] Failed to fetch page {page}, stopping")
-                break
-
-            # Campaign items: li.campaign_content
-            items = soup.select('li.campaign_content')
+        saved_count = self.save_listings(listings)
+        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved (total found: {len(listings)})")
+        return listings
 
-            if not items:
-                logger.info(f"[{self.platform}] No items found on page {page}, stopping pagination")
-                break
+    def page_requests(self) -> List[Tuple[str, Dict]]:
+        """Listing pages /campaign/?page=1..3"""
+        max_pages = 3
+        return [(f"{self.base_url}/campaign/", {'page': page}) for page in range(1, max_pages + 1)]
 
-            logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
+    def parse_page(self, soup, page: int) -> Optional[List[Dict]]:
+        """Parse one /campaign/ listing page; None stops pagination."""
+        # Campaign items: li.campaign_content
+        items = soup.select('li.campaign_content')
 
-            for item in items:
-                try:
-                    listing = self._parse_item(item)
-                    if listing and self.validate_listing(listing):
-                        listings.append(listing)
-                except Exception as e:
-                    logger.error(f"[{self.platform}] Error parsing item: {e}")
-                    continue
+        if not items:
+            logger.info(f"[{self.platform}] No items found on page {page}, stopping pagination")
+            return None
 
-            self.rate_limit()
+        logger.debug(f"[{self.platform}] Found {len(items)} items on page {page}")
 
-        saved_count = self.save_listings(listings)
-        logger.info(f"[{self.platform}] Completed: {saved_count} new listings saved (total found: {len(listings)})")
+        listings = []
+        for item in items:
+            try:
+                listing = self._parse_item(item)
+                if listing and self.validate_listing(listing):
+                    listings.append(listing)
+            except Exception as e:
+                logger.error(f"[{self.platform}] Error parsing item: {e}")
+                continue
         return listings
 
     def _parse_item(self, item) -> Optional[Dict]:
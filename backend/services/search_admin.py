@@ -47,7 +47,7 @@ def list_indices():
                 status[index] = {
                     'exists': True,
                     'doc_count': count_response.get('count', 0),
-                    'store_size': stats['indices'][index]['primaries']['store']['size_in_bytes']
+                    'store_size': stats['_all']['primaries']['store']['size_in_bytes']
                 }
             except:
                 status[index] = {
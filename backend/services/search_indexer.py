@@ -1,137 +1,311 @@
 """Search Indexer - Bulk index database records into Elasticsearch
 Provides utilities to sync SQLAlchemy models with Elasticsearch indices
+
+Full reindexing runs in bounded memory and without search downtime:
+  - rows are read in primary-key order one keyset page at a time
+    (id > last_id ORDER BY id LIMIT batch), streamed from the cursor with yield_per
+  - documents are built lazily and sent with streaming_bulk (or parallel_bulk
+    when SEARCH_INDEX_THREADS > 1) in SEARCH_INDEX_CHUNK_SIZE requests
+  - each run writes into a fresh versioned index (recipes_20260101120000) and
+    atomically moves the 'recipes' alias onto it when done, so searches keep
+    hitting the previous index until the new one is complete
+  - the last indexed id is checkpointed after every page, so an interrupted
+    run resumes into the same versioned index instead of starting over
+  - single-document syncs from every process also write into the index being
+    built: they find it through the checkpoint (cached for
+    SEARCH_BUILD_LOOKUP_TTL seconds), and a new build waits that long before
+    scanning so no process still holds a stale "no build" answer
 """
 
 from ..models import db, Recipe, SNSPost, User
 from .elasticsearch_service import get_search_manager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from elasticsearch import NotFoundError
+from sqlalchemy.orm import selectinload
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
-
-def index_recipes():
-    """Index all recipes from database into Elasticsearch"""
+# Rows per keyset page; a checkpoint is written after each page
+DEFAULT_BATCH_SIZE = int(os.getenv('SEARCH_INDEX_BATCH_SIZE', '1000'))
+# Documents per bulk request
+DEFAULT_CHUNK_SIZE = int(os.getenv('SEARCH_INDEX_CHUNK_SIZE', '500'))
+# Bulk sender threads; > 1 switches to parallel_bulk
+DEFAULT_THREAD_COUNT = int(os.getenv('SEARCH_INDEX_THREADS', '1'))
+
+CHECKPOINT_INDEX = 'search_reindex_checkpoints'
+# Seconds a process trusts its last checkpoint lookup for single-document syncs
+BUILD_LOOKUP_TTL = float(os.getenv('SEARCH_BUILD_LOOKUP_TTL', '5'))
+
+# alias -> versioned index currently being built in this process; single
+# document syncs are mirrored there so they are not lost by the alias swap
+_active_builds: Dict[str, str] = {}
+# alias -> (expires at, build target or None) from other processes' checkpoints
+_checkpoint_targets: Dict[str, tuple] = {}
+
+
+def _recipe_doc(recipe) -> Dict:
+    return {
+        'id': recipe.id,
+        'title': recipe.title or '',
+        'description': recipe.description or '',
+        'content': recipe.instructions or '',
+        'tags': recipe.tags or [],
+        'ingredients': ','.join([ing.get('name', '') for ing in (recipe.ingredients or [])]),
+        'difficulty': recipe.difficulty_level or 'medium',
+        'cooking_time': recipe.cooking_time_minutes or 30,
+        'servings': recipe.servings or 4,
+        'calories': recipe.calories or 0,
+        'protein': recipe.protein_g or 0,
+        'carbs': recipe.carbs_g or 0,
+        'fat': recipe.fat_g or 0,
+        'rating': recipe.average_rating or 0,
+        'review_count': recipe.review_count or 0,
+        'views': recipe.view_count or 0,
+        'created_at': recipe.created_at.isoformat() if recipe.created_at else None,
+        'updated_at': recipe.updated_at.isoformat() if recipe.updated_at else None,
+        'user_id': recipe.user_id,
+        'is_public': recipe.is_public if hasattr(recipe, 'is_public') else True
+    }
+
+
+def _post_doc(post) -> Dict:
+    # Calculate engagement rate
+    total_engagement = (post.likes_count or 0) + (post.comments_count or 0) + (post.shares or 0)
+    engagement_rate = total_engagement / max(post.views_count or 1, 1) if post.views_count else 0
+
+    return {
+        'id': post.id,
+        'content': post.content or '',
+        'caption': post.caption or '',
+        'hashtags': post.hashtags or [],
+        'platform': post.platform or 'unknown',
+        'likes': post.likes_count or 0,
+        'comments': post.comments_count or 0,
+        'shares': post.shares or 0,
+        'engagement_rate': engagement_rate,
+        'posted_at': post.published_at.isoformat() if post.published_at else None,
+        'created_at': post.created_at.isoformat() if post.created_at else None,
+        'user_id': post.user_id,
+        'user_name': post.user.name if post.user else 'unknown'
+    }
+
+
+def _user_doc(user) -> Dict:
+    return {
+        'id': user.id,
+        'name': user.name or '',
+        'email': user.email or '',
+        'bio': getattr(user, 'bio', '') or '',
+        'role': user.role or 'user',
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'is_active': user.is_active
+    }
+
+
+def _sources() -> Dict[str, tuple]:
+    """alias -> (model, document builder, loader options)"""
+    return {
+        'recipes': (Recipe, _recipe_doc, ()),
+        'sns_posts': (SNSPost, _post_doc, (selectinload(SNSPost.user),)),
+        'users': (User, _user_doc, ()),
+    }
+
+
+def iter_row_pages(model, after_id: int = 0, batch_size: int = DEFAULT_BATCH_SIZE,
+                   options=()) -> Iterator[List]:
+    """
+    Yield rows of ``model`` in primary-key order, one keyset page at a time.
+
+    Each page is a short query (id > after_id ORDER BY id LIMIT batch_size),
+    so no transaction or cursor stays open across the whole table and memory
+    is bounded by the page size.
+    """
+    while True:
+        query = (
+            db.session.query(model)
+            .options(*options)
+            .filter(model.id > after_id)
+            .order_by(model.id)
+            .limit(batch_size)
+        )
+        page = list(query.yield_per(min(batch_size, DEFAULT_CHUNK_SIZE)))
+        if not page:
+            return
+        yield page
+        if len(page) < batch_size:
+            return
+        after_id = page[-1].id
+
+
+# ---- checkpoints ----
+
+def _load_checkpoint(es, alias: str) -> Optional[Dict]:
     try:
-        search_manager = get_search_manager()
-
-        # Fetch all recipes in batches to avoid memory issues
-        recipes = db.session.query(Recipe).all()
-
-        documents = []
-        for recipe in recipes:
-            doc = {
-                'id': recipe.id,
-                'title': recipe.title or '',
-                'description': recipe.description or '',
-                'content': recipe.instructions or '',
-                'tags': recipe.tags or [],
-                'ingredients': ','.join([ing.get('name', '') for ing in (recipe.ingredients or [])]),
-                'difficulty': recipe.difficulty_level or 'medium',
-                'cooking_time': recipe.cooking_time_minutes or 30,
-                'servings': recipe.servings or 4,
-                'calories': recipe.calories or 0,
-                'protein': recipe.protein_g or 0,
-                'carbs': recipe.carbs_g or 0,
-                'fat': recipe.fat_g or 0,
-                'rating': recipe.average_rating or 0,
-                'review_count': recipe.review_count or 0,
-                'views': recipe.view_count or 0,
-                'created_at': recipe.created_at.isoformat() if recipe.created_at else None,
-                'updated_at': recipe.updated_at.isoformat() if recipe.updated_at else None,
-                'user_id': recipe.user_id,
-                'is_public': recipe.is_public if hasattr(recipe, 'is_public') else True
-            }
-            documents.append(doc)
-
-        if documents:
-            success, errors = search_manager.es.bulk_index('recipes', documents)
-            logger.info(f"Indexed {success} recipes into Elasticsearch")
-            if errors:
-                logger.warning(f"Errors during recipe indexing: {len(errors)}")
-            return success
-        return 0
+        return es.get(index=CHECKPOINT_INDEX, id=alias)['_source']
+    except NotFoundError:
+        return None
 
-    except Exception as e:
-        logger.error(f"Failed to index recipes: {str(e)}")
-        return 0
 
+def _save_checkpoint(es, alias: str, target: str, last_id: int, indexed: int) -> None:
+    es.index(index=CHECKPOINT_INDEX, id=alias, document={
+        'alias': alias,
+        'target': target,
+        'last_id': last_id,
+        'indexed': indexed,
+        'updated_at': datetime.utcnow().isoformat()
+    })
 
-def index_sns_posts():
-    """Index all SNS posts from database into Elasticsearch"""
+
+def _clear_checkpoint(es, alias: str) -> None:
     try:
-        search_manager = get_search_manager()
-
-        posts = db.session.query(SNSPost).all()
-
-        documents = []
-        for post in posts:
-            # Calculate engagement rate
-            total_engagement = (post.likes_count or 0) + (post.comments_count or 0) + (post.shares or 0)
-            engagement_rate = total_engagement / max(post.views_count or 1, 1) if post.views_count else 0
-
-            doc = {
-                'id': post.id,
-                'content': post.content or '',
-                'caption': post.caption or '',
-                'hashtags': post.hashtags or [],
-                'platform': post.platform or 'unknown',
-                'likes': post.likes_count or 0,
-                'comments': post.comments_count or 0,
-                'shares': post.shares or 0,
-                'engagement_rate': engagement_rate,
-                'posted_at': post.published_at.isoformat() if post.published_at else None,
-                'created_at': post.created_at.isoformat() if post.created_at else None,
-                'user_id': post.user_id,
-                'user_name': post.user.name if post.user else 'unknown'
-            }
-            documents.append(doc)
-
-        if documents:
-            success, errors = search_manager.es.bulk_index('sns_posts', documents)
-            logger.info(f"Indexed {success} SNS posts into Elasticsearch")
+        es.delete(index=CHECKPOINT_INDEX, id=alias)
+    except NotFoundError:
+        pass
+
+
+def _build_target(es, alias: str) -> Optional[str]:
+    """Versioned index being built for ``alias`` by any process, if any."""
+    target = _active_builds.get(alias)
+    if target:
+        return target
+    now = time.monotonic()
+    cached = _checkpoint_targets.get(alias)
+    if cached and cached[0] > now:
+        return cached[1]
+    try:
+        checkpoint = _load_checkpoint(es, alias)
+    except Exception as e:
+        logger.warning(f"Could not read '{alias}' reindex checkpoint: {str(e)}")
+        checkpoint = None
+    target = checkpoint['target'] if checkpoint else None
+    _checkpoint_targets[alias] = (now + BUILD_LOOKUP_TTL, target)
+    return target
+
+
+# ---- alias swap ----
+
+def _create_target(es_service, alias: str) -> str:
+    """Create an empty versioned index for ``alias`` tuned for bulk loading."""
+    target = f"{alias}_{datetime.utcnow():%Y%m%d%H%M%S}"
+    body = es_service.get_mapping(alias)
+    settings = dict(body.get('settings', {}))
+    # No refreshes or replicas while loading; restored before the swap
+    settings['refresh_interval'] = '-1'
+    settings['number_of_replicas'] = 0
+    es_service.es.indices.create(index=target, body={**body, 'settings': settings})
+    return target
+
+
+def _swap_alias(es_service, alias: str, target: str) -> None:
+    """Atomically point ``alias`` at ``target`` and drop the indices it replaces."""
+    es = es_service.es
+    replicas = es_service.get_mapping(alias).get('settings', {}).get('number_of_replicas', 1)
+    es.indices.put_settings(index=target, settings={
+        'index': {'refresh_interval': '1s', 'number_of_replicas': replicas}
+    })
+    es.indices.refresh(index=target)
+
+    actions = [{'add': {'index': target, 'alias': alias}}]
+    previous = []
+    if es.indices.exists_alias(name=alias):
+        previous = [name for name in es.indices.get_alias(name=alias) if name != target]
+        actions = [{'remove': {'index': name, 'alias': alias}} for name in previous] + actions
+    elif es.indices.exists(index=alias):
+        # Pre-alias deployments have a concrete index under the alias name
+        actions.insert(0, {'remove_index': {'index': alias}})
+    es.indices.update_aliases(actions=actions)
+
+    for name in previous:
+        es.indices.delete(index=name)
+    logger.info(f"Alias '{alias}' now points at '{target}'")
+
+
+def reindex(alias: str, batch_size: Optional[int] = None, chunk_size: Optional[int] = None,
+            thread_count: Optional[int] = None, resume: bool = True) -> int:
+    """
+    Rebuild one search index from the database without downtime.
+
+    Args:
+        alias: 'recipes', 'sns_posts' or 'users'
+        batch_size: rows per keyset page / checkpoint
+        chunk_size: documents per bulk request
+        thread_count: bulk sender threads (> 1 uses parallel_bulk)
+        resume: continue an interrupted run from its checkpoint
+
+    Returns:
+        Number of documents indexed into the new index
+    """
+    es_service = get_search_manager().es
+    es = es_service.es
+    model, build_doc, options = _sources()[alias]
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    thread_count = thread_count or DEFAULT_THREAD_COUNT
+
+    checkpoint = _load_checkpoint(es, alias)
+    if checkpoint and not es.indices.exists(index=checkpoint['target']):
+        checkpoint = None
+    if checkpoint and resume:
+        target, last_id, indexed = checkpoint['target'], checkpoint['last_id'], checkpoint['indexed']
+        logger.info(f"Resuming '{alias}' reindex into '{target}' after id {last_id}")
+    else:
+        target, last_id, indexed = _create_target(es_service, alias), 0, 0
+        # Publish the new target to other processes before abandoning the old one
+        _save_checkpoint(es, alias, target, last_id, indexed)
+        if checkpoint:
+            # Abandon the partial index of an interrupted run
+            es.indices.delete(index=checkpoint['target'])
+        # Let cached lookups expire so every process mirrors syncs before the scan
+        time.sleep(BUILD_LOOKUP_TTL)
+
+    _active_builds[alias] = target
+    try:
+        for page in iter_row_pages(model, last_id, batch_size, options):
+            docs = (build_doc(row) for row in page)
+            success, errors = es_service.stream_bulk(target, docs, chunk_size, thread_count)
             if errors:
-                logger.warning(f"Errors during SNS post indexing: {len(errors)}")
-            return success
-        return 0
+                logger.warning(f"Errors during {alias} indexing: {len(errors)}")
+            indexed += success
+            last_id = page[-1].id
+            _save_checkpoint(es, alias, target, last_id, indexed)
 
-    except Exception as e:
-        logger.error(f"Failed to index SNS posts: {str(e)}")
-        return 0
+        _swap_alias(es_service, alias, target)
+        _clear_checkpoint(es, alias)
+    finally:
+        _active_builds.pop(alias, None)
+        _checkpoint_targets.pop(alias, None)
 
+    logger.info(f"Indexed {indexed} {alias} into Elasticsearch")
+    return indexed
 
-def index_users():
-    """Index all users from database into Elasticsearch"""
-    try:
-        search_manager = get_search_manager()
-
-        users = db.session.query(User).all()
-
-        documents = []
-        for user in users:
-            doc = {
-                'id': user.id,
-                'name': user.name or '',
-                'email': user.email or '',
-                'bio': getattr(user, 'bio', '') or '',
-                'role': user.role or 'user',
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'is_active': user.is_active
-            }
-            documents.append(doc)
-
-        if documents:
-            success, errors = search_manager.es.bulk_index('users', documents)
-            logger.info(f"Indexed {success} users into Elasticsearch")
-            if errors:
-                logger.warning(f"Errors during user indexing: {len(errors)}")
-            return success
-        return 0
 
+def _safe_reindex(alias: str, **kwargs) -> int:
+    try:
+        return reindex(alias, **kwargs)
     except Exception as e:
-        logger.error(f"Failed to index users: {str(e)}")
+        logger.error(f"Failed to index {alias}: {str(e)}")
         return 0
 
 
+def index_recipes(**kwargs):
+    """Index all recipes from database into Elasticsearch"""
+    return _safe_reindex('recipes', **kwargs)
+
+
+def index_sns_posts(**kwargs):
+    """Index all SNS posts from database into Elasticsearch"""
+    return _safe_reindex('sns_posts', **kwargs)
+
+
+def index_users(**kwargs):
+    """Index all users from database into Elasticsearch"""
+    return _safe_reindex('users', **kwargs)
+
+
 def index_all():
     """Index all searchable content into Elasticsearch"""
     try:
@@ -153,40 +327,25 @@ def index_all():
         return None
 
 
+def _sync_document(alias: str, doc: Dict) -> bool:
+    es_service = get_search_manager().es
+    ok = es_service.index_document(alias, doc['id'], doc)
+    target = _build_target(es_service.es, alias)
+    if target:
+        es_service.index_document(target, doc['id'], doc)
+    return ok
+
+
 def sync_single_recipe(recipe_id: int):
     """Index or update a single recipe"""
     try:
-        search_manager = get_search_manager()
         recipe = db.session.query(Recipe).get(recipe_id)
 
         if not recipe:
             logger.warning(f"Recipe {recipe_id} not found")
             return False
 
-        doc = {
-            'id': recipe.id,
-            'title': recipe.title or '',
-            'description': recipe.description or '',
-            'content': recipe.instructions or '',
-            'tags': recipe.tags or [],
-            'ingredients': ','.join([ing.get('name', '') for ing in (recipe.ingredients or [])]),
-            'difficulty': recipe.difficulty_level or 'medium',
-            'cooking_time': recipe.cooking_time_minutes or 30,
-            'servings': recipe.servings or 4,
-            'calories': recipe.calories or 0,
-            'protein': recipe.protein_g or 0,
-            'carbs': recipe.carbs_g or 0,
-            'fat': recipe.fat_g or 0,
-            'rating': recipe.average_rating or 0,
-            'review_count': recipe.review_count or 0,
-            'views': recipe.view_count or 0,
-            'created_at': recipe.created_at.isoformat() if recipe.created_at else None,
-            'updated_at': recipe.updated_at.isoformat() if recipe.updated_at else None,
-            'user_id': recipe.user_id,
-            'is_public': recipe.is_public if hasattr(recipe, 'is_public') else True
-        }
-
-        return search_manager.index_document('recipes', recipe.id, doc)
+        return _sync_document('recipes', _recipe_doc(recipe))
     except Exception as e:
         logger.error(f"Failed to sync recipe {recipe_id}: {str(e)}")
         return False
@@ -195,43 +354,33 @@ def sync_single_recipe(recipe_id: int):
 def sync_single_post(post_id: int):
     """Index or update a single SNS post"""
     try:
-        search_manager = get_search_manager()
         post = db.session.query(SNSPost).get(post_id)
 
         if not post:
             logger.warning(f"Post {post_id} not found")
             return False
 
-        total_engagement = (post.likes_count or 0) + (post.comments_count or 0) + (post.shares or 0)
-        engagement_rate = total_engagement / max(post.views_count or 1, 1) if post.views_count else 0
-
-        doc = {
-            'id': post.id,
-            'content': post.content or '',
-            'caption': post.caption or '',
-            'hashtags': post.hashtags or [],
-            'platform': post.platform or 'unknown',
-            'likes': post.likes_count or 0,
-            'comments': post.comments_count or 0,
-            'shares': post.shares or 0,
-            'engagement_rate': engagement_rate,
-            'posted_at': post.published_at.isoformat() if post.published_at else None,
-            'created_at': post.created_at.isoformat() if post.created_at else None,
-            'user_id': post.user_id,
-            'user_name': post.user.name if post.user else 'unknown'
-        }
-
-        return search_manager.index_document('sns_posts', post.id, doc)
+        return _sync_document('sns_posts', _post_doc(post))
     except Exception as e:
         logger.error(f"Failed to sync post {post_id}: {str(e)}")
         return False
 
 
+def _delete_document(alias: str, doc_id: int) -> None:
+    es = get_search_manager().es.es
+    es.delete(index=alias, id=doc_id)
+    target = _build_target(es, alias)
+    if target:
+        try:
+            es.delete(index=target, id=doc_id)
+        except NotFoundError:
+            pass
+
+
 def delete_recipe_from_index(recipe_id: int):
     """Remove a recipe from Elasticsearch index"""
     try:
-        search_manager = get_search_manager()
-        search_manager.es.es.delete(index='recipes', id=recipe_id)
+        _delete_document('recipes', recipe_id)
         logger.info(f"Deleted recipe {recipe_id} from index")
         return True
     except Exception as e:
@@ -242,8 +391,7 @@ def delete_recipe_from_index(recipe_id: int):
 def delete_post_from_index(post_id: int):
     """Remove an SNS post from Elasticsearch index"""
     try:
-        search_manager = get_search_manager()
-        search_manager.es.es.delete(index='sns_posts', id=post_id)
+        _delete_document('sns_posts', post_id)
         logger.info(f"Deleted post {post_id} from index")
         return True
     except Exception as e:
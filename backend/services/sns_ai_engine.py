@@ -7,9 +7,12 @@ Uses the Anthropic Claude API with tiered model selection for cost efficiency:
 Optimizations (v2.0):
   - Tiered model routing per task complexity
   - TTL-based response caching via ai_cache.AIResponseCache
+  - Normalized-prompt, stale-while-revalidate call cache via ai_cache.PromptCache
   - Compressed prompts (40-60% shorter than v1.0)
   - Per-method max_tokens caps
   - Usage tracking forwarded to claude_ai.usage_tracker
+  - Bulk generation (generate_bulk) fanned out over a bounded thread pool,
+    with 429/529 backoff and the Anthropic client shared with claude_ai
 
 All methods include graceful fallback to template-based responses when
 the API is unavailable or raises an error.
@@ -17,8 +20,12 @@ the API is unavailable or raises an error.
 import os
 import json
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 logger = logging.getLogger('sns.ai')
 
@@ -62,6 +69,50 @@ _MAX_TOKENS: dict[str, int] = {
     'generate_content_calendar': 2000,
 }
 
+# ---------------------------------------------------------------------------
+# Bulk generation — concurrency cap and 429/529 backoff
+# ---------------------------------------------------------------------------
+MAX_CONCURRENCY = int(os.getenv('SNS_AI_MAX_CONCURRENCY', '4'))
+MAX_RETRIES = int(os.getenv('SNS_AI_MAX_RETRIES', '3'))
+RETRY_BASE_DELAY = float(os.getenv('SNS_AI_RETRY_BASE_DELAY', '1.0'))
+MAX_BULK_JOBS = 60
+
+_RETRY_STATUSES = (429, 529)
+
+# Process-wide cap on in-flight Claude calls, shared by every bulk request
+_call_slots = threading.BoundedSemaphore(max(MAX_CONCURRENCY, 1))
+
+# Bulk job type -> (engine method, {list field: argument it fans out into}).
+# A list field mapped to itself is split into one-element lists.
+BULK_JOB_TYPES: Dict[str, tuple] = {
+    'content':   ('generate_content', {'platforms': 'platform', 'topics': 'topic'}),
+    'hashtags':  ('generate_hashtags', {'platforms': 'platform'}),
+    'repurpose': ('repurpose_content', {'target_platforms': 'target_platforms'}),
+    'calendar':  ('generate_content_calendar', {'platforms': 'platforms'}),
+}
+
+
+def _retry_status(exc: Exception) -> Optional[int]:
+    """Return 429/529 when exc is a rate-limit or overload error, else None."""
+    status = getattr(exc, 'status_code', None)
+    if status in _RETRY_STATUSES:
+        return status
+    text = str(exc).lower()
+    if 'rate_limit' in text or '429' in text:
+        return 429
+    if 'overloaded' in text or '529' in text:
+        return 529
+    return None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Seconds from a retry-after response header, if the error carries one."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
 
 class SNSAIEngine:
     """Dedicated AI engine for SNS content operations."""
@@ -116,7 +167,13 @@ class SNSAIEngine:
 
     @property
     def client(self) -> Optional[Anthropic]:
-        """Lazy-init the Anthropic client."""
+        """Anthropic client shared with ClaudeAIService, else a lazy local one."""
+        if self._client is None:
+            try:
+                from .claude_ai import claude_ai
+                self._client = claude_ai.client
+            except ImportError:
+                pass
         if self._client is None and HAS_ANTHROPIC and self._api_key:
             try:
                 self._client = Anthropic(api_key=self._api_key)
@@ -145,34 +202,76 @@ class SNSAIEngine:
         model = _MODELS[tier]
         effective_max_tokens = max_tokens or _MAX_TOKENS.get(method, 1024)
 
-        try:
-            response = self.client.messages.create(
+        def create():
+            response = self._create_with_backoff(
                 model=model,
                 max_tokens=effective_max_tokens,
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_prompt}],
             )
-            text = response.content[0].text
-
-            # Forward usage to shared tracker
             usage = getattr(response, 'usage', None)
-            if usage:
-                try:
-                    from .claude_ai import usage_tracker
-                    usage_tracker.track(
-                        method=method or 'sns_engine',
-                        tier=tier,
-                        input_tokens=getattr(usage, 'input_tokens', 0),
-                        output_tokens=getattr(usage, 'output_tokens', 0),
-                    )
-                except ImportError:
-                    pass
+            usage = {
+                'input_tokens': getattr(usage, 'input_tokens', 0) if usage else 0,
+                'output_tokens': getattr(usage, 'output_tokens', 0) if usage else 0,
+            }
+            # Forward usage to shared tracker
+            if usage['input_tokens'] or usage['output_tokens']:
+                self._track(method or 'sns_engine', tier, usage, cached=False)
+            return response.content[0].text, usage
+
+        try:
+            try:
+                from .ai_cache import prompt_cache
+            except ImportError:
+                return create()[0]
 
+            text, usage, cached = prompt_cache.get_or_call(
+                method, user_prompt, create, model=model,
+                system=system_prompt, max_tokens=effective_max_tokens,
+            )
+            if cached:
+                self._track(method, tier, usage or {}, cached=True)
             return text
         except Exception as exc:
             logger.error("Claude API call failed (method=%s): %s", method, exc)
             return None
 
+    def _create_with_backoff(self, **kwargs):
+        """messages.create under the shared concurrency cap.
+
+        429 (rate limited) and 529 (overloaded) responses are retried up to
+        MAX_RETRIES times, waiting retry-after when given, else exponential
+        backoff with jitter. The slot is released while waiting.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with _call_slots:
+                    return self.client.messages.create(**kwargs)
+            except Exception as exc:
+                status = _retry_status(exc)
+                if status is None or attempt >= MAX_RETRIES:
+                    raise
+                delay = _retry_after(exc)
+                if delay is None:
+                    delay = RETRY_BASE_DELAY * (2 ** attempt) * (1 + random.random() / 2)
+                logger.warning("Claude API returned %s, retrying in %.1fs (attempt %d/%d)",
+                               status, delay, attempt + 1, MAX_RETRIES)
+                time.sleep(delay)
+
+    @staticmethod
+    def _track(method: str, tier: str, usage: dict, cached: bool) -> None:
+        try:
+            from .claude_ai import usage_tracker
+        except ImportError:
+            return
+        record = usage_tracker.track_cache_hit if cached else usage_tracker.track
+        record(
+            method=method,
+            tier=tier,
+            input_tokens=usage.get('input_tokens', 0),
+            output_tokens=usage.get('output_tokens', 0),
+        )
+
     def _parse_json_response(self, text: Optional[str]) -> Optional[dict]:
         """Attempt to parse JSON from Claude's response."""
         if not text:
@@ -574,6 +673,81 @@ class SNSAIEngine:
             'ai_generated':   False,
         }
 
+    # ==================================================================
+    # Bulk generation
+    # ==================================================================
+    def expand_bulk_jobs(self, jobs: List[dict]) -> List[dict]:
+        """Split bulk job specs into one Claude call each.
+
+        Each spec is ``{"type": <BULK_JOB_TYPES key>, **method kwargs}``; list
+        fields such as ``platforms`` or ``topics`` fan out into one job per
+        item. Raises ValueError on unknown types, bad arguments or more than
+        MAX_BULK_JOBS resulting jobs.
+        """
+        import inspect
+        from itertools import product
+
+        expanded = []
+        for spec in jobs:
+            if not isinstance(spec, dict) or spec.get('type') not in BULK_JOB_TYPES:
+                raise ValueError(f"Unknown bulk job type: {spec.get('type') if isinstance(spec, dict) else spec!r}")
+            method, fan_out = BULK_JOB_TYPES[spec['type']]
+            params = {k: v for k, v in spec.items() if k != 'type'}
+
+            axes = []
+            for field, arg in fan_out.items():
+                values = params.pop(field, None)
+                if values is None:
+                    continue
+                if not isinstance(values, list) or not values:
+                    raise ValueError(f"{field} must be a non-empty list")
+                axes.append([(arg, [v] if arg == field else v) for v in values])
+
+            for combo in product(*axes):
+                kwargs = dict(params, **dict(combo))
+                try:
+                    inspect.signature(getattr(self, method)).bind(**kwargs)
+                except TypeError as exc:
+                    raise ValueError(f"Invalid {spec['type']} job: {exc}") from None
+                expanded.append({'type': spec['type'], 'method': method, 'params': kwargs})
+
+        if len(expanded) > MAX_BULK_JOBS:
+            raise ValueError(f"Too many jobs ({len(expanded)} > {MAX_BULK_JOBS})")
+        return expanded
+
+    def generate_bulk(self, jobs: List[dict],
+                      max_concurrency: Optional[int] = None) -> Iterator[dict]:
+        """Run bulk jobs concurrently, yielding each result as it completes.
+
+        Jobs are expanded with expand_bulk_jobs() and run on a pool of at most
+        max_concurrency threads (capped at MAX_CONCURRENCY). Yields dicts with
+        index, type, params, elapsed_ms and either result or error.
+        """
+        expanded = self.expand_bulk_jobs(jobs)
+        if not expanded:
+            return
+        workers = min(max_concurrency or MAX_CONCURRENCY, MAX_CONCURRENCY, len(expanded))
+
+        def run(index: int, job: dict) -> dict:
+            started = time.monotonic()
+            event = {'index': index, 'type': job['type'], 'params': job['params']}
+            try:
+                event['result'] = getattr(self, job['method'])(**job['params'])
+            except Exception as exc:
+                logger.error("Bulk job %d (%s) failed: %s", index, job['method'], exc)
+                event['error'] = str(exc)
+            event['elapsed_ms'] = int((time.monotonic() - started) * 1000)
+            return event
+
+        executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='sns-ai-bulk')
+        try:
+            futures = [executor.submit(run, i, job) for i, job in enumerate(expanded)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Abandoned streams (client disconnect) drop the queued jobs
+            executor.shutdown(wait=False, cancel_futures=True)
+
     # ==================================================================
     # Method 6: analyze_post_performance
     # ==================================================================
@@ -1,15 +1,19 @@
-"""Simple in-memory caching for SNS analytics and frequently accessed data
+"""Simple caching for SNS analytics and frequently accessed data
 
-Phase 1: In-memory cache (dict-based)
-Phase 2: Redis cache (production)
+L1: per-process TTLCache
+L2: shared tier from backend.shared_cache (Redis, or local SQLite)
 """
 
-import time
 from typing import Optional, Any, Dict
-from datetime import datetime, timedelta
 
-# Global in-memory cache
-_CACHE: Dict[str, tuple] = {}  # {key: (value, expires_at)}
+from ..cache import TTLCache
+from ..shared_cache import TieredCache
+
+# ttl=0/None means "never expires"; the tiers still need a finite TTL.
+_NO_EXPIRY_TTL = 365 * 24 * 3600
+
+# Global two-tier cache
+_CACHE = TieredCache('sns', TTLCache(max_entries=2048))
 
 
 def cache_get(key: str) -> Optional[Any]:
@@ -22,17 +26,7 @@ def cache_get(key: str) -> Optional[Any]:
     Returns:
         Cached value or None if expired/not found
     """
-    if key not in _CACHE:
-        return None
-
-    value, expires_at = _CACHE[key]
-
-    # Check if expired
-    if expires_at and datetime.utcnow() > expires_at:
-        del _CACHE[key]
-        return None
-
-    return value
+    return _CACHE.get(key)
 
 
 def cache_set(key: str, value: Any, ttl: int = 300) -> None:
@@ -44,8 +38,7 @@ def cache_set(key: str, value: Any, ttl: int = 300) -> None:
         value: Value to cache
         ttl: Time to live in seconds (default 5 minutes)
     """
-    expires_at = datetime.utcnow() + timedelta(seconds=ttl) if ttl else None
-    _CACHE[key] = (value, expires_at)
+    _CACHE.set(key, value, ttl or _NO_EXPIRY_TTL)
 
 
 def cache_invalidate(prefix: str) -> None:
@@ -55,9 +48,7 @@ def cache_invalidate(prefix: str) -> None:
     Args:
         prefix: Key prefix to match (e.g., 'accounts:123' removes all keys starting with 'accounts:123')
     """
-    keys_to_delete = [key for key in _CACHE.keys() if key.startswith(prefix)]
-    for key in keys_to_delete:
-        del _CACHE[key]
+    _CACHE.invalidate_prefix(prefix)
 
 
 def cache_clear() -> None:
@@ -67,17 +58,14 @@ def cache_clear() -> None:
 
 def cache_stats() -> Dict[str, Any]:
     """Get cache statistics"""
-    total_keys = len(_CACHE)
-    expired_keys = 0
-
-    for key, (value, expires_at) in _CACHE.items():
-        if expires_at and datetime.utcnow() > expires_at:
-            expired_keys += 1
+    expired_keys = _CACHE.purge_expired()
+    stats = _CACHE.stats()
 
     return {
-        'total_keys': total_keys,
+        'total_keys': stats['entries'] + expired_keys,
         'expired_keys': expired_keys,
-        'active_keys': total_keys - expired_keys,
+        'active_keys': stats['entries'],
+        'l2_backend': stats['l2_backend'],
     }
 
 
@@ -0,0 +1,368 @@
+"""SNS Delivery — batched, leased execution of due SNS automations and posts.
+
+``execute_scheduled_posts`` drains the backlog in batches. Each batch:
+
+1. claims due ``SNSAutomate`` rules (``next_run <= now``) and scheduled
+   ``SNSPost`` rows (``scheduled_at <= now``) with a lease
+   (``backend.leases``): ``FOR UPDATE SKIP LOCKED`` on PostgreSQL, a
+   compare-and-set UPDATE on SQLite. Several scheduler workers can drain the
+   same backlog in parallel without double-posting.
+2. loads the claimed rows, the active accounts of every user involved and
+   their Telegram chat ids — one query each, however big the batch.
+3. publishes through a thread pool. A per-platform semaphore caps concurrent
+   calls to any single platform API (and to Telegram).
+4. re-checks its leases (``retain``), applies the results of the rows it
+   still holds and commits once, then sends Telegram notifications through
+   the same pool, outside the transaction. A row whose lease expired and was
+   re-claimed by another worker during a slow publish is left to that worker.
+
+Scheduled ``SNSPost`` rows are published through the platform clients.
+``SNSAutomate`` rules only record their placeholder post locally (as
+``published``), unless ``SNS_AUTOMATE_LIVE_POST`` is set — then the rule's
+text is sent to the platform with the account's real token.
+
+Worker threads never touch the ORM session; they get plain job dicts.
+Delivery is at-least-once: a worker that dies between publishing and
+committing leaves its lease to expire and the rows are retried.
+
+Config:
+    SNS_DELIVERY_BATCH        rows claimed per table per batch (default 50)
+    SNS_DELIVERY_WORKERS      publish/notify threads (default 8)
+    SNS_DELIVERY_LEASE        lease length in seconds (default 300)
+    SNS_AUTOMATE_LIVE_POST    publish automation rule posts to the platform
+                              (default off: rules create local posts only)
+    SNS_PLATFORM_CONCURRENCY  concurrent calls per platform, with optional
+                              overrides: "2" or "2,instagram=1,telegram=4"
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..leases import claim, new_owner, release, retain
+from ..models import db, SNSAccount, SNSAutomate, SNSPost, SNSSettings
+from ..telegram_service import dispatch_sns_notification
+from .sns_platforms import get_client
+
+logger = logging.getLogger('sns.delivery')
+
+WORDPRESS_PLATFORMS = {'wordpress', 'blog'}
+
+
+def parse_concurrency(spec: str) -> Tuple[int, Dict[str, int]]:
+    """``"2,instagram=1"`` -> ``(2, {'instagram': 1})``."""
+    default, overrides = 2, {}
+    for part in (p.strip() for p in (spec or '').split(',')):
+        if not part:
+            continue
+        if '=' in part:
+            platform, _, limit = part.partition('=')
+            overrides[platform.strip()] = max(1, int(limit))
+        else:
+            default = max(1, int(part))
+    return default, overrides
+
+
+class PlatformLimiter:
+    """One bounded semaphore per platform."""
+
+    def __init__(self, default: int, overrides: Optional[Dict[str, int]] = None):
+        self.default = default
+        self.overrides = dict(overrides or {})
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def slot(self, platform: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if platform not in self._slots:
+                self._slots[platform] = threading.BoundedSemaphore(
+                    self.overrides.get(platform, self.default))
+            return self._slots[platform]
+
+
+@dataclass
+class DeliveryStats:
+    """Counters for one drain of the due backlog."""
+    batches: int = 0
+    rules_claimed: int = 0
+    rules_executed: int = 0
+    rules_without_account: int = 0
+    leases_lost: int = 0
+    posts_claimed: int = 0
+    published: int = 0
+    failed: int = 0
+    drafts: int = 0
+    notifications_sent: int = 0
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        return (f'{self.rules_executed} rules, {self.published} published, '
+                f'{self.failed} failed, {self.batches} batches')
+
+
+def _next_run(rule, now: datetime, is_wordpress: bool) -> datetime:
+    if is_wordpress:
+        return now + timedelta(minutes=10)
+    freq = rule.frequency or 'daily'
+    if freq == 'weekly':
+        return now + timedelta(weeks=1)
+    if freq == 'custom':
+        return now + timedelta(hours=24)
+    return now + timedelta(days=1)
+
+
+def _publish_job(key, platform: str, account, content: str, media_urls=None, hashtags=None,
+                 link_url=None) -> Dict:
+    """Plain-data publish request, safe to hand to a worker thread."""
+    return {
+        'key': key,
+        'platform': platform,
+        'content': content,
+        'media_urls': media_urls or [],
+        'hashtags': hashtags or [],
+        'link_url': link_url,
+        'access_token': account.access_token,
+        'refresh_token': account.refresh_token,
+        'site_url': getattr(account, 'site_url', None),
+        'wp_username': getattr(account, 'wp_username', None),
+    }
+
+
+class SNSDeliveryEngine:
+    """Claims due work in batches and fans publishes out to a thread pool."""
+
+    def __init__(self, batch_size: int = 50, workers: int = 8, lease_seconds: int = 300,
+                 limiter: Optional[PlatformLimiter] = None, live_rules: bool = False):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.limiter = limiter or PlatformLimiter(2)
+        self.live_rules = live_rules
+        self.last_stats: Optional[DeliveryStats] = None
+
+    # ------------------------------------------------------------------
+    # Worker-thread stages (no database access)
+    # ------------------------------------------------------------------
+
+    def _publish(self, job: Dict) -> Dict:
+        with self.limiter.slot(job['platform']):
+            try:
+                client = get_client(
+                    job['platform'],
+                    access_token=job['access_token'],
+                    refresh_token=job['refresh_token'],
+                    simulation_mode=not job['access_token'],
+                    site_url=job['site_url'],
+                    wp_username=job['wp_username'],
+                )
+                if client is None:
+                    return {'success': False, 'error': f"No client for '{job['platform']}'"}
+                return client.post_content(
+                    content=job['content'],
+                    media_urls=job['media_urls'],
+                    hashtags=job['hashtags'],
+                    link_url=job['link_url'],
+                ) or {'success': False, 'error': 'Empty response from platform'}
+            except Exception as e:
+                return {'success': False, 'error': str(e)[:500]}
+
+    def _notify(self, chat_id: str, notification_type: str, data: Dict) -> bool:
+        with self.limiter.slot('telegram'):
+            return dispatch_sns_notification(chat_id, notification_type, data)
+
+    # ------------------------------------------------------------------
+    # Batch processing
+    # ------------------------------------------------------------------
+
+    def run(self, now: Optional[datetime] = None) -> DeliveryStats:
+        """Drain every due rule and scheduled post; returns stats."""
+        now = now or datetime.utcnow()
+        stats = DeliveryStats()
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sns-delivery') as pool:
+            while self._run_batch(pool, now, stats):
+                stats.batches += 1
+        stats.duration_ms = round((time.monotonic() - started) * 1000, 1)
+        self.last_stats = stats
+        return stats
+
+    def _claim(self, now: datetime) -> Tuple[str, List[int], List[int]]:
+        owner = new_owner('sns')
+        rule_ids = claim(
+            SNSAutomate,
+            [SNSAutomate.is_active.is_(True), SNSAutomate.next_run <= now],
+            [SNSAutomate.next_run, SNSAutomate.id],
+            self.batch_size, self.lease_seconds, owner=owner, now=now,
+        )
+        post_ids = claim(
+            SNSPost,
+            [SNSPost.status == 'scheduled', SNSPost.scheduled_at <= now],
+            [SNSPost.scheduled_at, SNSPost.id],
+            self.batch_size, self.lease_seconds, owner=owner, now=now,
+        )
+        return owner, rule_ids, post_ids
+
+    def _run_batch(self, pool: ThreadPoolExecutor, now: datetime, stats: DeliveryStats) -> bool:
+        owner, rule_ids, post_ids = self._claim(now)
+        if not rule_ids and not post_ids:
+            return False
+        stats.rules_claimed += len(rule_ids)
+        stats.posts_claimed += len(post_ids)
+
+        rules = (SNSAutomate.query.filter(SNSAutomate.id.in_(rule_ids)).order_by(SNSAutomate.id).all()
+                 if rule_ids else [])
+        posts = (SNSPost.query.filter(SNSPost.id.in_(post_ids)).order_by(SNSPost.id).all()
+                 if post_ids else [])
+
+        user_ids = {r.user_id for r in rules} | {p.user_id for p in posts}
+        accounts_by_user = defaultdict(list)
+        accounts_by_id = {}
+        for acct in SNSAccount.query.filter(
+                SNSAccount.user_id.in_(user_ids),
+                SNSAccount.is_active.is_(True)).order_by(SNSAccount.id):
+            accounts_by_user[acct.user_id].append(acct)
+            accounts_by_id[acct.id] = acct
+        chat_ids = {
+            s.user_id: s.telegram_chat_id
+            for s in SNSSettings.query.filter(
+                SNSSettings.user_id.in_(user_ids),
+                SNSSettings.telegram_enabled.is_(True),
+                SNSSettings.telegram_chat_id.isnot(None))
+        }
+
+        notifications: List[Tuple[int, str, Dict]] = []
+        jobs: List[Dict] = []
+        rule_plans = []
+        for rule in rules:
+            platforms = rule.platforms or []
+            if not platforms:
+                continue  # lease expires; retried like any other unrunnable rule
+            account = next((a for a in accounts_by_user.get(rule.user_id, ())
+                            if a.platform in platforms), None)
+            if account is None:
+                logger.warning(f'[AUTO-POST] No active account for rule {rule.id}')
+                stats.rules_without_account += 1
+                notifications.append((rule.user_id, 'post_failure',
+                                      {'platform': ', '.join(platforms), 'error': 'No active account found'}))
+                continue
+            is_wordpress = account.platform in WORDPRESS_PLATFORMS
+            content = (f'[Candidate] {rule.topic or "WordPress update"}' if is_wordpress
+                       else f'[Auto] {rule.topic or "Update"} - {rule.purpose or "engagement"}')
+            rule_plans.append((rule, account, is_wordpress, content))
+            if self.live_rules and not is_wordpress:
+                jobs.append(_publish_job(('rule', rule.id), account.platform, account, content))
+
+        post_plans = []
+        for post in posts:
+            account = accounts_by_id.get(post.account_id)
+            post_plans.append((post, account))
+            if account is not None:
+                jobs.append(_publish_job(('post', post.id), post.platform, account, post.content,
+                                         post.media_urls, post.hashtags, post.link_url))
+
+        results = dict(zip([j['key'] for j in jobs], pool.map(self._publish, jobs)))
+
+        # Publishing may have outlasted the lease; only write rows still ours.
+        held_rules = set(retain(SNSAutomate, [r.id for r, *_ in rule_plans], owner, self.lease_seconds))
+        held_posts = set(retain(SNSPost, [p.id for p, _ in post_plans], owner, self.lease_seconds))
+        lost = len(rule_plans) - len(held_rules) + len(post_plans) - len(held_posts)
+        if lost:
+            logger.warning(f'[AUTO-POST] {lost} leases lost to another worker; results dropped')
+            stats.leases_lost += lost
+
+        for rule, account, is_wordpress, content in rule_plans:
+            if rule.id not in held_rules:
+                continue
+            try:
+                if is_wordpress or not self.live_rules:
+                    result = {'success': not is_wordpress}
+                else:
+                    result = results.get(('rule', rule.id), {})
+                published = not is_wordpress and bool(result.get('success'))
+                post = SNSPost(
+                    user_id=rule.user_id,
+                    account_id=account.id,
+                    content=content,
+                    platform='wordpress' if is_wordpress else account.platform,
+                    template_type='trend-brief' if is_wordpress else 'auto_generated',
+                    status='draft' if is_wordpress else ('published' if published else 'failed'),
+                    published_at=now if published else None,
+                    scheduled_at=now,
+                    external_post_id=result.get('external_post_id') if published else None,
+                    error_message=None if is_wordpress or published else result.get('error', 'Unknown error'),
+                )
+                db.session.add(post)
+                rule.next_run = _next_run(rule, now, is_wordpress)
+                release(rule)
+                stats.rules_executed += 1
+                if is_wordpress:
+                    stats.drafts += 1
+                elif published:
+                    stats.published += 1
+                else:
+                    stats.failed += 1
+                    notifications.append((rule.user_id, 'post_failure',
+                                          {'platform': account.platform, 'error': post.error_message}))
+                notifications.append((rule.user_id, 'automation_executed', {
+                    'automation_name': rule.name or f'Auto-rule {rule.id}',
+                    'platforms': rule.platforms or [],
+                    'execution_time': now.strftime('%Y-%m-%d %H:%M:%S UTC'),
+                }))
+            except Exception as e:
+                logger.error(f'[AUTO-POST] Error executing rule {rule.id}: {e}')
+                notifications.append((rule.user_id, 'post_failure',
+                                      {'platform': ', '.join(rule.platforms or []), 'error': str(e)[:200]}))
+
+        for post, account in post_plans:
+            if post.id not in held_posts:
+                continue
+            if account is None:
+                result = {'success': False, 'error': 'Account missing or inactive'}
+            else:
+                result = results.get(('post', post.id), {})
+            if result.get('success'):
+                post.status = 'published'
+                post.published_at = now
+                post.external_post_id = result.get('external_post_id', '')
+                stats.published += 1
+                notifications.append((post.user_id, 'post_success', {
+                    'platform': post.platform, 'content': post.content, 'post_url': result.get('url', ''),
+                }))
+            else:
+                post.status = 'failed'
+                post.error_message = str(result.get('error', 'Unknown error'))[:500]
+                post.retry_count = (post.retry_count or 0) + 1
+                stats.failed += 1
+                logger.error(f'[AUTO-POST] Post {post.id} failed: {post.error_message}')
+                notifications.append((post.user_id, 'post_failure',
+                                      {'platform': post.platform, 'error': post.error_message}))
+            release(post)
+
+        db.session.commit()
+
+        sends = [(chat_ids[user_id], kind, data) for user_id, kind, data in notifications
+                 if user_id in chat_ids]
+        stats.notifications_sent += sum(pool.map(lambda n: bool(self._notify(*n)), sends))
+        return True
+
+
+def _engine_from_env() -> SNSDeliveryEngine:
+    default, overrides = parse_concurrency(os.getenv('SNS_PLATFORM_CONCURRENCY', '2'))
+    return SNSDeliveryEngine(
+        batch_size=int(os.getenv('SNS_DELIVERY_BATCH', '50')),
+        workers=int(os.getenv('SNS_DELIVERY_WORKERS', '8')),
+        lease_seconds=int(os.getenv('SNS_DELIVERY_LEASE', '300')),
+        limiter=PlatformLimiter(default, overrides),
+        live_rules=os.getenv('SNS_AUTOMATE_LIVE_POST', '').lower() in ('1', 'true', 'yes'),
+    )
+
+
+sns_delivery_engine = _engine_from_env()
@@ -12,8 +12,12 @@ Events:
 
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
-from typing import Dict, List, Callable, Optional
+from typing import Dict, List, Callable, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import logging
+import queue
 import uuid
 import json
 import threading
@@ -21,6 +25,14 @@ from backend.logging_config import get_logger
 
 log = get_logger(__name__)
 
+# Async dispatch limits: at most DISPATCH_MAX_WORKERS handler calls run at
+# once, and each subscription buffers at most DISPATCH_QUEUE_SIZE events.
+DISPATCH_MAX_WORKERS = 8
+DISPATCH_QUEUE_SIZE = 1000
+
+# Marks dispatch pool threads; see EventBus._enqueue
+_dispatch_thread = threading.local()
+
 
 class EventType(Enum):
     """Enumeration of SNS event types"""
@@ -126,6 +138,22 @@ class AnalyticsUpdatedEvent(SNSEvent):
         }
 
 
+class _HandlerQueue:
+    """Bounded queue of pending events for one (event_type, handler) subscription.
+
+    At most one drain task per queue is scheduled on the executor at a time,
+    so a handler never runs concurrently with itself and sees events in
+    publish order.
+    """
+
+    def __init__(self, handler: Callable, batch_size: Optional[int], maxsize: int):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.events = queue.Queue(maxsize=maxsize)
+        self.scheduled = False
+        self.lock = threading.Lock()
+
+
 class EventBus:
     """
     Publish-Subscribe Event Bus for SNS Operations
@@ -138,15 +166,48 @@ class EventBus:
         bus.subscribe('post:published', handle_post_published)
         event = PostPublishedEvent(user_id=1, post_id=123, platforms=['instagram'])
         bus.publish(event)
+
+    With ``async_handlers=True`` events are queued per subscription and
+    drained by a bounded thread pool. Handlers subscribed with ``batch_size``
+    receive a list of up to that many queued events per call. When a
+    subscription's queue is full, publish() blocks until there is room. A
+    handler publishing into a full queue from the pool drops the event (counted
+    in ``dispatch['dropped']``), because waiting there could stall every worker.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = DISPATCH_MAX_WORKERS,
+        max_queue_size: int = DISPATCH_QUEUE_SIZE,
+        max_history_size: int = 10000
+    ):
         self._subscribers: Dict[str, List[Callable]] = {}
-        self._event_history: List[SNSEvent] = []
+        self._batch_sizes: Dict[Tuple[str, Callable], int] = {}
+        self._max_history_size = max_history_size  # Keep last 10k events
+        self._event_history = deque(maxlen=max_history_size)
         self._history_lock = threading.Lock()  # Thread-safe history access
-        self._max_history_size = 10000  # Keep last 10k events
 
-    def subscribe(self, event_type: str, handler: Callable, priority: int = 0) -> None:
+        self._max_workers = max_workers
+        self._max_queue_size = max_queue_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queues: Dict[Tuple[str, Callable], _HandlerQueue] = {}
+        self._dispatch_lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Condition(self._dispatch_lock)
+        self._dispatch_stats = {
+            'queued': 0,
+            'handler_calls': 0,
+            'backpressure_waits': 0,
+            'dropped': 0,
+        }
+
+    def subscribe(
+        self,
+        event_type: str,
+        handler: Callable,
+        priority: int = 0,
+        batch_size: Optional[int] = None
+    ) -> None:
         """
         Subscribe a handler to an event type
 
@@ -154,19 +215,24 @@ class EventBus:
             event_type: Event type to subscribe to (e.g., 'post:published')
             handler: Callable that receives the event
             priority: Higher priority handlers are called first (default: 0)
+            batch_size: If set, handler receives a list of up to this many
+                events per call instead of a single event
         """
         if event_type not in self._subscribers:
             self._subscribers[event_type] = []
 
         self._subscribers[event_type].append((priority, handler))
         self._subscribers[event_type].sort(key=lambda x: x[0], reverse=True)
+        if batch_size:
+            self._batch_sizes[(event_type, handler)] = batch_size
 
         log.info(
             f"Handler subscribed to event",
             extra={
                 'handler': handler.__name__,
                 'event_type': event_type,
-                'priority': priority
+                'priority': priority,
+                'batch_size': batch_size
             }
         )
 
@@ -180,6 +246,7 @@ class EventBus:
             (p, h) for p, h in self._subscribers[event_type]
             if h != handler
         ]
+        self._batch_sizes.pop((event_type, handler), None)
 
         if len(self._subscribers[event_type]) < original_len:
             log.info(
@@ -195,24 +262,23 @@ class EventBus:
 
         Args:
             event: SNSEvent instance to publish
-            async_handlers: If True, handlers run in separate threads (default: False)
+            async_handlers: If True, handlers run on the bounded dispatch pool
+                (default: False)
         """
-        # Store in history
+        # Store in history; the deque drops the oldest event when full
         with self._history_lock:
             self._event_history.append(event)
-            # Keep only last N events to prevent memory bloat
-            if len(self._event_history) > self._max_history_size:
-                self._event_history = self._event_history[-self._max_history_size:]
 
-        log.info(
-            f"Event published",
-            extra={
-                'event_id': event.event_id,
-                'event_type': event.event_type,
-                'user_id': event.user_id,
-                'timestamp': event.timestamp.isoformat()
-            }
-        )
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                f"Event published",
+                extra={
+                    'event_id': event.event_id,
+                    'event_type': event.event_type,
+                    'user_id': event.user_id,
+                    'timestamp': event.timestamp.isoformat()
+                }
+            )
 
         # Notify subscribers
         if event.event_type in self._subscribers:
@@ -220,28 +286,125 @@ class EventBus:
 
             for priority, handler in handlers:
                 if async_handlers:
-                    # Run in separate thread (non-blocking)
-                    thread = threading.Thread(
-                        target=self._safe_call_handler,
-                        args=(handler, event)
-                    )
-                    thread.daemon = True
-                    thread.start()
+                    self._enqueue(event.event_type, handler, event)
+                elif (event.event_type, handler) in self._batch_sizes:
+                    self._safe_call_handler(handler, [event])
                 else:
                     # Run synchronously
                     self._safe_call_handler(handler, event)
 
-    def _safe_call_handler(self, handler: Callable, event: SNSEvent) -> None:
+    def _enqueue(self, event_type: str, handler: Callable, event: SNSEvent) -> None:
+        """Queue an event for a handler, waiting for room if its queue is full"""
+        key = (event_type, handler)
+        with self._dispatch_lock:
+            handler_queue = self._queues.get(key)
+            if handler_queue is None:
+                handler_queue = self._queues[key] = _HandlerQueue(
+                    handler, self._batch_sizes.get(key), self._max_queue_size
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='sns-event-bus'
+                )
+            self._pending += 1
+
+        try:
+            handler_queue.events.put_nowait(event)
+        except queue.Full:
+            if getattr(_dispatch_thread, 'active', False):
+                self._finish(1, 'dropped')
+                log.warning(
+                    f"Event dropped: handler queue full",
+                    extra={'handler': handler.__name__, 'event_type': event_type,
+                           'event_id': event.event_id}
+                )
+                return
+            # Backpressure: wait for the drain task instead of running the
+            # handler here, which would break its ordering and exclusivity
+            self._bump('backpressure_waits')
+            handler_queue.events.put(event)
+
+        self._bump('queued')
+        self._schedule(handler_queue)
+
+    def _schedule(self, handler_queue: _HandlerQueue) -> None:
+        with handler_queue.lock:
+            if handler_queue.scheduled:
+                return
+            handler_queue.scheduled = True
+        self._executor.submit(self._drain, handler_queue)
+
+    def _drain(self, handler_queue: _HandlerQueue) -> None:
+        """Run one batch from a handler queue, then reschedule if more are waiting"""
+        _dispatch_thread.active = True
+        limit = handler_queue.batch_size or 1
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(handler_queue.events.get_nowait())
+            except queue.Empty:
+                break
+
+        if batch:
+            try:
+                self._call_batch(handler_queue, batch)
+            finally:
+                self._finish(len(batch))
+
+        with handler_queue.lock:
+            handler_queue.scheduled = False
+            if handler_queue.events.empty():
+                return
+        self._schedule(handler_queue)
+
+    def _call_batch(self, handler_queue: _HandlerQueue, batch: List[SNSEvent]) -> None:
+        if handler_queue.batch_size:
+            self._safe_call_handler(handler_queue.handler, batch)
+        else:
+            for event in batch:
+                self._safe_call_handler(handler_queue.handler, event)
+
+    def _bump(self, counter: str) -> None:
+        with self._dispatch_lock:
+            self._dispatch_stats[counter] += 1
+
+    def _finish(self, count: int, counter: Optional[str] = None) -> None:
+        with self._dispatch_lock:
+            self._pending -= count
+            if counter:
+                self._dispatch_stats[counter] += 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued async events have been handled"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the dispatch pool, optionally after draining queued events"""
+        if wait:
+            self.wait_idle()
+        with self._dispatch_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _safe_call_handler(self, handler: Callable, event) -> None:
         """Safely call a handler with error handling"""
+        with self._dispatch_lock:
+            self._dispatch_stats['handler_calls'] += 1
         try:
             handler(event)
         except Exception as e:
+            events = event if isinstance(event, list) else [event]
             log.error(
                 f"Event handler failed",
                 extra={
                     'handler': handler.__name__,
-                    'event_type': event.event_type,
-                    'event_id': event.event_id,
+                    'event_type': events[0].event_type,
+                    'event_ids': [ev.event_id for ev in events],
                     'error': str(e)
                 },
                 exc_info=True
@@ -284,6 +447,14 @@ class EventBus:
             'event_types': list(set(e.event_type for e in events))
         }
 
+        with self._dispatch_lock:
+            stats['dispatch'] = {
+                **self._dispatch_stats,
+                'pending': self._pending,
+                'max_workers': self._max_workers,
+                'max_queue_size': self._max_queue_size,
+            }
+
         return stats
 
 
@@ -303,7 +474,7 @@ def register_default_handlers(event_bus_instance: EventBus = None) -> None:
 
     # Register handlers with priority (higher = earlier execution)
     event_bus.subscribe('post:published', handle_post_published, priority=100)
-    event_bus.subscribe('post:published', record_analytics, priority=50)
+    event_bus.subscribe('post:published', record_analytics_batch, priority=50, batch_size=100)
     event_bus.subscribe('post:published', send_notification, priority=10)
 
     event_bus.subscribe('post:failed', handle_post_failed, priority=100)
@@ -350,28 +521,39 @@ def record_analytics(event: PostPublishedEvent) -> None:
 
     Creates analytics record to track impressions, engagements, etc.
     """
+    record_analytics_batch([event])
+
+
+def record_analytics_batch(events: List[PostPublishedEvent]) -> None:
+    """
+    Batched handler: Record analytics entries for several published posts
+
+    Adds one analytics row per (post, platform) and commits them together.
+    """
     try:
         from backend.models import SNSAnalytics, db
 
-        for platform in event.platforms:
-            analytics = SNSAnalytics(
-                user_id=event.user_id,
-                post_id=event.post_id,
-                platform=platform,
-                action='published',
-                metadata=json.dumps({
-                    'content_length': len(event.content),
-                    'scheduled': event.scheduled,
-                    'published_at': datetime.utcnow().isoformat()
-                })
-            )
-            db.session.add(analytics)
+        published_at = datetime.utcnow().isoformat()
+        for event in events:
+            for platform in event.platforms:
+                analytics = SNSAnalytics(
+                    user_id=event.user_id,
+                    post_id=event.post_id,
+                    platform=platform,
+                    action='published',
+                    metadata=json.dumps({
+                        'content_length': len(event.content),
+                        'scheduled': event.scheduled,
+                        'published_at': published_at
+                    })
+                )
+                db.session.add(analytics)
 
         db.session.commit()
 
         log.info(
-            f"Analytics recorded for published post",
-            extra={'post_id': event.post_id, 'platforms': event.platforms}
+            f"Analytics recorded for published posts",
+            extra={'post_ids': [event.post_id for event in events]}
         )
 
     except Exception as e:
@@ -505,4 +687,5 @@ def get_event_bus() -> EventBus:
 def reset_event_bus() -> None:
     """Reset event bus (for testing)"""
     global event_bus
+    event_bus.shutdown(wait=False)
     event_bus = EventBus()
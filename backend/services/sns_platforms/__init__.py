@@ -50,7 +50,7 @@ def get_client(platform, access_token=None, refresh_token=None, simulation_mode=
         return client_class(access_token, refresh_token, simulation_mode,
                             site_url=site_url, wp_username=wp_username)
 
-    return client_class(access_token, refresh_token, simulation_mode)
+    return client_class(access_token, refresh_token=refresh_token, simulation_mode=simulation_mode)
 
 
 __all__ = [
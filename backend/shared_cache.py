@@ -0,0 +1,409 @@
+"""Two-tier (L1 in-process + L2 shared) cache backend for SoftFactory
+
+Every Gunicorn worker keeps its own L1 (a ``backend.cache.TTLCache``) and
+shares one L2 store with its siblings:
+
+- ``RedisL2``  — used when ``REDIS_URL`` is set and the ``redis`` package is
+  importable. Invalidations are broadcast with Redis PUBLISH/SUBSCRIBE.
+- ``SQLiteL2`` — local fallback stored under ``.workspace/cache/``. Works
+  across workers on the same host; invalidations are broadcast through an
+  append-only table that each worker polls.
+
+Backend selection (``CACHE_L2_BACKEND``): ``auto`` (default), ``redis``,
+``sqlite`` or ``none``. ``auto`` disables L2 when ``TESTING`` is true so test
+runs never see values persisted by earlier runs.
+
+Values are stored in L2 as JSON; anything that does not serialize stays in
+L1 only. Tuples come back from L2 as lists.
+
+Usage:
+    from backend.cache import TTLCache
+    from backend.shared_cache import TieredCache
+
+    cache = TieredCache('reports', TTLCache(max_entries=512))
+    cache.set('reports:42', {...}, ttl_seconds=300)
+    cache.get('reports:42')
+    cache.invalidate_prefix('reports:')   # reaches every worker
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional, Tuple
+
+from .runtime_paths import workspace_path
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = 'sfcache:'
+REDIS_CHANNEL = 'sfcache:invalidate'
+SQLITE_POLL_SECONDS = 1.0
+SQLITE_INVALIDATION_RETENTION_SECONDS = 300
+
+# Identifies this process so it can skip its own broadcast invalidations.
+_ORIGIN = uuid.uuid4().hex
+# Suffix marking a broadcast invalidation as one exact key rather than a prefix
+_EXACT = '\x00'
+
+
+def _encode(value: Any, expires_at: float) -> Optional[str]:
+    try:
+        return json.dumps({'v': value, 'e': expires_at}, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(raw) -> Optional[Tuple[Any, float]]:
+    if raw is None:
+        return None
+    try:
+        payload = json.loads(raw)
+        return payload['v'], float(payload['e'])
+    except (TypeError, ValueError, KeyError):
+        return None
+
+
+class RedisL2:
+    """Redis-backed shared tier with pub/sub invalidation."""
+
+    name = 'redis'
+
+    def __init__(self, url: str):
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._client.ping()
+        self._listener = None
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        return _decode(self._client.get(REDIS_KEY_PREFIX + key))
+
+    def set(self, key: str, value: Any, expires_at: float) -> bool:
+        raw = _encode(value, expires_at)
+        if raw is None:
+            return False
+        ttl_ms = max(1, int((expires_at - time.time()) * 1000))
+        self._client.set(REDIS_KEY_PREFIX + key, raw, px=ttl_ms)
+        return True
+
+    def delete(self, key: str) -> None:
+        self._client.delete(REDIS_KEY_PREFIX + key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        batch = []
+        for redis_key in self._client.scan_iter(match=REDIS_KEY_PREFIX + prefix + '*', count=500):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                self._client.delete(*batch)
+                batch = []
+        if batch:
+            self._client.delete(*batch)
+
+    def publish(self, namespace: str, prefix: str) -> None:
+        message = json.dumps({'origin': _ORIGIN, 'ns': namespace, 'prefix': prefix})
+        self._client.publish(REDIS_CHANNEL, message)
+
+    def listen(self, callback: Callable[[str, str], None]) -> None:
+        if self._listener is not None:
+            return
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+        def handle(message):
+            try:
+                payload = json.loads(message['data'])
+            except (TypeError, ValueError):
+                return
+            if payload.get('origin') != _ORIGIN:
+                callback(payload.get('ns', ''), payload.get('prefix', ''))
+
+        pubsub.subscribe(**{REDIS_CHANNEL: handle})
+        self._listener = pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+
+class SQLiteL2:
+    """Host-local shared tier stored in a WAL-mode SQLite file.
+
+    Invalidations are appended to ``cache_invalidations``; each process polls
+    rows written by other origins and applies them to its L1.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self._path = str(path)
+        self._local = threading.local()
+        self._listener = None
+        self._sets_since_purge = 0
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_expires ON cache_entries (expires_at)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_invalidations ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, '
+            'ns TEXT NOT NULL, prefix TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=2.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        row = self._conn().execute(
+            'SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?',
+            (key, time.time()),
+        ).fetchone()
+        return _decode(row[0]) if row else None
+
+    def set(self, key: str, value: Any, expires_at: float) -> bool:
+        raw = _encode(value, expires_at)
+        if raw is None:
+            return False
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, raw, expires_at),
+        )
+        self._sets_since_purge += 1
+        if self._sets_since_purge >= 1000:
+            self._sets_since_purge = 0
+            conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        return True
+
+    def delete(self, key: str) -> None:
+        self._conn().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        # Range predicate so the primary-key index is used instead of LIKE.
+        self._conn().execute(
+            'DELETE FROM cache_entries WHERE key >= ? AND key < ?',
+            (prefix, prefix + '\U0010ffff'),
+        )
+
+    def publish(self, namespace: str, prefix: str) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            'INSERT INTO cache_invalidations (origin, ns, prefix, created_at) VALUES (?, ?, ?, ?)',
+            (_ORIGIN, namespace, prefix, now),
+        )
+        conn.execute(
+            'DELETE FROM cache_invalidations WHERE created_at < ?',
+            (now - SQLITE_INVALIDATION_RETENTION_SECONDS,),
+        )
+
+    def listen(self, callback: Callable[[str, str], None]) -> None:
+        if self._listener is not None:
+            return
+        row = self._conn().execute('SELECT COALESCE(MAX(id), 0) FROM cache_invalidations').fetchone()
+        last_id = row[0]
+
+        def poll():
+            nonlocal last_id
+            while True:
+                time.sleep(SQLITE_POLL_SECONDS)
+                try:
+                    rows = self._conn().execute(
+                        'SELECT id, origin, ns, prefix FROM cache_invalidations WHERE id > ? ORDER BY id',
+                        (last_id,),
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning("Shared cache invalidation poll failed: %s", e)
+                    continue
+                for row_id, origin, namespace, prefix in rows:
+                    last_id = row_id
+                    if origin != _ORIGIN:
+                        callback(namespace, prefix)
+
+        self._listener = threading.Thread(target=poll, name='shared-cache-invalidations', daemon=True)
+        self._listener.start()
+
+
+# ---------------------------------------------------------------------------
+# Backend resolution (lazy, once per process)
+# ---------------------------------------------------------------------------
+_backend = None
+_backend_resolved = False
+_backend_lock = threading.Lock()
+_registry = {}  # namespace -> TieredCache
+
+
+def _dispatch_invalidation(namespace: str, prefix: str) -> None:
+    cache = _registry.get(namespace)
+    if cache is not None:
+        cache._invalidate_local(prefix)
+
+
+def _create_backend():
+    mode = os.getenv('CACHE_L2_BACKEND', 'auto').strip().lower()
+    if mode == 'auto' and os.getenv('TESTING', '').strip().lower() in {'1', 'true', 'yes', 'on'}:
+        mode = 'none'
+    if mode == 'none':
+        return None
+
+    redis_url = os.getenv('REDIS_URL', '').strip()
+    if mode in ('auto', 'redis') and redis_url:
+        try:
+            return RedisL2(redis_url)
+        except Exception as e:
+            logger.warning("Redis L2 cache unavailable, falling back to SQLite: %s", e)
+
+    try:
+        return SQLiteL2(workspace_path('cache', create=True) / 'shared_cache.sqlite3')
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("SQLite L2 cache unavailable, using L1 only: %s", e)
+        return None
+
+
+def get_shared_backend():
+    """Return the process-wide L2 backend, or None when L2 is disabled."""
+    global _backend, _backend_resolved
+    if _backend_resolved:
+        return _backend
+    with _backend_lock:
+        if not _backend_resolved:
+            _backend = _create_backend()
+            if _backend is not None:
+                try:
+                    _backend.listen(_dispatch_invalidation)
+                except Exception as e:
+                    logger.warning("Shared cache invalidation listener failed to start: %s", e)
+            _backend_resolved = True
+    return _backend
+
+
+def reset_shared_backend(backend=None):
+    """Replace the process-wide L2 backend (tests and explicit wiring)."""
+    global _backend, _backend_resolved
+    with _backend_lock:
+        _backend = backend
+        _backend_resolved = True
+        if backend is not None:
+            backend.listen(_dispatch_invalidation)
+
+
+class TieredCache:
+    """L1 ``TTLCache`` in front of the shared L2 backend.
+
+    Reads try L1, then L2 (promoting hits into L1). Writes and invalidations
+    go to both tiers, and invalidations are broadcast so sibling workers
+    drop their L1 copies too. While an L2 is configured, L1 entries never
+    outlive ``l1_max_ttl`` seconds, which bounds staleness if a broadcast is
+    missed. L2 errors are logged and the cache degrades to L1 only.
+    """
+
+    def __init__(self, namespace: str, l1, l1_max_ttl: float = 60):
+        self.namespace = namespace
+        self._l1 = l1
+        self._l1_max_ttl = l1_max_ttl
+        self._stats = {'l2_hits': 0, 'l2_misses': 0, 'l2_errors': 0}
+        self._stats_lock = threading.Lock()
+        _registry[namespace] = self
+
+    def _l2_key(self, key: str) -> str:
+        return f'{self.namespace}:{key}'
+
+    def _bump(self, counter: str) -> None:
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._l1.get(key)
+        if value is not None:
+            return value
+        backend = get_shared_backend()
+        if backend is None:
+            return None
+        try:
+            found = backend.get(self._l2_key(key))
+        except Exception as e:
+            self._bump('l2_errors')
+            logger.warning("L2 cache get failed for %s: %s", key, e)
+            return None
+        if found is None:
+            self._bump('l2_misses')
+            return None
+        value, expires_at = found
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            self._bump('l2_misses')
+            return None
+        self._bump('l2_hits')
+        self._l1.set(key, value, min(remaining, self._l1_max_ttl))
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        backend = get_shared_backend()
+        if backend is None:
+            self._l1.set(key, value, ttl_seconds)
+            return
+        self._l1.set(key, value, min(ttl_seconds, self._l1_max_ttl))
+        try:
+            backend.set(self._l2_key(key), value, time.time() + ttl_seconds)
+        except Exception as e:
+            self._bump('l2_errors')
+            logger.warning("L2 cache set failed for %s: %s", key, e)
+
+    def delete(self, key: str) -> None:
+        """Drop exactly ``key`` from both tiers and sibling L1s."""
+        self._l1.delete(key)
+        backend = get_shared_backend()
+        if backend is None:
+            return
+        try:
+            backend.delete(self._l2_key(key))
+            backend.publish(self.namespace, key + _EXACT)
+        except Exception as e:
+            self._bump('l2_errors')
+            logger.warning("L2 cache delete failed for %s: %s", key, e)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        self._l1.invalidate_prefix(prefix)
+        self._broadcast(prefix)
+
+    def clear(self) -> None:
+        self._l1.clear()
+        self._broadcast('')
+
+    def purge_expired(self) -> int:
+        """Drop expired L1 entries; L2 entries expire on their own."""
+        return self._l1.purge_expired()
+
+    def stats(self) -> dict:
+        backend = get_shared_backend()
+        stats = self._l1.stats()
+        with self._stats_lock:
+            stats.update(self._stats)
+        stats['l2_backend'] = backend.name if backend is not None else None
+        return stats
+
+    def _invalidate_local(self, prefix: str) -> None:
+        """Apply an invalidation broadcast by another worker to L1 only."""
+        if prefix.endswith(_EXACT):
+            self._l1.delete(prefix[:-len(_EXACT)])
+        elif prefix:
+            self._l1.invalidate_prefix(prefix)
+        else:
+            self._l1.clear()
+
+    def _broadcast(self, prefix: str) -> None:
+        backend = get_shared_backend()
+        if backend is None:
+            return
+        try:
+            backend.delete_prefix(self._l2_key(prefix))
+            backend.publish(self.namespace, prefix)
+        except Exception as e:
+            self._bump('l2_errors')
+            logger.warning("L2 cache invalidation failed for %s: %s", prefix, e)
@@ -204,8 +204,14 @@ def send_sns_notification(user_id: int, notification_type: str, data: Dict[str,
         logger.debug(f'[TELEGRAM] Telegram not enabled for user {user_id}')
         return False
 
-    chat_id = sns_settings.telegram_chat_id
+    return dispatch_sns_notification(sns_settings.telegram_chat_id, notification_type, data)
 
+
+def dispatch_sns_notification(chat_id: str, notification_type: str, data: Dict[str, Any]) -> bool:
+    """Send a typed SNS notification to a known chat (no database access).
+
+    Used directly by callers that resolved chat ids in bulk.
+    """
     try:
         if notification_type == 'post_success':
             return TelegramService.notify_post_success(
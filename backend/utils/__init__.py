@@ -20,7 +20,9 @@ from .pagination import (
     CursorPagination,
     OffsetPagination,
     FieldFilter,
-    PaginationMixin
+    PaginationMixin,
+    encode_keyset_cursor,
+    decode_keyset_cursor
 )
 
 from .retry_handler import (
@@ -49,6 +51,8 @@ __all__ = [
     'OffsetPagination',
     'FieldFilter',
     'PaginationMixin',
+    'encode_keyset_cursor',
+    'decode_keyset_cursor',
 
     # Retry/Circuit Breaker
     'ErrorCategory',
@@ -5,13 +5,35 @@ Implements:
 - Offset-based pagination (compatible)
 - Partial response/field filtering
 - Pagination metadata
+- Opaque keyset cursors (encode_keyset_cursor / decode_keyset_cursor)
 """
 
+import base64
+import json
+from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from flask import request, jsonify
 from functools import wraps
 
 
+def encode_keyset_cursor(*values) -> str:
+    """Opaque URL-safe cursor for the last row's sort key (datetimes as ISO strings)."""
+    key = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(key).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_keyset_cursor(cursor: str) -> list:
+    """Sort key values from encode_keyset_cursor; raises ValueError on a malformed cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
 class CursorPagination:
     """Cursor-based pagination for better performance"""
 
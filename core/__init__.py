@@ -1,6 +1,6 @@
 from .sequential_thinking import ThoughtChain, ThinkingStep
 from .handoff import HandOffMessage, TaskStatus
-from .ledger import log_to_ledger, update_mission_status
+from .ledger import log_to_ledger, update_mission_status, mission_history, mission_status, flush_ledger
 from .logger import get_logger
 from .consultation import (
     ConsultationBus, ConsultationRequest, ConsultationResponse,
@@ -26,7 +26,7 @@ __all__ = [
     # Handoff
     "HandOffMessage", "TaskStatus",
     # Ledger
-    "log_to_ledger", "update_mission_status",
+    "log_to_ledger", "update_mission_status", "mission_history", "mission_status", "flush_ledger",
     # Logger
     "get_logger",
     # Consultation
@@ -3,14 +3,17 @@ Consultation Bus — Inter-Agent Communication & Collaboration
 Real-time message passing, decision coordination, conflict resolution
 """
 
+import heapq
+import itertools
 import json
+import time
 import uuid
+from collections import OrderedDict, deque
 from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime
 import logging
-from queue import PriorityQueue, Empty
 import threading
 
 logger = logging.getLogger(__name__)
@@ -87,6 +90,14 @@ class Decision:
         return asdict(self)
 
 
+@dataclass
+class _Mailbox:
+    """Pending messages for one agent plus its position in the broadcast channel"""
+    ready: threading.Condition
+    broadcast_cursor: int
+    heap: List[tuple] = field(default_factory=list)
+
+
 class ConsultationBus:
     """
     Central message bus for agent collaboration
@@ -96,29 +107,78 @@ class ConsultationBus:
     - Broadcast: Agent A → All (information sharing)
     - Question: Agent A → Orchestrator (decision needed)
     - Handoff: Agent A → Agent B (task transfer)
+
+    Delivery:
+    - Targeted messages go straight into the recipient's mailbox (a heap
+      ordered by priority, then publish order); only that agent is woken.
+    - Broadcasts are appended once to a bounded fan-out channel and every
+      agent reads each of them (except its own) once. A consumer moves new
+      broadcasts into its mailbox when it polls, so ``consume`` only touches
+      that agent's messages. Agents lagging more than ``max_queue_size``
+      broadcasts behind skip the overwritten ones (``broadcasts_missed``).
+    - ``messages`` archives the newest ``archive_size`` messages by id.
     """
 
-    def __init__(self, max_queue_size: int = 1000):
-        self.queue: PriorityQueue = PriorityQueue(maxsize=max_queue_size)
-        self.messages: Dict[str, Message] = {}  # Archived messages
+    def __init__(self, max_queue_size: int = 1000, archive_size: int = 1000, latency_window: int = 1000):
+        self.max_queue_size = max_queue_size
+        self.archive_size = archive_size
+        self.messages: "OrderedDict[str, Message]" = OrderedDict()  # Archive, oldest first
         self.decisions: Dict[str, Decision] = {}  # Decision log
         self.subscriptions: Dict[str, List[Callable]] = {}  # Event listeners
         self.lock = threading.RLock()
 
+        self.mailboxes: Dict[str, _Mailbox] = {}
+        self.broadcasts: deque = deque(maxlen=max_queue_size)  # (seq, order, published_at, message)
+        self._broadcast_seq = 0  # seq of the next broadcast
+        self._order = itertools.count()
+        self._started = time.monotonic()
+        self._latency_ms: deque = deque(maxlen=latency_window)
+        self.counters = {
+            "published": 0, "targeted": 0, "broadcast": 0, "delivered": 0,
+            "rejected": 0, "broadcasts_missed": 0,
+        }
+
+    def _mailbox(self, agent_id: str) -> _Mailbox:
+        box = self.mailboxes.get(agent_id)
+        if box is None:
+            # New agents still see the broadcasts the channel retains
+            oldest = self.broadcasts[0][0] if self.broadcasts else self._broadcast_seq
+            box = self.mailboxes[agent_id] = _Mailbox(ready=threading.Condition(self.lock), broadcast_cursor=oldest)
+        return box
+
+    def _archive(self, message: Message):
+        self.messages[message.id] = message
+        self.messages.move_to_end(message.id)
+        while len(self.messages) > self.archive_size:
+            self.messages.popitem(last=False)
+
     def publish(self, message: Message) -> bool:
         """
         Publish message to bus
 
         Returns:
-            True if queued, False if queue full
+            True if queued, False if the recipient's mailbox is full
         """
         try:
             with self.lock:
-                # Convert priority to queue priority (lower = higher priority)
-                priority_value = message.priority.value
-                # Use message ID as tiebreaker to avoid comparing Message objects
-                self.queue.put((priority_value, message.created_at, message.id, message), block=False)
-                self.messages[message.id] = message
+                published_at = time.monotonic()
+                if message.to_agent is None:
+                    self.broadcasts.append((self._broadcast_seq, next(self._order), published_at, message))
+                    self._broadcast_seq += 1
+                    self.counters["broadcast"] += 1
+                    for box in self.mailboxes.values():
+                        box.ready.notify()
+                else:
+                    box = self._mailbox(message.to_agent)
+                    if len(box.heap) >= self.max_queue_size:
+                        self.counters["rejected"] += 1
+                        logger.warning(f"Mailbox full for {message.to_agent}, dropping {message.id}")
+                        return False
+                    heapq.heappush(box.heap, (message.priority.value, next(self._order), published_at, message))
+                    self.counters["targeted"] += 1
+                    box.ready.notify()
+                self.counters["published"] += 1
+                self._archive(message)
 
                 # Log
                 logger.info(
@@ -134,29 +194,42 @@ class ConsultationBus:
             logger.error(f"Failed to publish message: {e}")
             return False
 
+    def _pull_broadcasts(self, agent_id: str, box: _Mailbox):
+        """Move broadcasts this agent has not seen yet into its mailbox"""
+        fresh = self._broadcast_seq - box.broadcast_cursor
+        if fresh <= 0:
+            return
+        retained = min(fresh, len(self.broadcasts))
+        self.counters["broadcasts_missed"] += fresh - retained
+        for _, order, published_at, message in itertools.islice(reversed(self.broadcasts), retained):
+            if message.from_agent != agent_id:
+                heapq.heappush(box.heap, (message.priority.value, order, published_at, message))
+        box.broadcast_cursor = self._broadcast_seq
+
     def consume(self, agent_id: str, timeout: float = 0.5) -> Optional[Message]:
         """
         Retrieve next message for agent
 
+        Blocks up to ``timeout`` seconds, woken as soon as a message for this
+        agent (or a broadcast) is published.
+
         Returns:
             Message if available (targeted or broadcast), None if timeout
         """
-        try:
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            box = self._mailbox(agent_id)
             while True:
-                _, _, _, message = self.queue.get(timeout=timeout)
-
-                # Check if message is for this agent
-                if message.to_agent is None:  # Broadcast
+                self._pull_broadcasts(agent_id, box)
+                if box.heap:
+                    _, _, published_at, message = heapq.heappop(box.heap)
+                    self.counters["delivered"] += 1
+                    self._latency_ms.append((time.monotonic() - published_at) * 1000)
                     return message
-                elif message.to_agent == agent_id:  # Targeted
-                    return message
-                # Not for this agent, re-queue
-                else:
-                    self.queue.put(
-                        (message.priority.value, message.created_at, message.id, message)
-                    )
-        except Empty:
-            return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                box.ready.wait(remaining)
 
     def request(
         self,
@@ -361,26 +434,37 @@ class ConsultationBus:
     def get_message_stats(self) -> Dict[str, Any]:
         """Get bus statistics"""
         with self.lock:
+            uptime = max(time.monotonic() - self._started, 1e-9)
+            latencies = sorted(self._latency_ms)
+            pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)  # noqa: E731
+            pending = {agent: len(box.heap) + self._broadcast_seq - box.broadcast_cursor
+                       for agent, box in self.mailboxes.items()}
             return {
                 "total_messages": len(self.messages),
-                "queue_size": self.queue.qsize(),
+                "queue_size": sum(len(box.heap) for box in self.mailboxes.values()) + len(self.broadcasts),
                 "decisions_recorded": len(self.decisions),
-                "subscriptions": len(self.subscriptions)
+                "subscriptions": len(self.subscriptions),
+                "mailboxes": pending,
+                "counters": dict(self.counters),
+                "throughput_per_sec": {
+                    "published": round(self.counters["published"] / uptime, 3),
+                    "delivered": round(self.counters["delivered"] / uptime, 3),
+                },
+                "delivery_latency_ms": {
+                    "p50": pick(0.5) if latencies else None,
+                    "p95": pick(0.95) if latencies else None,
+                    "max": round(latencies[-1], 3) if latencies else None,
+                },
             }
 
     def clear_old_messages(self, keep_count: int = 500):
         """Archive old messages to save memory"""
         with self.lock:
             if len(self.messages) > keep_count:
-                # Keep newest N messages
-                sorted_messages = sorted(
-                    self.messages.items(),
-                    key=lambda x: x[1].created_at,
-                    reverse=True
-                )
-                to_keep = dict(sorted_messages[:keep_count])
-                self.messages = to_keep
-                logger.info(f"Archived messages, keeping {len(to_keep)}")
+                # Keep newest N messages (the archive is in publish order)
+                while len(self.messages) > keep_count:
+                    self.messages.popitem(last=False)
+                logger.info(f"Archived messages, keeping {len(self.messages)}")
 
 
 # Global bus instance
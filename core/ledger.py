@@ -1,17 +1,38 @@
 """
 core/ledger.py
-Stable ledger writer with file locking and proper section-based append.
+Append-only agent ledger with a debounced markdown view.
+
+logs/ledger.jsonl is the source of truth. Every log_to_ledger() /
+update_mission_status() call appends one JSON line (O_APPEND, no file lock,
+no rewrite), so concurrent agent runs never wait on each other. Entries
+carrying a mission id are indexed in memory; mission_history() and
+mission_status() read the index, catching up on lines other processes
+appended since the last read.
+
+The Change Log / Active Missions tables in CLAUDE.md are a rendered view.
+Appends schedule a render LEDGER_RENDER_DELAY seconds later (default 2.0;
+0 renders inline), so a burst of appends costs one locked rewrite. The
+render applies every entry past the watermark in logs/ledger.rendered, so
+renders from several processes never duplicate rows. render_ledger()
+forces one, and pending renders are flushed at exit.
 Uses msvcrt (Windows) or fcntl (Unix) for cross-platform file locking.
 """
 
-import re
+import atexit
+import json
 import os
+import re
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
 
 LEDGER_PATH = Path(__file__).parent.parent / "CLAUDE.md"
+LOGS_DIR = Path(__file__).parent.parent / "logs"
+LEDGER_LOG = LOGS_DIR / "ledger.jsonl"
+RENDER_WATERMARK = LOGS_DIR / "ledger.rendered"
 
 # ---------------------------------------------------------------------------
 # Cross-platform file locking
@@ -38,29 +59,81 @@ def _unlock(fp):
         fcntl.flock(fp, fcntl.LOCK_UN)
 
 
-def _write_with_lock(path: Path, content: str, retries: int = 5) -> None:
-    """Write file content with exclusive lock, retrying on lock contention."""
-    for attempt in range(retries):
+# ---------------------------------------------------------------------------
+# Append-only log + mission index
+# ---------------------------------------------------------------------------
+
+def _append(entry: dict) -> None:
+    """Append one entry as a single write; O_APPEND keeps concurrent lines whole."""
+    LEDGER_LOG.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(LEDGER_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _read_from(offset: int):
+    """Complete entries after byte ``offset``; returns (entries, new offset)."""
+    try:
+        with open(LEDGER_LOG, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    end = data.rfind(b"\n") + 1  # a line still being written waits for the next read
+    entries = []
+    for raw in data[:end].splitlines():
         try:
-            with open(path, "r+", encoding="utf-8") as fp:
-                try:
-                    _lock(fp)
-                    fp.seek(0)
-                    fp.write(content)
-                    fp.truncate()
-                finally:
-                    _unlock(fp)
-            return
-        except (IOError, OSError):
-            if attempt < retries - 1:
-                time.sleep(0.1 * (attempt + 1))
-            else:
-                # Last resort: write without lock
-                path.write_text(content, encoding="utf-8")
+            entries.append(json.loads(raw))
+        except ValueError:
+            continue
+    return entries, offset + end
+
+
+class _MissionIndex:
+    """mission_id -> entries, caught up incrementally from the log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._offset = 0
+        self._entries: Dict[str, List[dict]] = {}
+
+    def refresh(self) -> None:
+        with self._lock:
+            if self._path != LEDGER_LOG:
+                self._path, self._offset, self._entries = LEDGER_LOG, 0, {}
+            entries, self._offset = _read_from(self._offset)
+            for entry in entries:
+                if entry.get("mission_id"):
+                    self._entries.setdefault(entry["mission_id"], []).append(entry)
+
+    def history(self, mission_id: str) -> List[dict]:
+        self.refresh()
+        with self._lock:
+            return list(self._entries.get(mission_id, []))
+
+
+_index = _MissionIndex()
+
+
+def mission_history(mission_id: str) -> List[dict]:
+    """All ledger entries recorded for a mission, oldest first."""
+    return _index.history(mission_id)
+
+
+def mission_status(mission_id: str) -> Optional[str]:
+    """Latest status set through update_mission_status(), if any."""
+    for entry in reversed(_index.history(mission_id)):
+        if entry["type"] == "MISSION_STATUS":
+            return entry["status"]
+    return None
 
 
 # ---------------------------------------------------------------------------
-# Change Log append
+# Markdown view
 # ---------------------------------------------------------------------------
 
 _CHANGELOG_HEADER_RE = re.compile(
@@ -69,46 +142,136 @@ _CHANGELOG_HEADER_RE = re.compile(
 )
 
 
-def log_to_ledger(agent_name: str, action: str) -> None:
-    """Append a new row to the Change Log table in CLAUDE.md."""
-    date = datetime.utcnow().strftime("%Y-%m-%d")
-    new_row = f"| {date} | {agent_name} | {action} |\n"
+def _apply(content: str, entries: List[dict]) -> str:
+    rows = "".join(
+        f"| {e['date']} | {e['agent']} | {e['action']} |\n"
+        for e in reversed(entries) if e["type"] == "ACTION"  # newest row on top
+    )
+    if rows:
+        match = _CHANGELOG_HEADER_RE.search(content)
+        if match:
+            # Insert rows immediately after the separator line
+            content = content[:match.end()] + rows + content[match.end():]
+        else:
+            # Fallback: append at file end
+            content = content.rstrip() + "\n\n" + rows
 
-    content = LEDGER_PATH.read_text(encoding="utf-8")
+    statuses = {e["mission_id"]: e["status"] for e in entries if e["type"] == "MISSION_STATUS"}
+    for mission_id, new_status in statuses.items():
+        pattern = re.compile(
+            rf"(\| {re.escape(mission_id)} \|[^|]+\|[^|]+\|)\s*\w[\w-]*\s*(\|)",
+            re.MULTILINE,
+        )
+        content, n = pattern.subn(rf"\1 {new_status} \2", content)
+        if n == 0:
+            print(f"[LEDGER] WARNING: Mission {mission_id} row not found.")
+    return content
 
-    match = _CHANGELOG_HEADER_RE.search(content)
-    if match:
-        # Insert row immediately after the separator line
-        insert_pos = match.end()
-        content = content[:insert_pos] + new_row + content[insert_pos:]
-    else:
-        # Fallback: append at file end
-        content = content.rstrip() + "\n\n" + new_row
 
-    _write_with_lock(LEDGER_PATH, content)
-    print(f"[LEDGER] Logged: {agent_name} - {action}")
+def render_ledger() -> int:
+    """Apply entries appended since the last render to CLAUDE.md; returns how many."""
+    if not LEDGER_PATH.exists():
+        return 0
+    with open(LEDGER_PATH, "r+", encoding="utf-8") as fp:
+        _lock(fp)
+        try:
+            try:
+                offset = int(RENDER_WATERMARK.read_text().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                offset = 0
+            entries, new_offset = _read_from(offset)
+            if entries:
+                content = _apply(fp.read(), entries)
+                fp.seek(0)
+                fp.write(content)
+                fp.truncate()
+            if new_offset != offset:
+                RENDER_WATERMARK.parent.mkdir(parents=True, exist_ok=True)
+                RENDER_WATERMARK.write_text(str(new_offset))
+            return len(entries)
+        finally:
+            _unlock(fp)
+
+
+class _RenderScheduler:
+    """Coalesces render requests into one render per delay window."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def request(self) -> None:
+        delay = float(os.getenv("LEDGER_RENDER_DELAY", "2.0"))
+        if delay <= 0:
+            self._render()
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(delay, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _fire(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._render()
+
+    def flush(self) -> None:
+        """Run a pending render now (at exit, or before reading CLAUDE.md)."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self._render()
+
+    @staticmethod
+    def _render() -> None:
+        for attempt in range(3):
+            try:
+                render_ledger()
+                return
+            except (IOError, OSError) as e:
+                if attempt == 2:
+                    print(f"[LEDGER] WARNING: render failed: {e}")
+                else:
+                    time.sleep(0.1 * (attempt + 1))
+
+
+_renderer = _RenderScheduler()
+atexit.register(_renderer.flush)
+
+
+def flush_ledger() -> None:
+    """Render any pending entries into CLAUDE.md immediately."""
+    _renderer.flush()
 
 
 # ---------------------------------------------------------------------------
-# Mission status update
+# Writers
 # ---------------------------------------------------------------------------
 
-_MISSION_ROW_RE = re.compile(
-    r"(\| {mission_id} \|[^|]+\|[^|]+\|)\s*\S+\s*(\|)",
-    re.MULTILINE,
-)
+def log_to_ledger(agent_name: str, action: str, mission_id: Optional[str] = None) -> None:
+    """Record an agent action; shows up in the CLAUDE.md Change Log on the next render."""
+    now = datetime.utcnow()
+    _append({
+        "type": "ACTION",
+        "ts": now.isoformat(),
+        "date": now.strftime("%Y-%m-%d"),
+        "agent": agent_name,
+        "action": action,
+        "mission_id": mission_id,
+    })
+    _renderer.request()
+    print(f"[LEDGER] Logged: {agent_name} - {action}")
 
 
 def update_mission_status(mission_id: str, new_status: str) -> None:
-    """Update a mission row status in the Active Missions table."""
-    content = LEDGER_PATH.read_text(encoding="utf-8")
-    pattern = re.compile(
-        rf"(\| {re.escape(mission_id)} \|[^|]+\|[^|]+\|)\s*\w[\w-]*\s*(\|)",
-        re.MULTILINE,
-    )
-    updated, n = pattern.subn(rf"\1 {new_status} \2", content)
-    if n == 0:
-        print(f"[LEDGER] WARNING: Mission {mission_id} row not found.")
-    else:
-        _write_with_lock(LEDGER_PATH, updated)
-        print(f"[LEDGER] Mission {mission_id} status -> {new_status}")
+    """Record a mission status change; the Active Missions row updates on the next render."""
+    _append({
+        "type": "MISSION_STATUS",
+        "ts": datetime.utcnow().isoformat(),
+        "mission_id": mission_id,
+        "status": new_status,
+    })
+    _renderer.request()
+    print(f"[LEDGER] Mission {mission_id} status -> {new_status}")
@@ -0,0 +1,36 @@
+"""Add review_crawl_states for incremental review crawling
+
+Revision ID: 005_review_crawl_states
+Revises: 004_wordpress_fields
+Create Date: 2026-10-16
+
+Adds:
+  review_crawl_states — per-platform ETag/Last-Modified and content hash
+                        for listing pages, and content hash per listing
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005_review_crawl_states'
+down_revision = '004_wordpress_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'review_crawl_states',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('platform', sa.String(50), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('key', sa.String(1000), nullable=False),
+        sa.Column('etag', sa.String(255), nullable=True),
+        sa.Column('last_modified', sa.String(64), nullable=True),
+        sa.Column('content_hash', sa.String(64), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('platform', 'kind', 'key', name='uq_crawl_state_key'),
+    )
+
+
+def downgrade():
+    op.drop_table('review_crawl_states')
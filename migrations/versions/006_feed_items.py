@@ -0,0 +1,37 @@
+"""Add feed_items for fan-out-on-write home feeds
+
+Revision ID: 006_feed_items
+Revises: 005_review_crawl_states
+Create Date: 2026-10-16
+
+Adds:
+  feed_items — per-reader copy of followed users' activities, keyed by
+               (user_id, activity_id) for keyset-paginated feed reads
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006_feed_items'
+down_revision = '005_review_crawl_states'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'feed_items',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('feeds.id'), nullable=False),
+        sa.Column('actor_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('activity_type', sa.String(50), nullable=False),
+        sa.Column('content_json', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('user_id', 'activity_id', name='uq_feed_item_user_activity'),
+    )
+    op.create_index('idx_feed_item_user_actor', 'feed_items', ['user_id', 'actor_id'])
+
+
+def downgrade():
+    op.drop_index('idx_feed_item_user_actor', table_name='feed_items')
+    op.drop_table('feed_items')
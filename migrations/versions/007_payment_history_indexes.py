@@ -0,0 +1,29 @@
+"""Add (user_id, date) indexes for keyset payment history
+
+Revision ID: 007_payment_history_indexes
+Revises: 006_feed_items
+Create Date: 2026-10-16
+
+Adds:
+  idx_payment_user_created  payments(user_id, created_at)
+  idx_invoice_user_issued   invoices(user_id, issued_date)
+
+Both branches of the merged invoice/payment history UNION ALL become
+ordered index range scans.
+"""
+from alembic import op
+
+revision = '007_payment_history_indexes'
+down_revision = '006_feed_items'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_payment_user_created', 'payments', ['user_id', 'created_at'])
+    op.create_index('idx_invoice_user_issued', 'invoices', ['user_id', 'issued_date'])
+
+
+def downgrade():
+    op.drop_index('idx_invoice_user_issued', table_name='invoices')
+    op.drop_index('idx_payment_user_created', table_name='payments')
@@ -0,0 +1,49 @@
+"""Denormalize review listing application counts
+
+Revision ID: 008_review_listing_application_count
+Revises: 007_payment_history_indexes
+Create Date: 2026-10-16
+
+Adds:
+  review_listings.application_count  — local ReviewApplication rows per listing,
+                                       kept current by ORM flush hooks and
+                                       backfilled here
+  idx_listing_status_deadline        (status, deadline)
+  idx_listing_status_reward          (status, reward_value, deadline)
+  idx_listing_status_app_count       (status, application_count, deadline)
+
+The indexes serve the /api/review/aggregated sorts (deadline, reward_high,
+applicants_few); latest already uses idx_status_created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008_review_listing_application_count'
+down_revision = '007_payment_history_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('review_listings') as batch_op:
+        batch_op.add_column(sa.Column('application_count', sa.Integer(), nullable=False,
+                                      server_default='0'))
+
+    op.execute(
+        'UPDATE review_listings SET application_count = ('
+        'SELECT COUNT(*) FROM review_applications '
+        'WHERE review_applications.listing_id = review_listings.id)'
+    )
+
+    op.create_index('idx_listing_status_deadline', 'review_listings', ['status', 'deadline'])
+    op.create_index('idx_listing_status_reward', 'review_listings', ['status', 'reward_value', 'deadline'])
+    op.create_index('idx_listing_status_app_count', 'review_listings',
+                    ['status', 'application_count', 'deadline'])
+
+
+def downgrade():
+    op.drop_index('idx_listing_status_app_count', table_name='review_listings')
+    op.drop_index('idx_listing_status_reward', table_name='review_listings')
+    op.drop_index('idx_listing_status_deadline', table_name='review_listings')
+    with op.batch_alter_table('review_listings') as batch_op:
+        batch_op.drop_column('application_count')
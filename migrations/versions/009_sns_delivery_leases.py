@@ -0,0 +1,38 @@
+"""SNS delivery leases
+
+Revision ID: 009_sns_delivery_leases
+Revises: 008_review_listing_application_count
+Create Date: 2026-10-16
+
+Adds:
+  sns_automates.lease_owner / lease_expires_at  — claim lease (backend.leases)
+  sns_posts.lease_owner / lease_expires_at
+  idx_sns_automate_due            (is_active, next_run)
+  idx_sns_post_status_scheduled   (status, scheduled_at)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009_sns_delivery_leases'
+down_revision = '008_review_listing_application_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('sns_automates', 'sns_posts'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('lease_owner', sa.String(length=64), nullable=True))
+            batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+    op.create_index('idx_sns_automate_due', 'sns_automates', ['is_active', 'next_run'])
+    op.create_index('idx_sns_post_status_scheduled', 'sns_posts', ['status', 'scheduled_at'])
+
+
+def downgrade():
+    op.drop_index('idx_sns_post_status_scheduled', table_name='sns_posts')
+    op.drop_index('idx_sns_automate_due', table_name='sns_automates')
+    for table in ('sns_posts', 'sns_automates'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('lease_expires_at')
+            batch_op.drop_column('lease_owner')
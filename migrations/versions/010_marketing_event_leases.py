@@ -0,0 +1,42 @@
+"""Marketing event queue leases
+
+Revision ID: 010_marketing_event_leases
+Revises: 009_sns_delivery_leases
+Create Date: 2026-10-16
+
+Adds:
+  marketing_events.lease_owner / lease_expires_at  — claim lease (backend.leases)
+  marketing_events.delivery_attempts               — claims per event
+  idx_marketing_event_queue   (processing_status, created_at)
+  idx_marketing_event_lease   (processing_status, lease_expires_at)
+
+Rows already 'processing' get no lease, so the first claim after the
+upgrade treats them as expired and redelivers them (the old poller did
+the same after 5 minutes).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010_marketing_event_leases'
+down_revision = '009_sns_delivery_leases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('marketing_events') as batch_op:
+        batch_op.add_column(sa.Column('lease_owner', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('delivery_attempts', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('idx_marketing_event_queue', 'marketing_events', ['processing_status', 'created_at'])
+    op.create_index('idx_marketing_event_lease', 'marketing_events', ['processing_status', 'lease_expires_at'])
+
+
+def downgrade():
+    op.drop_index('idx_marketing_event_lease', table_name='marketing_events')
+    op.drop_index('idx_marketing_event_queue', table_name='marketing_events')
+    with op.batch_alter_table('marketing_events') as batch_op:
+        batch_op.drop_column('delivery_attempts')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
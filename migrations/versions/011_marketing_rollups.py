@@ -0,0 +1,63 @@
+"""Growth dashboard rollups
+
+Revision ID: 011_marketing_rollups
+Revises: 010_marketing_event_leases
+Create Date: 2026-10-16
+
+Adds:
+  marketing_rollups          (metric, bucket, dimension) -> total, hourly
+  marketing_journey_rollups  (span_start, span_end, state) -> total
+  idx_marketing_event_ts, idx_marketing_message_created, idx_marketing_dlq_created,
+  idx_marketing_journey_entered, idx_marketing_journey_last_action
+      — partial-hour edges of dashboard windows are counted from the raw rows
+
+The tables start empty: run ``python scripts/rebuild_growth_rollups.py``
+once after upgrading to backfill them from the raw marketing tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011_marketing_rollups'
+down_revision = '010_marketing_event_leases'
+branch_labels = None
+depends_on = None
+
+RAW_INDEXES = [
+    ('idx_marketing_event_ts', 'marketing_events', ['event_ts']),
+    ('idx_marketing_message_created', 'marketing_message_logs', ['created_at']),
+    ('idx_marketing_dlq_created', 'marketing_dlq', ['created_at']),
+    ('idx_marketing_journey_entered', 'marketing_journey_states', ['entered_at']),
+    ('idx_marketing_journey_last_action', 'marketing_journey_states', ['last_action_at']),
+]
+
+
+def upgrade():
+    op.create_table(
+        'marketing_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('metric', sa.String(length=32), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('dimension', sa.String(length=60), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('metric', 'bucket', 'dimension', name='uq_marketing_rollup_key'),
+    )
+    op.create_table(
+        'marketing_journey_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('span_start', sa.DateTime(), nullable=False),
+        sa.Column('span_end', sa.DateTime(), nullable=False),
+        sa.Column('state', sa.String(length=60), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('span_start', 'span_end', 'state', name='uq_marketing_journey_rollup_key'),
+    )
+    op.create_index('idx_marketing_journey_rollup_end', 'marketing_journey_rollups', ['span_end'])
+    for name, table, columns in RAW_INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(RAW_INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index('idx_marketing_journey_rollup_end', table_name='marketing_journey_rollups')
+    op.drop_table('marketing_journey_rollups')
+    op.drop_table('marketing_rollups')
@@ -0,0 +1,139 @@
+"""Benchmark: thread-pool vs async review scraping against a local fixture server
+
+Starts a threaded HTTP server on localhost that serves paginated listing pages
+with an artificial per-request latency, then crawls it with N paginated
+scrapers twice:
+
+  - thread path: aggregate-style ThreadPoolExecutor running parse_listings()
+    (sequential fetch_page + rate_limit sleep per page)
+  - async path:  one AsyncFetchEngine running parse_listings_async()
+    (pipelined pages, per-host concurrency and politeness limits)
+
+Both paths use the same politeness delay so the comparison is fair: the
+thread path sleeps ``--delay`` after every page, the async engine spaces
+request starts to a host ``--delay`` apart. Each scraper gets its own
+fixture host name (127.0.0.N) so per-host limits behave as in production.
+
+Usage:
+    python scripts/benchmark_review_scrapers.py --scrapers 8 --pages 5 --latency 0.2 --delay 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.review_scrapers.async_engine import AsyncFetchEngine  # noqa: E402
+from backend.services.review_scrapers.base_scraper import BaseScraper  # noqa: E402
+
+ITEMS_PER_PAGE = 20
+
+
+def make_handler(latency: float, pages: int):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            page = int(parse_qs(urlsplit(self.path).query).get('page', ['1'])[0])
+            items = range(ITEMS_PER_PAGE) if page <= pages else []
+            body = '<ul>' + ''.join(
+                f'<li data-id="{page}-{i}">Campaign {page}-{i}</li>' for i in items
+            ) + '</ul>'
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureScraper(BaseScraper):
+    """Paginated scraper over the fixture server; does not touch the DB."""
+
+    def __init__(self, index: int, port: int, pages: int, delay: float):
+        super().__init__(f'fixture{index}', f'http://127.0.0.{index + 1}:{port}',
+                         use_proxy=False, use_captcha_solver=False)
+        self.pages = pages
+        self.delay = delay
+
+    def parse_listings(self):
+        return self.crawl_pages()
+
+    def page_requests(self):
+        return [(f'{self.base_url}/list', {'page': p}) for p in range(1, self.pages + 1)]
+
+    def parse_page(self, soup, page):
+        items = soup.select('li')
+        if not items:
+            return None
+        return [
+            {'external_id': li['data-id'], 'title': li.text, 'url': self.base_url}
+            for li in items
+        ]
+
+    def save_listings(self, listings):
+        return len(listings)
+
+
+def run_thread_path(scrapers, max_workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        counts = list(executor.map(lambda s: len(s.parse_listings()), scrapers))
+    return time.perf_counter() - start, sum(counts)
+
+
+def run_async_path(scrapers, per_host_concurrency, delay):
+    async def crawl():
+        async with AsyncFetchEngine(per_host_concurrency=per_host_concurrency,
+                                    host_min_interval=delay) as engine:
+            results = await asyncio.gather(*(s.parse_listings_async(engine) for s in scrapers))
+            return sum(len(r) for r in results)
+
+    start = time.perf_counter()
+    total = asyncio.run(crawl())
+    return time.perf_counter() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scrapers', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help='server latency per request (s)')
+    parser.add_argument('--delay', type=float, default=0.1, help='politeness delay per host (s)')
+    parser.add_argument('--max-workers', type=int, default=3, help='thread path pool size')
+    parser.add_argument('--per-host', type=int, default=2, help='async per-host concurrency')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('0.0.0.0', 0), make_handler(args.latency, args.pages))
+    server.daemon_threads = True
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        def scrapers():
+            return [FixtureScraper(i, port, args.pages, args.delay) for i in range(args.scrapers)]
+
+        thread_time, thread_count = run_thread_path(scrapers(), args.max_workers)
+        async_time, async_count = run_async_path(scrapers(), args.per_host, args.delay)
+    finally:
+        server.shutdown()
+
+    print(f"scrapers={args.scrapers} pages={args.pages} latency={args.latency}s delay={args.delay}s")
+    print(f"thread pool (max_workers={args.max_workers}): {thread_time:6.2f}s  {thread_count} listings")
+    print(f"async engine (per_host={args.per_host}):     {async_time:6.2f}s  {async_count} listings")
+    print(f"speedup: {thread_time / async_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+"""
+Rebuild the growth dashboard rollups from the raw marketing tables.
+
+Run once after upgrading to migration 011, or after bulk edits that bypass
+the ORM flush hooks (Core UPDATEs, manual SQL).
+
+Usage:
+    python scripts/rebuild_growth_rollups.py
+"""
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.app import create_app
+from backend.services.growth_rollups import rebuild_rollups
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        counts = rebuild_rollups()
+    print(f"[OK] Rebuilt {counts['rollups']} hourly rollups and {counts['journey_rollups']} journey rollups")
+
+
+if __name__ == '__main__':
+    main()
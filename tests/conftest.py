@@ -11,6 +11,12 @@ from types import SimpleNamespace
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep caches and rate limits in-process. Some tests set TESTING=false, and the
+# "auto" backends would then pick the persistent .workspace/cache stores,
+# carrying entries over between test runs.
+os.environ["CACHE_L2_BACKEND"] = "none"
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+
 from backend.app import create_app
 from backend.models import db as _db
 
@@ -52,6 +58,9 @@ def _cleanup_db(app):
         for table in reversed(_db.metadata.sorted_tables):
             _db.session.execute(table.delete())
         _db.session.commit()
+    # Row ids are reused after the wipe, so cached principals must go too
+    from backend.principal import invalidate_all_principals
+    invalidate_all_principals()
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,158 @@
+"""
+Unit Tests: backend.services.sns_ai_engine bulk generation
+Covers job fan-out, bounded concurrency, 429/529 backoff and the SSE endpoint.
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.services import sns_ai_engine as engine_module
+from backend.services.sns_ai_engine import SNSAIEngine
+
+
+class _ApiError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={'retry-after': retry_after} if retry_after else {})
+
+
+def _response(text='{"hashtags": ["#a"]}'):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                           usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+
+
+@pytest.fixture
+def engine():
+    e = SNSAIEngine()
+    e._client = MagicMock()
+    return e
+
+
+class TestExpandJobs:
+    """Job specs fan out into one call per platform/topic"""
+
+    def test_list_fields_fan_out(self, engine):
+        jobs = engine.expand_bulk_jobs([
+            {'type': 'content', 'topics': ['kimchi', 'bibimbap'], 'platforms': ['instagram', 'twitter']},
+            {'type': 'repurpose', 'original_content': 'x', 'source_platform': 'blog',
+             'target_platforms': ['linkedin', 'threads']},
+            {'type': 'calendar', 'topics': ['food'], 'platforms': ['tiktok']},
+        ])
+        assert len(jobs) == 7
+        assert {(j['params']['topic'], j['params']['platform']) for j in jobs[:4]} == {
+            ('kimchi', 'instagram'), ('kimchi', 'twitter'),
+            ('bibimbap', 'instagram'), ('bibimbap', 'twitter'),
+        }
+        assert [j['params']['target_platforms'] for j in jobs[4:6]] == [['linkedin'], ['threads']]
+        assert jobs[6]['params'] == {'topics': ['food'], 'platforms': ['tiktok']}
+
+    @pytest.mark.parametrize('spec', [
+        {'type': 'unknown'},
+        {'type': 'hashtags', 'platforms': ['instagram']},          # missing content
+        {'type': 'hashtags', 'content': 'x', 'platform': 'ig', 'bogus': 1},
+        {'type': 'content', 'topic': 't', 'platforms': []},
+    ])
+    def test_invalid_specs_raise(self, engine, spec):
+        with pytest.raises(ValueError):
+            engine.expand_bulk_jobs([spec])
+
+    def test_job_limit(self, engine, monkeypatch):
+        monkeypatch.setattr(engine_module, 'MAX_BULK_JOBS', 2)
+        with pytest.raises(ValueError):
+            engine.expand_bulk_jobs([{'type': 'hashtags', 'content': 'x', 'platforms': ['a', 'b', 'c']}])
+
+
+class TestGenerateBulk:
+    """Concurrent execution and retry behaviour"""
+
+    def test_results_stream_in_completion_order_with_bounded_concurrency(self, engine, monkeypatch):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def generate_hashtags(content, platform, count=10):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.2 if platform == 'slow' else 0.02)
+            with lock:
+                active[0] -= 1
+            return {'platform': platform}
+
+        monkeypatch.setattr(engine, 'generate_hashtags', generate_hashtags)
+        platforms = ['slow', 'a', 'b', 'c', 'd', 'e']
+        events = list(engine.generate_bulk(
+            [{'type': 'hashtags', 'content': 'x', 'platforms': platforms}], max_concurrency=2))
+
+        assert sorted(e['index'] for e in events) == list(range(6))
+        assert events[-1]['result'] == {'platform': 'slow'}
+        assert peak[0] == 2
+
+    def test_job_errors_are_reported_not_raised(self, engine, monkeypatch):
+        monkeypatch.setattr(engine, 'generate_hashtags', MagicMock(side_effect=RuntimeError('boom')))
+        events = list(engine.generate_bulk([{'type': 'hashtags', 'content': 'x', 'platform': 'ig'}]))
+        assert events[0]['error'] == 'boom'
+        assert 'result' not in events[0]
+
+    def test_429_and_529_are_retried_with_backoff(self, engine, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(engine_module.time, 'sleep', sleeps.append)
+        engine._client.messages.create.side_effect = [
+            _ApiError(429, retry_after='3'), _ApiError(529), _response(),
+        ]
+
+        assert engine._create_with_backoff(model='m').content[0].text == '{"hashtags": ["#a"]}'
+        assert engine._client.messages.create.call_count == 3
+        assert sleeps[0] == 3.0
+        assert engine_module.RETRY_BASE_DELAY * 2 <= sleeps[1] <= engine_module.RETRY_BASE_DELAY * 3
+
+    def test_other_errors_and_exhausted_retries_raise(self, engine, monkeypatch):
+        monkeypatch.setattr(engine_module.time, 'sleep', lambda s: None)
+        engine._client.messages.create.side_effect = _ApiError(400)
+        with pytest.raises(_ApiError):
+            engine._create_with_backoff(model='m')
+        assert engine._client.messages.create.call_count == 1
+
+        engine._client.messages.create.reset_mock()
+        engine._client.messages.create.side_effect = _ApiError(529)
+        with pytest.raises(_ApiError):
+            engine._create_with_backoff(model='m')
+        assert engine._client.messages.create.call_count == engine_module.MAX_RETRIES + 1
+
+    def test_client_is_shared_with_claude_ai_service(self, monkeypatch):
+        shared = MagicMock()
+        monkeypatch.setattr('backend.services.claude_ai.claude_ai.client', shared)
+        assert SNSAIEngine().client is shared
+
+
+class TestBulkEndpoint:
+    """POST /api/ai/bulk-generate streams Server-Sent Events"""
+
+    def test_streams_result_and_done_events(self, client, auth_headers, monkeypatch):
+        from backend.services.claude_ai_routes import sns_ai_engine
+        monkeypatch.setattr(sns_ai_engine, 'generate_content',
+                            lambda platform, topic, **kw: {'content': f'{topic}@{platform}'})
+
+        res = client.post('/api/ai/bulk-generate', headers=auth_headers, json={
+            'jobs': [{'type': 'content', 'topic': 'kimchi', 'platforms': ['instagram', 'twitter']}],
+        })
+        assert res.status_code == 200
+        assert res.mimetype == 'text/event-stream'
+
+        events = []
+        for block in res.get_data(as_text=True).strip().split('\n\n'):
+            name, data = block.split('\n')
+            events.append((name.split(': ', 1)[1], json.loads(data.split(': ', 1)[1])))
+
+        assert [name for name, _ in events] == ['start', 'result', 'result', 'done']
+        assert events[0][1]['total'] == 2
+        assert {e['result']['content'] for _, e in events[1:3]} == {'kimchi@instagram', 'kimchi@twitter'}
+        assert events[-1][1]['failed'] == 0
+
+    def test_rejects_invalid_jobs(self, client, auth_headers):
+        res = client.post('/api/ai/bulk-generate', headers=auth_headers, json={'jobs': [{'type': 'nope'}]})
+        assert res.status_code == 400
+        assert client.post('/api/ai/bulk-generate', headers=auth_headers, json={'jobs': []}).status_code == 400
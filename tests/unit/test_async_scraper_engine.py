@@ -0,0 +1,242 @@
+"""
+Unit Tests: backend.services.review_scrapers.async_engine
+Covers per-host limits, pipelined pagination, retries, proxies and CAPTCHA retry.
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+
+from backend.services.review_scrapers.async_engine import AsyncFetchEngine
+from backend.services.review_scrapers.base_scraper import BaseScraper
+
+
+class PagedScraper(BaseScraper):
+    """Scraper over /list?page=N where each page holds <li> items."""
+
+    def __init__(self, base_url='http://fixture.test', max_pages=5):
+        super().__init__('fixture', base_url, use_proxy=False, use_captcha_solver=False)
+        self.max_pages = max_pages
+        self.max_retries = 2
+        self.initial_retry_delay = 0
+
+    def parse_listings(self):
+        return self.crawl_pages()
+
+    def page_requests(self):
+        return [(f"{self.base_url}/list", {'page': p}) for p in range(1, self.max_pages + 1)]
+
+    def parse_page(self, soup, page):
+        items = soup.select('li')
+        if not items:
+            return None
+        return [{'external_id': li.text, 'title': li.text, 'url': 'u'} for li in items]
+
+    def save_listings(self, listings):
+        return len(listings)
+
+
+def _page_html(items):
+    return '<ul>' + ''.join(f'<li>{i}</li>' for i in items) + '</ul>'
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestHostLimits:
+    """Per-host concurrency and politeness."""
+
+    def test_in_flight_requests_per_host_are_capped(self):
+        in_flight = {'now': 0, 'max': 0}
+
+        async def handler(request):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.02)
+            in_flight['now'] -= 1
+            return httpx.Response(200, text=_page_html(['x']))
+
+        async def main():
+            scraper = PagedScraper()
+            async with AsyncFetchEngine(per_host_concurrency=2, host_min_interval=0,
+                                        transport=httpx.MockTransport(handler)) as engine:
+                await asyncio.gather(*(engine.fetch(scraper, 'http://fixture.test/a') for _ in range(8)))
+                return engine.stats
+
+        stats = _run(main())
+        assert in_flight['max'] == 2
+        assert stats['requests'] == 8
+
+    def test_request_starts_are_spaced_per_host(self):
+        starts = []
+
+        async def handler(request):
+            starts.append(asyncio.get_running_loop().time())
+            return httpx.Response(200, text='<p></p>')
+
+        async def main():
+            scraper = PagedScraper()
+            async with AsyncFetchEngine(per_host_concurrency=4, host_min_interval=0.05,
+                                        transport=httpx.MockTransport(handler)) as engine:
+                await asyncio.gather(*(engine.fetch(scraper, 'http://fixture.test/a') for _ in range(3)))
+
+        _run(main())
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert all(gap >= 0.04 for gap in gaps)
+
+
+class TestPipelinedPagination:
+    """crawl_pages_async / parse_listings_async."""
+
+    def test_pages_are_parsed_in_order_and_stop_at_empty_page(self):
+        pages = {1: ['a', 'b'], 2: ['c'], 3: []}
+
+        def handler(request):
+            page = int(request.url.params['page'])
+            return httpx.Response(200, text=_page_html(pages.get(page, ['late'])))
+
+        async def main():
+            scraper = PagedScraper(max_pages=5)
+            async with AsyncFetchEngine(host_min_interval=0,
+                                        transport=httpx.MockTransport(handler)) as engine:
+                return await scraper.parse_listings_async(engine)
+
+        listings = _run(main())
+        assert [l['external_id'] for l in listings] == ['a', 'b', 'c']
+
+    def test_non_paginated_scraper_runs_on_a_thread(self):
+        scraper = PagedScraper()
+        scraper.page_requests = lambda: None
+        scraper.parse_listings = MagicMock(return_value=[{'external_id': 'z'}])
+
+        async def main():
+            async with AsyncFetchEngine(transport=httpx.MockTransport(lambda r: httpx.Response(500))) as engine:
+                return await scraper.parse_listings_async(engine)
+
+        assert _run(main()) == [{'external_id': 'z'}]
+
+
+class TestResilience:
+    """Proxy rotation and CAPTCHA handling."""
+
+    def test_server_error_is_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, text=_page_html(['ok']))
+
+        scraper = PagedScraper()
+
+        async def main():
+            async with AsyncFetchEngine(host_min_interval=0,
+                                        transport=httpx.MockTransport(handler)) as engine:
+                return await engine.fetch(scraper, 'http://fixture.test/a'), engine.stats
+
+        soup, stats = _run(main())
+        assert soup.select_one('li').text == 'ok'
+        assert len(calls) == 2
+        assert stats['failures'] == 1
+
+    def test_each_proxy_gets_its_own_pooled_client(self):
+        async def main():
+            async with AsyncFetchEngine() as engine:
+                first = engine._client('http://proxy.test:8001')
+                assert engine._client('http://proxy.test:8001') is first
+                assert engine._client(None) is not first
+
+        _run(main())
+
+    def test_captcha_page_is_solved_and_refetched_with_token(self):
+        def handler(request):
+            if 'g-recaptcha-response' in request.url.params:
+                return httpx.Response(200, text=_page_html(['ok']))
+            return httpx.Response(200, text='<div class="g-recaptcha" data-sitekey="KEY"></div>')
+
+        scraper = PagedScraper()
+        scraper.captcha_solver = MagicMock()
+        scraper.captcha_solver.solve_captcha.return_value = {'success': True, 'token': 'TOKEN', 'cost': 0.001}
+
+        async def main():
+            async with AsyncFetchEngine(host_min_interval=0,
+                                        transport=httpx.MockTransport(handler)) as engine:
+                soup = await engine.fetch(scraper, 'http://fixture.test/a')
+                return soup, engine.stats
+
+        soup, stats = _run(main())
+        assert soup.select_one('li').text == 'ok'
+        assert stats['captchas_solved'] == 1
+        scraper.captcha_solver.solve_captcha.assert_called_once_with(
+            captcha_type='recaptcha_v2', site_key='KEY', page_url='http://fixture.test/a'
+        )
+        assert scraper.captcha_cost_tracker == 0.001
+
+
+class TestEngineSelection:
+    """SCRAPER_ASYNC_ENGINE falls back to threads without httpx"""
+
+    def test_missing_httpx_uses_threaded_path(self, monkeypatch):
+        from backend.services import review_scrapers
+        from backend.services.review_scrapers import async_engine
+
+        monkeypatch.setenv('SCRAPER_ASYNC_ENGINE', '1')
+        assert review_scrapers._use_async_engine(None) is True
+        monkeypatch.setattr(async_engine, 'httpx', None)
+        assert review_scrapers._use_async_engine(None) is False
+        assert review_scrapers._use_async_engine(True) is False
+
+
+class TestAppContext:
+    """Worker threads never share the event loop's db.session"""
+
+    def test_concurrent_scrapers_get_their_own_sessions(self, app, monkeypatch):
+        import threading
+
+        from backend.models import db
+        from backend.services import review_scrapers
+
+        both_running = threading.Barrier(2, timeout=5)
+        sessions = []
+
+        class SessionScraper(PagedScraper):
+            def page_requests(self):
+                return None
+
+            def parse_listings(self):
+                both_running.wait()
+                sessions.append(db.session())
+                return []
+
+        scrapers = [SessionScraper(), SessionScraper()]
+        scrapers[1].platform = 'fixture2'
+        monkeypatch.setattr(review_scrapers, '_create_scrapers', lambda: scrapers)
+
+        with app.app_context():
+            caller_session = db.session()
+            results = _run(review_scrapers.aggregate_all_listings_async(engine=MagicMock()))
+
+        assert {r['status'] for r in results.values()} == {'success'}
+        assert len({id(s) for s in sessions + [caller_session]}) == 3
+
+    def test_crawl_state_loads_off_the_event_loop(self, app):
+        import threading
+
+        from backend.services.review_scrapers.crawl_state import CrawlStateStore
+
+        loaded_on = []
+        scraper = PagedScraper(max_pages=1)
+        scraper.crawl_state = CrawlStateStore('fixture')
+        real_load = scraper.crawl_state._load
+        scraper.crawl_state._load = lambda: loaded_on.append(threading.current_thread()) or real_load()
+
+        async def main():
+            async with AsyncFetchEngine(host_min_interval=0, transport=httpx.MockTransport(
+                    lambda r: httpx.Response(200, text=_page_html(['a'])))) as engine:
+                return await scraper.parse_listings_async(engine)
+
+        with app.app_context():
+            assert [l['external_id'] for l in _run(main())] == ['a']
+        assert loaded_on[0] is not threading.main_thread()
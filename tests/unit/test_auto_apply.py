@@ -0,0 +1,182 @@
+"""
+Unit Tests: backend.services.auto_apply
+Covers in-memory rule matching, watermark-based incremental ticks, rule
+backfills, prefetch/bulk-insert idempotency and per-tick stats.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+
+from sqlalchemy import event
+
+from backend.auth import create_tokens
+from backend.models import db, ReviewAccount, ReviewApplication, ReviewAutoRule, ReviewListing, User
+from backend.services.auto_apply import AutoApplyMatcher, auto_apply_matcher
+
+_ids = count()
+
+
+def _user_with_account(email='rules@auto.test'):
+    db.session.expunge_all()
+    user = User(email=email, password_hash='x', name='Rules')
+    db.session.add(user)
+    db.session.flush()
+    account = ReviewAccount(user_id=user.id, platform='naver', account_name=email, is_active=True)
+    db.session.add(account)
+    db.session.commit()
+    return user.id, account.id
+
+
+def _rule(user_id, **kw):
+    rule = ReviewAutoRule(user_id=user_id, name=kw.pop('name', 'rule'), is_active=True, **kw)
+    db.session.add(rule)
+    db.session.commit()
+    return rule
+
+
+def _listing(days=10, category='뷰티', reward_type='금전', reward=50000, **kw):
+    listing = ReviewListing(source_platform='revu', external_id=f'ext-{next(_ids)}', title='L',
+                            category=category, reward_type=reward_type, reward_value=reward,
+                            deadline=datetime.utcnow() + timedelta(days=days), status='active', **kw)
+    db.session.add(listing)
+    db.session.commit()
+    return listing.id
+
+
+def _applied(account_id):
+    return sorted(a.listing_id for a in ReviewApplication.query.filter_by(account_id=account_id))
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestMatching:
+    """Rule predicates and the first (backfill) tick"""
+
+    def test_first_tick_applies_matching_listings(self, app):
+        user_id, account_id = _user_with_account()
+        _rule(user_id, target_categories=['뷰티'], reward_types=['금전'], min_reward=10000,
+              max_reward=100000, apply_deadline_days=30, max_applicants_ratio=0.5)
+        match = _listing()
+        _listing(category='패션')                                 # wrong category
+        _listing(reward_type='상품')                               # wrong reward type
+        _listing(reward=5000)                                      # below min reward
+        _listing(days=45)                                          # outside deadline window
+        _listing(max_applicants=10, current_applicants=8)          # over applicant ratio
+        already = _listing()
+        db.session.add(ReviewApplication(listing_id=already, account_id=account_id))
+        db.session.commit()
+
+        stats = AutoApplyMatcher().run()
+
+        assert _applied(account_id) == sorted([match, already])
+        assert stats.applied == 1 and stats.skipped_existing == 1 and stats.skipped_ratio == 1
+        assert stats.rules_backfilled == 1
+        assert db.session.get(ReviewListing, match).applied_accounts == [account_id]
+
+    def test_overlapping_rules_apply_once(self, app):
+        user_id, account_id = _user_with_account()
+        _rule(user_id, name='a', target_categories=['뷰티'])
+        _rule(user_id, name='b', reward_types=['금전'])
+        listing_id = _listing()
+
+        stats = AutoApplyMatcher().run()
+        assert stats.matches == 2 and stats.applied == 1
+        assert _applied(account_id) == [listing_id]
+
+    def test_rule_without_account_is_counted(self, app):
+        db.session.expunge_all()
+        user = User(email='noacct@auto.test', password_hash='x', name='N')
+        db.session.add(user)
+        db.session.commit()
+        _rule(user.id)
+        _listing()
+        stats = AutoApplyMatcher().run()
+        assert stats.rules_without_account == 1 and stats.applied == 0
+
+
+class TestIncremental:
+    """Watermark, deadline-window entry and rule backfills"""
+
+    def test_only_new_listings_are_scanned(self, app):
+        user_id, account_id = _user_with_account()
+        _rule(user_id, target_categories=['뷰티'])
+        first = _listing()
+        matcher = AutoApplyMatcher()
+        matcher.run()
+
+        stats = matcher.run()
+        assert stats.listings_scanned == 0 and stats.applied == 0
+
+        second = _listing()
+        stats = matcher.run()
+        assert stats.listings_scanned == 1 and stats.applied == 1
+        assert _applied(account_id) == [first, second]
+
+    def test_listing_entering_deadline_window(self, app):
+        user_id, account_id = _user_with_account()
+        _rule(user_id, apply_deadline_days=30)
+        far = _listing(days=40)
+        matcher = AutoApplyMatcher()
+        assert matcher.run().applied == 0
+
+        assert matcher.run(now=datetime.utcnow() + timedelta(days=11)).applied == 1
+        assert _applied(account_id) == [far]
+
+    def test_edited_rule_backfills_existing_listings(self, app):
+        user_id, account_id = _user_with_account()
+        rule = _rule(user_id, target_categories=['패션'])
+        beauty = _listing()
+        matcher = AutoApplyMatcher()
+        assert matcher.run().applied == 0
+
+        rule.target_categories = ['뷰티']
+        rule.updated_at = datetime.utcnow() + timedelta(seconds=1)
+        db.session.commit()
+        stats = matcher.run()
+        assert stats.rules_backfilled == 1 and stats.applied == 1
+        assert _applied(account_id) == [beauty]
+
+    def test_query_count_is_independent_of_rules_and_listings(self, app):
+        for i in range(5):
+            user_id, _ = _user_with_account(email=f'u{i}@auto.test')
+            for j in range(3):
+                _rule(user_id, name=f'r{j}', target_categories=['뷰티', '패션'][j % 2:])
+        for _ in range(30):
+            _listing(category='뷰티')
+
+        with _count_queries() as statements:
+            stats = AutoApplyMatcher().run()
+        assert stats.applied == 5 * 30
+        # rules, accounts, listings, watermark, existing, insert, listing updates
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        assert len(selects) == 5
+
+
+class TestSchedulerJob:
+    """check_auto_apply_rules and the manual run endpoint report stats"""
+
+    def test_run_endpoint(self, client):
+        auto_apply_matcher.reset()
+        user_id, account_id = _user_with_account()
+        _rule(user_id)
+        _listing()
+        token, _ = create_tokens(user_id, 'user')
+
+        res = client.post('/api/review/auto-apply/run', headers={'Authorization': f'Bearer {token}'})
+        body = res.get_json()
+        assert body['success'] is True
+        assert body['applied_count'] == 1
+        assert body['stats']['rules'] == 1
+        auto_apply_matcher.reset()
@@ -0,0 +1,162 @@
+"""
+Unit Tests: backend.cache.TTLCache
+Covers LRU/expiry eviction, prefix invalidation and stats reporting.
+"""
+import time
+
+from backend.cache import TTLCache
+
+
+class TestTTLCacheEviction:
+    """Capacity and expiry behaviour."""
+
+    def test_evicts_least_recently_used_at_capacity(self):
+        cache = TTLCache(max_entries=3)
+        for key in ('a:1', 'a:2', 'a:3'):
+            cache.set(key, key, ttl_seconds=60)
+        cache.get('a:1')  # refresh a:1 so a:2 becomes the LRU entry
+        cache.set('a:4', 'a:4', ttl_seconds=60)
+
+        assert cache.get('a:2') is None
+        assert cache.get('a:1') == 'a:1'
+        assert cache.stats()['entries'] == 3
+
+    def test_expired_entries_are_evicted_before_live_ones(self):
+        cache = TTLCache(max_entries=2)
+        cache.set('x:old', 1, ttl_seconds=-1)
+        cache.set('x:live', 2, ttl_seconds=60)
+        cache.set('x:new', 3, ttl_seconds=60)
+
+        assert cache.get('x:live') == 2
+        assert cache.get('x:new') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_overwrite_does_not_evict(self):
+        cache = TTLCache(max_entries=2)
+        cache.set('k:1', 1, ttl_seconds=60)
+        cache.set('k:2', 2, ttl_seconds=60)
+        cache.set('k:1', 10, ttl_seconds=60)
+
+        assert cache.get('k:1') == 10
+        assert cache.get('k:2') == 2
+        assert cache.stats()['evictions'] == 0
+
+    def test_expired_get_is_a_miss(self):
+        cache = TTLCache()
+        cache.set('t:1', 'v', ttl_seconds=0.01)
+        time.sleep(0.02)
+
+        assert cache.get('t:1') is None
+        assert cache.stats()['misses'] == 1
+
+
+class TestTTLCacheInvalidation:
+    """Prefix-indexed invalidation."""
+
+    def test_invalidate_prefix_matches_startswith_semantics(self):
+        cache = TTLCache()
+        cache.set('data:1', 1, ttl_seconds=60)
+        cache.set('data_extra:1', 2, ttl_seconds=60)
+        cache.set('other:1', 3, ttl_seconds=60)
+
+        cache.invalidate_prefix('data')
+
+        assert cache.get('data:1') is None
+        assert cache.get('data_extra:1') is None
+        assert cache.get('other:1') == 3
+
+    def test_invalidate_full_key_prefix(self):
+        cache = TTLCache()
+        cache.set('data:abc', 1, ttl_seconds=60)
+        cache.set('data:xyz', 2, ttl_seconds=60)
+
+        cache.invalidate_prefix('data:a')
+
+        assert cache.get('data:abc') is None
+        assert cache.get('data:xyz') == 2
+
+
+class TestTTLCacheStats:
+    """Stats payload."""
+
+    def test_stats_include_eviction_latency_histogram(self):
+        cache = TTLCache(max_entries=1)
+        cache.set('s:1', 1, ttl_seconds=60)
+        cache.set('s:2', 2, ttl_seconds=60)
+
+        stats = cache.stats()
+        assert set(stats) >= {'hits', 'misses', 'evictions', 'hit_rate_pct', 'entries'}
+        assert sum(stats['eviction_latency_us'].values()) == 1
+        assert 'le_inf' in stats['eviction_latency_us']
+
+
+class TestTTLCacheDecorator:
+    """Single-flight and stale-while-revalidate modes of @ttl_cache."""
+
+    @staticmethod
+    def _make_app(calls, delay=0.0, **cache_kwargs):
+        import threading
+        from flask import Flask, jsonify
+        from backend.cache import ttl_cache
+
+        app = Flask(__name__)
+        lock = threading.Lock()
+
+        @app.route('/hot')
+        @ttl_cache(**cache_kwargs)
+        def hot():
+            with lock:
+                calls.append(1)
+                n = len(calls)
+            time.sleep(delay)
+            return jsonify({'call': n}), 200
+
+        return app
+
+    def test_single_flight_coalesces_concurrent_misses(self):
+        import threading
+        from backend.cache import get_cache, get_single_flight_stats
+
+        get_cache().clear()
+        calls = []
+        app = self._make_app(calls, delay=0.2, ttl_seconds=60,
+                             key_prefix='sf_test', single_flight=True)
+        before = get_single_flight_stats()['coalesced_hits']
+        markers = []
+
+        def hit():
+            resp = app.test_client().get('/hot')
+            markers.append(resp.headers.get('X-Cache'))
+
+        threads = [threading.Thread(target=hit) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert markers.count('COALESCED') == 4
+        assert get_single_flight_stats()['coalesced_hits'] - before == 4
+
+    def test_stale_while_revalidate_serves_previous_value(self):
+        from backend.cache import get_cache
+
+        get_cache().clear()
+        calls = []
+        app = self._make_app(calls, ttl_seconds=0.5, key_prefix='swr_test',
+                             stale_while_revalidate=60)
+        client = app.test_client()
+
+        assert client.get('/hot').get_json() == {'call': 1}
+        time.sleep(0.6)
+        stale = client.get('/hot')
+        assert stale.headers['X-Cache'] == 'STALE'
+        assert stale.get_json() == {'call': 1}
+
+        deadline = time.time() + 2
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.02)
+        fresh = client.get('/hot')
+        assert fresh.headers['X-Cache'] == 'HIT'
+        assert fresh.get_json() == {'call': 2}
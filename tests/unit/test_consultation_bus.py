@@ -0,0 +1,117 @@
+"""
+Unit Tests: core.consultation_bus.ConsultationBus
+Covers per-agent mailboxes, broadcast fan-out, condition-variable wakeups,
+the bounded archive and message statistics.
+"""
+import threading
+import time
+
+from core.consultation_bus import ConsultationBus, Message, MessagePriority
+
+
+def _message(to_agent=None, from_agent='orch', priority=MessagePriority.NORMAL, subject=''):
+    return Message(from_agent=from_agent, to_agent=to_agent, priority=priority, subject=subject)
+
+
+class TestMailboxes:
+    """Targeted delivery"""
+
+    def test_consumers_only_see_their_own_messages(self):
+        bus = ConsultationBus()
+        bus.publish(_message('a', subject='for-a'))
+
+        assert bus.consume('b', timeout=0) is None
+        assert bus.consume('a', timeout=0).subject == 'for-a'
+        assert bus.consume('a', timeout=0) is None
+
+    def test_priority_then_publish_order(self):
+        bus = ConsultationBus()
+        bus.publish(_message('a', subject='normal-1'))
+        bus.publish(_message('a', subject='normal-2'))
+        bus.publish(_message(None, priority=MessagePriority.CRITICAL, subject='alert'))
+        bus.publish(_message('a', priority=MessagePriority.LOW, subject='low'))
+
+        received = [bus.consume('a', timeout=0).subject for _ in range(4)]
+        assert received == ['alert', 'normal-1', 'normal-2', 'low']
+
+    def test_full_mailbox_rejects(self):
+        bus = ConsultationBus(max_queue_size=2)
+        assert bus.publish(_message('a')) and bus.publish(_message('a'))
+        assert bus.publish(_message('a')) is False
+        assert bus.publish(_message('b'))
+        assert bus.get_message_stats()['counters']['rejected'] == 1
+
+
+class TestBroadcasts:
+    """Fan-out channel"""
+
+    def test_every_agent_but_the_sender_gets_each_broadcast(self):
+        bus = ConsultationBus()
+        bus.consume('a', timeout=0)
+        bus.ask_question(from_agent='a', subject='Budget OK?', payload={})
+
+        assert bus.consume('b', timeout=0).subject == 'Budget OK?'
+        assert bus.consume('c', timeout=0).subject == 'Budget OK?'
+        assert bus.consume('a', timeout=0) is None
+        assert bus.consume('b', timeout=0) is None
+
+    def test_lagging_agent_skips_overwritten_broadcasts(self):
+        bus = ConsultationBus(max_queue_size=2)
+        bus.consume('slow', timeout=0)
+        for n in range(5):
+            bus.publish(_message(None, subject=f'b{n}'))
+
+        assert [bus.consume('slow', timeout=0).subject for _ in range(2)] == ['b3', 'b4']
+        assert bus.get_message_stats()['counters']['broadcasts_missed'] == 3
+
+
+class TestWakeups:
+    """Blocked consumers wake on publish"""
+
+    def test_waiting_consumer_is_woken(self):
+        bus = ConsultationBus()
+        received = []
+        started = time.monotonic()
+        consumer = threading.Thread(target=lambda: received.append(bus.consume('a', timeout=5)))
+        consumer.start()
+        time.sleep(0.05)
+        bus.publish(_message('a', subject='wake'))
+        consumer.join(timeout=5)
+
+        assert received[0].subject == 'wake'
+        assert time.monotonic() - started < 2
+
+    def test_timeout_returns_none(self):
+        bus = ConsultationBus()
+        started = time.monotonic()
+        assert bus.consume('a', timeout=0.05) is None
+        assert time.monotonic() - started >= 0.05
+
+
+class TestArchiveAndStats:
+    """Ring-buffer archive and counters"""
+
+    def test_archive_keeps_newest_messages(self):
+        bus = ConsultationBus(archive_size=3)
+        ids = [bus.request('a', 'b', f's{n}', {}) for n in range(5)]
+        assert list(bus.messages) == ids[2:]
+        assert bus.reply(ids[-1], 'b', {'ok': True})
+        assert bus.reply(ids[0], 'b', {}) == ''
+
+        bus.clear_old_messages(keep_count=1)
+        assert len(bus.messages) == 1
+
+    def test_stats_report_throughput_and_latency(self):
+        bus = ConsultationBus()
+        bus.request('a', 'b', 'ready', {})
+        bus.alert('c', 'disk', {})
+        bus.consume('b', timeout=0)
+        bus.consume('b', timeout=0)
+
+        stats = bus.get_message_stats()
+        assert stats['total_messages'] == 2
+        assert stats['counters']['published'] == 2
+        assert stats['counters']['delivered'] == 2
+        assert stats['mailboxes']['b'] == 0
+        assert stats['throughput_per_sec']['published'] > 0
+        assert stats['delivery_latency_ms']['p50'] is not None
@@ -0,0 +1,123 @@
+"""
+Unit Tests: backend.services.sns_event_bus.EventBus
+Covers ring-buffer history, pooled async dispatch, batching and backpressure.
+"""
+import threading
+
+from backend.services.sns_event_bus import EventBus, PostPublishedEvent
+
+
+def _event(post_id=1):
+    return PostPublishedEvent(user_id=1, post_id=post_id, platforms=['instagram'])
+
+
+class TestHistory:
+    """Bounded event history."""
+
+    def test_history_keeps_only_the_newest_events(self):
+        bus = EventBus(max_history_size=3)
+        for post_id in range(5):
+            bus.publish(_event(post_id))
+
+        history = bus.get_history()
+        assert [e.post_id for e in history] == [2, 3, 4]
+        assert bus.get_statistics()['total_events'] == 3
+
+
+class TestAsyncDispatch:
+    """Executor-backed dispatch."""
+
+    def test_async_handlers_run_on_bounded_pool_in_order(self):
+        bus = EventBus(max_workers=2)
+        seen, threads = [], set()
+
+        def handler(event):
+            seen.append(event.post_id)
+            threads.add(threading.current_thread().name)
+
+        bus.subscribe('post:published', handler)
+        for post_id in range(50):
+            bus.publish(_event(post_id), async_handlers=True)
+
+        assert bus.wait_idle(timeout=5)
+        assert seen == list(range(50))
+        assert len(threads) <= 2
+        assert all(name.startswith('sns-event-bus') for name in threads)
+        bus.shutdown()
+
+    def test_batched_handler_gets_single_event_list_when_sync(self):
+        bus = EventBus()
+        batches = []
+        bus.subscribe('post:published', batches.append, batch_size=10)
+        bus.publish(_event(7))
+
+        assert [[e.post_id for e in batch] for batch in batches] == [[7]]
+
+    def test_batched_handler_coalesces_queued_events(self):
+        bus = EventBus()
+        hold = threading.Event()
+        batches = []
+
+        def record(events):
+            hold.wait(5)
+            batches.append([e.post_id for e in events])
+
+        bus.subscribe('post:published', record, batch_size=10)
+        for post_id in range(21):
+            bus.publish(_event(post_id), async_handlers=True)
+        hold.set()
+
+        assert bus.wait_idle(timeout=5)
+        assert sum(batches, []) == list(range(21))
+        assert all(len(batch) <= 10 for batch in batches)
+        assert len(batches) < 21
+        bus.shutdown()
+
+    def test_full_queue_blocks_publisher_and_keeps_order(self):
+        bus = EventBus(max_workers=2, max_queue_size=1)
+        gate = threading.Event()
+        seen, callers, running = [], [], []
+
+        def handler(event):
+            running.append(1)
+            assert len(running) == 1  # never concurrent with itself
+            callers.append(threading.current_thread().name)
+            if event.post_id == 0:
+                gate.wait(5)
+            seen.append(event.post_id)
+            running.pop()
+
+        bus.subscribe('post:published', handler)
+        publisher = threading.Thread(
+            target=lambda: [bus.publish(_event(i), async_handlers=True) for i in range(5)])
+        publisher.start()
+        publisher.join(0.2)
+        assert publisher.is_alive()  # waiting for room, not running the handler itself
+        gate.set()
+        publisher.join(5)
+
+        assert bus.wait_idle(timeout=5)
+        assert seen == list(range(5))
+        assert all(name.startswith('sns-event-bus') for name in callers)
+        dispatch = bus.get_statistics()['dispatch']
+        assert dispatch['backpressure_waits'] >= 1
+        assert dispatch['pending'] == 0
+        bus.shutdown()
+
+    def test_full_queue_drops_republish_from_pool(self):
+        bus = EventBus(max_workers=1, max_queue_size=1)
+        seen = []
+
+        def handler(event):
+            seen.append(event.post_id)
+            if event.post_id == 0:
+                for post_id in (1, 2):
+                    bus.publish(_event(post_id), async_handlers=True)
+
+        bus.subscribe('post:published', handler)
+        bus.publish(_event(0), async_handlers=True)
+
+        assert bus.wait_idle(timeout=5)
+        assert seen == [0, 1]
+        assert bus.get_statistics()['dispatch']['dropped'] == 1
+        bus.shutdown()
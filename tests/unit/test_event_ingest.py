@@ -0,0 +1,165 @@
+"""
+Unit Tests: backend.services.event_ingest
+Covers set-based batch ingestion, per-event statuses, JSON/NDJSON batch
+bodies and the group-commit buffer.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from backend.models import db, MarketingContact, MarketingEvent, MarketingJourneyState
+from backend.services import event_ingest
+from backend.services.event_ingest import GroupCommitBuffer, ingest_batch
+
+
+def _event(event_id, name='lead_captured', **identity):
+    return {'event_id': event_id, 'event_name': name, 'ts': '2026-10-16T09:00:00Z', 'identity': identity}
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestIngestBatch:
+    """ingest_batch statuses, contacts and journeys"""
+
+    def test_statuses_in_input_order(self, app):
+        ingest_batch([_event('evt-old')])
+        results = ingest_batch([
+            _event('evt-new', email='a@ingest.test'),
+            _event('evt-old'),                                    # already stored
+            {'event_id': 'evt-new-2', 'idempotency_key': 'evt-new'},  # missing event_name
+            dict(_event('evt-3'), idempotency_key='evt-new'),     # duplicate within the batch
+            'not-an-object',
+        ])
+        assert [r['status'] for r in results] == ['accepted', 'duplicate', 'rejected', 'duplicate', 'rejected']
+        assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+        assert results[3]['event_id'] == 'evt-new'
+        assert MarketingEvent.query.count() == 2
+
+    def test_contacts_and_journeys_resolved_in_bulk(self, app):
+        existing = MarketingContact(contact_uid='uid-1', email='known@ingest.test')
+        db.session.add(existing)
+        db.session.commit()
+
+        ingest_batch([
+            _event('e1', 'lead_captured', email='new@ingest.test'),
+            _event('e2', 'signup_completed', email='new@ingest.test', phone='010-1'),
+            _event('e3', 'signup_completed', contact_id='uid-1'),
+            _event('e4', 'lead_captured', anonymous_id='anon'),
+        ])
+
+        new = MarketingContact.query.filter_by(email='new@ingest.test').one()
+        assert new.lifecycle_stage == 'signed_up'
+        journey = MarketingJourneyState.query.filter_by(contact_id=new.id, journey_id='growth_main').one()
+        assert journey.state == 'signup_completed' and journey.version == 2
+        assert MarketingEvent.query.filter_by(event_id='e3').one().contact_id == existing.id
+        assert MarketingEvent.query.filter_by(event_id='e4').one().contact_id is None
+        assert MarketingContact.query.count() == 2
+
+    def test_statement_count_is_independent_of_batch_size(self, app):
+        payloads = [_event(f'bulk-{i}', email=f'u{i}@ingest.test') for i in range(60)]
+        with _count_queries() as statements:
+            results = ingest_batch(payloads)
+        assert all(r['status'] == 'accepted' for r in results)
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        event_inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT INTO MARKETING_EVENTS')]
+        assert len(selects) == 3          # duplicates, contacts, journey states
+        assert len(event_inserts) == 1
+
+    def test_conflicting_writer_is_reported_as_duplicate(self, app, monkeypatch):
+        ingest_batch([_event('raced')])
+        real = event_ingest._existing_keys
+        calls = []
+
+        def stale_first(events):
+            calls.append(1)
+            return ({}, {}) if len(calls) == 1 else real(events)
+
+        monkeypatch.setattr(event_ingest, '_existing_keys', stale_first)
+        results = ingest_batch([_event('raced'), _event('fresh')])
+        assert [r['status'] for r in results] == ['duplicate', 'accepted']
+
+
+    def test_malformed_identity_is_rejected_alone(self, app):
+        results = ingest_batch([
+            _event('ok-1', email='ok@ingest.test'),
+            _event('bad-email', email=5),
+            _event('bad-phone', phone={'n': 1}),
+            _event('long-id' * 20),
+            _event('numeric-phone', phone=1012345678),
+        ])
+        assert [r['status'] for r in results] == ['accepted', 'rejected', 'rejected', 'rejected', 'accepted']
+        assert results[1]['error'] == 'identity.email must be a string'
+        assert MarketingContact.query.filter_by(phone='1012345678').count() == 1
+
+    def test_failed_batch_retries_event_by_event(self, app, monkeypatch):
+        real = event_ingest._persist
+
+        def fail_on_poison(events, results):
+            if any(e.event_id == 'poison' for e in events):
+                raise ValueError('unstorable event')
+            return real(events, results)
+
+        monkeypatch.setattr(event_ingest, '_persist', fail_on_poison)
+        results = ingest_batch([_event('a'), _event('poison'), _event('b')])
+        assert [r['status'] for r in results] == ['accepted', 'failed', 'accepted']
+        assert MarketingEvent.query.count() == 2
+
+
+class TestBatchEndpoint:
+    """POST /api/v1/events/batch"""
+
+    def test_json_array_and_ndjson(self, client, monkeypatch):
+        monkeypatch.setenv('EVENT_GROUP_COMMIT_MS', '0')
+        res = client.post('/api/v1/events/batch', json=[_event('b1'), _event('b1'), {'event_id': 'x'}])
+        body = res.get_json()
+        assert res.status_code == 200
+        assert (body['accepted'], body['duplicates'], body['rejected']) == (1, 1, 1)
+
+        ndjson = '\n'.join([json.dumps(_event('b2')), '{not json', json.dumps(_event('b1'))]) + '\n'
+        res = client.post('/api/v1/events/batch', data=ndjson, content_type='application/x-ndjson')
+        assert [r['status'] for r in res.get_json()['results']] == ['accepted', 'rejected', 'duplicate']
+
+    def test_limits_and_bad_body(self, client, monkeypatch):
+        monkeypatch.setenv('EVENT_BATCH_MAX', '2')
+        assert client.post('/api/v1/events/batch', json=[_event(f'l{i}') for i in range(3)]).status_code == 413
+        assert client.post('/api/v1/events/batch', json={'event_name': 'x'}).status_code == 400
+
+    def test_single_event_goes_through_buffer(self, client, app):
+        res = client.post('/api/v1/events', json=_event('single'))
+        assert res.status_code == 201 and res.get_json()['duplicate'] is False
+        assert app.extensions['event_group_commit'].flushes >= 1
+        assert client.post('/api/v1/events', json=_event('single')).status_code == 200
+
+
+class TestGroupCommitBuffer:
+    """Submissions coalesce by time and flush early by size"""
+
+    def test_concurrent_submissions_share_one_flush(self, app):
+        buffer = GroupCommitBuffer(app, max_events=100, max_wait_ms=200)
+        futures = [buffer.submit([_event(f'g{i}'), _event(f'g{i}')]) for i in range(3)]
+        results = [f.result(timeout=5) for f in futures]
+
+        assert buffer.flushes == 1
+        for mine in results:
+            assert [r['status'] for r in mine] == ['accepted', 'duplicate']
+            assert [r['index'] for r in mine] == [0, 1]
+
+    def test_size_triggers_early_flush(self, app):
+        buffer = GroupCommitBuffer(app, max_events=2, max_wait_ms=5000)
+        started = time.monotonic()
+        assert [r['status'] for r in buffer.ingest([_event('s1'), _event('s2')])] == ['accepted', 'accepted']
+        assert time.monotonic() - started < 2
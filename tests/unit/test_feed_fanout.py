@@ -0,0 +1,138 @@
+"""
+Unit Tests: backend.services.feed_service fan-out feeds
+Covers fan-out on write, keyset pagination, high-follower pull merging and backfill.
+"""
+import pytest
+
+from backend.models import db, Feed, FeedItem, User, UserFollow
+from backend.services import feed_service
+from backend.services.feed_service import FeedService
+
+
+@pytest.fixture(autouse=True)
+def _fresh_celebrity_cache():
+    feed_service._celebrity_cache['expires_at'] = 0.0
+    feed_service._rebuild_markers.clear()
+    yield
+    feed_service._celebrity_cache['expires_at'] = 0.0
+    feed_service._rebuild_markers.clear()
+
+
+def _users(*names):
+    db.session.expunge_all()
+    users = [User(email=f'{n}@feed.test', password_hash='x', name=n) for n in names]
+    db.session.add_all(users)
+    db.session.commit()
+    return [u.id for u in users]
+
+
+def _follow(follower_id, following_id):
+    db.session.add(UserFollow(follower_id=follower_id, following_id=following_id))
+    db.session.commit()
+
+
+def _publish(author_id, title, activity_type='recipe_published'):
+    activity = Feed(user_id=author_id, activity_type=activity_type, content_json={'recipe_name': title})
+    db.session.add(activity)
+    db.session.flush()
+    FeedService.fan_out(activity)
+    db.session.commit()
+    return activity.id
+
+
+def _titles(result):
+    return [item['content']['recipe_name'] for item in result['feed']]
+
+
+class TestFanOutOnWrite:
+    """fan_out() and keyset reads"""
+
+    def test_activity_lands_in_author_and_follower_feeds(self, app):
+        author, fan, stranger = _users('author', 'fan', 'stranger')
+        _follow(fan, author)
+
+        _publish(author, 'Kimchi')
+        _publish(author, 'liked', activity_type='recipe_liked')  # not fanned out
+
+        assert FeedItem.query.filter_by(user_id=fan).count() == 1
+        assert FeedItem.query.filter_by(user_id=author).count() == 1
+        assert FeedItem.query.filter_by(user_id=stranger).count() == 0
+
+        result = FeedService.get_user_feed(fan, limit=10)
+        assert _titles(result) == ['Kimchi']
+        assert result['feed'][0]['actor_id'] == author
+        assert result['has_more'] is False
+
+    def test_cursor_pages_are_contiguous(self, app):
+        author, fan = _users('author', 'fan')
+        _follow(fan, author)
+        for i in range(5):
+            _publish(author, f'r{i}')
+
+        seen, cursor = [], None
+        while True:
+            result = FeedService.get_user_feed(fan, limit=2, cursor=cursor)
+            seen.extend(_titles(result))
+            cursor = result['next_cursor']
+            if not result['has_more']:
+                break
+        assert seen == ['r4', 'r3', 'r2', 'r1', 'r0']
+        assert cursor is None
+
+
+class TestHybridPull:
+    """High-follower authors are merged at read time"""
+
+    def test_celebrity_is_not_fanned_out_but_still_read(self, app, monkeypatch):
+        monkeypatch.setattr(feed_service, 'FANOUT_THRESHOLD', 1)
+        star, friend, fan, other = _users('star', 'friend', 'fan', 'other')
+        _follow(fan, star)
+        _follow(other, star)
+        _follow(fan, friend)
+
+        _publish(star, 's1')
+        _publish(friend, 'f1')
+        _publish(star, 's2')
+
+        # Only the star's own copy is written
+        assert {i.user_id for i in FeedItem.query.filter_by(actor_id=star)} == {star}
+
+        first = FeedService.get_user_feed(fan, limit=2)
+        assert _titles(first) == ['s2', 'f1']
+        second = FeedService.get_user_feed(fan, limit=2, cursor=first['next_cursor'])
+        assert _titles(second) == ['s1']
+
+
+class TestFollowLifecycle:
+    """Backfill on follow / first read, cleanup on unfollow"""
+
+    def test_follow_backfills_and_unfollow_removes(self, app):
+        author, fan = _users('author', 'fan')
+        _publish(author, 'old')
+
+        _follow(fan, author)
+        FeedService.backfill_from(fan, [author])
+        db.session.commit()
+        assert _titles(FeedService.get_user_feed(fan)) == ['old']
+
+        FeedService.remove_author(fan, author)
+        db.session.commit()
+        assert FeedItem.query.filter_by(user_id=fan).count() == 0
+
+    def test_empty_feed_is_rebuilt_on_first_read(self, app):
+        author, fan = _users('author', 'fan')
+        db.session.add(Feed(user_id=author, activity_type='recipe_reviewed', content_json={'recipe_name': 'Bibimbap'}))
+        _follow(fan, author)
+
+        assert _titles(FeedService.get_user_feed(fan)) == ['Bibimbap']
+        assert FeedItem.query.filter_by(user_id=fan).count() == 1
+
+    def test_genuinely_empty_feed_is_rebuilt_once(self, app, monkeypatch):
+        loner, = _users('loner')
+        calls = []
+        real = FeedService.rebuild_feed
+        monkeypatch.setattr(FeedService, 'rebuild_feed', staticmethod(lambda uid: calls.append(uid) or real(uid)))
+
+        for _ in range(3):
+            assert FeedService.get_user_feed(loner)['feed'] == []
+        assert calls == [loner]
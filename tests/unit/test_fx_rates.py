@@ -0,0 +1,158 @@
+"""
+Unit Tests: backend.services.fx_rates
+Covers the file/static sources, snapshot persistence, non-blocking
+background refresh, staleness metadata and the payment endpoints.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from backend.services import fx_rates as fx_module
+from backend.services.fx_rates import (
+    FileRateSource, FxRateProvider, StaticRateSource, source_from_env,
+)
+
+
+def _rates_file(tmp_path, rate, timestamp=1760000000):
+    path = tmp_path / 'latest.json'
+    path.write_text(json.dumps({'base': 'USD', 'rates': {'KRW': rate}, 'timestamp': timestamp}))
+    return path
+
+
+class _SlowSource:
+    """Network-like source that blocks until released."""
+    name = 'slow'
+    local = False
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.release = threading.Event()
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        self.release.wait(2)
+        return self.rate, None
+
+
+def _wait_idle(provider):
+    deadline = time.time() + 2
+    while provider.status()['refreshing'] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestSources:
+    """Source selection and parsing"""
+
+    def test_file_source_and_snapshot(self, tmp_path):
+        provider = FxRateProvider(FileRateSource(_rates_file(tmp_path, 1380.5)),
+                                  snapshot_path=tmp_path / 'snap.json')
+        assert provider.get_rate() == 1380.5
+
+        status = provider.status()
+        assert status['source'] == 'file'
+        assert status['as_of'] == '2025-10-09T08:53:20'
+        assert status['stale'] is False
+        assert json.loads((tmp_path / 'snap.json').read_text())['rate'] == 1380.5
+
+    def test_source_from_env(self, monkeypatch, tmp_path):
+        for var in ('FX_RATE_SOURCE', 'FX_RATE_FILE', 'CACHED_EXCHANGE_RATE', 'EXCHANGE_RATE_API_KEY'):
+            monkeypatch.delenv(var, raising=False)
+        assert source_from_env() is None
+
+        monkeypatch.setenv('CACHED_EXCHANGE_RATE', '1300')
+        assert isinstance(source_from_env(), StaticRateSource)
+
+        monkeypatch.setenv('FX_RATE_SOURCE', 'file')
+        monkeypatch.setenv('FX_RATE_FILE', str(tmp_path / 'r.json'))
+        assert source_from_env().path == tmp_path / 'r.json'
+
+
+class TestProvider:
+    """Non-blocking reads, persistence and failure handling"""
+
+    def test_default_without_source(self, tmp_path):
+        provider = FxRateProvider(None, snapshot_path=tmp_path / 'snap.json')
+        assert provider.get_rate() == fx_module.DEFAULT_RATE
+        assert provider.status()['source'] == 'default'
+        assert provider.status()['stale'] is True
+
+    def test_network_source_never_blocks_readers(self, tmp_path):
+        source = _SlowSource(1400.0)
+        provider = FxRateProvider(source, snapshot_path=tmp_path / 'snap.json')
+
+        started = time.monotonic()
+        assert provider.get_rate() == fx_module.DEFAULT_RATE
+        assert provider.get_rate() == fx_module.DEFAULT_RATE
+        assert time.monotonic() - started < 0.5
+        assert provider.status()['refreshing'] is True
+
+        source.release.set()
+        _wait_idle(provider)
+        assert provider.get_rate() == 1400.0
+        assert source.calls == 1
+
+    def test_restart_serves_persisted_rate_and_refreshes_when_due(self, tmp_path):
+        snap = tmp_path / 'snap.json'
+        snap.write_text(json.dumps({'rate': 1333.0, 'fetched_at': time.time() - 7200,
+                                    'as_of': None, 'source': 'slow'}))
+        source = _SlowSource(1350.0)
+        provider = FxRateProvider(source, snapshot_path=snap, refresh_interval=3600, max_age=3600)
+
+        assert provider.get_rate() == 1333.0  # last-known, while refreshing
+        status = provider.status()
+        assert status['age_seconds'] >= 7200 and status['stale'] is True
+
+        source.release.set()
+        _wait_idle(provider)
+        assert provider.get_rate() == 1350.0
+        assert json.loads(snap.read_text())['rate'] == 1350.0
+
+    def test_failed_refresh_keeps_last_known_rate(self, tmp_path):
+        path = _rates_file(tmp_path, 1390.0)
+        provider = FxRateProvider(FileRateSource(path), snapshot_path=tmp_path / 'snap.json',
+                                  refresh_interval=0, max_age=0)
+        assert provider.get_rate() == 1390.0
+
+        path.write_text('{"rates": {}}')
+        assert provider.get_rate() == 1390.0
+        status = provider.status()
+        assert status['last_error'].startswith('KeyError')
+        assert status['stale'] is True
+
+    def test_local_source_changes_apply_immediately(self, tmp_path):
+        path = _rates_file(tmp_path, 1390.0)
+        provider = FxRateProvider(FileRateSource(path), snapshot_path=tmp_path / 'snap.json')
+        assert provider.get_rate() == 1390.0
+
+        _rates_file(tmp_path, 1410.25)
+        assert provider.get_rate() == 1410.25
+
+        # Restart with a new static value: the file-source snapshot is ignored
+        restarted = FxRateProvider(StaticRateSource(1500), snapshot_path=tmp_path / 'snap.json')
+        assert restarted.status()['rate'] == fx_module.DEFAULT_RATE
+        assert restarted.get_rate() == 1500.0
+        restarted.source = StaticRateSource(1510)
+        assert restarted.get_rate() == 1510.0
+
+
+class TestPaymentEndpoints:
+    """ExchangeRateService reads through the provider"""
+
+    @pytest.fixture
+    def fixed_rate(self, monkeypatch, tmp_path):
+        provider = FxRateProvider(StaticRateSource(1000.0), snapshot_path=tmp_path / 'snap.json')
+        monkeypatch.setattr('backend.payment.fx_rates', provider)
+        return provider
+
+    def test_convert_and_exchange_rate(self, client, fixed_rate):
+        res = client.post('/api/payment/convert', json={'amount': 12.5, 'from_currency': 'USD',
+                                                         'to_currency': 'KRW'})
+        assert res.get_json()['converted_amount'] == 12500
+
+        body = client.get('/api/payment/exchange-rate').get_json()
+        assert body['rate'] == 1000.0
+        assert body['source'] == 'static'
+        assert body['stale'] is False
@@ -0,0 +1,121 @@
+"""
+Unit Tests: backend.services.growth_queue
+Covers leased claims, lease-expiry redelivery, claim-guarded ack/fail,
+batch settle endpoints and queue metrics.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import db, MarketingDLQ, MarketingEvent
+from backend.services.growth_queue import ack_events, claim_events, fail_events, queue_metrics_recorder
+
+NOW = datetime(2026, 10, 16, 12, 0)
+TOKEN = {'X-Queue-Token': 'queue-token'}
+
+
+def _events(n, status='pending'):
+    rows = [MarketingEvent(event_id=f'q-{i}', event_name='lead_captured', event_ts=NOW,
+                           idempotency_key=f'q-{i}', processing_status=status,
+                           created_at=NOW - timedelta(minutes=n - i))
+            for i in range(n)]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [r.event_id for r in rows]
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    db.session.expunge_all()
+    monkeypatch.setenv('GROWTH_QUEUE_TOKEN', 'queue-token')
+    queue_metrics_recorder.reset()
+
+
+class TestClaims:
+    """Exclusive claims and lease expiry"""
+
+    def test_claims_do_not_overlap(self, queue):
+        ids = _events(5)
+        _, _, first = claim_events(3, now=NOW)
+        _, _, second = claim_events(3, now=NOW)
+        assert [r.event_id for r in first] == ids[:3]
+        assert [r.event_id for r in second] == ids[3:]
+        assert claim_events(3, now=NOW)[2] == []
+        assert {r.processing_status for r in first + second} == {'processing'}
+
+    def test_expired_lease_is_redelivered(self, queue):
+        _events(1)
+        stale_claim, _, _ = claim_events(1, lease_seconds=60, now=NOW)
+        assert claim_events(1, now=NOW + timedelta(seconds=59))[2] == []
+
+        fresh_claim, _, rows = claim_events(1, lease_seconds=60, now=NOW + timedelta(seconds=61))
+        assert rows[0].delivery_attempts == 2
+
+        assert ack_events([{'event_id': 'q-0'}], claim_id=stale_claim)[0]['status'] == 'lease_lost'
+        assert ack_events([{'event_id': 'q-0'}], claim_id=fresh_claim)[0]['status'] == 'ok'
+        db.session.expire_all()
+        row = MarketingEvent.query.filter_by(event_id='q-0').one()
+        assert row.processing_status == 'processed' and row.lease_owner is None
+        assert queue_metrics_recorder.counters['redelivered'] == 1
+
+    def test_legacy_processing_rows_are_claimable(self, queue):
+        _events(2, status='processing')   # no lease: stuck before the upgrade
+        assert len(claim_events(5, now=NOW)[2]) == 2
+
+    def test_fail_dead_letters(self, queue):
+        _events(2)
+        claim_id, _, _ = claim_events(2, now=NOW)
+        results = fail_events([{'event_id': 'q-0', 'error': 'boom'}, {'event_id': 'missing'}], claim_id=claim_id)
+        assert [r['status'] for r in results] == ['ok', 'not_found']
+        assert db.session.get(MarketingDLQ, results[0]['dlq_id']).error_summary == 'boom'
+
+
+class TestEndpoints:
+    """Queue HTTP surface"""
+
+    def test_pending_returns_claim_and_single_ack_guard(self, client, queue):
+        _events(2)
+        body = client.get('/api/v1/growth/queue/pending?limit=1', headers=TOKEN).get_json()
+        assert body['claim_id'] and len(body['events']) == 1
+        assert body['events'][0]['delivery_attempt'] == 1
+
+        res = client.post('/api/v1/growth/queue/ack', headers=TOKEN,
+                          json={'event_id': body['events'][0]['event_id'], 'claim_id': 'someone-else'})
+        assert res.status_code == 409
+        res = client.post('/api/v1/growth/queue/ack', headers=TOKEN,
+                          json={'event_id': body['events'][0]['event_id'], 'claim_id': body['claim_id']})
+        assert res.status_code == 200
+
+    def test_batch_ack_and_fail(self, client, queue):
+        _events(4)
+        claim_id = client.get('/api/v1/growth/queue/pending?limit=4', headers=TOKEN).get_json()['claim_id']
+
+        res = client.post('/api/v1/growth/queue/ack/batch', headers=TOKEN, json={
+            'claim_id': claim_id, 'workflow_run_id': 'run-9',
+            'events': ['q-0', {'event_id': 'q-1', 'workflow_run_id': 'run-10'}, 'nope'],
+        })
+        body = res.get_json()
+        assert res.status_code == 200 and body['settled'] == 2
+        assert [r['status'] for r in body['results']] == ['ok', 'ok', 'not_found']
+
+        res = client.post('/api/v1/growth/queue/fail/batch', headers=TOKEN, json={
+            'claim_id': claim_id, 'workflow_name': 'Growth 06', 'error': 'provider timeout',
+            'events': ['q-2', {'event_id': 'q-3', 'error': 'bounced'}],
+        })
+        assert res.get_json()['settled'] == 2
+        dlq = {d.event_id: d for d in MarketingDLQ.query.all()}
+        assert dlq['q-2'].workflow_name == 'Growth 06' and dlq['q-3'].error_summary == 'bounced'
+
+        runs = {e.event_id: e.workflow_run_id for e in MarketingEvent.query.filter(MarketingEvent.event_id.in_(['q-0', 'q-1']))}
+        assert runs == {'q-0': 'run-9', 'q-1': 'run-10'}
+        assert client.post('/api/v1/growth/queue/ack/batch', headers=TOKEN, json={'events': []}).status_code == 400
+
+    def test_metrics(self, client, queue):
+        _events(3)
+        client.get('/api/v1/growth/queue/pending?limit=1', headers=TOKEN)
+        metrics = client.get('/api/v1/growth/queue/metrics', headers=TOKEN).get_json()
+        assert metrics['depth'] == {'pending': 2, 'processing': 1}
+        assert metrics['in_flight'] == 1 and metrics['expired_leases'] == 0 and metrics['ready'] == 2
+        assert metrics['counters']['claimed'] == 1
+        assert metrics['queue_wait_seconds']['p50'] is not None
+        assert client.get('/api/v1/growth/queue/metrics').status_code == 401
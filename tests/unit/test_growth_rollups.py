@@ -0,0 +1,176 @@
+"""
+Unit Tests: backend.services.growth_rollups
+Covers flush-hook maintenance of the hourly rollups, window reads against
+the raw tables, rebuild/backfill and the dashboard summary endpoint.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, or_, update
+
+from backend.models import (
+    db, MarketingContact, MarketingDLQ, MarketingEvent, MarketingJourneyRollup,
+    MarketingJourneyState, MarketingMessageLog, MarketingRollup,
+)
+from backend.services.event_ingest import ingest_batch
+from backend.services.growth_queue import ack_events, claim_events, fail_events
+from backend.services.growth_rollups import build_summary, rebuild_rollups
+
+T0 = datetime(2026, 10, 16, 9, 0)
+
+WINDOWS = [
+    (None, None),
+    (T0, None),
+    (None, T0 + timedelta(hours=2)),
+    (T0 + timedelta(minutes=20), T0 + timedelta(hours=2, minutes=10)),
+    (T0 + timedelta(hours=1), T0 + timedelta(hours=3)),
+    (T0 + timedelta(minutes=5), T0 + timedelta(minutes=50)),
+    (T0 + timedelta(hours=3), T0),
+]
+
+
+def _ts(minutes):
+    return (T0 + timedelta(minutes=minutes)).isoformat()
+
+
+def _raw_summary(from_dt=None, to_dt=None):
+    """The per-row queries the rollups replace."""
+    def window(query, column):
+        if from_dt:
+            query = query.filter(column >= from_dt)
+        if to_dt:
+            query = query.filter(column <= to_dt)
+        return query
+
+    def grouped(query, column):
+        return dict(query.with_entities(column, func.count()).group_by(column).all())
+
+    contacts = window(MarketingContact.query, MarketingContact.created_at)
+    events = window(MarketingEvent.query, MarketingEvent.event_ts)
+    journeys = MarketingJourneyState.query
+    if from_dt:
+        journeys = journeys.filter(or_(MarketingJourneyState.entered_at >= from_dt,
+                                       MarketingJourneyState.last_action_at >= from_dt))
+    if to_dt:
+        journeys = journeys.filter(or_(MarketingJourneyState.entered_at <= to_dt,
+                                       MarketingJourneyState.last_action_at <= to_dt))
+    return {
+        "contacts": {"total": contacts.count(),
+                     "lifecycle_counts": grouped(contacts, MarketingContact.lifecycle_stage)},
+        "events": {"total": events.count(),
+                   "failed": events.filter(MarketingEvent.processing_status == "failed").count()},
+        "journey_counts": grouped(journeys, MarketingJourneyState.state),
+        "delivery": grouped(window(MarketingMessageLog.query, MarketingMessageLog.created_at),
+                            MarketingMessageLog.status),
+        "queue": grouped(MarketingEvent.query, MarketingEvent.processing_status),
+        "errors": {"dlq_open": window(MarketingDLQ.query, MarketingDLQ.created_at)
+                   .filter(MarketingDLQ.status == "open").count()},
+    }
+
+
+def _rollup_rows():
+    return (
+        sorted((r.metric, r.bucket, r.dimension, r.total) for r in MarketingRollup.query if r.total),
+        sorted((r.span_start, r.span_end, r.state, r.total) for r in MarketingJourneyRollup.query if r.total),
+    )
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def activity(app):
+    """Contacts, events, journeys, messages and DLQ rows spread over four hours."""
+    db.session.expunge_all()
+    ingest_batch([
+        {'event_id': 'r1', 'event_name': 'lead_captured', 'ts': _ts(10), 'identity': {'email': 'a@roll.test'}},
+        {'event_id': 'r2', 'event_name': 'signup_completed', 'ts': _ts(75), 'identity': {'email': 'a@roll.test'}},
+        {'event_id': 'r3', 'event_name': 'lead_captured', 'ts': _ts(130), 'identity': {'email': 'b@roll.test'}},
+        # Arrives late: last_action_at ends up before entered_at
+        {'event_id': 'r4', 'event_name': 'lead_captured', 'ts': _ts(40), 'identity': {'email': 'b@roll.test'}},
+        {'event_id': 'r5', 'event_name': 'payment_failed', 'ts': _ts(185), 'identity': {'email': 'c@roll.test'}},
+        {'event_id': 'r6', 'event_name': 'page_viewed', 'ts': _ts(120), 'identity': {'anonymous_id': 'anon'}},
+    ])
+    for contact in MarketingContact.query:
+        contact.created_at = T0 + timedelta(minutes=5 + 50 * contact.id)
+
+    claim_id, _, _ = claim_events(4, now=T0 + timedelta(hours=4))
+    ack_events([{'event_id': 'r1'}, {'event_id': 'r2'}], claim_id=claim_id)
+    fail_events([{'event_id': 'r3', 'error': 'bounce'}], claim_id=claim_id)
+    db.session.add_all([
+        MarketingMessageLog(channel='email', status=status, created_at=T0 + timedelta(minutes=minutes))
+        for status, minutes in (('sent', 15), ('sent', 60), ('bounced', 125), ('delivered', 170))
+    ])
+    db.session.add(MarketingDLQ(event_id='old', workflow_name='wf', error_summary='x', status='open',
+                                created_at=T0 + timedelta(minutes=30)))
+    db.session.commit()
+
+
+class TestMaintenance:
+    """Flush hooks keep rollups equal to a rebuild"""
+
+    def test_incremental_matches_rebuild(self, activity):
+        incremental = _rollup_rows()
+        assert incremental[0] and incremental[1]
+        rebuild_rollups()
+        assert _rollup_rows() == incremental
+
+    def test_updates_deletes_and_rollbacks(self, activity):
+        contact = MarketingContact.query.filter_by(email='a@roll.test').one()
+        contact.lifecycle_stage = 'churned'
+        db.session.commit()
+        assert build_summary()["contacts"]["lifecycle_counts"].get('churned') == 1
+
+        dlq = MarketingDLQ.query.filter_by(event_id='old').one()
+        dlq.status = 'resolved'
+        db.session.rollback()
+        assert build_summary()["errors"]["dlq_open"] == 2
+
+        db.session.delete(MarketingContact.query.filter_by(email='b@roll.test').one())
+        db.session.commit()
+        assert build_summary() == _raw_summary()
+        before = _rollup_rows()
+        rebuild_rollups()
+        assert _rollup_rows() == before
+
+    def test_rebuild_repairs_bulk_updates(self, activity):
+        db.session.execute(update(MarketingMessageLog).values(status='sent'))
+        db.session.commit()
+        assert build_summary()["delivery"] != _raw_summary()["delivery"]
+        rebuild_rollups()
+        assert build_summary()["delivery"] == {'sent': 4}
+
+
+class TestReads:
+    """Window reads match the raw per-row queries"""
+
+    @pytest.mark.parametrize("window", WINDOWS)
+    def test_summary_matches_raw_queries(self, activity, window):
+        assert build_summary(*window) == _raw_summary(*window)
+
+    def test_queue_tracks_lease_claims(self, activity):
+        summary = build_summary()
+        assert summary["queue"] == {'processed': 2, 'failed': 1, 'processing': 1, 'pending': 2}
+
+    def test_unwindowed_summary_is_three_queries(self, activity):
+        with _count_queries() as statements:
+            build_summary()
+        assert len(statements) == 3
+
+    def test_dashboard_endpoint(self, client, auth_headers, activity):
+        res = client.get('/api/v1/growth/dashboard/summary?from=2026-10-16T09:20:00Z&to=2026-10-16T11:10:00Z',
+                         headers=auth_headers)
+        assert res.status_code == 200
+        assert res.get_json() == _raw_summary(T0 + timedelta(minutes=20), T0 + timedelta(hours=2, minutes=10))
@@ -0,0 +1,119 @@
+"""
+Unit Tests: backend.services.review_scrapers.crawl_state
+Covers conditional GETs, content-hash page skipping and bulk listing upserts.
+"""
+from unittest.mock import Mock, patch
+
+from backend.models import ReviewCrawlState, ReviewListing
+from backend.services.review_scrapers.base_scraper import BaseScraper
+
+
+class ListScraper(BaseScraper):
+    """Two listing pages of <li data-id> items."""
+
+    def __init__(self):
+        super().__init__('incr', 'https://incr.test', use_proxy=False, use_captcha_solver=False)
+        self.delay = 0
+
+    def parse_listings(self):
+        listings = self.crawl_pages()
+        self.save_listings(listings)
+        return listings
+
+    def page_requests(self):
+        return [(f"{self.base_url}/list", {'page': p}) for p in (1, 2)]
+
+    def parse_page(self, soup, page):
+        items = soup.select('li')
+        if not items:
+            return None
+        return [
+            {'external_id': f"incr_{li['data-id']}", 'title': li.text, 'url': f"{self.base_url}/{li['data-id']}"}
+            for li in items
+        ]
+
+
+def _response(body, status=200, headers=None):
+    return Mock(status_code=status, content=body.encode(), headers=headers or {})
+
+
+PAGE_1 = '<ul><li data-id="1">One</li><li data-id="2">Two</li></ul>'
+PAGE_2 = '<ul><li data-id="3">Three</li></ul>'
+
+
+class TestConditionalCrawl:
+    """Page-level incremental crawling."""
+
+    def test_second_crawl_sends_validators_and_skips_not_modified(self, app):
+        with patch('requests.Session.get') as mock_get:
+            mock_get.side_effect = [
+                _response(PAGE_1, headers={'ETag': '"p1"'}),
+                _response(PAGE_2, headers={'Last-Modified': 'Wed, 01 Jan 2026 00:00:00 GMT'}),
+            ]
+            first = ListScraper().parse_listings()
+
+        assert [l['external_id'] for l in first] == ['incr_1', 'incr_2', 'incr_3']
+        assert ReviewListing.query.filter_by(source_platform='incr').count() == 3
+        assert ReviewCrawlState.query.filter_by(platform='incr', kind='page').count() == 2
+
+        scraper = ListScraper()
+        with patch('requests.Session.get') as mock_get, \
+                patch.object(ListScraper, 'parse_page') as parse_page:
+            mock_get.side_effect = [_response('', status=304), _response('', status=304)]
+            second = scraper.parse_listings()
+
+        assert second == []
+        parse_page.assert_not_called()
+        sent = [call.kwargs['headers'] for call in mock_get.call_args_list]
+        assert sent[0] == {'If-None-Match': '"p1"'}
+        assert sent[1] == {'If-Modified-Since': 'Wed, 01 Jan 2026 00:00:00 GMT'}
+
+    def test_identical_body_without_validators_is_skipped(self, app):
+        with patch('requests.Session.get') as mock_get:
+            mock_get.side_effect = [_response(PAGE_1), _response(PAGE_2)]
+            ListScraper().parse_listings()
+
+        with patch('requests.Session.get') as mock_get:
+            mock_get.side_effect = [_response(PAGE_1), _response(PAGE_2.replace('Three', 'Three!'))]
+            second = ListScraper().parse_listings()
+
+        assert [l['title'] for l in second] == ['Three!']
+
+    def test_state_is_not_kept_when_save_fails(self, app):
+        scraper = ListScraper()
+        with patch('requests.Session.get') as mock_get, \
+                patch('backend.models.db.session.commit', side_effect=RuntimeError('db down')):
+            mock_get.side_effect = [_response(PAGE_1), _response(PAGE_2)]
+            scraper.parse_listings()
+
+        assert ReviewCrawlState.query.filter_by(platform='incr').count() == 0
+        assert scraper.crawl_state.conditional_headers('https://incr.test/list?page=1') == {}
+
+
+class TestBulkUpsert:
+    """save_listings() listing-level hashing and upsert."""
+
+    def test_changed_listings_are_updated_and_unchanged_skipped(self, app):
+        listings = [
+            {'external_id': 'incr_a', 'title': 'A', 'url': 'https://incr.test/a'},
+            {'external_id': 'incr_b', 'title': 'B', 'url': 'https://incr.test/b'},
+        ]
+        assert ListScraper().save_listings(listings) == 2
+
+        listings[1] = {**listings[1], 'title': 'B v2'}
+        scraper = ListScraper()
+        with patch.object(ReviewListing, 'query', wraps=ReviewListing.query) as query:
+            assert scraper.save_listings(listings + [listings[0]]) == 0
+            # One IN lookup, for the changed listing only
+            assert query.filter.call_count == 1
+
+        titles = {l.external_id: l.title for l in ReviewListing.query.filter_by(source_platform='incr')}
+        assert titles == {'incr_a': 'A', 'incr_b': 'B v2'}
+
+    def test_duplicate_ids_in_one_batch_insert_once(self, app):
+        listings = [
+            {'external_id': 'incr_dup', 'title': 'first', 'url': 'u'},
+            {'external_id': 'incr_dup', 'title': 'second', 'url': 'u'},
+        ]
+        assert ListScraper().save_listings(listings) == 1
+        assert ReviewListing.query.filter_by(external_id='incr_dup').one().title == 'second'
@@ -0,0 +1,193 @@
+"""
+Unit Tests: backend.services.invoice_renderer
+Covers deterministic rendering, the content-addressed store, the background
+render queue, process-pool batches and the invoice download endpoint.
+"""
+import threading
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.auth import create_tokens
+from backend.models import db, Invoice, User
+from backend.services import invoice_renderer
+from backend.services.invoice_renderer import (
+    InvoiceArtifactStore, InvoiceRenderQueue, artifact_key, invoice_payload, render_invoice_pdf,
+)
+
+
+def _payload(number='20261001-0001', amount=100000):
+    invoice = SimpleNamespace(invoice_number=number, issued_date=datetime(2026, 10, 1),
+                              due_date=None, amount_krw=amount, tax_krw=amount // 10,
+                              total_krw=amount + amount // 10)
+    order = SimpleNamespace(items_json='[{"product_id": 3, "quantity": 2, "price_krw": 50000}]')
+    return invoice_payload(invoice, SimpleNamespace(name='Kim', email='kim@inv.test'), order)
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = InvoiceRenderQueue(InvoiceArtifactStore(tmp_path / 'invoices'), max_workers=2)
+    monkeypatch.setattr('backend.payment.invoice_render_queue', queue)
+    monkeypatch.setattr('backend.payment.invoice_store', queue.store)
+    monkeypatch.setattr(invoice_renderer, 'invoice_render_queue', queue)
+    return queue
+
+
+class TestRendering:
+    """Payloads, deterministic output and cached template"""
+
+    def test_payload_snapshot(self):
+        payload = _payload()
+        assert payload['due_date'] == '2026-10-31'
+        assert payload['items'] == [{'product_id': 3, 'quantity': 2, 'price_krw': 50000}]
+
+    def test_render_is_deterministic_and_template_cached(self):
+        render_invoice_pdf(_payload())
+        misses = invoice_renderer._template.cache_info().misses
+        first = render_invoice_pdf(_payload())
+        second = render_invoice_pdf(_payload())
+
+        assert first.startswith(b'%PDF') and first == second
+        assert invoice_renderer._template.cache_info().misses == misses
+        assert artifact_key(_payload()) == artifact_key(_payload())
+        assert artifact_key(_payload()) != artifact_key(_payload(amount=200000))
+
+
+class TestRenderQueue:
+    """Background rendering, deduplication and batches"""
+
+    def test_submit_renders_once(self, queue, monkeypatch):
+        calls, ready = [], []
+        real_render = invoice_renderer.render_invoice_pdf
+        monkeypatch.setattr(invoice_renderer, 'render_invoice_pdf',
+                            lambda p: calls.append(p['invoice_number']) or real_render(p))
+
+        key = queue.submit(_payload(), on_ready=ready.append)
+        assert queue.submit(_payload()) == key
+        path = queue.wait(key)
+        assert path == queue.store.path_for(key) and path.read_bytes().startswith(b'%PDF')
+        assert ready == [path]
+
+        assert queue.submit(_payload()) == key
+        assert queue.status(key) == 'ready'
+        assert calls == ['20261001-0001']
+
+    def test_render_batch_uses_process_pool_and_skips_stored(self, queue):
+        payloads = [_payload(number=f'20261001-{i:04d}') for i in range(3)]
+        keys = queue.render_batch(payloads, processes=2)
+        assert all(queue.store.get(k) for k in keys)
+        assert queue.store.get(keys[0]).read_bytes() == render_invoice_pdf(payloads[0])
+
+        mtimes = [queue.store.get(k).stat().st_mtime_ns for k in keys]
+        assert queue.render_batch(payloads, processes=2) == keys
+        assert [queue.store.get(k).stat().st_mtime_ns for k in keys] == mtimes
+
+
+class TestInvoiceEndpoints:
+    """POST /invoice queues the render; downloads stream the artifact"""
+
+    def _user_headers(self):
+        db.session.expunge_all()
+        user = User(email='inv@inv.test', password_hash='x', name='Inv')
+        db.session.add(user)
+        db.session.commit()
+        token, _ = create_tokens(user.id, 'user')
+        return {'Authorization': f'Bearer {token}'}
+
+    def test_create_and_download(self, client, queue):
+        headers = self._user_headers()
+        res = client.post('/api/payment/invoice', headers=headers, json={'amount_krw': 50000})
+        assert res.status_code == 201
+        body = res.get_json()
+        assert body['pdf_status'] in ('pending', 'ready')
+        assert body['pdf_url'].endswith(f"/invoices/{body['invoice_id']}/download")
+
+        res = client.get(body['pdf_url'], headers=headers)
+        assert res.status_code == 200
+        assert res.mimetype == 'application/pdf'
+        pdf = res.data
+        etag = res.headers['ETag']
+
+        res = client.get(body['pdf_url'], headers={**headers, 'If-None-Match': etag})
+        assert res.status_code == 304
+
+        res = client.get(body['pdf_url'], headers={**headers, 'Range': 'bytes=0-9'})
+        assert res.status_code == 206
+        assert res.data == pdf[:10]
+
+    def test_download_pending_returns_202(self, client, queue, monkeypatch):
+        headers = self._user_headers()
+        invoice_id = client.post('/api/payment/invoice', headers=headers,
+                                 json={'amount_krw': 70000}).get_json()['invoice_id']
+        invoice = db.session.get(Invoice, invoice_id)
+        queue.wait(artifact_key(invoice_payload(invoice, invoice.user, None)))
+        for path in queue.store.root.rglob('*.pdf'):
+            path.unlink()
+        monkeypatch.setattr(queue, 'submit', lambda payload, on_ready=None: artifact_key(payload))
+
+        res = client.get(f'/api/payment/invoices/{invoice_id}/download', headers=headers)
+        assert res.status_code == 202
+        assert res.headers['Retry-After'] == '2'
+
+    def test_s3_url_served_only_after_upload(self, client, queue, monkeypatch):
+        class FakeS3:
+            fail = True
+            uploaded = threading.Event()
+
+            def put_object(self, **kw):
+                try:
+                    if self.fail:
+                        raise RuntimeError('S3 unavailable')
+                finally:
+                    self.uploaded.set()
+
+        s3 = FakeS3()
+        monkeypatch.setattr('backend.payment.get_s3_client', lambda: s3)
+        headers = self._user_headers()
+
+        def create_and_evict(amount):
+            s3.uploaded.clear()
+            body = client.post('/api/payment/invoice', headers=headers, json={'amount_krw': amount}).get_json()
+            assert body['pdf_url'].endswith(f"/invoices/{body['invoice_id']}/download")
+            assert s3.uploaded.wait(5)
+            for path in queue.store.root.rglob('*.pdf'):
+                path.unlink()  # as seen from a host that did not render it
+            return body['pdf_url']
+
+        # Upload failed: the S3 object does not exist, so the PDF is rendered here
+        res = client.get(create_and_evict(80000), headers=headers)
+        assert res.status_code == 200 and res.mimetype == 'application/pdf'
+
+        s3.fail = False
+        url = create_and_evict(90000)
+        for _ in range(50):  # the hook records file_size just after the put
+            res = client.get(url, headers=headers)
+            if res.mimetype == 'application/json':
+                break
+            for path in queue.store.root.rglob('*.pdf'):
+                path.unlink()
+            time.sleep(0.02)
+        assert res.get_json()['pdf_url'].startswith('https://')
+
+
+class TestMonthEndBatch:
+    """Scheduler job pre-renders the previous month"""
+
+    def test_render_month_invoices(self, app, queue):
+        from backend.scheduler import get_job_history, render_month_invoices
+
+        db.session.expunge_all()
+        user = User(email='month@inv.test', password_hash='x', name='Month')
+        db.session.add(user)
+        db.session.flush()
+        for number, issued in (('20260905-0001', datetime(2026, 9, 5)),
+                               ('20261002-0001', datetime(2026, 10, 2))):
+            db.session.add(Invoice(user_id=user.id, invoice_number=number, amount_krw=1000,
+                                   tax_krw=100, total_krw=1100, issued_date=issued))
+        db.session.commit()
+
+        render_month_invoices(app, month_start=date(2026, 9, 1))
+        assert len(list(queue.store.root.rglob('*.pdf'))) == 1
+        assert get_job_history(1)[0]['detail'] == '1 invoices for 2026-09'
@@ -0,0 +1,72 @@
+"""
+Unit Tests: backend.performance_monitor sketches
+Covers percentile accuracy, time-bucketed windows and the buffered log writer.
+"""
+import json
+
+from backend.performance_monitor import BufferedLogWriter, LatencySketch, RollingSketches
+
+
+class TestLatencySketch:
+    """Log-bucketed histogram accuracy."""
+
+    def test_percentiles_within_relative_error(self):
+        sketch = LatencySketch()
+        for ms in range(1, 1001):
+            sketch.add(float(ms))
+
+        stats = sketch.to_stats()
+        assert stats['count'] == 1000
+        assert abs(stats['response_time']['p50'] - 500) / 500 <= 0.05
+        assert abs(stats['response_time']['p95'] - 950) / 950 <= 0.05
+        assert abs(stats['response_time']['p99'] - 990) / 990 <= 0.05
+        assert stats['response_time']['min'] == 1.0
+        assert stats['response_time']['max'] == 1000.0
+
+    def test_merge_combines_counts_and_errors(self):
+        a, b = LatencySketch(), LatencySketch()
+        a.add(10.0, db_queries=2)
+        b.add(20.0, db_queries=4, is_error=True)
+        a.merge(b)
+
+        stats = a.to_stats()
+        assert stats['count'] == 2
+        assert stats['errors'] == 1
+        assert stats['db_queries'] == {'min': 2, 'max': 4, 'avg': 3.0}
+
+
+class TestRollingSketches:
+    """Time-bucketed windows."""
+
+    def test_windows_only_include_recent_slots(self):
+        sketches = RollingSketches()
+        now = 100_000.0
+        sketches.add('auth.login', 'POST', 5.0, 200, now=now - 30 * 60)
+        sketches.add('auth.login', 'POST', 7.0, 200, now=now - 3 * 60)
+        sketches.add('auth.login', 'POST', 9.0, 500, now=now)
+
+        assert sketches.window(1, 'auth.login', now=now).count == 1
+        assert sketches.window(5, 'auth.login', now=now).count == 2
+        assert sketches.window(60, 'auth.login', now=now).count == 3
+        assert sketches.window(60, 'auth.login', 'GET', now=now).count == 0
+
+    def test_slots_older_than_the_ring_are_reused(self):
+        sketches = RollingSketches(slots=2)
+        sketches.add('e', 'GET', 1.0, 200, now=0)
+        sketches.add('e', 'GET', 1.0, 200, now=120)  # same ring position, new slot
+
+        assert sketches.window(2, 'e', now=120).count == 1
+
+
+class TestBufferedLogWriter:
+    """Background JSONL writer."""
+
+    def test_flush_writes_queued_records(self, tmp_path):
+        path = tmp_path / 'perf.jsonl'
+        writer = BufferedLogWriter(path)
+        writer._queue.put({'endpoint': 'a'})
+        writer._queue.put({'endpoint': 'b'})
+        writer.flush()
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)['endpoint'] for line in lines] == ['a', 'b']
@@ -0,0 +1,120 @@
+"""
+Unit Tests: core.ledger
+Covers append-only logging, the mission index, debounced markdown renders
+and concurrent writers.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from core import ledger
+
+CLAUDE_MD = """# Project
+
+## 📋 Active Missions
+| ID | Name | Owner | Status |
+|----|------|-------|--------|
+| M-001 | Launch | PM | PLANNING |
+
+## 📝 Change Log
+| Date | Agent | Action |
+|------|-------|--------|
+| 2026-01-01 | Seed | Initial row |
+"""
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    md = tmp_path / "CLAUDE.md"
+    md.write_text(CLAUDE_MD, encoding="utf-8")
+    monkeypatch.setattr(ledger, "LEDGER_PATH", md)
+    monkeypatch.setattr(ledger, "LEDGER_LOG", tmp_path / "logs" / "ledger.jsonl")
+    monkeypatch.setattr(ledger, "RENDER_WATERMARK", tmp_path / "logs" / "ledger.rendered")
+    monkeypatch.setenv("LEDGER_RENDER_DELAY", "30")
+    yield md
+    ledger.flush_ledger()
+
+
+def _rows(md):
+    lines = md.read_text(encoding="utf-8").split("## 📝 Change Log")[1].splitlines()
+    return [line for line in lines if line.startswith("| 20")]
+
+
+class TestAppendOnly:
+    """Writers append; CLAUDE.md waits for the render"""
+
+    def test_appends_do_not_touch_markdown(self, paths):
+        ledger.log_to_ledger("PM", "PRD written", mission_id="M-001")
+        ledger.update_mission_status("M-001", "IN_PROGRESS")
+
+        assert paths.read_text(encoding="utf-8") == CLAUDE_MD
+        lines = ledger.LEDGER_LOG.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["type"] for line in lines] == ["ACTION", "MISSION_STATUS"]
+
+    def test_mission_index(self, paths):
+        ledger.log_to_ledger("PM", "PRD written", mission_id="M-001")
+        ledger.log_to_ledger("QA", "unrelated")
+        ledger.update_mission_status("M-001", "IN_PROGRESS")
+        assert [e["type"] for e in ledger.mission_history("M-001")] == ["ACTION", "MISSION_STATUS"]
+
+        ledger.update_mission_status("M-001", "DONE")   # picked up incrementally
+        assert ledger.mission_status("M-001") == "DONE"
+        assert ledger.mission_status("M-404") is None
+
+
+class TestRender:
+    """Debounced markdown view"""
+
+    def test_flush_renders_rows_and_statuses_once(self, paths):
+        ledger.log_to_ledger("PM", "first")
+        ledger.log_to_ledger("QA", "second")
+        ledger.update_mission_status("M-001", "IN_PROGRESS")
+        ledger.flush_ledger()
+
+        assert [row.split("|")[3].strip() for row in _rows(paths)] == ["second", "first", "Initial row"]
+        assert "| M-001 | Launch | PM | IN_PROGRESS |" in paths.read_text(encoding="utf-8")
+        assert ledger.render_ledger() == 0           # watermark: nothing applied twice
+        assert len(_rows(paths)) == 3
+
+    def test_burst_is_rendered_by_one_debounced_pass(self, paths, monkeypatch):
+        monkeypatch.setenv("LEDGER_RENDER_DELAY", "0.1")
+        renders = []
+        real = ledger.render_ledger
+        monkeypatch.setattr(ledger, "render_ledger", lambda: renders.append(real()))
+        for n in range(20):
+            ledger.log_to_ledger("Dev", f"step {n}")
+        time.sleep(0.5)
+
+        assert renders == [20]
+        assert len(_rows(paths)) == 21
+
+    def test_missing_markdown_keeps_entries_for_later(self, paths):
+        paths.unlink()
+        ledger.log_to_ledger("PM", "queued")
+        ledger.flush_ledger()
+
+        paths.write_text(CLAUDE_MD, encoding="utf-8")
+        assert ledger.render_ledger() == 1
+
+
+class TestConcurrency:
+    """Concurrent writers never lose or tear lines"""
+
+    def test_parallel_appends(self, paths):
+        def run(agent):
+            for n in range(50):
+                ledger.log_to_ledger(agent, f"action {n}", mission_id=agent)
+
+        threads = [threading.Thread(target=run, args=(f"A{i}",)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        lines = ledger.LEDGER_LOG.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 400 and all(json.loads(line) for line in lines)
+        assert len(ledger.mission_history("A3")) == 50
+        ledger.flush_ledger()
+        assert len(_rows(paths)) == 401
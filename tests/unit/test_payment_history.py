@@ -0,0 +1,159 @@
+"""
+Unit Tests: backend.services.payment_history
+Covers the merged invoice/payment ledger, keyset cursors, correct totals,
+eager-loaded PDFs and the streaming CSV/JSONL export.
+"""
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.auth import create_tokens
+from backend.models import db, FileUpload, Invoice, Payment, Product, User
+from backend.services.payment_history import decode_cursor, encode_cursor, history_page, iter_history
+
+BASE = datetime(2026, 9, 1, 12, 0, 0)
+
+
+def _product_id():
+    product = Product.query.filter_by(slug='coocook').first()
+    if product is None:
+        product = Product(slug='coocook', name='CooCook', monthly_price=1)
+        db.session.add(product)
+        db.session.commit()
+    return product.id
+
+
+def _seed(invoices=5, payments=7, same_time=False):
+    """User with interleaved invoices (even minutes) and payments (odd minutes)."""
+    db.session.expunge_all()
+    user = User(email='hist@history.test', password_hash='x', name='Hist')
+    db.session.add(user)
+    db.session.flush()
+    product_id = _product_id()
+    for i in range(invoices):
+        issued = BASE if same_time else BASE + timedelta(minutes=2 * i)
+        pdf = FileUpload(user_id=user.id, file_key=f'invoices/{i}.pdf', original_filename=f'{i}.pdf',
+                         file_size=1, content_type='application/pdf', category='document',
+                         s3_url=f'https://s3/{i}.pdf')
+        db.session.add(Invoice(user_id=user.id, invoice_number=f'H-{i:04d}', amount_krw=1000,
+                               tax_krw=100, total_krw=1100, status='paid' if i % 2 else 'issued',
+                               issued_date=issued, pdf=pdf))
+    for i in range(payments):
+        created = BASE if same_time else BASE + timedelta(minutes=2 * i + 1)
+        db.session.add(Payment(user_id=user.id, product_id=product_id, amount=10.0 + i,
+                               status='paid' if i % 2 else 'pending', created_at=created))
+    db.session.commit()
+    return user.id
+
+
+def _walk(user_id, limit, status=None):
+    seen, cursor = [], None
+    while True:
+        page = history_page(user_id, limit=limit, cursor=cursor, status=status)
+        seen.extend((e['type'], e['id']) for e in page['history'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return seen, page['total']
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestLedger:
+    """Merged ordering, cursors and totals"""
+
+    def test_keyset_walk_covers_history_in_order(self, app):
+        user_id = _seed()
+        seen, total = _walk(user_id, limit=3)
+
+        assert total == 12
+        assert len(seen) == 12 and len(set(seen)) == 12
+        dates = [e['date'] for e in history_page(user_id, limit=100)['history']]
+        assert dates == sorted(dates, reverse=True)
+
+    def test_ties_on_date_are_broken_by_type_and_id(self, app):
+        user_id = _seed(invoices=3, payments=3, same_time=True)
+        seen, _ = _walk(user_id, limit=2)
+        assert [t for t, _ in seen] == ['payment'] * 3 + ['invoice'] * 3
+        assert len(set(seen)) == 6
+
+    def test_offset_and_status_use_merged_ledger(self, app):
+        user_id = _seed()
+        everything = [(e['type'], e['id']) for e in history_page(user_id, limit=100)['history']]
+        page = history_page(user_id, limit=4, offset=8)
+        assert [(e['type'], e['id']) for e in page['history']] == everything[8:12]
+
+        paid = history_page(user_id, limit=100, status='paid')
+        assert paid['total'] == 2 + 3
+        assert {e['status'] for e in paid['history']} == {'paid'}
+
+    def test_pdfs_are_eager_loaded(self, app):
+        user_id = _seed(invoices=6, payments=0)
+        db.session.expunge_all()
+        with _count_queries() as statements:
+            page = history_page(user_id, limit=10)
+        assert [e['invoice_url'] for e in page['history']][0] == 'https://s3/5.pdf'
+        assert len(statements) == 3  # keys, count, invoices + pdfs
+
+    def test_cursor_round_trip(self):
+        key = (BASE, 'invoice', 42)
+        assert decode_cursor(encode_cursor(key)) == key
+        try:
+            decode_cursor('not-a-cursor')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('expected ValueError')
+
+
+class TestEndpoints:
+    """GET /history and /history/export"""
+
+    def test_history_endpoint(self, client):
+        user_id = _seed()
+        token, _ = create_tokens(user_id, 'user')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        body = client.get('/api/payment/history?limit=5', headers=headers).get_json()
+        assert body['total'] == 12 and len(body['history']) == 5
+        nxt = client.get(f"/api/payment/history?limit=5&cursor={body['next_cursor']}",
+                         headers=headers).get_json()
+        assert not {e['id'] for e in body['history'] if e['type'] == 'payment'} & \
+            {e['id'] for e in nxt['history'] if e['type'] == 'payment'}
+
+        assert client.get('/api/payment/history?cursor=bogus', headers=headers).status_code == 400
+
+    def test_streaming_export(self, client):
+        user_id = _seed()
+        token, _ = create_tokens(user_id, 'user')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        res = client.get('/api/payment/history/export?format=jsonl', headers=headers)
+        assert res.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in res.data.decode().splitlines()]
+        assert len(rows) == 12
+
+        res = client.get('/api/payment/history/export', headers=headers)
+        assert res.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(res.data.decode())))
+        assert len(rows) == 12 and rows[0]['type'] == 'payment'
+        assert client.get('/api/payment/history/export?format=xml', headers=headers).status_code == 400
+
+    def test_iter_history_chunks(self, app):
+        user_id = _seed()
+        assert len(list(iter_history(user_id, chunk_size=5))) == 12
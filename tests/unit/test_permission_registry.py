@@ -0,0 +1,154 @@
+"""
+Unit Tests: backend.permission_registry
+Covers bit assignment, role masks, bitset permission checks and the
+"which users have permission X" admin query.
+"""
+from flask import g
+
+from backend.auth import create_tokens
+from backend.models import db, Permission, Role, User
+from backend.permission_registry import PermissionRegistry
+from backend.principal import get_principal
+from backend.rbac import (
+    assign_role_to_user, grant_permission_to_role, require_permission,
+    revoke_permission_from_role, users_with_permission,
+)
+from backend.shared_cache import SQLiteL2, reset_shared_backend
+
+
+def _setup():
+    """Roles writer (write, read) and reader (read); returns permission ids."""
+    db.session.expunge_all()
+    write = Permission(name='write:posts', resource='posts', action='write', is_active=True)
+    read = Permission(name='read:posts', resource='posts', action='read', is_active=True)
+    retired = Permission(name='old:posts', resource='posts', action='old', is_active=False)
+    writer = Role(name='writer', is_active=True)
+    reader = Role(name='reader', is_active=True)
+    writer.permissions.extend([write, read, retired])
+    reader.permissions.append(read)
+    db.session.add_all([writer, reader])
+    db.session.commit()
+    return write.id, read.id, retired.id
+
+
+def _users(*names):
+    users = [User(email=f'{n}@perm.test', password_hash='x', name=n) for n in names]
+    db.session.add_all(users)
+    db.session.commit()
+    return [u.id for u in users]
+
+
+class TestRegistry:
+    """Bit assignment and role masks"""
+
+    def test_bits_follow_permission_ids(self, app):
+        write_id, read_id, retired_id = _setup()
+        registry = PermissionRegistry()
+
+        assert registry.mask_for('write:posts') == 1 << write_id
+        assert registry.mask_for('write:posts', 'read:posts') == (1 << write_id) | (1 << read_id)
+        assert registry.mask_for('old:posts', 'missing') == 0
+
+        writer = Role.query.filter_by(name='writer').one()
+        assert registry.role_mask(writer.id) == (1 << write_id) | (1 << read_id)
+        assert registry.names_for(registry.role_mask(writer.id)) == {'write:posts', 'read:posts'}
+        assert sorted(registry.roles_with('read:posts')) == sorted(
+            r.id for r in Role.query.filter(Role.name.in_(['writer', 'reader'])))
+
+    def test_reload_after_invalidate(self, app):
+        _setup()
+        registry = PermissionRegistry(ttl=3600)
+        assert registry.mask_for('new:posts') == 0
+
+        perm = Permission(name='new:posts', resource='posts', action='new', is_active=True)
+        db.session.add(perm)
+        db.session.commit()
+        assert registry.mask_for('new:posts') == 0  # still the loaded snapshot
+        registry.invalidate()
+        assert registry.mask_for('new:posts') == 1 << perm.id
+
+    def test_invalidate_reaches_other_workers(self, app, tmp_path):
+        reset_shared_backend(SQLiteL2(tmp_path / 'l2.sqlite3'))
+        try:
+            _setup()
+            here, elsewhere = PermissionRegistry(ttl=3600), PermissionRegistry(ttl=3600)
+            assert elsewhere.mask_for('new:posts') == 0
+
+            perm = Permission(name='new:posts', resource='posts', action='new', is_active=True)
+            db.session.add(perm)
+            db.session.commit()
+            here.invalidate()
+            assert elsewhere.mask_for('new:posts') == 1 << perm.id
+            assert elsewhere.generation() == here.generation()
+        finally:
+            reset_shared_backend(None)
+
+
+class TestBitsetChecks:
+    """Principals carry a mask; grants and revokes take effect immediately"""
+
+    def test_principal_mask_and_grant_revoke(self, app):
+        write_id, read_id, _ = _setup()
+        (user_id,) = _users('alice')
+        with app.test_request_context():
+            assign_role_to_user(user_id, 'reader')
+            principal = get_principal(user_id)
+            assert principal.permission_mask == 1 << read_id
+            assert principal.permissions == {'read:posts'}
+            assert not principal.has_permission('write:posts')
+
+            grant_permission_to_role('reader', 'write:posts')
+            assert get_principal(user_id).has_permission('write:posts')
+
+            revoke_permission_from_role('reader', 'write:posts')
+            assert get_principal(user_id).permission_mask == 1 << read_id
+
+    def test_require_permission_decorator(self, app):
+        _setup()
+        (user_id,) = _users('bob')
+        with app.test_request_context():
+            assign_role_to_user(user_id, 'reader')
+
+        view = require_permission('write:posts', 'admin:all')(lambda: 'ok')
+        with app.test_request_context():
+            g.user_id = user_id
+            response, status = view()
+            assert status == 403
+            assert 'write:posts' in response.get_json()['message']
+
+            grant_permission_to_role('reader', 'write:posts')
+            assert view() == 'ok'
+
+
+class TestPermissionHolders:
+    """users_with_permission and its admin endpoint"""
+
+    def test_users_with_permission(self, app):
+        _setup()
+        alice, bob, carol = _users('alice', 'bob', 'carol')
+        with app.test_request_context():
+            assign_role_to_user(alice, 'writer')
+            assign_role_to_user(bob, 'reader')
+            assign_role_to_user(bob, 'writer')
+
+        total, users = users_with_permission('read:posts')
+        assert total == 2 and [u.id for u in users] == [alice, bob]
+        assert users_with_permission('read:posts', limit=1, offset=1)[1][0].id == bob
+        assert users_with_permission('old:posts') == (0, [])
+
+    def test_endpoint(self, client):
+        _setup()
+        db.session.add(Role(name='admin', is_active=True))
+        db.session.commit()
+        admin, writer = _users('admin', 'writer')
+        with client.application.test_request_context():
+            assign_role_to_user(admin, 'admin')
+            assign_role_to_user(writer, 'writer')
+        token, _ = create_tokens(admin, 'user')
+
+        res = client.get('/api/admin/rbac/permissions/write:posts/users',
+                         headers={'Authorization': f'Bearer {token}'})
+        assert res.status_code == 200
+        body = res.get_json()
+        assert body['total'] == 1
+        assert body['users'][0]['email'] == 'writer@perm.test'
@@ -0,0 +1,199 @@
+"""
+Unit Tests: backend.principal
+Covers principal loading, per-request/process caching, RBAC and subscription
+decorators, and invalidation hooks.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend import principal as principal_module
+from backend.auth import create_tokens
+from backend.models import db, Permission, Product, Role, Subscription, User
+from backend.permission_registry import PermissionRegistry, permission_registry
+from backend.principal import get_principal
+from backend.rbac import assign_role_to_user, grant_permission_to_role
+from backend.services.admin_service import AdminService
+from backend.shared_cache import SQLiteL2, reset_shared_backend
+
+
+def _user(email='p@principal.test', role='user'):
+    db.session.expunge_all()
+    user = User(email=email, password_hash='x', name='P', role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _coocook_id():
+    product = Product.query.filter_by(slug='coocook').first()
+    if product is None:
+        product = Product(slug='coocook', name='CooCook', monthly_price=1)
+        db.session.add(product)
+        db.session.commit()
+    return product.id
+
+
+def _headers(user_id):
+    token, _ = create_tokens(user_id, 'user')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestPrincipal:
+    """Loading and caching"""
+
+    def test_roles_permissions_and_subscriptions(self, app):
+        user_id = _user(role='admin')
+        role = Role(name='editor', is_active=True)
+        role.permissions.append(Permission(name='write:posts', resource='posts', action='write', is_active=True))
+        role.permissions.append(Permission(name='old:posts', resource='posts', action='old', is_active=False))
+        db.session.add(role)
+        db.session.commit()
+        user = db.session.get(User, user_id)
+        user.roles.append(role)
+        product_id = _coocook_id()
+        db.session.add(Subscription(user_id=user_id, product_id=product_id, status='active'))
+        db.session.commit()
+        # Grants were written directly, so reload the permission registry
+        principal_module.invalidate_all_principals()
+
+        p = get_principal(user_id)
+        assert p.roles == {'editor', 'admin'}
+        assert p.permissions == {'write:posts'}
+        assert p.subscriptions == {'coocook'}
+        assert p.has_role('viewer', 'editor') and not p.has_permission('old:posts')
+        assert get_principal(999999) is None
+
+    def test_cached_until_invalidated(self, app, monkeypatch):
+        user_id = _user()
+        builds = []
+        real_build = principal_module.build_principal
+        monkeypatch.setattr(principal_module, 'build_principal',
+                            lambda uid: builds.append(uid) or real_build(uid))
+
+        assert get_principal(user_id).is_active is True
+        User.query.filter_by(id=user_id).update({'is_active': False})
+        db.session.commit()
+        assert get_principal(user_id).is_active is True  # still cached
+        assert builds == [user_id]
+
+        principal_module.invalidate_principal(user_id)
+        assert get_principal(user_id).is_active is False
+        assert builds == [user_id, user_id]
+
+    def test_invalidation_drops_only_that_user(self, app, monkeypatch):
+        user_id, other_id = _user(), _user(email='q@principal.test')
+        get_principal(user_id)
+        get_principal(other_id)
+        walks = []
+        monkeypatch.setattr(principal_module._cache._l1, 'invalidate_prefix', walks.append)
+
+        principal_module.invalidate_principal(user_id)
+        assert walks == []  # exact-key delete, no namespace scan
+        assert principal_module._cache.get(f'user:{user_id}') is None
+        assert principal_module._cache.get(f'user:{other_id}') is not None
+
+    def test_entry_from_older_generation_is_a_miss(self, app):
+        user_id = _user()
+        get_principal(user_id)
+        principal_module._cache._l1.set(f'user:{user_id}', {
+            'generation': 'superseded',
+            'principal': {'user_id': user_id, 'is_active': False, 'role': 'user',
+                          'roles': [], 'permission_mask': 0, 'subscriptions': []},
+        }, 60)
+        assert get_principal(user_id).is_active is True
+
+    def test_generation_is_shared_across_workers(self, app, monkeypatch, tmp_path):
+        reset_shared_backend(SQLiteL2(tmp_path / 'l2.sqlite3'))
+        try:
+            user_id = _user()
+            builds = []
+            real_build = principal_module.build_principal
+            monkeypatch.setattr(principal_module, 'build_principal',
+                                lambda uid: builds.append(uid) or real_build(uid))
+            get_principal(user_id)
+            principal_module._cache._l1.clear()  # a sibling worker with a cold L1
+            get_principal(user_id)
+            assert builds == [user_id]
+
+            PermissionRegistry().invalidate()  # grant changed in another worker
+            get_principal(user_id)
+            assert builds == [user_id, user_id]
+        finally:
+            reset_shared_backend(None)
+            principal_module._cache._l1.clear()
+
+
+class TestDecorators:
+    """require_auth / require_role / require_subscription use the principal"""
+
+    def test_authenticated_request_skips_user_row_after_first_hit(self, client):
+        user_id = _user(email='me@principal.test')
+        headers = _headers(user_id)
+        client.get('/api/coocook/bookings', headers=headers)  # warm the cache
+
+        with _count_queries() as statements:
+            res = client.get('/api/coocook/bookings', headers=headers)
+        assert res.status_code == 403  # no subscription
+        assert statements == []
+
+    def test_role_assignment_takes_effect_immediately(self, client):
+        user_id = _user()
+        db.session.add(Role(name='admin', is_active=True))
+        db.session.commit()
+        headers = _headers(user_id)
+
+        assert client.get('/api/admin/rbac/roles', headers=headers).status_code == 403
+        with client.application.test_request_context():
+            assert assign_role_to_user(user_id, 'admin')[0] is True
+        assert client.get('/api/admin/rbac/roles', headers=headers).status_code == 200
+
+    def test_permission_grant_invalidates_every_principal(self, app):
+        user_id = _user()
+        db.session.add(Role(name='writer', is_active=True))
+        db.session.add(Permission(name='write:posts', resource='posts', action='write', is_active=True))
+        db.session.commit()
+        with app.test_request_context():
+            assign_role_to_user(user_id, 'writer')
+            assert not get_principal(user_id).has_permission('write:posts')
+            generation = permission_registry.generation()
+
+            assert grant_permission_to_role('writer', 'write:posts')[0] is True
+        assert permission_registry.generation() != generation
+        assert get_principal(user_id).has_permission('write:posts')
+
+    def test_deactivated_user_is_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(AdminService, 'audit_log', staticmethod(lambda **kw: None))
+        user_id = _user()
+        headers = _headers(user_id)
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+        AdminService.toggle_user_active(user_id, False, admin_id=None)
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+    def test_subscription_change_unlocks_product(self, client):
+        user_id = _user()
+        product_id = _coocook_id()
+        headers = _headers(user_id)
+        assert client.get('/api/coocook/bookings', headers=headers).status_code == 403
+
+        db.session.add(Subscription(user_id=user_id, product_id=product_id, status='active',
+                                    current_period_end=datetime.utcnow()))
+        db.session.commit()
+        principal_module.invalidate_principal(user_id)
+        assert client.get('/api/coocook/bookings', headers=headers).status_code == 200
@@ -0,0 +1,175 @@
+"""
+Unit Tests: backend.services.ai_cache.PromptCache
+Covers prompt normalization, similar-prompt hits, stale-while-revalidate and savings tracking.
+"""
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.services import ai_cache
+from backend.services.ai_cache import PromptCache, fresh_responses, normalize_prompt, prompt_similarity
+from backend.services.claude_ai import AIUsageTracker, ClaudeAIService
+
+
+def _caller(*texts):
+    """Fake Claude call returning the given texts in order and counting calls."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        return texts[min(len(calls), len(texts)) - 1], {'input_tokens': 100, 'output_tokens': 50}
+
+    return call, calls
+
+
+@pytest.fixture
+def cache(request):
+    return PromptCache({'generate_sns_content': 600, 'analyze_competitor': 600},
+                       namespace=f'test_prompt_{request.node.name}')
+
+
+class TestPromptKeys:
+    """Normalization and similarity matching"""
+
+    def test_whitespace_and_case_share_an_entry(self, cache):
+        call, calls = _caller('first', 'second')
+        cache.get_or_call('analyze_competitor', 'Analyze  @Chef\n', call, model='m')
+        text, usage, cached = cache.get_or_call('analyze_competitor', 'analyze @chef', call, model='m')
+        assert (text, cached) == ('first', True)
+        assert usage == {'input_tokens': 100, 'output_tokens': 50}
+        assert len(calls) == 1
+        assert normalize_prompt(' A\tB  ') == 'a b'
+
+    def test_params_are_part_of_the_key(self, cache):
+        call, calls = _caller('a', 'b')
+        cache.get_or_call('analyze_competitor', 'p', call, model='fast', max_tokens=100)
+        cache.get_or_call('analyze_competitor', 'p', call, max_tokens=100, model='balanced')
+        assert len(calls) == 2
+
+    def test_near_identical_topics_hit_but_different_topics_do_not(self):
+        cache = PromptCache({'generate_sns_content': 600}, namespace='test_prompt_similar', similarity=0.8)
+        template = 'instagram post | Topic: {} | Tone: casual | Tags: 5'
+        call, calls = _caller('stew post', 'other post', 'ten tags')
+        cache.get_or_call('generate_sns_content', template.format('Kimchi stew'), call)
+
+        assert cache.get_or_call('generate_sns_content', template.format('kimchi stews'), call)[2] is True
+        assert cache.get_or_call('generate_sns_content', template.format('spring menu'), call)[2] is False
+        # Numbers must match exactly
+        other = template.format('Kimchi stew').replace('Tags: 5', 'Tags: 10')
+        assert cache.get_or_call('generate_sns_content', other, call)[2] is False
+        assert len(calls) == 3
+        assert cache.stats()['similar_hits'] == 1
+
+        assert prompt_similarity('topic: beef', 'topic: beer') < 0.8
+
+    def test_similarity_matching_is_off_by_default(self, cache):
+        call, calls = _caller('healthy post', 'unhealthy post')
+        assert prompt_similarity('topic: healthy', 'topic: unhealthy') > 0.8
+        cache.get_or_call('generate_sns_content', 'Topic: healthy', call)
+        text, _, cached = cache.get_or_call('generate_sns_content', 'Topic: unhealthy', call)
+        assert (text, cached) == ('unhealthy post', False)
+        assert cache.stats()['similar_hits'] == 0
+
+    def test_uncached_methods_and_failures_always_call(self, cache):
+        call, calls = _caller('x')
+        cache.get_or_call('generate_review_response', 'p', call)
+        cache.get_or_call('generate_review_response', 'p', call)
+
+        failing = MagicMock(return_value=(None, None))
+        cache.get_or_call('analyze_competitor', 'q', failing)
+        cache.get_or_call('analyze_competitor', 'q', failing)
+        assert len(calls) == 2
+        assert failing.call_count == 2
+
+
+    def test_fresh_responses_bypass_and_replace_the_entry(self, cache, app):
+        call, calls = _caller('v1', 'v2', 'v3')
+        cache.get_or_call('generate_sns_content', 'p', call)
+        with fresh_responses():
+            assert cache.get_or_call('generate_sns_content', 'p', call)[:3:2] == ('v2', False)
+        assert cache.get_or_call('generate_sns_content', 'p', call)[:3:2] == ('v2', True)
+
+        with app.test_request_context(headers={'Cache-Control': 'no-cache'}):
+            assert cache.get_or_call('generate_sns_content', 'p', call)[0] == 'v3'
+        assert len(calls) == 3 and cache.stats()['bypassed'] == 2
+
+
+class TestStaleWhileRevalidate:
+    """Expired entries are served while one background call refreshes them"""
+
+    def test_stale_entry_is_served_and_refreshed_once(self, cache):
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            if len(calls) > 1:
+                release.wait(2)
+            return f'v{len(calls)}', {'input_tokens': 1, 'output_tokens': 1}
+
+        cache.get_or_call('analyze_competitor', 'p', call)
+        key = cache.make_key('analyze_competitor', 'p')[0]
+        cache._cache.get(key)['fresh_until'] = 0  # expire without waiting
+
+        text, _, cached = cache.get_or_call('analyze_competitor', 'p', call)
+        assert (text, cached) == ('v1', True)
+        assert cache.get_or_call('analyze_competitor', 'p', call)[0] == 'v1'
+        release.set()
+
+        deadline = time.time() + 2
+        while cache.stats()['refreshing'] and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 2
+        assert cache.get_or_call('analyze_competitor', 'p', call)[0] == 'v2'
+        assert cache.stats()['background_refreshes'] == 1
+
+    def test_stale_similar_hit_refreshes_its_own_prompt(self):
+        cache = PromptCache({'generate_sns_content': 600}, namespace='test_prompt_similar_stale',
+                            similarity=0.8)
+        template = 'instagram post | Topic: {} | Tone: casual | Tags: 5'
+        call_a, _ = _caller('stew post')
+        call_b, calls_b = _caller('stews post')
+        cache.get_or_call('generate_sns_content', template.format('Kimchi stew'), call_a)
+        key_a = cache.make_key('generate_sns_content', template.format('Kimchi stew'))[0]
+        cache._cache.get(key_a)['fresh_until'] = 0
+
+        text, _, cached = cache.get_or_call('generate_sns_content', template.format('kimchi stews'), call_b)
+        assert (text, cached) == ('stew post', True)
+        deadline = time.time() + 2
+        while cache.stats()['refreshing'] and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert len(calls_b) == 1
+        assert cache._cache.get(key_a)['text'] == 'stew post'
+        assert cache.get_or_call('generate_sns_content', template.format('kimchi stews'), call_b)[0] == 'stews post'
+
+
+class TestSavingsTracking:
+    """AIUsageTracker reports tokens and dollars saved by cache hits"""
+
+    def test_cache_hits_are_reported_as_savings(self, monkeypatch):
+        tracker = AIUsageTracker()
+        monkeypatch.setattr('backend.services.claude_ai.usage_tracker', tracker)
+        monkeypatch.setattr(ai_cache, 'prompt_cache',
+                            PromptCache({'analyze_nutrition': 600}, namespace='test_prompt_savings'))
+
+        service = ClaudeAIService.__new__(ClaudeAIService)
+        service.client = MagicMock()
+        service.client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text='{"calories": 100}')],
+            usage=SimpleNamespace(input_tokens=1000, output_tokens=500),
+        )
+
+        for _ in range(3):
+            assert service._call_claude('rice, egg', json_mode=True, method='analyze_nutrition') == {'calories': 100}
+
+        assert service.client.messages.create.call_count == 1
+        report = tracker.report()
+        assert report['daily_calls'] == 1
+        assert report['cache_hits'] == 2
+        assert report['tokens_saved'] == 3000
+        # fast tier: 2 x (1000 x $0.25 + 500 x $1.25) / 1M
+        assert report['estimated_savings_usd'] == pytest.approx(0.00175)
@@ -0,0 +1,53 @@
+"""
+Unit Tests: backend.rate_limiter.GCRARateLimiter
+Covers burst allowance, refill, header info and the SQLite shared backend.
+"""
+from unittest.mock import patch
+
+from backend.rate_limiter import GCRARateLimiter, SQLiteGCRABackend
+
+
+class TestGCRARateLimiter:
+    """In-process GCRA behaviour."""
+
+    def test_allows_burst_up_to_limit_then_denies(self):
+        limiter = GCRARateLimiter()
+        results = [limiter.check('ip:1', 5, 60) for _ in range(6)]
+
+        assert [allowed for allowed, _ in results] == [True] * 5 + [False]
+        assert [info['remaining'] for _, info in results[:5]] == [4, 3, 2, 1, 0]
+        denied = results[-1][1]
+        assert denied['remaining'] == 0
+        assert 1 <= denied['retry_after'] <= 12
+
+    def test_refills_one_request_per_interval(self):
+        limiter = GCRARateLimiter()
+        with patch('backend.rate_limiter.time.time', return_value=1000.0):
+            for _ in range(3):
+                limiter.check('ip:2', 3, 30)
+            assert limiter.check('ip:2', 3, 30)[0] is False
+        with patch('backend.rate_limiter.time.time', return_value=1010.0):
+            allowed, info = limiter.check('ip:2', 3, 30)
+
+        assert allowed is True
+        assert info['remaining'] == 0
+
+    def test_keys_are_independent_and_resettable(self):
+        limiter = GCRARateLimiter(shards=4)
+        limiter.check('a', 1, 60)
+
+        assert limiter.check('a', 1, 60)[0] is False
+        assert limiter.check('b', 1, 60)[0] is True
+        limiter.reset('a')
+        assert limiter.check('a', 1, 60)[0] is True
+
+    def test_sqlite_backend_shares_state_between_limiters(self, tmp_path):
+        path = tmp_path / 'rl.sqlite3'
+        worker_a = GCRARateLimiter(backend=SQLiteGCRABackend(path))
+        worker_b = GCRARateLimiter(backend=SQLiteGCRABackend(path))
+
+        assert worker_a.check('ip:3', 2, 60)[0] is True
+        assert worker_b.check('ip:3', 2, 60)[0] is True
+        allowed, info = worker_a.check('ip:3', 2, 60)
+        assert allowed is False
+        assert info['retry_after'] >= 1
@@ -0,0 +1,194 @@
+"""
+Unit Tests: /api/review/aggregated
+Covers the denormalized application_count, keyset pagination for every
+sort, and the crawl-refreshed last_scraped cache.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+from sqlalchemy import event
+
+from backend.auth import create_tokens
+from backend.models import db, ReviewAccount, ReviewApplication, ReviewAutoRule, ReviewListing, User
+from backend.services import review_freshness
+from backend.services.auto_apply import AutoApplyMatcher
+
+_ids = count()
+
+
+def _user():
+    db.session.expunge_all()
+    user = User(email='agg@review.test', password_hash='x', name='Agg')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _account(user_id, name='acct'):
+    account = ReviewAccount(user_id=user_id, platform='naver', account_name=name, is_active=True)
+    db.session.add(account)
+    db.session.commit()
+    return account
+
+
+def _listing(reward=10000, days=10, scraped_minutes=0):
+    listing = ReviewListing(source_platform='revu', external_id=f'agg-{next(_ids)}', title='L',
+                            category='뷰티', reward_type='금전', reward_value=reward, status='active',
+                            deadline=datetime.utcnow() + timedelta(days=days),
+                            scraped_at=datetime(2026, 10, 1) + timedelta(minutes=scraped_minutes))
+    db.session.add(listing)
+    db.session.commit()
+    return listing.id
+
+
+def _count(listing_id):
+    db.session.expire_all()
+    return db.session.get(ReviewListing, listing_id).application_count
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def headers(app):
+    user_id = _user()
+    token, _ = create_tokens(user_id, 'user')
+    return user_id, {'Authorization': f'Bearer {token}'}
+
+
+class TestApplicationCount:
+    """Counter follows inserts, deletes, cascades and bulk inserts"""
+
+    def test_orm_insert_delete_and_cascade(self, app):
+        user_id = _user()
+        first, second = _account(user_id, 'a'), _account(user_id, 'b')
+        listing_id = _listing()
+
+        db.session.add_all([ReviewApplication(listing_id=listing_id, account_id=first.id),
+                            ReviewApplication(listing_id=listing_id, account_id=second.id)])
+        db.session.commit()
+        assert _count(listing_id) == 2
+
+        db.session.delete(ReviewApplication.query.filter_by(account_id=first.id).one())
+        db.session.commit()
+        assert _count(listing_id) == 1
+
+        db.session.delete(db.session.get(ReviewAccount, second.id))  # cascades to its applications
+        db.session.commit()
+        assert _count(listing_id) == 0
+
+    def test_rollback_discards_increment(self, app):
+        user_id = _user()
+        account = _account(user_id)
+        listing_id = _listing()
+        db.session.add(ReviewApplication(listing_id=listing_id, account_id=account.id))
+        db.session.flush()
+        db.session.rollback()
+        assert _count(listing_id) == 0
+
+    def test_auto_apply_bulk_insert(self, app):
+        user_id = _user()
+        _account(user_id)
+        listing_ids = [_listing() for _ in range(3)]
+        db.session.add(ReviewAutoRule(user_id=user_id, name='all', is_active=True))
+        db.session.commit()
+
+        assert AutoApplyMatcher().run().applied == 3
+        assert [_count(i) for i in listing_ids] == [1, 1, 1]
+
+
+class TestAggregatedEndpoint:
+    """Sorting, keyset pagination and last_scraped"""
+
+    def _walk(self, client, headers, sort, per_page=2):
+        body = client.get(f'/api/review/aggregated?sort={sort}&per_page={per_page}',
+                          headers=headers).get_json()
+        seen = [l['id'] for l in body['listings']]
+        while body['next_cursor']:
+            body = client.get(f"/api/review/aggregated?sort={sort}&per_page={per_page}"
+                              f"&cursor={body['next_cursor']}", headers=headers).get_json()
+            assert body['total'] is None
+            seen.extend(l['id'] for l in body['listings'])
+        return seen
+
+    def test_keyset_matches_page_order_for_every_sort(self, client, headers):
+        user_id, auth = headers
+        account = _account(user_id)
+        ids = [_listing(reward=r, days=d, scraped_minutes=m)
+               for r, d, m in [(30000, 5, 3), (None, 9, 1), (10000, 7, 2), (30000, 3, 4), (None, 2, 0)]]
+        db.session.add_all([ReviewApplication(listing_id=ids[0], account_id=account.id),
+                            ReviewApplication(listing_id=ids[3], account_id=account.id)])
+        db.session.commit()
+
+        for sort in ('latest', 'reward_high', 'applicants_few', 'deadline'):
+            full = client.get(f'/api/review/aggregated?sort={sort}&per_page=50',
+                              headers=auth).get_json()
+            assert full['total'] == 5
+            assert self._walk(client, auth, sort) == [l['id'] for l in full['listings']], sort
+
+        few = client.get('/api/review/aggregated?sort=applicants_few&per_page=50', headers=auth).get_json()
+        assert [l['current_applicants'] for l in few['listings']] == [0, 0, 0, 1, 1]
+        reward = client.get('/api/review/aggregated?sort=reward_high&per_page=50', headers=auth).get_json()
+        assert [l['reward_value'] for l in reward['listings']] == [30000, 30000, 10000, None, None]
+
+    def test_no_group_by_or_max_scan_per_request(self, client, headers):
+        _, auth = headers
+        _listing()
+        review_freshness.refresh_last_scraped()
+        client.get('/api/review/aggregated?sort=applicants_few', headers=auth)  # warm auth caches
+
+        with _count_queries() as statements:
+            body = client.get('/api/review/aggregated?sort=applicants_few', headers=auth).get_json()
+        sql = ' '.join(statements).upper()
+        assert 'GROUP BY' not in sql and 'MAX(' not in sql
+        assert body['last_scraped'] == '2026-10-01T00:00:00'
+
+    def test_last_scraped_refreshes_on_crawl(self, app):
+        _listing(scraped_minutes=0)
+        assert review_freshness.refresh_last_scraped() == datetime(2026, 10, 1)
+        _listing(scraped_minutes=5)
+        assert review_freshness.get_last_scraped() == datetime(2026, 10, 1)  # cached
+        review_freshness.refresh_last_scraped()
+        assert review_freshness.get_last_scraped() == datetime(2026, 10, 1, 0, 5)
+
+    @pytest.mark.parametrize('use_async', [False, True])
+    def test_every_aggregation_publishes_last_scraped(self, app, monkeypatch, use_async):
+        from unittest.mock import MagicMock
+        from backend.services import review_scrapers
+        from backend.services.review_scrapers.base_scraper import BaseScraper
+
+        class OneListingScraper(BaseScraper):
+            def __init__(self):
+                super().__init__('fake', use_proxy=False, use_captcha_solver=False)
+
+            def parse_listings(self):
+                return [_listing(scraped_minutes=5)]
+
+        _listing(scraped_minutes=0)
+        review_freshness.refresh_last_scraped()
+        monkeypatch.setattr(review_scrapers, '_create_scrapers', lambda: [OneListingScraper()])
+
+        if use_async:
+            import asyncio
+            asyncio.run(review_scrapers.aggregate_all_listings_async(engine=MagicMock()))
+        else:
+            review_scrapers.aggregate_all_listings(use_async=False)
+        assert review_freshness.get_last_scraped() == datetime(2026, 10, 1, 0, 5)
+
+    def test_invalid_cursor(self, client, headers):
+        _, auth = headers
+        res = client.get('/api/review/aggregated?cursor=%%%', headers=auth)
+        assert res.status_code == 400
@@ -0,0 +1,178 @@
+"""
+Unit Tests: backend.services.search_indexer
+Covers keyset-paginated reads, checkpointed resumable reindexing and alias swaps.
+"""
+import types
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+from elasticsearch import NotFoundError
+
+from backend.models import db, User
+from backend.services import search_indexer
+from backend.services.elasticsearch_service import ElasticsearchService
+
+
+@pytest.fixture(autouse=True)
+def _no_build_wait(monkeypatch):
+    monkeypatch.setattr(search_indexer, 'BUILD_LOOKUP_TTL', 0)
+    monkeypatch.setattr(search_indexer, '_checkpoint_targets', {})
+
+
+def _make_users(count):
+    db.session.expunge_all()
+    User.query.delete()
+    users = [User(email=f'u{i}@test.dev', password_hash='x', name=f'User {i}') for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [u.id for u in users]
+
+
+def _fake_service(checkpoint=None, legacy_index=True):
+    """ElasticsearchService stand-in that records bulk-streamed documents."""
+    service = MagicMock()
+    service.get_mapping.side_effect = lambda alias: {'settings': {'number_of_replicas': 1}, 'mappings': {}}
+    service.streamed = []
+
+    def stream_bulk(index, documents, chunk_size=500, thread_count=1):
+        docs = list(documents)
+        service.streamed.append((index, [d['id'] for d in docs]))
+        return len(docs), []
+
+    service.stream_bulk.side_effect = stream_bulk
+    es = service.es
+    if checkpoint:
+        es.get.return_value = {'_source': checkpoint}
+    else:
+        es.get.side_effect = NotFoundError('missing', MagicMock(status=404), {})
+    es.indices.exists.return_value = legacy_index
+    es.indices.exists_alias.return_value = False
+    return service
+
+
+def _patch_manager(service):
+    return patch.object(search_indexer, 'get_search_manager',
+                        return_value=types.SimpleNamespace(es=service))
+
+
+class TestKeysetPages:
+    """iter_row_pages()"""
+
+    def test_pages_follow_primary_key_order(self, app):
+        ids = _make_users(5)
+
+        pages = [[u.id for u in page] for page in search_indexer.iter_row_pages(User, batch_size=2)]
+        assert pages == [ids[0:2], ids[2:4], ids[4:5]]
+
+        resumed = [[u.id for u in page] for page in search_indexer.iter_row_pages(User, ids[2], 2)]
+        assert resumed == [ids[3:5]]
+
+
+class TestReindex:
+    """reindex() into versioned indices behind an alias"""
+
+    def test_full_reindex_checkpoints_pages_and_swaps_alias(self, app):
+        ids = _make_users(3)
+        service = _fake_service()
+
+        with _patch_manager(service):
+            assert search_indexer.index_users(batch_size=2) == 3
+
+        es = service.es
+        target = es.indices.create.call_args.kwargs['index']
+        assert target.startswith('users_')
+        assert es.indices.create.call_args.kwargs['body']['settings']['refresh_interval'] == '-1'
+        assert service.streamed == [(target, ids[0:2]), (target, ids[2:3])]
+
+        checkpoints = [c.kwargs['document']['last_id'] for c in es.index.call_args_list]
+        # The target is published before the scan, then checkpointed per page
+        assert checkpoints == [0, ids[1], ids[2]]
+
+        # Legacy concrete 'users' index is replaced by the alias in one atomic call
+        actions = es.indices.update_aliases.call_args.kwargs['actions']
+        assert actions == [
+            {'remove_index': {'index': 'users'}},
+            {'add': {'index': target, 'alias': 'users'}},
+        ]
+        es.delete.assert_called_once_with(index=search_indexer.CHECKPOINT_INDEX, id='users')
+
+    def test_interrupted_reindex_resumes_from_checkpoint(self, app):
+        ids = _make_users(4)
+        checkpoint = {'alias': 'users', 'target': 'users_20260101000000', 'last_id': ids[1], 'indexed': 2}
+        service = _fake_service(checkpoint=checkpoint)
+        service.es.indices.exists_alias.return_value = True
+        service.es.indices.get_alias.return_value = {'users_20251201000000': {}}
+
+        with _patch_manager(service):
+            assert search_indexer.reindex('users', batch_size=10) == 4
+
+        es = service.es
+        es.indices.create.assert_not_called()
+        assert service.streamed == [('users_20260101000000', ids[2:4])]
+        assert es.indices.update_aliases.call_args.kwargs['actions'] == [
+            {'remove': {'index': 'users_20251201000000', 'alias': 'users'}},
+            {'add': {'index': 'users_20260101000000', 'alias': 'users'}},
+        ]
+        es.indices.delete.assert_called_once_with(index='users_20251201000000')
+
+    def test_failure_keeps_checkpoint_and_returns_zero(self, app):
+        _make_users(2)
+        service = _fake_service()
+        service.es.indices.update_aliases.side_effect = RuntimeError('cluster red')
+
+        with _patch_manager(service):
+            assert search_indexer.index_users() == 0
+
+        service.es.delete.assert_not_called()
+        assert search_indexer._active_builds == {}
+
+
+    def test_syncs_from_other_processes_reach_the_build_target(self, app, monkeypatch):
+        checkpoint = {'alias': 'recipes', 'target': 'recipes_20260101000000', 'last_id': 7, 'indexed': 7}
+        service = _fake_service(checkpoint=checkpoint)
+        monkeypatch.setattr(search_indexer, 'BUILD_LOOKUP_TTL', 60)
+        doc = {'id': 3, 'title': 'stew'}
+
+        with _patch_manager(service):
+            search_indexer._sync_document('recipes', doc)
+            search_indexer._sync_document('recipes', doc)
+
+        assert service.index_document.call_args_list == [
+            call('recipes', 3, doc), call('recipes_20260101000000', 3, doc),
+        ] * 2
+        service.es.get.assert_called_once()  # second lookup served from the cache
+
+
+class TestStreamBulk:
+    """ElasticsearchService.stream_bulk()"""
+
+    def _service(self):
+        service = ElasticsearchService.__new__(ElasticsearchService)
+        service.es = MagicMock()
+        return service
+
+    def test_documents_are_consumed_lazily_in_chunks(self):
+        consumed = []
+
+        def documents():
+            for i in range(3):
+                consumed.append(i)
+                yield {'id': i}
+
+        def fake_streaming_bulk(client, actions, chunk_size, **kwargs):
+            assert chunk_size == 2
+            assert consumed == []
+            for action in actions:
+                yield action['_id'] != 1, action
+
+        with patch('backend.services.elasticsearch_service.streaming_bulk', fake_streaming_bulk):
+            success, errors = self._service().stream_bulk('users_v2', documents(), chunk_size=2)
+
+        assert success == 2
+        assert [e['_id'] for e in errors] == [1]
+
+    def test_threads_use_parallel_bulk(self):
+        with patch('backend.services.elasticsearch_service.parallel_bulk',
+                   return_value=iter([(True, {})])) as parallel:
+            assert self._service().stream_bulk('users', [{'id': 1}], thread_count=4) == (1, [])
+        assert parallel.call_args.kwargs['thread_count'] == 4
@@ -0,0 +1,86 @@
+"""
+Unit Tests: backend.shared_cache
+Covers L1/L2 read-through, cross-worker invalidation and L1-only fallback.
+"""
+import pytest
+
+from backend import shared_cache
+from backend.cache import TTLCache
+from backend.shared_cache import SQLiteL2, TieredCache, reset_shared_backend
+
+
+@pytest.fixture
+def sqlite_l2(tmp_path):
+    backend = SQLiteL2(tmp_path / 'l2.sqlite3')
+    reset_shared_backend(backend)
+    yield backend
+    reset_shared_backend(None)
+
+
+class TestTieredCache:
+    """Two-tier read/write behaviour."""
+
+    def test_l1_miss_is_served_from_l2(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        cache.set('k:1', {'value': 1}, ttl_seconds=60)
+        cache._l1.clear()  # simulate a sibling worker with a cold L1
+
+        assert cache.get('k:1') == {'value': 1}
+        assert cache.stats()['l2_hits'] == 1
+        assert cache.stats()['l2_backend'] == 'sqlite'
+
+    def test_invalidate_prefix_clears_both_tiers(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        cache.set('user:1:a', 'a', ttl_seconds=60)
+        cache.set('user:2:a', 'b', ttl_seconds=60)
+
+        cache.invalidate_prefix('user:1:')
+        cache._l1.clear()
+
+        assert cache.get('user:1:a') is None
+        assert cache.get('user:2:a') == 'b'
+
+    def test_delete_removes_only_the_exact_key(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        cache.set('user:5', 'a', ttl_seconds=60)
+        cache.set('user:50', 'b', ttl_seconds=60)
+
+        cache.delete('user:5')
+        cache._l1.clear()
+
+        assert cache.get('user:5') is None
+        assert cache.get('user:50') == 'b'
+
+    def test_remote_exact_delete_keeps_sibling_keys(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        cache._l1.set('user:5', 'stale', 60)
+        cache._l1.set('user:50', 'fresh', 60)
+
+        shared_cache._dispatch_invalidation('unit_tier', 'user:5' + shared_cache._EXACT)
+
+        assert cache._l1.get('user:5') is None
+        assert cache._l1.get('user:50') == 'fresh'
+
+    def test_remote_invalidation_drops_local_l1(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        cache._l1.set('feed:1', 'stale', 60)
+
+        shared_cache._dispatch_invalidation('unit_tier', 'feed:')
+
+        assert cache._l1.get('feed:1') is None
+
+    def test_unserializable_values_stay_in_l1(self, sqlite_l2):
+        cache = TieredCache('unit_tier', TTLCache())
+        marker = object()
+        cache.set('obj:1', marker, ttl_seconds=60)
+
+        assert cache.get('obj:1') is marker
+        assert sqlite_l2.get('unit_tier:obj:1') is None
+
+    def test_without_l2_behaves_as_plain_ttl_cache(self):
+        reset_shared_backend(None)
+        cache = TieredCache('unit_tier', TTLCache(), l1_max_ttl=1)
+        cache.set('k', 'v', ttl_seconds=3600)
+
+        assert cache.get('k') == 'v'
+        assert cache.stats()['l2_backend'] is None
@@ -0,0 +1,265 @@
+"""
+Unit Tests: backend.services.sns_delivery
+Covers leased claims, batched rule/post delivery, per-platform concurrency
+limits, prefetching and out-of-transaction notifications.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from backend.leases import claim, retain
+from backend.models import db, SNSAccount, SNSAutomate, SNSPost, SNSSettings, User
+from backend.scheduler import execute_scheduled_posts
+from backend.services import sns_delivery
+from backend.services.sns_delivery import PlatformLimiter, SNSDeliveryEngine, parse_concurrency
+
+NOW = datetime(2026, 10, 16, 12, 0)
+
+
+def _user(email='sns@delivery.test', telegram=False):
+    user = User(email=email, password_hash='x', name='SNS')
+    db.session.add(user)
+    db.session.flush()
+    if telegram:
+        db.session.add(SNSSettings(user_id=user.id, telegram_enabled=True, telegram_chat_id=f'chat-{user.id}'))
+    db.session.commit()
+    return user.id
+
+
+def _account(user_id, platform='twitter', active=True):
+    account = SNSAccount(user_id=user_id, platform=platform, account_name=platform, is_active=active)
+    db.session.add(account)
+    db.session.commit()
+    return account.id
+
+
+def _rule(user_id, platforms=('twitter',), **kw):
+    rule = SNSAutomate(user_id=user_id, name=kw.pop('name', 'rule'), topic='AI', platforms=list(platforms),
+                       next_run=kw.pop('next_run', NOW - timedelta(minutes=1)), is_active=True, **kw)
+    db.session.add(rule)
+    db.session.commit()
+    return rule.id
+
+
+def _post(user_id, account_id, platform='twitter', minutes_ago=1):
+    post = SNSPost(user_id=user_id, account_id=account_id, content='hello', platform=platform,
+                   status='scheduled', scheduled_at=NOW - timedelta(minutes=minutes_ago))
+    db.session.add(post)
+    db.session.commit()
+    return post.id
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def sent(app, monkeypatch):
+    """Records Telegram notifications instead of sending them."""
+    db.session.expunge_all()
+    calls = []
+    monkeypatch.setattr(sns_delivery, 'dispatch_sns_notification',
+                        lambda chat_id, kind, data: calls.append((chat_id, kind)) or True)
+    return calls
+
+
+class TestLeases:
+    """claim() hands each row to exactly one owner until the lease expires"""
+
+    def test_claim_is_exclusive_until_expiry(self, sent):
+        user_id = _user()
+        ids = [_rule(user_id, name=f'r{i}') for i in range(3)]
+        criteria = lambda: [SNSAutomate.next_run <= NOW]  # noqa: E731
+
+        first = claim(SNSAutomate, criteria(), [SNSAutomate.id], 2, 60, owner='a', now=NOW)
+        second = claim(SNSAutomate, criteria(), [SNSAutomate.id], 5, 60, owner='b', now=NOW)
+        assert first == ids[:2] and second == ids[2:]
+        assert claim(SNSAutomate, criteria(), [SNSAutomate.id], 5, 60, owner='c', now=NOW) == []
+
+        later = NOW + timedelta(seconds=61)
+        assert claim(SNSAutomate, criteria(), [SNSAutomate.id], 5, 60, owner='d', now=later) == ids
+
+    def test_retain_drops_rows_reclaimed_by_another_worker(self, sent):
+        user_id = _user()
+        ids = [_rule(user_id, name=f'r{i}') for i in range(2)]
+        claim(SNSAutomate, [SNSAutomate.next_run <= NOW], [SNSAutomate.id], 2, 60, owner='a', now=NOW)
+        later = NOW + timedelta(seconds=61)
+        claim(SNSAutomate, [SNSAutomate.id == ids[1]], [SNSAutomate.id], 1, 60, owner='b', now=later)
+
+        assert retain(SNSAutomate, ids, 'a', 60) == ids[:1]
+        db.session.commit()
+
+    def test_slow_publish_does_not_overwrite_reclaimed_rows(self, sent, app, monkeypatch):
+        user_id = _user()
+        post_id = _post(user_id, _account(user_id))
+        engine = SNSDeliveryEngine(lease_seconds=60)
+
+        def publish_while_lease_expires(job):
+            # Another worker re-claims the row while this publish is in flight
+            with app.app_context():
+                claim(SNSPost, [SNSPost.id == post_id], [SNSPost.id], 1, 60, owner='other',
+                      now=datetime.utcnow() + timedelta(seconds=61))
+            return {'success': True, 'external_post_id': 'late'}
+
+        monkeypatch.setattr(engine, '_publish', publish_while_lease_expires)
+        stats = engine.run(now=NOW)
+
+        assert stats.leases_lost == 1 and stats.published == 0
+        db.session.expire_all()
+        post = db.session.get(SNSPost, post_id)
+        assert post.status == 'scheduled' and post.lease_owner == 'other'
+
+    def test_engine_skips_rows_leased_by_another_worker(self, sent):
+        user_id = _user()
+        _account(user_id)
+        leased = _rule(user_id, name='leased')
+        free = _rule(user_id, name='free')
+        claim(SNSAutomate, [SNSAutomate.id == leased], [SNSAutomate.id], 1, 300, owner='other', now=NOW)
+
+        stats = SNSDeliveryEngine(lease_seconds=300).run(now=NOW)
+        assert stats.rules_executed == 1
+        db.session.expire_all()
+        assert db.session.get(SNSAutomate, leased).next_run < NOW
+        assert db.session.get(SNSAutomate, free).next_run == NOW + timedelta(days=1)
+
+
+class TestDelivery:
+    """Rule execution and scheduled post publishing"""
+
+    def test_rules_record_posts_and_advance(self, sent, monkeypatch):
+        monkeypatch.setattr(sns_delivery, 'get_client', lambda *a, **kw: pytest.fail('rule posted live'))
+        user_id = _user(telegram=True)
+        _account(user_id, 'twitter')
+        _account(user_id, 'wordpress')
+        social = _rule(user_id, ('twitter',), frequency='weekly')
+        blog = _rule(user_id, ('wordpress',), name='blog')
+
+        stats = SNSDeliveryEngine().run(now=NOW)
+
+        assert stats.rules_executed == 2 and stats.published == 1 and stats.drafts == 1
+        db.session.expire_all()
+        rule = db.session.get(SNSAutomate, social)
+        assert rule.next_run == NOW + timedelta(weeks=1) and rule.lease_owner is None
+        assert db.session.get(SNSAutomate, blog).next_run == NOW + timedelta(minutes=10)
+        posts = {p.platform: p for p in SNSPost.query.filter_by(user_id=user_id)}
+        assert posts['twitter'].status == 'published' and not posts['twitter'].external_post_id
+        assert posts['wordpress'].status == 'draft'
+        assert sorted(kind for _, kind in sent) == ['automation_executed', 'automation_executed']
+
+    def test_live_rules_publish_to_platform(self, sent):
+        user_id = _user()
+        _account(user_id, 'twitter')
+        _rule(user_id, ('twitter',))
+
+        stats = SNSDeliveryEngine(live_rules=True).run(now=NOW)
+
+        assert stats.published == 1
+        post = SNSPost.query.filter_by(user_id=user_id).one()
+        assert post.status == 'published' and post.external_post_id
+
+    def test_rule_without_account_waits_for_lease(self, sent):
+        user_id = _user(telegram=True)
+        rule_id = _rule(user_id, ('instagram',))
+        engine = SNSDeliveryEngine(lease_seconds=300)
+
+        stats = engine.run(now=NOW)
+        assert stats.rules_without_account == 1 and stats.batches == 1
+        assert sent == [(f'chat-{user_id}', 'post_failure')]
+        assert engine.run(now=NOW + timedelta(seconds=10)).rules_claimed == 0
+
+        _account(user_id, 'instagram')
+        assert engine.run(now=NOW + timedelta(seconds=301)).rules_executed == 1
+        db.session.expire_all()
+        assert db.session.get(SNSAutomate, rule_id).lease_owner is None
+
+    def test_scheduled_posts(self, sent):
+        user_id = _user()
+        active = _account(user_id)
+        inactive = _account(user_id, 'instagram', active=False)
+        ok = _post(user_id, active)
+        bad = _post(user_id, inactive, 'instagram')
+        future = _post(user_id, active, minutes_ago=-5)
+
+        stats = SNSDeliveryEngine().run(now=NOW)
+
+        assert stats.posts_claimed == 2 and stats.published == 1 and stats.failed == 1
+        db.session.expire_all()
+        assert db.session.get(SNSPost, ok).status == 'published'
+        failed = db.session.get(SNSPost, bad)
+        assert failed.status == 'failed' and failed.retry_count == 1 and failed.lease_owner is None
+        assert db.session.get(SNSPost, future).status == 'scheduled'
+
+    def test_batches_drain_backlog_with_constant_queries(self, sent):
+        for i in range(4):
+            user_id = _user(f'u{i}@delivery.test', telegram=True)
+            account_id = _account(user_id)
+            for j in range(3):
+                _rule(user_id, name=f'r{j}')
+                _post(user_id, account_id)
+
+        with _count_queries() as statements:
+            stats = SNSDeliveryEngine(batch_size=6).run(now=NOW)
+
+        assert stats.batches == 2 and stats.rules_executed == 12 and stats.published == 24
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        # per batch: 2 claim read-backs, rules, posts, accounts, settings, 2 lease re-checks;
+        # plus the final empty claim
+        assert len(selects) == 2 * 8 + 2
+
+    def test_scheduler_job_reports_stats(self, sent, app):
+        user_id = _user()
+        _post(user_id, _account(user_id), minutes_ago=60 * 24 * 400)
+        stats = execute_scheduled_posts(app)
+        assert stats['published'] == 1
+
+
+class TestConcurrency:
+    """Per-platform semaphores bound concurrent publishes"""
+
+    def test_parse_concurrency(self):
+        assert parse_concurrency('3,instagram=1, telegram=4') == (3, {'instagram': 1, 'telegram': 4})
+        assert parse_concurrency('') == (2, {})
+
+    def test_platform_limit(self, sent, monkeypatch):
+        active = {'instagram': 0, 'twitter': 0}
+        peak = {'instagram': 0, 'twitter': 0}
+        lock = threading.Lock()
+
+        class SlowClient:
+            def __init__(self, platform):
+                self.platform = platform
+
+            def post_content(self, **kw):
+                with lock:
+                    active[self.platform] += 1
+                    peak[self.platform] = max(peak[self.platform], active[self.platform])
+                time.sleep(0.02)
+                with lock:
+                    active[self.platform] -= 1
+                return {'success': True, 'external_post_id': 'x'}
+
+        monkeypatch.setattr(sns_delivery, 'get_client', lambda platform, **kw: SlowClient(platform))
+        user_id = _user()
+        insta, twitter = _account(user_id, 'instagram'), _account(user_id, 'twitter')
+        for _ in range(6):
+            _post(user_id, insta, 'instagram')
+            _post(user_id, twitter, 'twitter')
+
+        engine = SNSDeliveryEngine(workers=8, limiter=PlatformLimiter(3, {'instagram': 1}))
+        assert engine.run(now=NOW).published == 12
+        assert peak['instagram'] == 1
+        assert 1 < peak['twitter'] <= 3